@@ -66,6 +66,7 @@ class SettingsConfigured():
 		self._settings['USER_INPUT']['automatic_mode'] 				= True 	# Set True to run program without any breaking point.
 		self._settings['USER_INPUT']['no_termination'] 				= True 	# Set True to run program with no termination possibility.
 		self._settings['USER_INPUT']['key_terminate']				= 'q'	# Press/hold this key to terminate the program.
+		self._settings['USER_INPUT']['key_trigger_recording'] 		= 't' 	# Press this key to store the frames around this moment (when frames are held in the pre-trigger buffer).
 		#---- COMPUTER VISION SETTINGS ----#
 		self._settings['CV'] 										= {}
 		self._settings['CV']['rho_step_distance'] 					= None  		# If None = then each step distance (how far the drone should fly during each step) is set to a quarter the diagonal frame size
@@ -74,6 +75,11 @@ class SettingsConfigured():
 		self._settings['CV']['desired_frame_shape'] 				= (512,612) 	# Desired frame shape to work with, given as a tuple of (height, width). Set to (-1,-1) to not use a desired frame shape, and instead stay fixed to the default downsampling divisor.
 		self._settings['CV']['detector_type'] 						= 0 			# Detector type to use for detecting feature points (blobs) - options: 0, 1, 2, 3 for simple blob detector, ORB, SIFT or SURF (in that order)
 		self._settings['CV']['crop_frames'] 						= True 			# Crop frames according to the difference in fan angle between the laser and camera.
+		self._settings['CV']['blob_detection_tiles'] 				= 1 			# Number of overlapping tiles for detecting blobs in parallel threads. Set <= 1 to detect blobs on the whole frame in a single thread.
+		self._settings['CV']['coarse_detection_divisor'] 			= 1 			# Coarse-to-fine detection: locate blobs on the green mask downsampled by this divisor, and refine the centroids at the processing resolution. Set <= 1 for single scale detection.
+		self._settings['CV']['point_tracking_keyframe_interval'] 	= 1 			# Track points between frames with optical flow, and only run full blob detection every n-th frame (keyframe). Set <= 1 to run full detection on every frame.
+		self._settings['CV']['point_tracking_min_confidence'] 		= 0.8 			# Minimum fraction of points successfully tracked from the previous frame. Full detection is run if the tracking confidence drops below.
+		self._settings['CV']['use_cv_worker_process'] 				= False 	# Run the master computer vision (point detection, heading and stereopsis) in a separate worker process, with frames passed through shared memory.
 		#---- DATABASE SETTINGS ----#
 		self._settings['DATABASE'] 									= {}
 		self._settings['DATABASE']['username'] 						= 'root' 					# Set to None to make user type in username at bootup
@@ -83,6 +89,10 @@ class SettingsConfigured():
 		self._settings['DATABASE']['output_folder']					= 'DataSamples/samples_output/' 		# Set to None to make user type in output folder at bootup
 		self._settings['DATABASE']['sub_output_folder']				= '' 					# Give the output data folder additional subfolder (f.ex 'sub_folder/'). Set '' for no subfolder. Set to None to make user type in sub folder at bootup
 		self._settings['DATABASE']['print_progress'] 				= True
+		self._settings['DATABASE']['async_log'] 					= True 		# Write the log (Log.txt and Log.jsonl) by a background log writer thread.
+		self._settings['DATABASE']['log_flush_interval'] 			= 0.5 		# Time (sec) between flushing of the log files by the background log writer.
+		self._settings['DATABASE']['log_queue_size'] 				= 10000 	# Maximum number of log records queued for the background log writer.
+		self._settings['DATABASE']['log_screen_interval'] 			= 1.0 		# Minimum time (sec) between progress printed to the screen by the background log writer.
 		self._settings['DATABASE']['print_3D_points'] 				= False 		# Print all 3D point values (does not save to database)
 		self._settings['DATABASE']['store_process_data'] 			= False 	# Store process data to database
 		self._settings['DATABASE']['draw_heading'] 					= True		# Draw headings and information on incoming frames
@@ -93,6 +103,26 @@ class SettingsConfigured():
 		self._settings['DATABASE']['store_frames_as_video'] 		= False 		# Store frames as videos (Separate video for each frame set)
 		self._settings['DATABASE']['store_frames_video_fps']		= 1.0		# FPS for stored videos
 		self._settings['DATABASE']['store_frames_as_images'] 		= False 	# Store fames as images (Separate folder for each frame set)
+		self._settings['DATABASE']['store_frames_in_archive'] 		= False 	# Store frames in a chunked frame archive (<frame set>_archive/) instead of one image file per frame, if store_frames_as_images is True.
+		self._settings['DATABASE']['frame_archive_chunk_size'] 		= 256 		# Size (MB) of each frame archive chunk file.
+		self._settings['DATABASE']['frame_archive_compression'] 	= 0 		# zlib compression level (1-9) of archived frames, 0 for raw frames.
+		self._settings['DATABASE']['frame_writer_threads'] 			= 2 		# Number of threads writing recorded frames (0 for writing frames in the frame loop).
+		self._settings['DATABASE']['frame_writer_queue_size'] 		= 16 		# Maximum number of frames queued for each frame writer thread.
+		self._settings['DATABASE']['frame_writer_block_on_full'] 	= True 		# Set False to drop frames on a full frame writer queue instead of letting the frame loop wait.
+		self._settings['DATABASE']['pre_trigger_seconds'] 			= 0.0 		# Seconds of frames held in memory and only stored around trigger events (boundary errors, tip/root detection, user key). 0 to store all frames.
+		self._settings['DATABASE']['post_trigger_seconds'] 			= 5.0 		# Seconds of frames stored after each trigger event.
+		self._settings['DATABASE']['pre_trigger_max_mb'] 			= 256 		# Maximum memory (MB) of frames held in the pre-trigger buffer.
+		self._settings['DATABASE']['background_db_writer'] 			= True 		# Write database rows by a background writer thread in batches.
+		self._settings['DATABASE']['db_writer_queue_size'] 			= 256 		# Maximum number of rows queued for the background writer.
+		self._settings['DATABASE']['db_writer_batch_size'] 			= 32 		# Maximum number of rows written by the background writer in one transaction.
+		self._settings['DATABASE']['db_writer_flush_interval'] 		= 1.0 		# Maximum time (sec) a row waits for its batch to fill before it is written.
+		self._settings['DATABASE']['db_writer_block_on_full'] 		= True 		# Set False to drop rows on a full writer queue instead of letting the frame loop wait.
+		self._settings['DATABASE']['db_backend'] 					= 'mysql' 	# Database backend: 'mysql' (server) or 'sqlite' (embedded, no server needed).
+		self._settings['DATABASE']['sqlite_folder'] 				= 'DataSamples/database/' 	# Folder of the sqlite database files (<database>.db).
+		self._settings['DATABASE']['db_blob_compression'] 			= 0 		# zlib compression level (1-9) of numpy arrays stored as BLOBs, 0 for no compression.
+		self._settings['DATABASE']['store_columnar_data'] 			= False 	# Record process data and 3D points of each frame to columnar files (<output folder>columns/) for post-flight analysis.
+		self._settings['DATABASE']['columnar_chunk_size'] 			= 64 		# Number of frames buffered before they are appended to the columnar files.
+		self._settings['DATABASE']['columnar_compress'] 			= False 	# Write compressed chunks (npz) instead of memory mappable npy columns.
 		#---- CAMERA CALIBRATION SETTINGS ----#
 		self._settings['CALIB'] 									= {}
 		self._settings['CALIB']['calib_img_folder_left_cam'] 		= 'DataSamples/calibration_samples/camera_calib_samples/left_camera/'
@@ -107,6 +137,10 @@ class SettingsConfigured():
 		self._settings['CALIB']['calib_chess_rows']					= 6
 		self._settings['CALIB']['calib_chess_columns']				= 9
 		self._settings['CALIB']['save_calib_param_to_json'] 		= True
+		self._settings['CALIB']['calib_workers'] 					= 1 	# Number of worker processes for the chessboard corner detection. Set <= 1 to process the calibration images sequentially.
+		self._settings['CALIB']['calib_corner_cache'] 				= True 	# Cache detected chessboard corners on disk (in calib_save_folder), so only new or changed calibration images are processed on recalibration.
+		self._settings['CALIB']['calib_search_divisor'] 			= 1 	# Search for the chessboard in a frame downscaled by this divisor first, and refine the corners in full resolution. Set <= 1 to search in full resolution only.
+		self._settings['CALIB']['calib_use_sb'] 					= False # Use the sector based chessboard detector (findChessboardCornersSB) if available in the installed opencv version.
 		self._settings['CALIB']['calib_timeout'] 					= -1 # sec - Set < 0 for inf
 		self._settings['CALIB']['focal_length'] 					= 8.5 	#mm
 		self._settings['CALIB']['baseline']		 					= 50.0 	# Baseline (mm)
@@ -125,6 +159,7 @@ class SettingsConfigured():
 		self._settings['BLOB_SCALE']['scale_calib_save_folder']		= 'DataSamples/calibration_saves/scale_calibration/'
 		self._settings['BLOB_SCALE']['scale_calib_save_fname'] 		= 'scale_param' 
 		self._settings['BLOB_SCALE']['scale_filtrate'] 				= True
+		self._settings['BLOB_SCALE']['scale_calib_workers'] 		= 1 	# Number of worker processes for the scale calibration. Set <= 1 to process the calibration images sequentially.
 		#---- MASTER / SLAVE TCP -----#
 		self._settings['TCP']										= {}
 		#self._settings['TCP']['master_ip']							= '192.168.137.54'
@@ -135,6 +170,23 @@ class SettingsConfigured():
 		self._settings['TCP']['tcp_timeout']						= 10.0 	# Tcp timeout in sec
 		self._settings['TCP']['frame_req_timeout']					= 10.0
 		self._settings['TCP']['print_payload_info'] 				= False # Set True to print payload information during runtime. Information gives how large the payloads are, to adjust the buffer sizes.
+		self._settings['TCP']['transport'] 							= 'tcp' # 'tcp' or 'shm'. Set 'shm' to use the shared memory transport for a master and slave on the same device (f.ex simulation).
+		self._settings['TCP']['shm_ring_slots'] 					= 4 	# Number of shared frame buffers in the ring of the shared memory transport.
+		self._settings['TCP']['push_point_list'] 					= False # Set True to let the slave push its point list to the master as soon as a new frame is processed, instead of the master polling for it.
+		self._settings['TCP']['udp_trigger'] 						= False # Set True to trigger frame capturing on the slave by a UDP broadcast instead of the TCP 'setNewFrame' request.
+		self._settings['TCP']['udp_trigger_address'] 				= '<broadcast>' # Broadcast address of the camera nodes. Use '127.0.0.1' for a master and slave on the same device.
+		self._settings['TCP']['udp_trigger_port'] 					= 1992 	# Port of UDP triggers. Clock synchronization requests are sent to udp_trigger_port+1 on the master.
+		self._settings['TCP']['clock_sync_samples'] 				= 8 	# Number of NTP-style samples for estimating the clock offset between slave and master.
+		self._settings['TCP']['max_capture_delta'] 					= 0.01 	# Max capture time difference (sec) between left and right frames, before the stereo pair is flagged as skewed (udp_trigger only).
+		self._settings['TCP']['transport_metrics'] 					= True 	# Set True to record transport metrics (payload sizes and timings per request type). Metrics are saved to the session output folder when the master/slave is closed.
+		self._settings['TCP']['loopback_latency'] 					= 0.0 	# One-way latency (sec) added to each message by the loopback slave (emulated link).
+		self._settings['TCP']['loopback_bandwidth'] 				= 0 	# Bandwidth (bytes/sec) of the emulated link of the loopback slave. 0 = unlimited.
+		self._settings['TCP']['loopback_point_lists'] 				= True 	# Set True to let the loopback slave precompute point lists of the served frame sets. False serves the original frames with empty point lists.
+		self._settings['TCP']['loopback_benchmark_frames'] 			= 200 	# Number of frame cycles in the loopback benchmark ('python main.py benchmark').
+		self._settings['TCP']['tcp_nodelay'] 						= True 	# Set True to disable Nagle's algorithm (TCP_NODELAY), so small messages (acknowledges, requests) are sent immediately.
+		self._settings['TCP']['so_sndbuf'] 							= 0 	# Socket send buffer size (SO_SNDBUF) in bytes. 0 = OS default.
+		self._settings['TCP']['so_rcvbuf'] 							= 0 	# Socket receive buffer size (SO_RCVBUF) in bytes. 0 = OS default.
+		self._settings['TCP']['auto_tune_send_size'] 				= False # Set True to tune the send chunk size of large payloads from measured throughput, instead of using the master/slave buffer size.
 		#---- CAMERA SETTINGS ----#
 		self._settings['CAMERA'] 									= {}
 		self._settings['CAMERA']['ptgrey_library'] 					= 'Jordens' # Tag for selecting which library to use. Options - FLIR library: 'FLIR', Jordens library: 'Jordens'. Jordens library is set as default. (Woops.. The FLIR library isn't finished implemented (4/6/17))
@@ -158,6 +210,7 @@ class SettingsConfigured():
 		self._settings['VIDEO']['left_sl_video']					= 'left_camera/recordings/original_sl_left.avi' 
 		self._settings['VIDEO']['right_video']						= 'right_camera/recordings/original_right.avi'			# Slave is to the right
 		self._settings['VIDEO']['right_sl_video']					= 'right_camera/recordings/original_sl_right.avi'
+		self._settings['VIDEO']['video_prefetch_size'] 				= 8 		# Number of frames decoded ahead by the read-ahead threads of the normal and sl video (0 for decoding in the frame loop).
 		#---- IMAGE SETTINGS -----#
 		self._settings['IMAGE'] 									= {}
 		self._settings['IMAGE']['input_folder']						= 'DataSamples/live_test_sample/'
@@ -165,6 +218,13 @@ class SettingsConfigured():
 		self._settings['IMAGE']['left_sl_images']					= 'left_camera/recordings/original_sl_left_frames/' 
 		self._settings['IMAGE']['right_images']						= 'right_camera/recordings/original_right_frames/'	# Slave is to the right
 		self._settings['IMAGE']['right_sl_images']					= 'right_camera/recordings/original_sl_right_frames/'
+		#---- REPLAY SETTINGS -----#
+		self._settings['REPLAY'] 									= {}
+		self._settings['REPLAY']['replay_start_frame'] 				= 0 		# First replayed frame of the recorded session (VIDEO/IMAGE source).
+		self._settings['REPLAY']['replay_start_seconds'] 			= 0.0 		# Start the replay this many seconds into the recorded session instead of at replay_start_frame (if > 0).
+		self._settings['REPLAY']['replay_end_frame'] 				= -1 		# Replay until this frame (exclusive), -1 for the end of the recorded session.
+		self._settings['REPLAY']['replay_stride'] 					= 1 		# Replay every n-th frame.
+		self._settings['REPLAY']['replay_rate'] 					= 0.0 		# Replay rate relative to real time (1.0 = real time, 2.0 = double speed), 0 for as fast as possible.
 
 		##################################################
 
@@ -193,6 +253,7 @@ class SettingsConfigured():
 		settings_info['USER_INPUT']['automatic_mode'] 				= "Options True/False. Set True to run program without any breaking point."
 		settings_info['USER_INPUT']['no_termination']				= "Options True/False. Set True to run program with no possibility of termination."
 		settings_info['USER_INPUT']['key_terminate']				= "Options: (char). Press/hold this key (char) to terminate the program."
+		settings_info['USER_INPUT']['key_trigger_recording'] 		= "Press this key (automatic mode, with no_termination = False) to store the frames around this moment, when frames are held in the pre-trigger buffer (see DATABASE pre_trigger_seconds), options: (char)"
 		#---- COMPUTER VISION SETTINGS ----#
 		settings_info['CV'] 										= {}
 		settings_info['CV']['rho_step_distance'] 					= "Options: None/(float). If None = then each step distance (how far the drone should fly during each step) is set to a quarter the diagonal frame size"
@@ -201,6 +262,11 @@ class SettingsConfigured():
 		settings_info['CV']['desired_frame_shape'] 					= "Desired frame shape to work with. Given as a tuple of (height, width). Set to (-1,-1) to not use a desired frame shape, and instead stay fixed to the default downsampling divisor."
 		settings_info['CV']['detector_type']						= "Detector type to use for detecting feature points (blobs). Options (int): 0, 1, 2, 3 for simple blob detector, ORB, SIFT or SURF (in that order). Simple blob detector (option 0) is recommended."
 		settings_info['CV']['crop_frames'] 							= "Options True/False. Crop frames according to the difference in fan angle between the laser and camera."
+		settings_info['CV']['blob_detection_tiles'] 				= "Options: (int). Number of overlapping horizontal tiles the frame is split into for detecting blobs in parallel threads (one per tile). Useful for full resolution frames on multi-core devices. Set <= 1 to detect blobs on the whole frame in a single thread."
+		settings_info['CV']['coarse_detection_divisor'] 			= "Options: (int) - even number >= 1. Coarse-to-fine detection: blobs are located on the green mask downsampled by this divisor, and each blob centroid is refined to sub-pixel accuracy at the processing resolution (given by default_downsampling_divisor/desired_frame_shape) using image moments. F.ex default_downsampling_divisor=1 and coarse_detection_divisor=4 gives most of the speed of low resolution detection with the accuracy of full resolution. Set <= 1 for single scale detection."
+		settings_info['CV']['point_tracking_keyframe_interval'] 	= "Options: (int). Track points between frames using sparse optical flow on the green mask, and only run full blob detection on every n-th frame (keyframe). Tracked points keep a stable id across frames. Set <= 1 to run full detection on every frame."
+		settings_info['CV']['point_tracking_min_confidence'] 		= "Options: (float), between 0 -> 1. Minimum fraction of points successfully tracked from the previous frame. Full detection is run on the frame if the tracking confidence drops below this value."
+		settings_info['CV']['use_cv_worker_process'] 				= "Options: True/False. Run the master computer vision (point detection, heading and stereopsis) in a dedicated worker process, forked after calibration. Raw frames are passed to the worker through shared memory, and only compact results (and drawn frames) are returned, so networking and recording on the master are not blocked by the computer vision."
 		#---- DATABASE SETTINGS ----#
 		settings_info['DATABASE'] 									= {}
 		settings_info['DATABASE']['username'] 						= "Database username (mysql), options: None/(string) - Set to None to make user type in username at startup"
@@ -210,6 +276,10 @@ class SettingsConfigured():
 		settings_info['DATABASE']['output_folder']					= "Main output folder for storing data (f.ex 'main_folder/'), options: None/(string) - Set to None to make user type in username at startup."
 		settings_info['DATABASE']['sub_output_folder']				= "Give the main output folder an additional subfolder (f.ex 'sub_folder/'), options: None/(string). Set '' for no subfolder. Set to None to make user type in sub folder at startup"
 		settings_info['DATABASE']['print_progress'] 				= "Print progress data to screen. Progress data is automatically written to a log.txt file, options: True/False"
+		settings_info['DATABASE']['async_log'] 						= "Write the log by a background log writer, options: True/False. True: log lines and progress are written in batches to Log.txt, and as json lines (one record per line with frame number and timestamps) to Log.jsonl. False: each log line is written (and printed) in the frame loop. Compare with 'python main.py benchmark log'."
+		settings_info['DATABASE']['log_flush_interval'] 			= "Time in seconds between flushing of the log files by the background log writer, options: (float)."
+		settings_info['DATABASE']['log_queue_size'] 				= "Maximum number of log records queued for the background log writer, options: (int). Records are dropped while the queue is full."
+		settings_info['DATABASE']['log_screen_interval'] 			= "Minimum time in seconds between progress printed to the screen by the background log writer, options: (float). The latest progress is printed."
 		settings_info['DATABASE']['print_3D_points'] 				= "Print all 3D point values (does not save to mysql database), options: True/False"
 		settings_info['DATABASE']['store_process_data'] 			= "Store process data to database (mysql), options: True/False"
 		settings_info['DATABASE']['draw_heading'] 					= "Draw heading and detected blade edges, options: True/False"
@@ -220,6 +290,26 @@ class SettingsConfigured():
 		settings_info['DATABASE']['store_frames_as_video'] 			= "Store frames as videos (Separate video for each frame set), options: True/False"
 		settings_info['DATABASE']['store_frames_video_fps']			= "FPS for stored videos, options: (float)"
 		settings_info['DATABASE']['store_frames_as_images'] 		= "Store fames as images (Separate folder for each frame set), options: True/False"
+		settings_info['DATABASE']['store_frames_in_archive'] 		= "Options: True/False. True: frames stored by store_frames_as_images are appended to a chunked frame archive (<frame set>_archive/: large chunk files with raw frames and an index), instead of one image file per frame. The archive can be replayed by setting the IMAGE input to the archive folders."
+		settings_info['DATABASE']['frame_archive_chunk_size'] 		= "Size in MB of each frame archive chunk file, options: (int/float). Chunk files are preallocated, and truncated to the used size when closed."
+		settings_info['DATABASE']['frame_archive_compression'] 		= "zlib compression level (1-9) of archived frames, 0 for raw frames, options: (int). Compression saves disk space at the cost of cpu time."
+		settings_info['DATABASE']['frame_writer_threads'] 			= "Number of threads writing recorded frames (video and images), options: (int). Frames of each frame set are written in order by one thread. 0: frames are written in the frame loop."
+		settings_info['DATABASE']['frame_writer_queue_size'] 		= "Maximum number of frames queued for each frame writer thread, options: (int)."
+		settings_info['DATABASE']['frame_writer_block_on_full'] 	= "Wait for room in a full frame writer queue, options: True/False. False: frames are dropped while the queue is full."
+		settings_info['DATABASE']['pre_trigger_seconds'] 			= "Seconds of frames held in a pre-trigger ring buffer in memory, options: (float). If > 0, stored frames (store_frames_as_video/images) are only written around trigger events: boundary errors, tip/root detection and the key_trigger_recording key (master only, the slave stores all frames). The buffered frames are written on a trigger, followed by the frames of post_trigger_seconds. Events are logged in recordings/trigger_events.txt. 0: all frames are stored."
+		settings_info['DATABASE']['post_trigger_seconds'] 			= "Seconds of frames stored after each trigger event, options: (float)."
+		settings_info['DATABASE']['pre_trigger_max_mb'] 			= "Maximum memory in MB of frames held in the pre-trigger ring buffer, options: (int/float). The oldest frames are discarded when exceeded (reported by a warning, and with the peak memory use when closing)."
+		settings_info['DATABASE']['background_db_writer'] 			= "Write database rows by a background writer thread (with its own sql connection) in batches of one transaction, options: True/False. False: each row is inserted and committed in the frame loop."
+		settings_info['DATABASE']['db_writer_queue_size'] 			= "Maximum number of rows queued for the background writer, options: (int)."
+		settings_info['DATABASE']['db_writer_batch_size'] 			= "Maximum number of rows written by the background writer in one transaction, options: (int)."
+		settings_info['DATABASE']['db_writer_flush_interval'] 		= "Maximum time in seconds a row waits for its batch to fill before it is written by the background writer, options: (float)."
+		settings_info['DATABASE']['db_writer_block_on_full'] 		= "Wait for room in a full background writer queue, options: True/False. False: rows are dropped while the queue is full."
+		settings_info['DATABASE']['db_backend'] 					= "Database backend, options: 'mysql'/'sqlite'. 'mysql' needs a running mysql server and MySQL-python. 'sqlite' stores the database in a file (<sqlite_folder><database>.db) in WAL mode, without any server. Compare the write throughput of the backends with 'python main.py benchmark database'."
+		settings_info['DATABASE']['sqlite_folder'] 					= "Folder of the sqlite database files, options: (string) - f.ex 'DataSamples/database/'. Only used by the 'sqlite' backend."
+		settings_info['DATABASE']['db_blob_compression'] 			= "zlib compression level of numpy arrays stored as BLOBs, options: 0-9 (int). 0: raw bytes, decoded without copying. 1-9: smaller blobs, at the cost of compression time. Compare with 'python main.py benchmark blob'."
+		settings_info['DATABASE']['store_columnar_data'] 			= "Record process data (X/Y/Z averages, rho, theta, ..), frame timings and the 3D points of each frame to columnar files in the session output folder (<output folder>columns/), options: True/False. Load the files with LoadColumnarSession (src/DataBase/ColumnRecorder)."
+		settings_info['DATABASE']['columnar_chunk_size'] 			= "Number of frames buffered in memory before they are appended to the columnar files, options: (int)."
+		settings_info['DATABASE']['columnar_compress'] 				= "Options: True/False. True: each chunk is written as a compressed npz file (smaller, loaded to memory). False: each column is appended to an npy file, which may be memory mapped for analysis of long inspections."
 		#---- CAMERA CALIBRATION SETTINGS ----#
 		settings_info['CALIB'] 										= {}
 		settings_info['CALIB']['calib_img_folder_left_cam'] 		= "Folder path for camera calibration frames belonging to the left camera, options (string) - folder path as 'left_camera_calib_folder/'"
@@ -234,6 +324,10 @@ class SettingsConfigured():
 		settings_info['CALIB']['calib_chess_rows']					= "Set number of rows on the calibration chess chart, options (int)"
 		settings_info['CALIB']['calib_chess_columns']				= "Set number of columns on the calibration chess chart, options (int)"
 		settings_info['CALIB']['save_calib_param_to_json'] 			= "Save calibration parameters as a readable json next to the pickle file, only used for readability. Options: True/False"
+		settings_info['CALIB']['calib_workers'] 					= "Number of worker processes detecting chessboard corners in parallel over the calibration images, options: (int) - set <= 1 to process the calibration images sequentially."
+		settings_info['CALIB']['calib_corner_cache'] 				= "Cache detected chessboard corners on disk, keyed by image content and chessboard size, so recalibration only processes new or changed images. The cache is shared by the left and right camera calibrations. Options: True/False"
+		settings_info['CALIB']['calib_search_divisor'] 			= "Divisor for searching the chessboard in a downscaled copy of high resolution calibration frames first. The corners are mapped up and refined in full resolution, and the full resolution frame is searched if the chessboard is not found in the downscaled copy. Options: (int) - set <= 1 to search in full resolution only."
+		settings_info['CALIB']['calib_use_sb'] 					= "Use the sector based chessboard detector (cv2.findChessboardCornersSB) instead of cv2.findChessboardCorners, if available in the installed opencv version. Options: True/False"
 		settings_info['CALIB']['calib_timeout'] 					= "Master waits this many seconds for slave to finish calibrating, options: (float) - Set < 0 for infinite waiting time."
 		settings_info['CALIB']['focal_length'] 						= "Focal length in mm of the cameras in use, options (float)."
 		settings_info['CALIB']['baseline']		 					= "Baseline in mm between the cameras, options (float)"
@@ -252,6 +346,7 @@ class SettingsConfigured():
 		settings_info['BLOB_SCALE']['scale_calib_save_folder']		= "Folder path for storing blob calibration parameters, options (string) - folder path as 'blob_scale_calib_param/'"
 		settings_info['BLOB_SCALE']['scale_calib_save_fname'] 		= "Filename for saving blob calibration parameters, options (string) - filename without file ending as 'blob_scale_calib_param'"
 		settings_info['BLOB_SCALE']['scale_filtrate'] 				= "Filtrate detected distances between blobs by removing distances outside of the standard deviation, options: True/False"
+		settings_info['BLOB_SCALE']['scale_calib_workers'] 		= "Number of worker processes computing the standard distance between blobs in parallel over the calibration images, options: (int) - set <= 1 to process the calibration images sequentially."
 		#---- MASTER / SLAVE TCP -----#
 		settings_info['TCP']										= {}
 		settings_info['TCP']['master_ip']							= "IP address to the master device, options: <ip_address> - f.ex '192.168.137.54', or 'localhost' to run a simulation on a single device."
@@ -261,6 +356,23 @@ class SettingsConfigured():
 		settings_info['TCP']['tcp_timeout']							= "TCP send/receive timeout in seconds, options: (float)"
 		settings_info['TCP']['frame_req_timeout']					= "Timeout in seconds for the master to wait for slave to process and send a frame set (or keypoints and descriptors), options: (float)"
 		settings_info['TCP']['print_payload_info'] 					= "Options: True/False. Set True to print payload information during runtime. Information gives how large the payloads are, to adjust the buffer sizes. Should only be True during testing."
+		settings_info['TCP']['transport'] 							= "Transport between master and slave, options: 'tcp' or 'shm'. 'tcp' uses TCP sockets with json payloads. 'shm' is for a master and slave on the same device (f.ex 'simulate video|image'): control messages are sent by a local unix domain socket, and frames are passed through a ring of shared memory buffers instead of json lists."
+		settings_info['TCP']['shm_ring_slots'] 						= "Number of shared frame buffers in the ring of the shared memory transport (only used if transport = 'shm'), options: (int) >= 1. A frame payload stays valid until this many new payloads are sent."
+		settings_info['TCP']['push_point_list'] 					= "Options: True/False. True: the slave pushes its point list (tagged with the frame sequence number) to the master as soon as the frame triggered by 'setNewFrame' is processed. False: the master polls the slave with 'getPointList' until the point list is ready, or until 'frame_req_timeout'."
+		settings_info['TCP']['udp_trigger'] 						= "Options: True/False. True: frame capturing is triggered by a UDP broadcast (sequence number + master timestamp) to all camera nodes, which is not queued behind large TCP payloads. The slave estimates its clock offset to the master with an NTP-style exchange when connecting, and reports its capture timestamps in master time."
+		settings_info['TCP']['udp_trigger_address'] 				= "Address the UDP triggers are sent to, options: (string). '<broadcast>' broadcasts to all camera nodes on the network, use '127.0.0.1' for a master and slave on the same device."
+		settings_info['TCP']['udp_trigger_port'] 					= "UDP port of the triggers, options: (int). The master answers clock synchronization requests on udp_trigger_port+1."
+		settings_info['TCP']['clock_sync_samples'] 					= "Number of NTP-style request/reply samples for estimating the clock offset between slave and master, options: (int) >= 1. The sample with the shortest round trip delay is used."
+		settings_info['TCP']['max_capture_delta'] 					= "Max capture time difference in seconds between the left (master) and right (slave) frames, options: (float). Stereo pairs with a larger difference are flagged as skewed (warning, and 'capture_skewed' in the process data). Only checked if udp_trigger is set."
+		settings_info['TCP']['transport_metrics'] 					= "Options: True/False. Set True to record transport metrics per request type: payload counts and bytes, and latency histograms (mean, p50, p90, p99, max) of serialize/deserialize time, send/recv (wire) time, and round trip (master) or service time (slave). The metrics may be queried live (GetTransportMetrics(), RequestTransportMetrics()), and are printed and saved to 'transport_metrics_master/slave.json' in the session output folder when the master/slave is closed."
+		settings_info['TCP']['loopback_latency'] 					= "One-way latency in seconds added to each message to and from the loopback slave, options: (float). Used to emulate the network link when benchmarking the master against the loopback slave ('python main.py run loopback image|video' or 'python main.py benchmark')."
+		settings_info['TCP']['loopback_bandwidth'] 					= "Bandwidth in bytes per second of the emulated link of the loopback slave, options: (int) - 0 for unlimited bandwidth."
+		settings_info['TCP']['loopback_point_lists'] 				= "Options: True/False. True: the loopback slave calibrates point detection from the saved calibration, and precomputes point lists of all served frame sets (right camera frames of the session given by the VIDEO/IMAGE settings). False: the original frames are served with empty point lists (transport benchmark only)."
+		settings_info['TCP']['loopback_benchmark_frames'] 			= "Number of frame cycles (setNewFrame, point list and getFrame) in the loopback transport benchmark ('python main.py benchmark'), options: (int)."
+		settings_info['TCP']['tcp_nodelay'] 						= "Options: True/False. True disables Nagle's algorithm (TCP_NODELAY) on the master/slave sockets, so small messages (acknowledges, requests, pushed point lists) are not delayed waiting for outstanding acknowledges."
+		settings_info['TCP']['so_sndbuf'] 							= "Socket send buffer size (SO_SNDBUF) in bytes on the master/slave sockets, options: (int) - 0 for the OS default."
+		settings_info['TCP']['so_rcvbuf'] 							= "Socket receive buffer size (SO_RCVBUF) in bytes on the master/slave sockets, options: (int) - 0 for the OS default. Set on the listening socket of the master, so the accepted connection inherits it."
+		settings_info['TCP']['auto_tune_send_size'] 				= "Options: True/False. True: large payloads (>= 64 KB) are sent in chunks of a size tuned from measured throughput (each candidate from the buffer size to 1 MB, and a single call, is measured on the first payloads). False: payloads are sent in chunks of the master/slave buffer size. Chunks are sent without copying the payload in both cases. Benchmark with 'python main.py benchmark throughput'."
 		#---- CAMERA SETTINGS ----#
 		settings_info['CAMERA'] 									= {}
 		settings_info['CAMERA']['ptgrey_library'] 					= "Tag for selecting which library to use. Options - FLIR library: 'FLIR', Jordens library: 'Jordens'. Jordens library is set as default. (Woops.. The FLIR library isn't finished implemented (4/6/17))"
@@ -284,13 +396,21 @@ class SettingsConfigured():
 		settings_info['VIDEO']['left_sl_video']						= "Video of original samples from the left camera with structured light, options: (string) - f.ex 'original_sl_left_avi'"
 		settings_info['VIDEO']['right_video']						= "Video of original samples from the right camera without structured light, options: (string) - f.ex 'original_right_avi'"
 		settings_info['VIDEO']['right_sl_video']					= "Video of original samples from the right camera with structured light, options: (string) - f.ex 'original_sl_right_avi'"
+		settings_info['VIDEO']['video_prefetch_size'] 				= "Number of frames decoded ahead of the frame loop, options: (int). If > 0, the normal and sl videos are decoded concurrently by two read-ahead threads into bounded queues, so replay is limited by the processing instead of the decoding. 0: frames are decoded in the frame loop. The effective fps is printed when the video is stopped."
 		#---- IMAGE SETTINGS -----#
 		settings_info['IMAGE'] 										= {}
 		settings_info['IMAGE']['input_folder']						= "Top folder for the given image samples. Image samples can be obtained be turning on image storing during a real process. Following image settings must be consistent. Options: (string) - folder path as 'image_samples/'"
-		settings_info['IMAGE']['left_images']						= "Image sets of original samples from the left camera without structured light. May be a single image file, a directory with files, or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_left.tif', 'original_left_frames/' or ['original_left_0.tif',..,'original_left_n.tif']"
-		settings_info['IMAGE']['left_sl_images']					= "Image sets of original samples from the left camera with structured light. May be a single image file, a directory with files, or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_sl_left.tif', 'original_sl_left_frames/' or ['original_sl_left_0.tif',..,'original_sl_left_n.tif']"
-		settings_info['IMAGE']['right_images']						= "Image sets of original samples from the right camera without structured light. May be a single image file, a directory with files, or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_right.tif', 'original_right_frames/' or ['original_right_0.tif',..,'original_right_n.tif']"
-		settings_info['IMAGE']['right_sl_images']					= "Image sets of original samples from the right camera with structured light. May be a single image file, a directory with files, or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_sl_right.tif', 'original_sl_right_frames/' or ['original_sl_right_0.tif',..,'original_sl_right_n.tif']"
+		settings_info['IMAGE']['left_images']						= "Image sets of original samples from the left camera without structured light. May be a single image file, a directory with files, a frame archive directory (recorded with store_frames_in_archive, f.ex 'original_left_archive/'), or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_left.tif', 'original_left_frames/' or ['original_left_0.tif',..,'original_left_n.tif']"
+		settings_info['IMAGE']['left_sl_images']					= "Image sets of original samples from the left camera with structured light. May be a single image file, a directory with files, a frame archive directory (recorded with store_frames_in_archive, f.ex 'original_sl_left_archive/'), or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_sl_left.tif', 'original_sl_left_frames/' or ['original_sl_left_0.tif',..,'original_sl_left_n.tif']"
+		settings_info['IMAGE']['right_images']						= "Image sets of original samples from the right camera without structured light. May be a single image file, a directory with files, a frame archive directory (recorded with store_frames_in_archive, f.ex 'original_right_archive/'), or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_right.tif', 'original_right_frames/' or ['original_right_0.tif',..,'original_right_n.tif']"
+		settings_info['IMAGE']['right_sl_images']					= "Image sets of original samples from the right camera with structured light. May be a single image file, a directory with files, a frame archive directory (recorded with store_frames_in_archive, f.ex 'original_sl_right_archive/'), or a list of image files, options: (string)/(string_dir/)/[(string_0),..,(string_n)] - f.ex 'original_sl_right.tif', 'original_sl_right_frames/' or ['original_sl_right_0.tif',..,'original_sl_right_n.tif']"
+		#---- REPLAY SETTINGS -----#
+		settings_info['REPLAY'] 									= {}
+		settings_info['REPLAY']['replay_start_frame'] 				= "First replayed frame of the recorded session (VIDEO/IMAGE source), options: (int). The frame is found by the session index of the recording (<name>_index.bin, written by the frame recorder, or created from the frame rate), without decoding the frames before it."
+		settings_info['REPLAY']['replay_start_seconds'] 			= "Start the replay this many seconds into the recorded session (by the recorded frame timestamps), options: (float). 0 to start at replay_start_frame."
+		settings_info['REPLAY']['replay_end_frame'] 				= "Replay until this frame (exclusive), options: (int). -1 for the end of the recorded session."
+		settings_info['REPLAY']['replay_stride'] 					= "Replay every n-th frame of the recorded session, options: (int) >= 1."
+		settings_info['REPLAY']['replay_rate'] 						= "Replay rate relative to real time by the recorded frame timestamps, options: (float). 1.0: real time, 2.0: double speed, 0: as fast as possible."
 
 		return settings_info
 		##################################################
@@ -13,12 +13,22 @@ def ImportDataBaseScripts():
 	from TestUnits.Test_src.Test_DataBase.Test_MySQL.Test_MySQL import Test_MySQL
 	from TestUnits.Test_src.Test_DataBase.Test_GPS.Test_GPS import Test_GPS
 	from TestUnits.Test_src.Test_DataBase.Test_FrameRecorder.Test_FrameRecorder import Test_FrameRecorder
+	from TestUnits.Test_src.Test_DataBase.Test_DataBaseWriter.Test_DataBaseWriter import Test_DataBaseWriter
+	from TestUnits.Test_src.Test_DataBase.Test_SQLite.Test_SQLite import Test_SQLite
+	from TestUnits.Test_src.Test_DataBase.Test_ColumnRecorder.Test_ColumnRecorder import Test_ColumnRecorder
+	from TestUnits.Test_src.Test_DataBase.Test_SQLBase.Test_SQLBlob import Test_SQLBlob
+	from TestUnits.Test_src.Test_DataBase.Test_LogTool.Test_LogTool import Test_LogTool
 
 	DataBaseScripts = {
 		'DataBase': Test_DataBase,
 		'MySQL': Test_MySQL,
 		'GPS': Test_GPS,
-		'FrameRecorder': Test_FrameRecorder
+		'FrameRecorder': Test_FrameRecorder,
+		'DataBaseWriter': Test_DataBaseWriter,
+		'SQLite': Test_SQLite,
+		'ColumnRecorder': Test_ColumnRecorder,
+		'SQLBlob': Test_SQLBlob,
+		'LogTool': Test_LogTool
 	}
 
 	return DataBaseScripts
\ No newline at end of file
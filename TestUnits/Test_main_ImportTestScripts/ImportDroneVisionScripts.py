@@ -18,6 +18,8 @@ def ImportDroneVisionScripts():
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_ImageLink import Test_ImageLink
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_imageTools import Test_imageTools
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_RecordFrames import Test_RecordFrames
+	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_FrameArchive import Test_FrameArchive
+	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_ReplayLink import Test_ReplayLink
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_VideoLink import Test_VideoLink
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_PinControl import Test_PinControl
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_hardware.Test_PyQtImage import Test_PyQtImage
@@ -30,6 +32,8 @@ def ImportDroneVisionScripts():
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_featureDetection.Test_generalDetectors.Test_detectLines import Test_detectLines
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_featureDetection.Test_PointDetection.Test_PointDetection import Test_PointDetection
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_featureDetection.Test_BlobScaleDetector.Test_BlobScaleDetector import Test_BlobScaleDetector
+	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_featureDetection.Test_PointTracker.Test_PointTracker import Test_PointTracker
+	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_CVWorker.Test_CVWorker import Test_CVWorker
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_frameTools.Test_frameTools import Test_frameTools
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_Heading.Test_EdgeHeading import Test_EdgeHeading
 	from TestUnits.Test_src.Test_DroneVision.Test_DroneVision_src.Test_imgProcessing.Test_Heading.Test_Heading import Test_Heading
@@ -45,6 +49,8 @@ def ImportDroneVisionScripts():
 		'ImageLink': Test_ImageLink,
 		'imageTools': Test_imageTools,
 		'RecordFrames': Test_RecordFrames,
+		'FrameArchive': Test_FrameArchive,
+		'ReplayLink': Test_ReplayLink,
 		'VideoLink': Test_VideoLink,
 		'PinControl': Test_PinControl,
 		'PyQtImage': Test_PyQtImage,
@@ -57,6 +63,8 @@ def ImportDroneVisionScripts():
 		'detectLines': Test_detectLines,
 		'PointDetection': Test_PointDetection,
 		'BlobScaleDetector': Test_BlobScaleDetector,
+		'PointTracker': Test_PointTracker,
+		'CVWorker': Test_CVWorker,
 		'frameTools': Test_frameTools,
 		'EdgeHeading': Test_EdgeHeading,
 		'Heading': Test_Heading,
@@ -11,10 +11,20 @@ def ImportMasterSlaveScripts():
 	'''
 	from TestUnits.Test_src.Test_MasterSlave.Test_Master import Test_Master
 	from TestUnits.Test_src.Test_MasterSlave.Test_Slave import Test_Slave
+	from TestUnits.Test_src.Test_MasterSlave.Test_SharedMemoryTransport import Test_SharedMemoryTransport
+	from TestUnits.Test_src.Test_MasterSlave.Test_TriggerBroadcast import Test_TriggerBroadcast
+	from TestUnits.Test_src.Test_MasterSlave.Test_TransportMetrics import Test_TransportMetrics
+	from TestUnits.Test_src.Test_MasterSlave.Test_LoopbackSlave import Test_LoopbackSlave
+	from TestUnits.Test_src.Test_MasterSlave.Test_SocketTuning import Test_SocketTuning
 
 	MasterSlaveSripts = {
 		'Master': Test_Master,
-		'Slave': Test_Slave
+		'Slave': Test_Slave,
+		'SharedMemoryTransport': Test_SharedMemoryTransport,
+		'TriggerBroadcast': Test_TriggerBroadcast,
+		'TransportMetrics': Test_TransportMetrics,
+		'LoopbackSlave': Test_LoopbackSlave,
+		'SocketTuning': Test_SocketTuning
 	}
 
 	return MasterSlaveSripts
\ No newline at end of file
@@ -0,0 +1,82 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for ColumnRecorder
+'''
+class Test_ColumnRecorder(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DataBase.ColumnRecorder import ColumnRecorder
+		self.ColumnRecorder = ColumnRecorder
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_ColumnRecorder(self):
+		'''
+		 @brief Test function for ColumnRecorder
+		'''
+		self.TestColumnRecorder(compress=False)
+		self.TestColumnRecorder(compress=True)
+
+	def TestColumnRecorder(self, compress):
+		'''
+		 @brief Test recording and loading of columnar session data, with a column appearing in the middle of the session.
+
+		 @param compress (True/False)
+		'''
+		import numpy as np
+		import tempfile, shutil
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			n_frames 		= 10
+			columnRecorder 	= self.ColumnRecorder.ColumnRecorder(folder, chunk_size=4, compress=compress)
+			for i in range(n_frames):
+				process_data = {'rho': float(i), 'Z_average': np.float64(i*0.5), 'note': 'not numeric'}
+				if i >= n_frames/2:
+					process_data['theta'] = 2.0*i
+				points3D = [np.array([[i], [j], [0.0]]) for j in range(i % 3)]
+				columnRecorder.RecordColumns(process_data, points3D)
+				if i == 4:
+					session = self.ColumnRecorder.LoadColumnarSession(folder) # Load during recording
+					self.assertEqual(session['n_frames'], 4)
+			self.assertEqual(columnRecorder.GetNumberOfRecordedFrames(), n_frames)
+			columnRecorder.CloseColumnRecorder()
+
+			session = self.ColumnRecorder.LoadColumnarSession(folder)
+			self.assertEqual(session['n_frames'], n_frames)
+			self.assertEqual(sorted(session['columns'].keys()), ['Z_average', 'frame_time', 'rho', 'theta', 'timestamp'])
+			self.assertTrue(np.array_equal(session['columns']['rho'], np.arange(n_frames)))
+			self.assertTrue(np.all(np.isnan(session['columns']['theta'][:n_frames/2])))
+			self.assertTrue(np.array_equal(session['columns']['theta'][n_frames/2:], 2.0*np.arange(n_frames/2, n_frames)))
+			self.assertEqual(len(session['points3D_offsets']), n_frames+1)
+			for i in range(n_frames):
+				points3D = session['points3D'][session['points3D_offsets'][i]:session['points3D_offsets'][i+1]]
+				self.assertEqual(points3D.shape, (i % 3, 3))
+				for j in range(len(points3D)):
+					self.assertTrue(np.array_equal(points3D[j], [i, j, 0.0]))
+			if not(compress):
+				self.assertTrue(isinstance(session['columns']['rho'], np.memmap))
+		finally:
+			shutil.rmtree(folder)
\ No newline at end of file
@@ -0,0 +1,67 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for DataBaseWriter
+'''
+class Test_DataBaseWriter(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DataBase.MySQL import MySQL
+		from src.DataBase.DataBaseWriter import DataBaseWriter
+		self.MySQL 			= MySQL
+		self.DataBaseWriter = DataBaseWriter
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_DataBaseWriter(self):
+		'''
+		 @brief Test batched background writing, with a new column in the middle of the session.
+		'''
+		from datetime import datetime, timedelta
+
+		table_name 		= 'Test_db_writer_' + datetime.utcnow().strftime('%Y_%m_%d__%H_%M_%S')
+		mysql 			= self.MySQL.MySQL(self.username, self.password, self.database, self.host)
+		dataBaseWriter 	= self.DataBaseWriter.DataBaseWriter(self.MySQL.MySQL(self.username, self.password, self.database, self.host), table_name, ('timestamp', 'TIMESTAMP(6)'), max_queue_size=1000, batch_size=16, flush_interval=0.1)
+		dataBaseWriter.StartDataBaseWriter()
+
+		n_rows 		= 100
+		start_time 	= datetime.utcnow()
+		for i in range(n_rows):
+			data = {'timestamp': (start_time + timedelta(milliseconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f'), 'distance': 4424.99 + i, 'rho': 12.055}
+			if i >= n_rows/2:
+				data['theta'] = 22.44
+			self.assertTrue(dataBaseWriter.PutRow(data))
+		dataBaseWriter.FlushDataBaseWriter()
+		status = dataBaseWriter.GetDataBaseWriterStatus()
+		self.assertEqual(status['written'], n_rows)
+		self.assertEqual(status['failed'], 0)
+		self.assertTrue(status['batches'] < n_rows)
+		dataBaseWriter.CloseDataBaseWriter()
+
+		mysql.SelectDataFromSQLTable(table_name, 'theta')
+		sql_rows = mysql.FetchSelectedSQLData()
+		self.assertEqual(len(sql_rows), n_rows)
+		mysql.DropSQLTable(table_name)
+		mysql.CloseSQL()
\ No newline at end of file
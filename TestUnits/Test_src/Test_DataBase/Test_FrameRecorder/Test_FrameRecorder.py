@@ -23,9 +23,11 @@ class Test_FrameRecorder(unittest.TestCase, Test_main, TestData):
 		self.InitTestData()
 		#### IMPORTS #####
 		from Settings import Settings
-		from src.DataBase.FrameRecorder import FrameRecorder
-		self.Settings 		= Settings
-		self.FrameRecorder	= FrameRecorder
+		from src.DataBase.FrameRecorder import FrameRecorder, FrameWriterPool, FrameRingBuffer
+		self.Settings 			= Settings
+		self.FrameRecorder		= FrameRecorder
+		self.FrameWriterPool 	= FrameWriterPool
+		self.FrameRingBuffer 	= FrameRingBuffer
 		##################
 
 	def tearDown(self):
@@ -42,4 +44,118 @@ class Test_FrameRecorder(unittest.TestCase, Test_main, TestData):
 		'''
 		###### START TEST #####
 		print 'FrameRecorder test is tested by DroneMaster/DroneSlave test'
-		###########################
\ No newline at end of file
+		self.TestFrameWriterPool()
+		self.TestFrameRingBuffer()
+		self.TestPreTriggerRecording()
+		###########################
+
+	def TestFrameWriterPool(self):
+		'''
+		 @brief Test recording of frames by the frame writer pool.
+		 	All queued frames must be written (in order) when the recordings are closed.
+		'''
+		import tempfile, shutil, glob, cv2
+		import numpy as np
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			n_frames 		= 40
+			frameRecorder 	= self.FrameRecorder.FrameRecorder(default_fps=10.0, store_frames_as_video=True, store_frames_as_images=True, n_writer_threads=2, writer_queue_size=4, writer_block_on_full=True)
+			frameRecorder.InitFrameRecorder(folder)
+			for i in range(n_frames):
+				frameRecorder.SetProcessFrame('original_left', np.full((48, 64), i, dtype=np.uint8))
+				frameRecorder.SetProcessFrame('original_sl_left', np.full((48, 64), 255-i, dtype=np.uint8))
+				frameRecorder.RecordProcessFrames()
+				frameRecorder.ResetProcessFrames()
+			status = frameRecorder.GetFrameWriterPool().GetFrameWriterPoolStatus()
+			self.assertEqual(status['dropped'], 0)
+			self.assertTrue(status['max_queue_depth'] <= 4)
+			frameRecorder.CloseRecordings()
+			for tag, value in [('original_left', lambda i: i), ('original_sl_left', lambda i: 255-i)]:
+				self.assertEqual(len(glob.glob(folder + 'recordings/' + tag + '_frames/*.tif')), n_frames)
+				for i in [0, n_frames/2, n_frames-1]:
+					frame = cv2.imread(folder + 'recordings/' + tag + '_frames/' + tag + '_' + str(i) + '.tif', cv2.IMREAD_UNCHANGED)
+					self.assertTrue(np.all(frame == value(i)))
+				self.assertTrue(cv2.VideoCapture(folder + 'recordings/' + tag + '.avi').isOpened())
+
+			frameWriterPool = self.FrameWriterPool.FrameWriterPool(n_workers=1, max_queue_size=1, block_on_full=False)
+			frameWriterPool.StartFrameWriterPool()
+			recordFrames 	= frameRecorder.CreateFrameRecorder(10.0, folder, 'dropped', store_frames_as_video=False, store_frames_as_images=True)
+			n_put 			= 0
+			for i in range(n_frames):
+				if frameWriterPool.PutFrame(recordFrames, np.zeros((480, 640), dtype=np.uint16)):
+					n_put += 1
+			frameWriterPool.CloseFrameWriterPool()
+			status = frameWriterPool.GetFrameWriterPoolStatus()
+			self.assertEqual(status['written'] + status['dropped'], n_frames)
+			self.assertEqual(status['written'], n_put)
+			self.assertEqual(len(glob.glob(folder + 'dropped_frames/*.tif')), n_put)
+		finally:
+			shutil.rmtree(folder)
+
+	def TestFrameRingBuffer(self):
+		'''
+		 @brief Test the time and memory limits of the pre-trigger ring buffer.
+		'''
+		import numpy as np
+		frame 			= np.zeros((100, 100), dtype=np.uint8) # 10000 bytes
+		frameRingBuffer = self.FrameRingBuffer.FrameRingBuffer(max_seconds=2.0, max_bytes=1000000)
+		for i in range(50):
+			frameRingBuffer.PutFrame('original_left', frame, timestamp=100.0 + i*0.1)
+		status = frameRingBuffer.GetFrameRingBufferStatus()
+		self.assertEqual(status['frames'], 21) # Frames of the last 2 seconds
+		self.assertEqual(status['bytes'], 21*frame.nbytes)
+		self.assertEqual(status['discarded'], 29)
+		self.assertEqual(status['memory_limited'], 0)
+
+		frameRingBuffer = self.FrameRingBuffer.FrameRingBuffer(max_seconds=10.0, max_bytes=10*frame.nbytes)
+		for i in range(50):
+			frameRingBuffer.PutFrame('original_left', frame, timestamp=100.0 + i*0.1)
+		status = frameRingBuffer.GetFrameRingBufferStatus()
+		self.assertEqual(status['frames'], 10)
+		self.assertEqual(status['peak_bytes'], 11*frame.nbytes)
+		self.assertEqual(status['memory_limited'], 40)
+		frames = frameRingBuffer.PopFrames()
+		self.assertEqual([timestamp for timestamp, tag, frame in frames], [100.0 + i*0.1 for i in range(40, 50)])
+		self.assertEqual(frameRingBuffer.GetFrameRingBufferStatus()['bytes'], 0)
+
+	def TestPreTriggerRecording(self):
+		'''
+		 @brief Test recording of frames around trigger events only.
+		'''
+		import tempfile, shutil, time
+		import numpy as np
+		from src.DroneVision.DroneVision_src.hardware.FrameArchive import FrameArchiveReader
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			frameRecorder = self.FrameRecorder.FrameRecorder(store_frames_as_video=False, store_frames_as_images=True, store_frames_in_archive=True, n_writer_threads=1, writer_queue_size=2, writer_block_on_full=True, pre_trigger_seconds=60.0, post_trigger_seconds=0.2, pre_trigger_max_bytes=5*48*64)
+			frameRecorder.InitFrameRecorder(folder)
+			for i in range(20): # Only the last 5 frames are kept
+				frameRecorder.SetProcessFrame('original_left', np.full((48, 64), i, dtype=np.uint8))
+				frameRecorder.RecordProcessFrames()
+				frameRecorder.ResetProcessFrames()
+			self.assertEqual(frameRecorder.TriggerFrameRecording('boundary_error'), 5)
+			self.assertTrue(frameRecorder.CheckFrameRecordingTriggered())
+			for i in range(20, 23): # Post-trigger frames
+				frameRecorder.SetProcessFrame('original_left', np.full((48, 64), i, dtype=np.uint8))
+				frameRecorder.RecordProcessFrames()
+				frameRecorder.ResetProcessFrames()
+			time.sleep(0.3)
+			self.assertFalse(frameRecorder.CheckFrameRecordingTriggered())
+			for i in range(23, 30): # Buffered, but not triggered
+				frameRecorder.SetProcessFrame('original_left', np.full((48, 64), i, dtype=np.uint8))
+				frameRecorder.RecordProcessFrames()
+				frameRecorder.ResetProcessFrames()
+			status = frameRecorder.GetFrameRingBufferStatus()
+			self.assertEqual(status['trigger_events'], 1)
+			self.assertEqual(status['frames'], 5)
+			self.assertTrue(status['peak_bytes'] <= status['max_bytes'] + 48*64)
+			frameRecorder.CloseRecordings()
+
+			reader = FrameArchiveReader(folder + 'recordings/original_left_archive/')
+			self.assertEqual([int(reader.ReadArchiveFrame(i)[0][0, 0]) for i in range(reader.GetNumberOfArchiveFrames())], range(15, 23))
+			with open(folder + 'recordings/trigger_events.txt', 'r') as f:
+				events = f.read().splitlines()
+			self.assertEqual(len(events), 1)
+			self.assertEqual(events[0].split('\t')[1:], ['boundary_error', '5'])
+		finally:
+			shutil.rmtree(folder)
\ No newline at end of file
@@ -0,0 +1,140 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for LogTool
+'''
+class Test_LogTool(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DataBase.LogTool import LogTool
+		from src.DataBase.LogTool import LogWriter
+		self.LogTool 	= LogTool
+		self.LogWriter 	= LogWriter
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_LogTool(self):
+		'''
+		 @brief Test function for LogTool
+		'''
+		import tempfile, shutil
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			self.TestAsyncLog(folder)
+			self.TestLogWriterFull(folder)
+			self.TestLogBenchmark()
+		finally:
+			shutil.rmtree(folder)
+
+	def WriteLog(self, filename, async_log, n_frames):
+		'''
+		 @brief Write a log session with progress of n_frames frames.
+
+		 @param filename
+		 @param async_log (True/False)
+		 @param n_frames
+
+		 @return logTool
+		'''
+		import os
+		import numpy as np
+		source 	= self.LogTool.LogBenchmarkSource(os.path.dirname(filename) + '/', n_frames)
+		logTool = self.LogTool.LogTool(source, async_log=async_log, flush_interval=0.05)
+		logTool.SetLogFilename(filename)
+		logTool.PrintStarting(wait_for_user=False)
+		for i in range(n_frames):
+			source.SetFrameNumber(i+1)
+			logTool.SetProcessData('rho', np.float64(i))
+			logTool.SetProcessData('boundary_error', np.bool_(i % 2 == 0))
+			logTool.PrintProgress(points3D=[np.array([[i], [1.0], [2.0]])])
+			logTool.ResetProcessData()
+		logTool.PrintFinished()
+		return logTool
+
+	def TestAsyncLog(self, folder):
+		'''
+		 @brief Test that the async log gives the same text log as the synchronous log, and a json lines log with the records.
+
+		 @param folder
+		'''
+		import json, re
+		n_frames = 20
+		self.WriteLog(folder + 'Log_sync.txt', False, n_frames).CloseLog()
+		logTool = self.WriteLog(folder + 'Log_async.txt', True, n_frames)
+		logTool.FlushLog()
+		status = logTool.GetLogWriterStatus()
+		self.assertEqual(status['queue_depth'], 0)
+		self.assertEqual(status['dropped'], 0)
+		self.assertEqual(status['written'], status['queued'])
+		logTool.CloseLog()
+		logTool.CloseLog() # Closing twice is harmless
+
+		timings = re.compile(r'[0-9]+\.[0-9]+ sec') # Execution times differ
+		with open(folder + 'Log_sync.txt', 'r') as f:
+			sync_log = timings.sub('', f.read())
+		with open(folder + 'Log_async.txt', 'r') as f:
+			async_log = timings.sub('', f.read())
+		self.assertEqual(sync_log, async_log)
+
+		with open(folder + 'Log_async.jsonl', 'r') as f:
+			records = [json.loads(line) for line in f]
+		progress = [record for record in records if record['type'] == 'progress']
+		self.assertEqual(len(progress), n_frames)
+		for i in range(n_frames):
+			self.assertEqual(progress[i]['frame_i'], i+1)
+			self.assertEqual(progress[i]['n_frames'], n_frames)
+			self.assertEqual(progress[i]['process_data'], {'rho': float(i), 'boundary_error': i % 2 == 0})
+			self.assertEqual(progress[i]['points3D'], [[float(i), 1.0, 2.0]])
+		timestamps = [record['timestamp'] for record in records]
+		self.assertEqual(timestamps, sorted(timestamps))
+		self.assertEqual(records[-1]['type'], 'text')
+		self.assertEqual(records[-1]['frame_i'], n_frames)
+
+	def TestLogWriterFull(self, folder):
+		'''
+		 @brief Test that records are dropped (not blocking) when the log writer queue is full.
+
+		 @param folder
+		'''
+		import warnings
+		logWriter = self.LogWriter.LogWriter(folder + 'Log_full.txt', max_queue_size=5, flush_interval=0.05)
+		with warnings.catch_warnings(record=True):
+			for i in range(100): # Writer thread not started, so the queue is never emptied
+				logWriter.PutLogRecord({'type': 'text', 'text': str(i), 'timestamp': float(i)})
+		status = logWriter.GetLogWriterStatus()
+		self.assertEqual(status['queued'], 5)
+		self.assertEqual(status['dropped'], 95)
+		logWriter.StartLogWriter()
+		logWriter.CloseLogWriter()
+		with open(folder + 'Log_full.txt', 'r') as f:
+			self.assertEqual(f.read(), '0\n1\n2\n3\n4\n')
+
+	def TestLogBenchmark(self):
+		'''
+		 @brief Test the log benchmark.
+		'''
+		results = self.LogTool.RunLogBenchmark(n_records=200, n_points3D=5)
+		for mode in ['sync', 'async']:
+			self.assertTrue(results[mode]['per_call'] > 0)
\ No newline at end of file
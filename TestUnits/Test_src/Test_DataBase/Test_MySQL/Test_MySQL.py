@@ -79,6 +79,12 @@ class Test_MySQL(unittest.TestCase, Test_main, TestData):
 				data[key] = mysql.ConvertPythonToSQLValue(process_data[key])
 			mysql.InsertDataIntoSQLTable(table_name, data)
 			time.sleep(0.2)
+
+		mysql.AddMissingSQLColumns(table_name, {'longitude': 1.0, 'schema_cache_test': 1.0})
+		self.assertTrue(mysql.CheckSQLColumnExist(table_name, 'schema_cache_test'))
+		schema = dict(mysql.GetSQLSchema(table_name))
+		mysql.ClearSQLSchemaCache(table_name)
+		self.assertEqual(schema, mysql.GetSQLSchema(table_name)) # Cached schema equals the schema of the server
 		
 		columns  = mysql.GetSQLColumns(table_name)
 		print 'Columns: ', columns
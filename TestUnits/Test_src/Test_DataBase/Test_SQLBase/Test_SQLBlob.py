@@ -0,0 +1,81 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for SQLBlob
+'''
+class Test_SQLBlob(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DataBase.SQLBase import SQLBlob
+		self.SQLBlob = SQLBlob
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_SQLBlob(self):
+		'''
+		 @brief Test function for SQLBlob
+		'''
+		self.TestEncodeDecode()
+		self.TestLegacyBlobs()
+		self.SQLBlob.RunBlobBenchmark(n_keypoints=100, n_points3D=1000, repeats=2)
+
+	def TestEncodeDecode(self):
+		'''
+		 @brief Test encoding and decoding of arrays with different dtypes, shapes and memory layouts.
+		'''
+		import numpy as np
+		arrays = [
+			np.random.rand(500, 7).astype(np.float32),
+			np.random.rand(3, 1000),
+			np.random.randint(0, 256, (16, 24, 3)).astype(np.uint8),
+			np.random.rand(10, 10)[::2, 1::3], # Non-contiguous
+			np.asfortranarray(np.random.rand(4, 5)),
+			np.arange(12, dtype='>i4').reshape(3, 4), # Big endian
+			np.array([True, False, True]),
+			np.zeros((0, 3)),
+			np.array(4.5)
+		]
+		for np_array in arrays:
+			for compression_level in [0, 6]:
+				blob 			= self.SQLBlob.EncodeNumpyBlob(np_array, compression_level=compression_level)
+				self.assertTrue(blob.startswith(self.SQLBlob.BLOB_MAGIC))
+				for blob_value in [blob, buffer(blob)]: # MySQL returns strings, and SQLite buffers
+					decoded_array = self.SQLBlob.DecodeNumpyBlob(blob_value)
+					self.assertEqual(decoded_array.dtype, np_array.dtype)
+					self.assertEqual(decoded_array.shape, np_array.shape)
+					self.assertTrue(np.array_equal(decoded_array, np_array))
+		decoded_array = self.SQLBlob.DecodeNumpyBlob(self.SQLBlob.EncodeNumpyBlob(arrays[1]))
+		self.assertFalse(decoded_array.flags.writeable) # Zero-copy decoding
+
+	def TestLegacyBlobs(self):
+		'''
+		 @brief Test decoding of pickled blobs, and pickling of object arrays.
+		'''
+		import numpy as np
+		np_array = np.random.rand(3, 50)
+		self.assertTrue(np.array_equal(self.SQLBlob.DecodeNumpyBlob(np.ndarray.dumps(np_array)), np_array))
+		object_array 	= np.array([{'a': 1}, None], dtype=object)
+		decoded_array 	= self.SQLBlob.DecodeNumpyBlob(self.SQLBlob.EncodeNumpyBlob(object_array))
+		self.assertEqual(list(decoded_array), list(object_array))
\ No newline at end of file
@@ -0,0 +1,161 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for SQLite
+'''
+class Test_SQLite(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.DataBase.SQLite import SQLite
+		from src.DataBase.SQLBase import SQLBase
+		from src.DataBase.DataBaseWriter import DataBaseWriter
+		self.Settings 		= Settings
+		self.SQLite 		= SQLite
+		self.SQLBase 		= SQLBase
+		self.DataBaseWriter = DataBaseWriter
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_SQLite(self):
+		'''
+		 @brief Test function for SQLite
+		'''
+		import tempfile, shutil
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			self.TestSQLite(folder)
+			self.TestSQLiteDataBaseWriter(folder)
+			self.TestDataBaseBenchmark(folder)
+		finally:
+			shutil.rmtree(folder)
+
+	def TestSQLite(self, folder):
+		'''
+		 @brief Test table, column and value handling of the SQLite backend.
+
+		 @param folder
+		'''
+		import numpy as np
+		from datetime import datetime, timedelta
+		sqlite = self.SQLite.SQLite(self.database, folder=folder)
+		self.assertFalse(sqlite.CheckSQLDatabaseExist(self.database))
+		sqlite.SelectSQLDatabase(self.database)
+		self.assertTrue(sqlite.CheckSQLDatabaseExist(self.database))
+		sqlite.ExecuteSQLCommand("PRAGMA journal_mode")
+		self.assertEqual(sqlite.FetchSelectedSQLData()[0][0].lower(), 'wal')
+
+		table_name 	= 'Test_sqlite'
+		primary_key = 'timestamp'
+		frame 		= np.ones((16, 24), dtype=np.uint8)
+		columns 	= {primary_key: 'TIMESTAMP(6)', 'longitude': 'FLOAT', 'frame': sqlite.FindSQLValueType(frame)}
+		self.assertFalse(sqlite.CheckSQLTableExist(table_name))
+		sqlite.CreateSQLTable(table_name, columns, primary_key)
+		self.assertTrue(sqlite.CheckSQLTableExist(table_name))
+		for key in columns:
+			self.assertTrue(sqlite.CheckSQLColumnExist(table_name, key))
+
+		n_rows 		= 10
+		start_time 	= datetime.utcnow()
+		for i in range(n_rows):
+			data = {primary_key: (start_time + timedelta(milliseconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f'), 'longitude': float(i), 'frame': sqlite.ConvertPythonToSQLValue(frame*i)}
+			if i >= n_rows/2:
+				data['distance'] = 4424.99
+			sqlite.AddMissingSQLColumns(table_name, data)
+			sqlite.InsertDataIntoSQLTable(table_name, data)
+		self.assertTrue(sqlite.CheckSQLColumnExist(table_name, 'distance'))
+
+		sql_columns = sqlite.GetSQLColumns(table_name)
+		self.assertEqual([sql_row[0] for sql_row in sql_columns], [primary_key, 'frame', 'longitude', 'distance'])
+		self.assertEqual(sql_columns[0][3], 'PRI')
+		schema = dict(sqlite.GetSQLSchema(table_name))
+		sqlite.ClearSQLSchemaCache(table_name)
+		self.assertEqual(schema, sqlite.GetSQLSchema(table_name)) # Cached schema equals the schema of the database
+
+		sqlite.SelectDataFromSQLTable(table_name, 'longitude, frame, distance', n_rows=3, row_number=2)
+		sql_rows = sqlite.FetchSelectedSQLData()
+		self.assertEqual(len(sql_rows), 3)
+		for i in range(len(sql_rows)):
+			self.assertEqual(sql_rows[i][0], float(i+2))
+			self.assertTrue(np.array_equal(sqlite.ConvertSQLValueToPython(sql_rows[i][1], schema['FRAME']), frame*(i+2)))
+			self.assertEqual(sql_rows[i][2], None)
+
+		sqlite.RenameColumnFromSQLTable(table_name, 'distance', ('dist', 'FLOAT'))
+		self.assertTrue(sqlite.CheckSQLColumnExist(table_name, 'dist'))
+		sqlite.DropColumnFromSQLTable(table_name, 'dist')
+		self.assertFalse(sqlite.CheckSQLColumnExist(table_name, 'dist'))
+		sqlite.RenameSQLTable(table_name, table_name + '_renamed')
+		self.assertFalse(sqlite.CheckSQLTableExist(table_name))
+		sqlite.DropSQLTable(table_name + '_renamed')
+		self.assertFalse(sqlite.CheckSQLTableExist(table_name + '_renamed'))
+
+		sqlite.DropSQLDatabase(self.database)
+		self.assertFalse(sqlite.CheckSQLDatabaseExist(self.database))
+		sqlite.CloseSQL()
+
+	def TestSQLiteDataBaseWriter(self, folder):
+		'''
+		 @brief Test batched background writing to the SQLite backend, with a new column in the middle of the session.
+
+		 @param folder
+		'''
+		from datetime import datetime, timedelta
+		table_name 		= 'Test_db_writer'
+		dataBaseWriter 	= self.DataBaseWriter.DataBaseWriter(self.SQLite.SQLite(self.database, folder=folder), table_name, ('timestamp', 'TIMESTAMP(6)'), max_queue_size=1000, batch_size=16, flush_interval=0.1)
+		dataBaseWriter.StartDataBaseWriter()
+
+		n_rows 		= 100
+		start_time 	= datetime.utcnow()
+		for i in range(n_rows):
+			data = {'timestamp': (start_time + timedelta(milliseconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f'), 'distance': 4424.99 + i, 'rho': 12.055}
+			if i >= n_rows/2:
+				data['theta'] = 22.44
+			self.assertTrue(dataBaseWriter.PutRow(data))
+		dataBaseWriter.FlushDataBaseWriter()
+		status = dataBaseWriter.GetDataBaseWriterStatus()
+		self.assertEqual(status['written'], n_rows)
+		self.assertEqual(status['failed'], 0)
+		self.assertTrue(status['batches'] < n_rows)
+		dataBaseWriter.CloseDataBaseWriter()
+
+		sqlite = self.SQLite.SQLite(self.database, folder=folder)
+		sqlite.SelectDataFromSQLTable(table_name, 'theta')
+		sql_rows = sqlite.FetchSelectedSQLData()
+		self.assertEqual(len(sql_rows), n_rows)
+		self.assertEqual(len([sql_row for sql_row in sql_rows if sql_row[0] != None]), n_rows/2)
+		sqlite.DropSQLDatabase(self.database)
+
+	def TestDataBaseBenchmark(self, folder):
+		'''
+		 @brief Test the database write throughput benchmark with the SQLite backend.
+
+		 @param folder
+		'''
+		settings_inst = self.Settings.Settings()
+		settings_inst.ChangeSetting('DATABASE', 'sqlite_folder', folder)
+		results = self.SQLBase.RunDataBaseBenchmark(settings_inst.GetSettings('DATABASE'), backends=['sqlite'], n_rows=200, batch_sizes=[1, 32])
+		self.assertEqual(sorted(results['sqlite'].keys()), [1, 32])
+		for batch_size in results['sqlite']:
+			self.assertTrue(results['sqlite'][batch_size] > 0)
\ No newline at end of file
@@ -0,0 +1,3 @@
+'''
+Made by Hans Erik Heggem
+'''
\ No newline at end of file
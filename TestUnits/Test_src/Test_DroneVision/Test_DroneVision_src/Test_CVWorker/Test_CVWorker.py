@@ -0,0 +1,134 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for CVWorker
+'''
+class Test_CVWorker(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DroneVision.DroneVision_src.CVWorker import CVWorker
+		from src.bin import SharedFrameBuffer
+		self.CVWorker 			= CVWorker
+		self.SharedFrameBuffer 	= SharedFrameBuffer
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_CVWorker(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestSharedFrameBuffer()
+		self.TestCVWorker()
+		###########################
+
+	def TestSharedFrameBuffer(self):
+		'''
+		 @brief Test writing and reading frames through the shared frame buffer, including reallocation for larger frames.
+		'''
+		import numpy as np
+
+		writer = self.SharedFrameBuffer.SharedFrameBuffer()
+		reader = self.SharedFrameBuffer.SharedFrameBuffer()
+		for shape in [(100, 120), (1024, 1280, 3)]:
+			frames 			= [np.random.randint(0, 255, shape).astype(np.uint8), None, np.random.rand(7, 3)]
+			fname, headers 	= writer.WriteFrames(frames)
+			read_frames 	= reader.ReadFrames(fname, headers)
+			self.assertTrue(np.array_equal(frames[0], read_frames[0]))
+			self.assertEqual(read_frames[1], None)
+			self.assertTrue(np.array_equal(frames[2], read_frames[2]))
+		reader.Close()
+		writer.Close()
+
+	def TestCVWorker(self):
+		'''
+		 @brief Test the worker process protocol using a simple stand-in for DroneVision.
+		 	The stand-in detects 'points' as bright pixels, and returns the number of points as heading and the point sum as 3D points.
+		'''
+		import timeit, cv2
+		import numpy as np
+		from Settings.Exceptions import DroneVisionError
+
+		print '\n'
+		print '#----------- TESTING CV WORKER PROCESS   \t---------------#'
+
+		class DroneVisionStandIn():
+			tip_or_root_detected = False
+			def ResetDetectionPool(self):
+				pass
+			def GetTipOrRootDetected(self):
+				return self.tip_or_root_detected
+			def SetTipOrRootDetected(self, tip_or_root_detected):
+				self.tip_or_root_detected = tip_or_root_detected
+			def GetProcessedFrame(self, original_frame=None, original_sl_frame=None, draw_detected_points=False):
+				delta_frame = cv2.absdiff(original_sl_frame, original_frame)
+				points 		= np.argwhere(delta_frame > 128)
+				if len(points) == 0:
+					raise DroneVisionError('no_blobs_error_msg')
+				keypoints 	= [cv2.KeyPoint(float(x), float(y), 1) for y, x in points]
+				return original_frame, original_sl_frame, original_frame.copy(), delta_frame, keypoints, None
+			def ProcessHeading(self, frame_un, delta_frame, keypoints, draw_heading=False, draw_hough_lines=False):
+				self.tip_or_root_detected = True
+				return None, None, len(keypoints), 0.0, frame_un, None
+			def ProcessStereopsis(self, shape_l, shape_r, keypoints_l, desc_l, keypoints_r, desc_r, draw_matches=False):
+				return None, [sum(kp.pt[0] for kp in keypoints_l) - sum(kp.pt[0] for kp in keypoints_r)], None
+
+		droneVision = DroneVisionStandIn()
+		cvWorker 	= self.CVWorker.CVWorker(droneVision)
+		cvWorker.StartCVWorker()
+		try:
+			frame 		= np.zeros((512, 612), dtype=np.uint8)
+			sl_frame 	= frame.copy()
+			sl_frame[100, 200] = sl_frame[300, 400] = 255
+
+			delay = timeit.default_timer()
+			cvWorker.ProcessFrames(frame, sl_frame, draw_heading=True)
+			self.assertEqual(cvWorker.GetPointsError(), None)
+			cvWorker.ProcessStereopsis(frame.shape, [cv2.KeyPoint(190.0, 100.0, 1), cv2.KeyPoint(390.0, 300.0, 1)], None)
+			results = cvWorker.GetResults()
+			print 'Delay for CV worker round trip: {0} sec'.format(timeit.default_timer() - delay)
+			points_error, boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, frame_un_l, delta_frame_l, hough_frame, matches_frame = results
+			self.assertEqual(heading_distance, 2)
+			self.assertAlmostEqual(points3D[0], 20.0)
+			self.assertTrue(np.array_equal(frame_un_l, frame))
+			self.assertEqual(delta_frame_l, None)
+			self.assertTrue(droneVision.GetTipOrRootDetected()) # Detected in the worker process
+
+			# No points - the error is returned, and the worker continues with the next frame set.
+			cvWorker.ProcessFrames(frame, frame)
+			self.assertTrue(isinstance(cvWorker.GetPointsError(), DroneVisionError))
+
+			# Aborted stereopsis
+			cvWorker.ProcessFrames(frame, sl_frame)
+			self.assertEqual(cvWorker.GetPointsError(), None)
+			cvWorker.AbortStereopsis()
+			cvWorker.ProcessFrames(frame, sl_frame)
+			self.assertEqual(cvWorker.GetPointsError(), None)
+			cvWorker.ProcessStereopsis(frame.shape, [], None)
+			self.assertAlmostEqual(cvWorker.GetResults()[6][0], 600.0)
+		finally:
+			cvWorker.StopCVWorker()
+		self.assertFalse(cvWorker.GetCVWorkerAlive())
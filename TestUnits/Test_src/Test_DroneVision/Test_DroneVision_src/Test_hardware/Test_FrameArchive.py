@@ -0,0 +1,117 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for FrameArchive
+'''
+class Test_FrameArchive(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.DroneVision.DroneVision_src.hardware import FrameArchive
+		from src.DroneVision.DroneVision_src.hardware import RecordFrames
+		from src.DroneVision.DroneVision_src.hardware import ImageLink
+		self.Settings 		= Settings
+		self.FrameArchive 	= FrameArchive
+		self.RecordFrames 	= RecordFrames
+		self.ImageLink 		= ImageLink
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_FrameArchive(self):
+		'''
+		 @brief Test function for FrameArchive
+		'''
+		import tempfile, shutil
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			self.TestFrameArchive(folder + 'raw/', compression_level=0)
+			self.TestFrameArchive(folder + 'zlib/', compression_level=1)
+			self.TestImageLinkReplay(folder)
+		finally:
+			shutil.rmtree(folder)
+
+	def TestFrameArchive(self, folder, compression_level):
+		'''
+		 @brief Test writing and reading a frame archive with small chunks (several frames per chunk, and new chunks while reading).
+
+		 @param folder
+		 @param compression_level
+		'''
+		import os, glob
+		import numpy as np
+		n_frames 		= 25
+		frames 			= [np.random.randint(0, 255, (30, 40, 3)).astype(np.uint8) if i % 2 == 0 else (np.random.rand(30, 40)*4000).astype(np.uint16) for i in range(n_frames)]
+		frameArchive 	= self.FrameArchive.FrameArchiveWriter(folder, chunk_size=10000, compression_level=compression_level)
+		for i in range(n_frames/2):
+			frameArchive.WriteArchiveFrame(frames[i], tag='original_left' if i % 2 == 0 else 'original_sl_left', timestamp=1000.0+i)
+		reader = self.FrameArchive.FrameArchiveReader(folder) # Read while the archive is written
+		self.assertEqual(reader.GetNumberOfArchiveFrames(), n_frames/2)
+		for i in range(n_frames/2, n_frames):
+			frameArchive.WriteArchiveFrame(frames[i], tag='original_left' if i % 2 == 0 else 'original_sl_left', timestamp=1000.0+i)
+		self.assertTrue(np.array_equal(reader.ReadArchiveFrame(n_frames-1)[0], frames[n_frames-1])) # Index is reloaded
+		frameArchive.CloseArchive()
+		if compression_level == 0:
+			self.assertTrue(len(glob.glob(folder + 'chunk_*.bin')) > 1)
+			self.assertTrue(os.path.getsize(folder + 'chunk_000000.bin') < 10000) # Truncated to the used size
+
+		reader = self.FrameArchive.FrameArchiveReader(folder)
+		self.assertEqual(reader.GetNumberOfArchiveFrames(), n_frames)
+		self.assertEqual(reader.GetArchiveTags(), ['original_left', 'original_sl_left'])
+		self.assertEqual(list(reader.FindArchiveFrames('original_sl_left')), range(1, n_frames, 2))
+		for i in reversed(range(n_frames)): # Random access
+			frame, timestamp, tag = reader.ReadArchiveFrame(i)
+			self.assertTrue(np.array_equal(frame, frames[i]))
+			self.assertEqual(frame.dtype, frames[i].dtype)
+			self.assertEqual(timestamp, 1000.0+i)
+			self.assertEqual(tag, 'original_left' if i % 2 == 0 else 'original_sl_left')
+			if compression_level == 0:
+				self.assertFalse(frame.flags.writeable) # Memory mapped
+		self.assertTrue(np.array_equal(reader.GetArchiveIndex()['frame_i'], np.arange(n_frames)))
+		reader.CloseArchiveReader()
+
+	def TestImageLinkReplay(self, folder):
+		'''
+		 @brief Test recording frames to archives by RecordFrames, and replaying them by the ImageLink.
+
+		 @param folder
+		'''
+		import numpy as np
+		n_frames 	= 5
+		recorders 	= [self.RecordFrames.RecordFrames(1.0, folder, tag, store_frames_as_video=False, store_frames_as_images=True, store_frames_in_archive=True) for tag in ['original_left', 'original_sl_left']]
+		for i in range(n_frames):
+			for j in range(len(recorders)):
+				recorders[j].WriteFrame(np.full((20, 30), i*10 + j, dtype=np.uint8))
+		for recorder in recorders:
+			recorder.CloseRecording()
+
+		imageLink = self.ImageLink.ImageLink(folder, 'original_left_archive/', 'original_sl_left_archive/')
+		self.assertEqual(imageLink.GetTotalFrames(), n_frames)
+		for i in range(n_frames):
+			frame, sl_frame = imageLink.GetFrame()
+			self.assertEqual(frame.shape, (20, 30, 3)) # Color frame, as by GetImage
+			self.assertTrue(np.all(frame == i*10))
+			self.assertTrue(np.all(sl_frame == i*10 + 1))
+			frame[0, 0] = 0 # Replayed frames are writeable
+		imageLink.StopImage()
\ No newline at end of file
@@ -0,0 +1,131 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for ReplayLink
+'''
+class Test_ReplayLink(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.DroneVision.DroneVision_src.hardware import ReplayLink
+		from src.DroneVision.DroneVision_src.hardware import SessionIndex
+		from src.DroneVision.DroneVision_src.hardware import RecordFrames
+		from src.DroneVision.DroneVision_src.hardware import ImageLink
+		from src.DroneVision.DroneVision_src.hardware import VideoLink
+		self.ReplayLink 	= ReplayLink
+		self.SessionIndex 	= SessionIndex
+		self.RecordFrames 	= RecordFrames
+		self.ImageLink 		= ImageLink
+		self.VideoLink 		= VideoLink
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps.
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_ReplayLink(self):
+		'''
+		 @brief Test function for ReplayLink
+		'''
+		import tempfile, shutil
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			n_frames = 12
+			self.RecordSession(folder, n_frames)
+			self.TestSessionIndex(folder, n_frames)
+			self.TestReplayLink(self.ImageLink.ImageLink(folder, 'original_left_frames/', 'original_sl_left_frames/'), n_frames)
+			self.TestReplayLink(self.VideoLink.VideoLink(folder + 'original_left.avi', folder + 'original_sl_left.avi'), n_frames, video=True)
+			self.TestReplayLink(self.VideoLink.VideoLink(folder + 'original_left.avi', folder + 'original_sl_left.avi', prefetch_size=3), n_frames, video=True) # Read-ahead
+		finally:
+			shutil.rmtree(folder)
+
+	def RecordSession(self, folder, n_frames):
+		'''
+		 @brief Record a session of frames with the frame number as intensity (10*frame_i), and timestamps 0.1 sec apart.
+
+		 @param folder
+		 @param n_frames
+		'''
+		import numpy as np
+		recorders = [self.RecordFrames.RecordFrames(10.0, folder, tag, store_frames_as_video=True, store_frames_as_images=True) for tag in ['original_left', 'original_sl_left']]
+		for i in range(n_frames):
+			for recorder in recorders:
+				recorder.WriteFrame(np.full((48, 64, 3), i*10, dtype=np.uint8), timestamp=1000.0 + 0.1*i)
+		for recorder in recorders:
+			recorder.CloseRecording()
+
+	def TestSessionIndex(self, folder, n_frames):
+		'''
+		 @brief Test the session index written by the frame recorder.
+
+		 @param folder
+		 @param n_frames
+		'''
+		import numpy as np
+		self.assertEqual(self.SessionIndex.GetSessionIndexFilename(folder + 'original_left.avi'), folder + 'original_left_index.bin')
+		self.assertEqual(self.SessionIndex.GetSessionIndexFilename(folder + 'original_left_frames/'), folder + 'original_left_index.bin')
+		sessionIndex = self.SessionIndex.LoadSessionIndex(folder + 'original_left.avi')
+		self.assertEqual(sessionIndex.GetNumberOfFrames(), n_frames)
+		self.assertTrue(np.allclose(sessionIndex.GetTimestamps(), 1000.0 + 0.1*np.arange(n_frames)))
+		self.assertEqual(sessionIndex.FindFrameNumber(1000.45), 5)
+		self.assertEqual(sessionIndex.GetKeyframe(7), 7)
+		self.assertEqual(self.SessionIndex.CreateSessionIndex(10, fps=5.0, keyframes=False).GetKeyframe(7), 0)
+		self.assertEqual(self.SessionIndex.SortFrameFilenames(['a_10.tif', 'a_2.tif', 'a_1.tif', 'a.tif']), ['a_1.tif', 'a_2.tif', 'a_10.tif', 'a.tif'])
+
+	def TestReplayLink(self, link, n_frames, video=False):
+		'''
+		 @brief Test replay range, stride, seeking and rate control.
+
+		 @param link (VideoLink or ImageLink)
+		 @param n_frames
+		 @param video (True for MJPG video frames, which are compared with a tolerance (default=False))
+		'''
+		import time
+		import numpy as np
+		def CheckFrame(frame, frame_i):
+			self.assertTrue(abs(np.mean(frame) - frame_i*10) < (3 if video else 1e-9))
+
+		replayLink = self.ReplayLink.ReplayLink(link, start_frame=3, end_frame=10, stride=2)
+		self.assertEqual(replayLink.GetTotalFrames(), 4) # 3, 5, 7, 9
+		replayed = []
+		while replayLink.GetFrameNumber() < replayLink.GetTotalFrames():
+			frame, sl_frame = replayLink.GetFrame()
+			CheckFrame(frame, replayLink.GetReplayFrameNumber())
+			CheckFrame(sl_frame, replayLink.GetReplayFrameNumber())
+			replayed.append(replayLink.GetReplayFrameNumber())
+		self.assertEqual(replayed, [3, 5, 7, 9])
+		self.assertRaises(TypeError, replayLink.GetFrame)
+
+		replayLink.SeekFrame(4) # Backwards seek
+		CheckFrame(replayLink.GetFrame()[0], 4)
+		replayLink.SetReplayRange(0, None)
+		replayLink.SetReplayStride(1)
+		replayLink.SeekTime(0.55)
+		CheckFrame(replayLink.GetFrame()[0], 6)
+		self.assertAlmostEqual(replayLink.GetFrameTimestamp(), 1000.6)
+
+		replayLink.SetReplayRange(0, 4)
+		replayLink.SetReplayRate(1.0) # Real time, 0.1 sec between frames
+		timer = time.time()
+		for i in range(replayLink.GetTotalFrames()):
+			replayLink.GetFrame()
+		self.assertTrue(time.time() - timer >= 0.25)
+		replayLink.StopCamera()
\ No newline at end of file
@@ -42,6 +42,42 @@ class Test_VideoLink(unittest.TestCase, Test_main, TestData):
 		'''
 		print 'VideoLink is not working, but no need for it either..'
 		#self.TestVideoLink()
+		self.TestVideoReadAhead()
+
+	def TestVideoReadAhead(self):
+		'''
+		 @brief Test that the read-ahead threads give the same frame pairs as decoding in GetFrame(), and report the effective fps.
+		'''
+		import tempfile, shutil
+		import numpy as np
+		from src.DroneVision.DroneVision_src.hardware.RecordFrames import RecordFrames
+		folder = tempfile.mkdtemp() + '/'
+		try:
+			n_frames 	= 10
+			recorders 	= [RecordFrames(10.0, folder, tag, store_frames_as_video=True, store_frames_as_images=False) for tag in ['video', 'sl_video']]
+			for i in range(n_frames):
+				for j in range(len(recorders)):
+					recorders[j].WriteFrame(np.full((48, 64, 3), i*20 + j*5, dtype=np.uint8))
+			for recorder in recorders:
+				recorder.CloseRecording()
+
+			frame_sets = {}
+			for prefetch_size in [0, 2]:
+				video_link = self.VideoLink.VideoLink(folder + 'video.avi', folder + 'sl_video.avi', prefetch_size=prefetch_size)
+				frame_sets[prefetch_size] = [video_link.GetFrame() for i in range(n_frames)]
+				self.assertRaises(TypeError, video_link.GetFrame) # End of video
+				self.assertRaises(TypeError, video_link.GetFrame)
+				status = video_link.GetVideoReadStatus()
+				self.assertEqual(status['frames'], n_frames)
+				self.assertTrue(status['fps'] > 0)
+				video_link.StopVideo()
+			for i in range(n_frames):
+				self.assertTrue(np.array_equal(frame_sets[0][i][0], frame_sets[2][i][0]))
+				self.assertTrue(np.array_equal(frame_sets[0][i][1], frame_sets[2][i][1]))
+				self.assertTrue(abs(np.mean(frame_sets[2][i][0]) - i*20) < 3)
+				self.assertTrue(abs(np.mean(frame_sets[2][i][1]) - (i*20 + 5)) < 3)
+		finally:
+			shutil.rmtree(folder)
 
 	def TestVideoLink(self):
 		'''
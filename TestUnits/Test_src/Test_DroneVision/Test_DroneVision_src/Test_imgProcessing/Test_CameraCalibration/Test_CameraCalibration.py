@@ -74,3 +74,66 @@ class Test_CameraCalibration(unittest.TestCase, Test_main, TestData):
 		if not(self.CheckAllTests()):
 			MatplotShow(touple_frames, test_img_fname+'_Camera_calibration_test', save_fig=self.save_figs, save_fig_only=self.save_figs_only)
 
+
+
+	def test_ChessboardCornerCache(self):
+		'''
+		 @brief Test parallel chessboard corner detection and the corner cache.
+		 	Sequential, parallel and cached detections must give the same corners.
+		'''
+		import timeit, shutil, os
+		import numpy as np
+
+		settings_inst = self.Settings.Settings()
+		settings_inst.ChangeSetting('CALIB', 'calib_print_process', False)
+		settings_inst.ChangeSetting('CALIB', 'calib_show_imgs', False)
+		settings_inst.ChangeSetting('CALIB', 'calib_corner_cache', True)
+		cache_folder = settings_inst.GetSettings('CALIB', 'calib_save_folder') + 'corner_cache/'
+
+		detections_list = []
+		for calib_workers, clear_cache, test_name in [(1, True, 'sequential'), (4, True, 'parallel (4 workers)'), (4, False, 'cached')]:
+			if clear_cache and os.path.isdir(cache_folder):
+				shutil.rmtree(cache_folder)
+			settings_inst.ChangeSetting('CALIB', 'calib_workers', calib_workers)
+			calib 	= self.CameraCalibration.CameraCalibration(settings_inst.GetSettings('CALIB'), settings_inst.GetSettings('CALIB', 'calib_img_folder_left_cam'), settings_inst.GetSettings('CALIB', 'calib_save_fname_left_cam'), True)
+			fnames 	= calib.GetDistorionCalibImages()
+
+			delay 		= timeit.default_timer()
+			detections 	= calib.DetectChessboardCorners(fnames)
+			print 'Delay for {0} chessboard corner detection of {1} images: {2} sec'.format(test_name, len(fnames), timeit.default_timer() - delay)
+			detections_list.append(detections)
+
+		for detections in detections_list[1:]:
+			for (fname, gray_shape, corners), (ref_fname, ref_gray_shape, ref_corners) in zip(detections, detections_list[0]):
+				self.assertEqual(fname, ref_fname)
+				self.assertEqual(gray_shape, ref_gray_shape)
+				self.assertEqual(isinstance(corners, type(None)), isinstance(ref_corners, type(None)))
+				if not(isinstance(corners, type(None))):
+					self.assertTrue(np.allclose(corners, ref_corners))
+
+
+	def test_ChessboardSearchModes(self):
+		'''
+		 @brief Benchmark chessboard search on full resolution against downscaled-first search (and the SB detector). 
+		 	Reports calibration time and mean reprojection error for each mode.
+		'''
+		import timeit
+		import numpy as np
+
+		settings_inst = self.Settings.Settings()
+		settings_inst.ChangeSetting('CALIB', 'calib_print_process', False)
+		settings_inst.ChangeSetting('CALIB', 'calib_show_imgs', False)
+		settings_inst.ChangeSetting('CALIB', 'calib_corner_cache', False)
+		settings_inst.ChangeSetting('CALIB', 'calib_workers', 1)
+
+		for search_divisor, use_sb in [(1, False), (2, False), (4, False), (1, True), (4, True)]:
+			settings_inst.ChangeSetting('CALIB', 'calib_search_divisor', search_divisor)
+			settings_inst.ChangeSetting('CALIB', 'calib_use_sb', use_sb)
+			calib 	= self.CameraCalibration.CameraCalibration(settings_inst.GetSettings('CALIB'), settings_inst.GetSettings('CALIB', 'calib_img_folder_left_cam'), settings_inst.GetSettings('CALIB', 'calib_save_fname_left_cam'), True)
+			n_imgs 	= len(calib.GetDistorionCalibImages())
+
+			delay = timeit.default_timer()
+			calib.CalibrateCameraDistortion()
+			timeout = timeit.default_timer() - delay
+			reprojection_errors = calib.GetReprojectionErrors()
+			print 'Search divisor: {0}, SB detector: {1} - {2} sec per image, {3}/{4} images used, mean reprojection error: {5} px'.format(search_divisor, use_sb, timeout/n_imgs, len(reprojection_errors), n_imgs, np.mean(reprojection_errors))
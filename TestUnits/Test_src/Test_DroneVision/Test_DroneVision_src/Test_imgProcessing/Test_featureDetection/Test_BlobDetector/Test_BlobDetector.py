@@ -45,6 +45,8 @@ class Test_BlobDetector(unittest.TestCase, Test_main, TestData):
 			if use_set:
 				for fn_frame, fn_slframe in left_frames:
 					self.TestBlobDetection(folder, fn_frame, fn_slframe)
+					self.TestTiledBlobDetection(folder, fn_frame, fn_slframe)
+					self.TestCoarseToFineBlobDetection(folder, fn_frame, fn_slframe)
 		###########################
 
 	def TestBlobDetection(self, folder, fn_frame, fn_slframe):
@@ -106,4 +108,93 @@ class Test_BlobDetector(unittest.TestCase, Test_main, TestData):
 		touple_frames.append(('Delta Frame', delta_frame))
 		if not(self.CheckAllTests()):
 			MatplotShow(touple_frames, fn_frame+'_Feature Points', default_n_cols=3, save_fig=self.save_figs, save_fig_only=self.save_figs_only)
-			MatplotShow(feature_point_frames, fn_frame+'_Detected Feature Points', default_n_cols=4, save_fig=self.save_figs, save_fig_only=self.save_figs_only)
\ No newline at end of file
+			MatplotShow(feature_point_frames, fn_frame+'_Detected Feature Points', default_n_cols=4, save_fig=self.save_figs, save_fig_only=self.save_figs_only)
+
+	def TestTiledBlobDetection(self, folder, fn_frame, fn_slframe, tiles_list=[1, 2, 4, 8]):
+		'''
+		 @brief Benchmark tiled (parallel) blob detection on full resolution frames against single threaded detection.
+
+		 @param folder Input folder 
+		 @param fn_frame Frame filename without points.
+		 @param fn_slframe Frame filename with points.
+		 @param tiles_list (list of number of tiles to benchmark)
+		'''
+		import timeit
+		from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage
+		from src.DroneVision.DroneVision_src.imgProcessing.featureDetection.PointDetection import PointDetection
+
+		print '\n'
+		print '#----------- TESTING TILED BLOB DETECTION   \t---------------#'
+		print '#----------- Image without points: {0} \t---------------#'.format(fn_frame)
+		print '#----------- Image with points: {0}    \t---------------#'.format(fn_slframe)
+
+		settings_inst 	= self.Settings.Settings()
+		settings_inst.ChangeSetting('CV', 'default_downsampling_divisor', 1)
+		settings_inst.ChangeSetting('CV', 'desired_frame_shape', (-1,-1))
+		settings_inst.ChangeSetting('CV', 'detector_type', 0)
+
+		frame 		= GetImage(folder + fn_frame)
+		sl_frame 	= GetImage(folder + fn_slframe)
+
+		pointDet 	= PointDetection.PointDetection(True, settings_inst.GetSettings())
+		pointDet.CalibratePointDetection()
+		delta_frame, point_kp, blob_desc, frame_un, sl_frame_un = pointDet.GetPointList(frame, sl_frame)
+		reference_points = sorted([(round(kp.pt[0], 2), round(kp.pt[1], 2)) for kp in point_kp])
+
+		for n_tiles in tiles_list:
+			pointDet.SetDetectionTiles(n_tiles)
+			delay = timeit.default_timer()
+			keypoints, descriptors = pointDet.DetectBlobs(delta_frame)
+			print 'Delay for blob detection using {0} tile(s): {1} sec - {2} keypoints'.format(n_tiles, timeit.default_timer() - delay, len(keypoints))
+			self.assertEqual(reference_points, sorted([(round(kp.pt[0], 2), round(kp.pt[1], 2)) for kp in keypoints]))
+
+	def TestCoarseToFineBlobDetection(self, folder, fn_frame, fn_slframe, coarse_divisors=[2, 4]):
+		'''
+		 @brief Benchmark coarse-to-fine blob detection against the single scale path.
+		 	The single scale point list at full resolution is used as reference, and the mean/max position error (pixels in full resolution) is reported 
+		 	for coarse-to-fine detection and for the single scale point list at the coarse resolution.
+
+		 @param folder Input folder 
+		 @param fn_frame Frame filename without points.
+		 @param fn_slframe Frame filename with points.
+		 @param coarse_divisors (list of coarse level divisors to benchmark)
+		'''
+		import timeit
+		import numpy as np
+		from scipy.spatial import cKDTree
+		from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage
+		from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
+		from src.DroneVision.DroneVision_src.imgProcessing.featureDetection.PointDetection import PointDetection
+
+		print '\n'
+		print '#----------- TESTING COARSE-TO-FINE BLOB DETECTION   \t---------------#'
+		print '#----------- Image without points: {0} \t---------------#'.format(fn_frame)
+		print '#----------- Image with points: {0}    \t---------------#'.format(fn_slframe)
+
+		frame 		= GetImage(folder + fn_frame)
+		sl_frame 	= GetImage(folder + fn_slframe)
+
+		def get_point_list(default_downsampling_divisor, coarse_detection_divisor):
+			settings_inst = self.Settings.Settings()
+			settings_inst.ChangeSetting('CV', 'default_downsampling_divisor', default_downsampling_divisor)
+			settings_inst.ChangeSetting('CV', 'desired_frame_shape', (-1,-1))
+			settings_inst.ChangeSetting('CV', 'detector_type', 0)
+			settings_inst.ChangeSetting('CV', 'coarse_detection_divisor', coarse_detection_divisor)
+			pointDet = PointDetection.PointDetection(True, settings_inst.GetSettings())
+			pointDet.CalibratePointDetection()
+			delay = timeit.default_timer()
+			delta_frame, keypoints, descriptors, frame_un, sl_frame_un = pointDet.GetPointList(frame, sl_frame)
+			return delta_frame, keypoints, timeit.default_timer() - delay
+
+		reference_frame, reference_keypoints, timeout = get_point_list(1, 1)
+		height, width 	= GetShape(reference_frame)
+		reference_tree 	= cKDTree(np.array([kp.pt for kp in reference_keypoints]))
+		print 'Single scale point list at full resolution: {0} sec - {1} keypoints'.format(timeout, len(reference_keypoints))
+
+		for divisor in coarse_divisors:
+			for title, default_downsampling_divisor, coarse_detection_divisor in [('Coarse-to-fine', 1, divisor), ('Single scale', divisor, 1)]:
+				delta_frame, keypoints, timeout = get_point_list(default_downsampling_divisor, coarse_detection_divisor)
+				d_height, d_width 	= GetShape(delta_frame)
+				points 				= np.array([(kp.pt[0]*width/float(d_width), kp.pt[1]*height/float(d_height)) for kp in keypoints])
+				distances, indices 	= reference_tree.query(points)
+				print '{0} point list (divisor {1}): {2} sec - {3} keypoints - mean error: {4} px, max error: {5} px'.format(title, divisor, timeout, len(keypoints), np.mean(distances), np.max(distances))
\ No newline at end of file
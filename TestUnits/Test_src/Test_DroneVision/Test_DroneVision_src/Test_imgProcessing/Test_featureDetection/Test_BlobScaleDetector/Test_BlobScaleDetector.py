@@ -47,6 +47,20 @@ class Test_BlobScaleDetector(unittest.TestCase, Test_main, TestData):
 			if use_set:
 				for i in range(len(left_frames)):
 					self.TestBlobScaleDetector(folder, left_frames[i][0], left_frames[i][1], actual_distances[i])
+					self.TestScalingDistances(folder, left_frames[i][0], left_frames[i][1])
+		###########################
+
+	def test_ParallelScaleCalibration(self):
+		'''
+		 @brief Test the scale calibration on a process pool.
+		 	Skipped if the scale calibration samples are not present.
+		'''
+		import os
+		scale_calib_folder = self.Settings.Settings().GetSettings('BLOB_SCALE', 'scale_calib_folder')
+		if not(os.path.isdir(scale_calib_folder)):
+			self.skipTest('Scale calibration samples are not present: ' + scale_calib_folder)
+		###### START TEST #####
+		self.TestParallelScaleCalibration()
 		###########################
 
 	def TestBlobScaleDetector(self, folder, fn_frame, fn_slframe, actual_distance):
@@ -100,4 +114,82 @@ class Test_BlobScaleDetector(unittest.TestCase, Test_main, TestData):
 		touple_frames.append(('SL frame', sl_frame))
 		touple_frames.append(('Delta frame', delta_frame))
 		if not(self.CheckAllTests()):
-			MatplotShow(touple_frames, fn_frame+'_Blob_scale_test', save_fig=self.save_figs, save_fig_only=self.save_figs_only)
\ No newline at end of file
+			MatplotShow(touple_frames, fn_frame+'_Blob_scale_test', save_fig=self.save_figs, save_fig_only=self.save_figs_only)
+
+	def TestScalingDistances(self, folder, fn_frame, fn_slframe):
+		'''
+		 @brief Test the KD-tree based scaling distances against a brute force search for the closest point within the block.
+
+		 @param folder Input folder
+		 @param fn_frame Frame filename without points.
+		 @param fn_slframe Frame filename with points.
+		'''
+		import timeit, math
+		import numpy as np
+		from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage
+		from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
+
+		print '\n'
+		print '#----------- TESTING SCALING DISTANCES (KD-TREE)   \t---------------#'
+		print '#----------- Image with points: {0}    \t---------------#'.format(fn_slframe)
+
+		settings_inst 	= self.Settings.Settings()
+		settings_inst.ChangeSetting('BASIC', 'reset_calibration', False)
+		pointDet 		= self.PointDetection.PointDetection(True, settings_inst.GetSettings())
+		pointDet.CalibrateBlobScaleDetector(printInfo=False)
+
+		frame 		= GetImage(folder + fn_frame)
+		sl_frame 	= GetImage(folder + fn_slframe)
+		delta_frame, points_kp, blob_desc, frame, sl_frame = pointDet.GetPointList(frame, sl_frame, concatenate_points=True)
+
+		width, height 	= GetShape(sl_frame)
+		blockSize 		= int(math.sqrt(math.pow(width, 2.0) + math.pow(height, 2.0))//4)
+
+		delay = timeit.default_timer()
+		positions, distances = pointDet.ComputeScalingDistances(points_kp, blockSize)
+		print 'Delay for KD-tree scaling distances: {0} sec'.format(timeit.default_timer() - delay)
+
+		delay 		= timeit.default_timer()
+		points 		= {}
+		for kp in points_kp:
+			points[(int(round(kp.pt[1])), int(round(kp.pt[0])))] = kp.pt
+		for i in range(len(positions)):
+			x, y 				= positions[i]
+			shortest_distance 	= -1
+			for (x_block, y_block), pt in points.iteritems():
+				if (x_block, y_block) != (x, y) and abs(x_block - x) <= blockSize//2 and abs(y_block - y) <= blockSize//2:
+					distance = math.sqrt(math.pow(points[(x, y)][0] - pt[0], 2) + math.pow(points[(x, y)][1] - pt[1], 2))
+					if distance < shortest_distance or shortest_distance < 0:
+						shortest_distance = distance
+			self.assertAlmostEqual(distances[i], shortest_distance, places=6)
+		print 'Delay for brute force scaling distances: {0} sec'.format(timeit.default_timer() - delay)
+
+	def TestParallelScaleCalibration(self, workers_list=[1, 2, 4]):
+		'''
+		 @brief Benchmark the standard scale calibration with different numbers of worker processes.
+		 	All worker counts must give the same calibration result.
+
+		 @param workers_list (list of worker counts to test)
+		'''
+		import timeit
+
+		print '\n'
+		print '#----------- TESTING PARALLEL BLOB SCALE CALIBRATION   \t---------------#'
+
+		scale_params = None
+		for calib_workers in workers_list:
+			settings_inst 	= self.Settings.Settings()
+			settings_inst.ChangeSetting('BASIC', 'reset_calibration', False)
+			settings_inst.ChangeSetting('BLOB_SCALE', 'scale_calib_workers', calib_workers)
+			pointDet 		= self.PointDetection.PointDetection(True, settings_inst.GetSettings())
+			pointDet.CalibrateStereoVisionSystem(default_frame_shape=pointDet.GetDesiredFrameShape())
+
+			delay = timeit.default_timer()
+			pointDet.CalibrateStandardScaling()
+			print 'Delay for scale calibration with {0} worker(s): {1} sec'.format(calib_workers, timeit.default_timer() - delay)
+
+			if scale_params == None:
+				scale_params = (pointDet.GetStandardScaleDistance(), pointDet.GetStandardPointSize())
+			else:
+				self.assertAlmostEqual(pointDet.GetStandardScaleDistance(), scale_params[0])
+				self.assertAlmostEqual(pointDet.GetStandardPointSize(), scale_params[1])
\ No newline at end of file
@@ -0,0 +1,115 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for PointTracker
+'''
+class Test_PointTracker(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.DroneVision.DroneVision_src.imgProcessing.featureDetection.PointTracker import PointTracker
+		self.Settings 		= Settings
+		self.PointTracker 	= PointTracker
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_PointTracker(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestPointTracking()
+		###########################
+
+	def CreatePointGridMask(self, dx, dy, frame_shape=(512,612), grid_step=30, point_radius=4):
+		'''
+		 @brief Create a synthetic green mask with a grid of structured light points.
+
+		 @param dx (grid offset in x direction)
+		 @param dy (grid offset in y direction)
+		 @param frame_shape (default=(512,612))
+		 @param grid_step (default=30)
+		 @param point_radius (default=4)
+
+		 @return green_mask
+		'''
+		import cv2
+		import numpy as np
+		green_mask = np.zeros(frame_shape, dtype=np.uint8)
+		for y in range(grid_step, frame_shape[0] - grid_step, grid_step):
+			for x in range(grid_step, frame_shape[1] - grid_step, grid_step):
+				cv2.circle(green_mask, (int(round(x + dx)), int(round(y + dy))), point_radius, 255, -1)
+		return green_mask
+
+	def TestPointTracking(self, keyframe_interval=4, n_frames=10, step=(1.5, 1.0)):
+		'''
+		 @brief Test that points are tracked between keyframes with stable ids.
+
+		 @param keyframe_interval (default=4)
+		 @param n_frames (default=10)
+		 @param step (grid movement per frame as (dx, dy) (default=(1.5, 1.0)))
+		'''
+		import timeit, cv2
+		import numpy as np
+
+		print '\n'
+		print '#----------- TESTING POINT TRACKING   \t---------------#'
+
+		blob_params = cv2.SimpleBlobDetector_Params()
+		blob_params.minThreshold 		= 1
+		blob_params.maxThreshold 		= 255
+		blob_params.filterByColor 		= True
+		blob_params.blobColor 			= 255
+		blob_params.filterByArea 		= False
+		blob_params.filterByCircularity = False
+		blob_params.filterByConvexity 	= False
+		blob_params.filterByInertia 	= False
+		detector = cv2.SimpleBlobDetector_create(blob_params)
+
+		pointTracker = self.PointTracker.PointTracker(keyframe_interval)
+		green_mask 	= self.CreatePointGridMask(0, 0)
+		keypoints 	= detector.detect(green_mask, mask=green_mask)
+		pointTracker.SetKeyframe(green_mask, keypoints)
+		start_positions = dict([(kp.class_id, kp.pt) for kp in keypoints])
+		self.assertEqual(len(start_positions), len(keypoints))
+
+		for i in range(1, n_frames):
+			green_mask = self.CreatePointGridMask(step[0]*i, step[1]*i)
+			delay = timeit.default_timer()
+			if pointTracker.CheckKeyframe(green_mask.shape):
+				keypoints = detector.detect(green_mask, mask=green_mask)
+				pointTracker.SetKeyframe(green_mask, keypoints)
+				frame_type = 'keyframe'
+			else:
+				keypoints, tracking_ok = pointTracker.TrackKeypoints(green_mask)
+				self.assertTrue(tracking_ok)
+				frame_type = 'tracked'
+			print 'Frame {0} ({1}): {2} points, confidence {3}, delay {4} sec'.format(i, frame_type, len(keypoints), pointTracker.GetConfidence(), timeit.default_timer() - delay)
+			self.assertEqual((i % keyframe_interval == 0), frame_type == 'keyframe')
+			for kp in keypoints:
+				self.assertTrue(kp.class_id in start_positions)
+				start_pt = start_positions[kp.class_id]
+				self.assertLess(np.hypot(kp.pt[0] - start_pt[0] - step[0]*i, kp.pt[1] - start_pt[1] - step[1]*i), 1.5)
@@ -0,0 +1,74 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for LoopbackSlave
+'''
+class Test_LoopbackSlave(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.MasterSlave import LoopbackSlave
+		self.Settings 		= Settings
+		self.LoopbackSlave 	= LoopbackSlave
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_LoopbackSlave(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestLinkEmulator()
+		self.TestLoopbackBenchmark()
+		###########################
+
+	def TestLinkEmulator(self):
+		'''
+		 @brief Test link delay of latency and bandwidth.
+		'''
+		linkEmulator = self.LoopbackSlave.LinkEmulator(latency=0.01, bandwidth=1e6)
+		self.assertAlmostEqual(linkEmulator.GetLinkDelay(0), 0.01)
+		self.assertAlmostEqual(linkEmulator.GetLinkDelay(1e6), 1.01)
+		self.assertEqual(self.LoopbackSlave.LinkEmulator().GetLinkDelay(1e6), 0.0)
+
+	def TestLoopbackBenchmark(self):
+		'''
+		 @brief Test benchmark of the master against the loopback slave with synthetic frames and emulated latency.
+		'''
+		import numpy as np
+
+		latency 		= 0.002
+		settings_inst 	= self.Settings.Settings()
+		settings_inst.ChangeSetting('TCP', 'loopback_latency', latency)
+		settings_inst.ChangeSetting('TCP', 'loopback_point_lists', False)
+		settings_inst.ChangeSetting('TCP', 'transport_metrics', True)
+		frame_sets 		= [(np.ones((124, 124), dtype=np.uint8)*i, np.ones((124, 124), dtype=np.uint8)*(i+1)) for i in range(3)]
+		results 		= self.LoopbackSlave.RunLoopbackBenchmark(settings_inst, frame_sets, n_frames=10, request_frames=True)
+		self.assertEqual(results['n_frames'], 10)
+		self.assertEqual(results['n_invalid'], 0)
+		self.assertTrue(results['fps'] > 0)
+		self.assertTrue(results['master_metrics']['setNewFrame']['timings']['round_trip']['min'] >= 2*latency)
+		self.assertEqual(results['slave_metrics']['getFrame']['payloads']['sent']['count'], 10)
\ No newline at end of file
@@ -85,6 +85,32 @@ class Test_MasterSubClass(Test_main, TestData):
 		self.objMaster.RequestRestart()
 		self.TestConnect() #Test reconnect
 
+	def TestPushPointList(self):
+		'''
+		 @brief Test point list pushed by the slave.
+		 	The push of the first frame is not received before the next trigger, and should be discarded.
+		'''
+		print 'Testing pushed point list from slave'
+		self.objMaster.RequestFrameProcessingOnSlave(push_point_list=True)
+		seq = self.objMaster.RequestFrameProcessingOnSlave(push_point_list=True)
+		und_shape, point_list, blob_desc, valid, error = self.objMaster.ReceivePushedPointList(seq, 5.0)
+		if not(valid):
+			raise Exception('Pushed point list request failed')
+
+	def TestTransportMetrics(self):
+		'''
+		 @brief Test live transport metrics of master and slave.
+		'''
+		print 'Testing transport metrics'
+		master_metrics 	= self.objMaster.GetTransportMetrics()
+		slave_metrics 	= self.objMaster.RequestTransportMetrics()
+		if master_metrics != None:
+			if not('getFrame' in master_metrics) or master_metrics['getFrame']['timings']['round_trip']['count'] < 1:
+				raise Exception('Master transport metrics are missing getFrame')
+		if slave_metrics != None:
+			if not('getFrame' in slave_metrics) or slave_metrics['getFrame']['payloads']['sent']['count'] < 1:
+				raise Exception('Slave transport metrics are missing getFrame')
+
 	def TestRequestCameraRestart(self):
 		'''
 		 @brief Test camera restart request
@@ -132,6 +158,8 @@ class Test_MasterSubClass(Test_main, TestData):
 		self.TestGeneralRequests()
 		self.TestRequestFrame()
 		self.TestRequestPointList()
+		self.TestPushPointList()
+		self.TestTransportMetrics()
 		self.TestRequestCameraRestart()
 
 		self.TestStayingAlive(settings_inst.GetSettings('TCP', 'tcp_timeout')*0.3)
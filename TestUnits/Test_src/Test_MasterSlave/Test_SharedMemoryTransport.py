@@ -0,0 +1,87 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for the shared memory transport
+'''
+class Test_SharedMemoryTransport(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.MasterSlave import SharedMemoryTransport, Requests
+		self.SharedMemoryTransport 	= SharedMemoryTransport
+		self.Requests 				= Requests
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_SharedMemoryTransport(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestSharedFrameRing()
+		self.TestFramePayload()
+		###########################
+
+	def TestSharedFrameRing(self):
+		'''
+		 @brief Test passing frames through the shared frame ring, for more payloads than slots in the ring.
+		'''
+		import numpy as np
+
+		n_slots 		= 3
+		sender_ring 	= self.SharedMemoryTransport.SharedFrameRing(n_slots)
+		receiver_ring 	= self.SharedMemoryTransport.SharedFrameRing(n_slots)
+		for i in range(4*n_slots):
+			frames 		= [np.random.randint(0, 255, (100+i, 120)).astype(np.uint8), None]
+			frame_refs 	= sender_ring.PackFrames(frames)
+			self.assertEqual(frame_refs[1], None)
+			self.assertTrue(np.array_equal(frames[0], receiver_ring.UnpackFrame(frame_refs[0])))
+		sender_ring.Close()
+		receiver_ring.Close()
+
+	def TestFramePayload(self):
+		'''
+		 @brief Test frame payloads of the requests with json lists and with the shared frame ring.
+		 	Prints the time of packing, serializing and unpacking a frame set with each transport.
+		'''
+		import numpy as np
+		import json, timeit
+
+		frame 			= np.random.randint(0, 255, (1024, 1280)).astype(np.uint8)
+		descriptors 	= np.zeros(0)
+		content 		= (frame, frame, frame, frame, [], descriptors)
+		for use_shm in [False, True]:
+			sender 		= self.Requests.Requests(False) # Slave
+			receiver 	= self.Requests.Requests(True) # Master
+			if use_shm:
+				sender.SetSharedFrameRing(self.SharedMemoryTransport.SharedFrameRing(2))
+				receiver.SetSharedFrameRing(self.SharedMemoryTransport.SharedFrameRing(2))
+			start_time 	= timeit.default_timer()
+			payload 	= json.dumps(sender.GetContentRequestFrame(content))
+			frame_content, valid, error = receiver.GetContentRequestFrame(json.loads(payload))
+			print 'Frame payload with {0}: {1:.4f} sec, {2} bytes'.format('shm' if use_shm else 'json lists', timeit.default_timer() - start_time, len(payload))
+			self.assertTrue(valid)
+			for received_frame in frame_content[:4]:
+				self.assertTrue(np.array_equal(frame, received_frame))
\ No newline at end of file
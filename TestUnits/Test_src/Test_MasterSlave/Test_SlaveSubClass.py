@@ -38,13 +38,21 @@ class Test_SlaveSubClass(Test_main, TestData):
 		import numpy as np # Only needed for the unit test
 		return np.ones((124, 124), dtype=np.uint8)*10 #Create uint8 numpy array (frame)
 
-	def SetProcessNewFrameFlag(self):
+	def SetProcessNewFrameFlag(self, seq=None):
 		'''
 		 @brief Test function for SetProcessNewFrameFlag(). 
 		 Actually a function from DroneSlave during normal operation.
 		'''
 		print 'processing new frame..'
 
+	def WaitNewFrameProcessed(self, timeout, seq=None):
+		'''
+		 @brief Test function for WaitNewFrameProcessed(). 
+		 Actually a function from DroneSlave during normal operation.
+		'''
+		print 'waiting for new frame to be processed..'
+		return True
+
 	def GetFramePayload(self):
 		'''
 		 @brief Test function for GetFramePayload(). 
@@ -60,6 +68,14 @@ class Test_SlaveSubClass(Test_main, TestData):
 		frame_content 		= (original_frame, original_sl_frame, frame_un, delta_frame, point_list, blob_desc)
 		return frame_content, None
 
+	def GetCaptureTime(self):
+		'''
+		 @brief Test function for GetCaptureTime(). 
+		 Actually a function from DroneSlave during normal operation.
+		'''
+		from src.MasterSlave.TriggerBroadcast import GetTriggerClock
+		return GetTriggerClock()
+
 	def RestartCamera(self):
 		'''
 		 @brief simulating camera restart
@@ -0,0 +1,90 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for SocketTuning
+'''
+class Test_SocketTuning(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.MasterSlave import SocketTuning
+		self.Settings 		= Settings
+		self.SocketTuning 	= SocketTuning
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_SocketTuning(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestSendChunks()
+		self.TestAdaptiveChunker()
+		self.TestThroughputBenchmark()
+		###########################
+
+	def TestSendChunks(self):
+		'''
+		 @brief Test that chunked payloads are received completely and in order.
+		'''
+		import socket, threading, os
+
+		payload = os.urandom(300*1024+7)
+		for chunk_size in [0, 1000, 64*1024, len(payload)]:
+			sender, receiver 	= socket.socketpair()
+			received 			= []
+			t = threading.Thread(target=lambda: received.append(self.SocketTuning.RecvExactly(receiver, len(payload))))
+			t.start()
+			self.SocketTuning.SendChunks(sender, payload, chunk_size)
+			t.join(5.0)
+			self.assertEqual(received, [payload])
+			sender.close()
+			self.assertRaises(socket.error, self.SocketTuning.RecvExactly, receiver, 1)
+			receiver.close()
+
+	def TestAdaptiveChunker(self):
+		'''
+		 @brief Test that the candidate with the highest throughput is chosen.
+		'''
+		seconds 		= {1024: 1.0, 65536: 0.25, 0: 0.5}
+		chunker 		= self.SocketTuning.AdaptiveChunker([1024, 65536, 0], min_payload=1000, samples=2)
+		self.assertEqual(chunker.GetChunkSize(10), 0) # Small payloads are sent by a single call
+		for i in range(6):
+			chunk_size = chunker.GetChunkSize(1e6)
+			chunker.AddThroughputSample(chunk_size, 1e6, seconds[chunk_size])
+		chunk_size, throughputs = chunker.GetTunedChunkSize()
+		self.assertEqual(chunk_size, 65536)
+		self.assertAlmostEqual(throughputs[65536], 4e6)
+		self.assertEqual(chunker.GetChunkSize(1e6), 65536)
+
+	def TestThroughputBenchmark(self):
+		'''
+		 @brief Test throughput benchmark over loopback.
+		'''
+		settings_inst 	= self.Settings.Settings()
+		results 		= self.SocketTuning.RunThroughputBenchmark(settings_inst.GetSettings('TCP'), payload_sizes=[1024, 1024**2], chunk_sizes=[3072, 0], repeats=2)
+		self.assertEqual(sorted(results.keys()), [0, 3072])
+		self.assertTrue(results[0][1024**2] > 0)
\ No newline at end of file
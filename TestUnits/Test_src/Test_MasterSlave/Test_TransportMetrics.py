@@ -0,0 +1,89 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for TransportMetrics
+'''
+class Test_TransportMetrics(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from src.MasterSlave import TransportMetrics
+		self.TransportMetrics = TransportMetrics
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_TransportMetrics(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestLatencyHistogram()
+		self.TestTransportMetrics()
+		###########################
+
+	def TestLatencyHistogram(self):
+		'''
+		 @brief Test histogram percentiles against exact percentiles.
+		'''
+		import numpy as np
+
+		values 		= np.random.lognormal(np.log(1e-3), 1.0, 10000)
+		histogram 	= self.TransportMetrics.LatencyHistogram()
+		for value in values:
+			histogram.Add(value)
+		summary = histogram.GetSummary()
+		self.assertEqual(summary['count'], len(values))
+		self.assertAlmostEqual(summary['mean'], np.mean(values))
+		for p in [50, 90, 99]:
+			exact = np.percentile(values, p)
+			self.assertTrue(exact*0.95 <= summary['p{0}'.format(p)] <= exact*1.25)
+		self.assertEqual(self.TransportMetrics.LatencyHistogram().GetPercentile(50), None)
+
+	def TestTransportMetrics(self):
+		'''
+		 @brief Test transport metrics summary, and saving it to json.
+		'''
+		import json, os, tempfile
+
+		metrics = self.TransportMetrics.TransportMetrics('test')
+		for i in range(10):
+			metrics.AddTiming('getFrame', 'round_trip', 0.01*(i+1))
+			metrics.AddPayload('getFrame', 'received', 1000*(i+1))
+		metrics.AddPayload('setNewFrame', 'sent', 50)
+		summary = metrics.GetTransportMetrics()
+		self.assertEqual(sorted(summary.keys()), ['getFrame', 'setNewFrame'])
+		self.assertEqual(summary['getFrame']['timings']['round_trip']['count'], 10)
+		self.assertEqual(summary['getFrame']['payloads']['received'], {'count': 10, 'bytes': 55000, 'max_bytes': 10000})
+		self.assertEqual(metrics.GetTransportMetrics('setNewFrame').keys(), ['setNewFrame'])
+		metrics.PrintTransportMetrics()
+
+		fd, filename = tempfile.mkstemp(suffix='.json')
+		os.close(fd)
+		try:
+			metrics.SaveTransportMetrics(filename)
+			with open(filename, 'r') as f:
+				self.assertEqual(json.load(f)['metrics']['getFrame']['payloads']['received']['bytes'], 55000)
+		finally:
+			os.remove(filename)
\ No newline at end of file
@@ -0,0 +1,90 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+################### UNIT TEST ########################
+import unittest
+
+from Settings.TestData import TestData
+from TestUnits.Test_main import Test_main
+'''
+ @brief Test unit for the UDP trigger broadcast
+'''
+class Test_TriggerBroadcast(unittest.TestCase, Test_main, TestData):
+
+	def setUp(self):
+		'''
+		 @brief Give all setups to the unit test.
+		'''
+		self.SetAllKey()
+		self.InitTestData()
+		#### IMPORTS #####
+		from Settings import Settings
+		from src.MasterSlave import TriggerBroadcast
+		self.Settings 			= Settings
+		self.TriggerBroadcast 	= TriggerBroadcast
+		##################
+
+	def tearDown(self):
+		'''
+		 @brief Give all tear down steps. 
+		 	Is runned even if the test failed.
+		'''
+		pass
+
+	def test_TriggerBroadcast(self):
+		'''
+		 @brief Main start test function.
+		 	Append functions to test for this unit.
+		'''
+		###### START TEST #####
+		self.TestClockOffset()
+		self.TestTriggerChannel()
+		###########################
+
+	def TestClockOffset(self):
+		'''
+		 @brief Test NTP-style clock offset with a remote clock 5 sec ahead, and 10 ms delay each way.
+		'''
+		t0 = 100.0
+		t1 = t0 + 0.01 + 5.0
+		t2 = t1 + 0.002
+		t3 = t2 - 5.0 + 0.01
+		offset, delay = self.TriggerBroadcast.ComputeClockOffset(t0, t1, t2, t3)
+		self.assertAlmostEqual(offset, 5.0)
+		self.assertAlmostEqual(delay, 0.02)
+
+	def TestTriggerChannel(self):
+		'''
+		 @brief Test clock synchronization and trigger broadcast between a master and a slave on this device.
+		'''
+		import time
+
+		settings_inst = self.Settings.Settings()
+		settings_inst.ChangeSetting('TCP', 'udp_trigger_address', '127.0.0.1')
+		settings_inst.ChangeSetting('TCP', 'master_ip', '127.0.0.1')
+		settings_inst = settings_inst.GetSettings('TCP')
+
+		received_seqs 	= []
+		broadcaster 	= self.TriggerBroadcast.TriggerBroadcaster(settings_inst)
+		receiver 		= self.TriggerBroadcast.TriggerReceiver(settings_inst, received_seqs.append)
+		broadcaster.StartTriggerBroadcaster()
+		try:
+			clock_offset, delay = receiver.SynchronizeClock()
+			print 'Clock offset: {0:.6f} sec, round trip delay: {1:.6f} sec'.format(clock_offset, delay)
+			self.assertLess(abs(clock_offset), 0.01) # Same clock
+			receiver.StartTriggerReceiver()
+			for seq in range(1, 6):
+				broadcaster.BroadcastTrigger(seq)
+				time.sleep(0.01)
+			timeout = time.time() + 2.0
+			while len(received_seqs) < 5 and time.time() < timeout:
+				time.sleep(0.01)
+			self.assertEqual(received_seqs, range(1, 6))
+			print 'Trigger latency: {0:.6f} sec'.format(receiver.GetTriggerLatency())
+		finally:
+			receiver.CloseTriggerReceiver()
+			broadcaster.CloseTriggerBroadcaster()
\ No newline at end of file
@@ -16,6 +16,12 @@
  					- 'calibrate_stereopsis' to start a new session aimed at capturing frames of a chessboard for calibration purposes
  					- 'calibrate_blob' to start a new session aimed at capturing frames of structured light and normal frames to calibrate blob sizes and distance.
  					- 'calibrate' to start a new session aimed at both of the alternatives above.
+ 			- 'loopback' with 'video' or 'image' to benchmark the master end to end against a loopback slave, serving the recorded right camera frames given by the settings.
+ 		- 'benchmark' to benchmark the master transport against a loopback slave (append 'video' or 'image' to serve recorded frames given by the settings, otherwise synthetic frames).
+ 			- Append 'throughput' to benchmark the socket throughput over loopback for 1 KB to 50 MB payloads instead.
+ 			- Append 'database' to benchmark the write throughput of the database backends (sqlite and mysql) instead.
+ 			- Append 'blob' to benchmark the encoding and decoding of numpy arrays stored as database BLOBs instead.
+ 			- Append 'log' to benchmark the cost per frame of logging progress, written synchronously and by the background log writer, instead.
  		- 'test' to start a unit test. Specify with name of script to test the unit, or 'all' to test all units.
 
  	Append 'install' if required packages needs to be installed (does not include opencv, openGL or mysql - see HOWTO.txt).
@@ -42,6 +48,11 @@ if __name__ == "__main__":
 from src.bin.tools import RunThread
 from src.DroneMaster import DroneMaster
 from src.DroneSlave import DroneSlave
+from src.MasterSlave.LoopbackSlave import LoopbackSlave, RunLoopbackBenchmark
+from src.MasterSlave.SocketTuning import RunThroughputBenchmark
+from src.DataBase.SQLBase.SQLBase import RunDataBaseBenchmark
+from src.DataBase.SQLBase.SQLBlob import RunBlobBenchmark
+from src.DataBase.LogTool.LogTool import RunLogBenchmark
 from Settings.Settings import Settings
 
 def RunMaster(calibrate_stereopsis_session=False, calibrate_blob_scale_detector_session=False, preset_settings=None):
@@ -80,6 +91,33 @@ def RunSlave(preset_settings=None):
 	if not(isinstance(error, type(None))):
 		raise
 
+def RunLoopbackSlave(preset_settings=None):
+	'''
+	 @brief Shortcut for running loopback slave
+
+	 @param preset_settings (Settings class for giving preset settings (default=None). None means no preset settings)
+	'''
+	loopbackSlave = LoopbackSlave(settings_inst=preset_settings)
+	loopbackSlave.InitializeLoopbackSlave()
+	loopbackSlave.RunLoopbackSlave()
+
+def GetSimulationSettings():
+	'''
+	 @brief Get preset settings for simulating the slave on this device.
+	 	Source type is given by appending 'video' or 'image'.
+
+	 @return preset_settings
+	'''
+	preset_settings = Settings()
+	if 'video' in sys.argv:
+		preset_settings.ChangeSetting('BASIC', 'source_type', 'VIDEO')
+	elif 'image' in sys.argv:
+		preset_settings.ChangeSetting('BASIC', 'source_type', 'IMAGE')
+	else:
+		raise Exception("Please append 'video' or 'image' to select a source type for simulation, and be sure to set correct video/image targets in the settings configuration file. Append 'info' to get more details.")
+	preset_settings.ChangeSetting('TCP', 'master_ip', 'localhost')
+	return preset_settings
+
 def PrintInfo():
 		'''
 		 @brief Print info about how to use this program.
@@ -100,6 +138,7 @@ def PrintInfo():
 		print "# \t\t -SETTING_TYPE --SETTING ---NEW_SETTING_VALUE"
 		print "# \t Change a specific setting by entering a valid python code, may be commenced by typing: "
 		print "# \t\t -SETTING_TYPE --SETTING"
+		print "# The master may be benchmarked against a loopback slave serving a saved session by typing 'run loopback video' or 'run loopback image', or the transport only by typing 'benchmark' (optionally with 'video' or 'image')."
 		print "# Saved sessions may be simulated by typing 'simulate video' or 'simulate image' instead of 'master'/'slave', with video or image targets given by the settings configurations."
 		print "# Program settings may be changed in detail by changing the settings configuration json file."
 		print "# Program settings may be found at {0}.json.".format(static_settings['settings_params_folder']+static_settings['settings_params_fname'])
@@ -136,22 +175,39 @@ if __name__ == "__main__":
 		elif 'slave' in sys.argv:
 			RunSlave()
 		elif 'simulate' in sys.argv:
-			preset_settings = Settings()
-			if 'video' in sys.argv:
-				preset_settings.ChangeSetting('BASIC', 'source_type', 'VIDEO')
-			elif 'image' in sys.argv:
-				preset_settings.ChangeSetting('BASIC', 'source_type', 'IMAGE')
-			else:
-				raise Exception("Please append 'video' or 'image' to select a source type for simulation, and be sure to set correct video/image targets in the settings configuration file. Append 'info' to get more details.")
-			preset_settings.ChangeSetting('TCP', 'master_ip', 'localhost')
+			preset_settings = GetSimulationSettings()
 			if not(preset_settings.GetSettings('REAL_TIME_PLOT', 'use_matplotlib')):
 				warnings.warn('PyQtImage does not work outside of main thread - switching to matplotlib with interactive mode on.')
 				preset_settings.ChangeSetting('REAL_TIME_PLOT', 'use_matplotlib', True)
 				preset_settings.ChangeSetting('REAL_TIME_PLOT', 'use_interactive_mode', True)
 			RunThread(RunSlave, args=(preset_settings,))
 			RunMaster(calib_stereopsis, calib_blobs, preset_settings)
+		elif 'loopback' in sys.argv:
+			preset_settings = GetSimulationSettings()
+			preset_settings.ChangeSetting('REAL_TIME_PLOT', 'real_time_plot_on', False)
+			RunThread(RunLoopbackSlave, args=(preset_settings,))
+			RunMaster(preset_settings=preset_settings)
 		else:
-			raise Exception("Please append 'master', 'slave' or 'simulate' to start the main program.")
+			raise Exception("Please append 'master', 'slave', 'simulate' or 'loopback' to start the main program.")
+	elif 'benchmark' in sys.argv and 'throughput' in sys.argv:
+		RunThroughputBenchmark(Settings().GetSettings('TCP'))
+	elif 'benchmark' in sys.argv and 'database' in sys.argv:
+		RunDataBaseBenchmark(Settings().GetSettings('DATABASE'))
+	elif 'benchmark' in sys.argv and 'blob' in sys.argv:
+		RunBlobBenchmark()
+	elif 'benchmark' in sys.argv and 'log' in sys.argv:
+		RunLogBenchmark()
+	elif 'benchmark' in sys.argv:
+		frame_sets = None
+		if 'video' in sys.argv or 'image' in sys.argv:
+			preset_settings = GetSimulationSettings()
+		else:
+			import numpy as np
+			preset_settings = Settings()
+			preset_settings.ChangeSetting('TCP', 'master_ip', 'localhost')
+			preset_settings.ChangeSetting('TCP', 'loopback_point_lists', False)
+			frame_sets = [(np.random.randint(0, 256, (1024, 1280, 3)).astype(np.uint8), np.random.randint(0, 256, (1024, 1280, 3)).astype(np.uint8))]
+		RunLoopbackBenchmark(preset_settings, frame_sets)
 	elif 'test' in sys.argv:
 		from TestUnits.Test_main import Test_main
 		test_main = Test_main()
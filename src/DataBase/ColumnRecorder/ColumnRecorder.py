@@ -0,0 +1,186 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import os, glob, json, struct, time, numbers
+import numpy as np
+from src.bin.tools import CheckDir
+
+NPY_HEADER_SIZE = 128 # Fixed npy header size, so the header can be rewritten in place when the array grows
+
+def WriteNpyHeader(f, dtype, shape):
+	'''
+	 @brief Write npy (version 1.0) header padded to NPY_HEADER_SIZE bytes at the current file position.
+
+	 @param f (file opened for binary writing)
+	 @param dtype
+	 @param shape
+	'''
+	header = "{{'descr': '{0}', 'fortran_order': False, 'shape': {1}, }}".format(np.dtype(dtype).str, repr(tuple(shape)))
+	header = header.ljust(NPY_HEADER_SIZE - 10 - 1) + '\n'
+	f.write('\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header)
+
+def AppendToNpy(filename, array):
+	'''
+	 @brief Append array along the first axis to an npy file (created if it does not exist).
+	 	The data is written before the header is updated, so the file is always readable as the previous or the new array.
+
+	 @param filename
+	 @param array
+	'''
+	array = np.ascontiguousarray(array)
+	if not(os.path.isfile(filename)):
+		with open(filename, 'wb') as f:
+			WriteNpyHeader(f, array.dtype, (0,) + array.shape[1:])
+	with open(filename, 'r+b') as f:
+		f.seek(0)
+		f.read(8)
+		header_len 	= struct.unpack('<H', f.read(2))[0]
+		n_rows 		= int(f.read(header_len).split("'shape': (")[1].split(',')[0])
+		f.seek(10 + header_len + n_rows*array.dtype.itemsize*int(np.prod(array.shape[1:])))
+		f.write(array.tostring())
+		f.seek(0)
+		WriteNpyHeader(f, array.dtype, (n_rows + array.shape[0],) + array.shape[1:])
+
+def LoadColumnarSession(folder, mmap_mode='r'):
+	'''
+	 @brief Load columnar session data recorded by the ColumnRecorder.
+	 	Uncompressed sessions are memory mapped by default, so hours of recordings are read on demand.
+	 	Frames missing a column have NaN values. The points of frame i are points3D[points3D_offsets[i]:points3D_offsets[i+1]].
+	 	Sessions may be loaded while they are recorded (the frames flushed so far are returned).
+
+	 @param folder (Columnar data folder, f.ex <session output folder>columns/)
+	 @param mmap_mode (Memory map mode for uncompressed sessions, None for loading to memory (default='r'))
+
+	 @return session (dictionary: 'n_frames', 'columns' ({column: array of n_frames}), 'points3D' (Nx3 array), 'points3D_offsets' (array of n_frames+1))
+	'''
+	with open(folder + 'columns.json', 'r') as f:
+		index = json.load(f)
+	n_frames 	= index['n_frames']
+	columns 	= {}
+	if index['compress']:
+		chunks 		= [np.load(filename) for filename in sorted(glob.glob(folder + 'chunk_*.npz'))[:index['n_chunks']]]
+		for column in index['columns']:
+			columns[column] = np.concatenate([chunk[column] if column in chunk.files else np.full(len(chunk['points3D_counts']), np.nan) for chunk in chunks] + [np.zeros(0)])
+		points3D 		= np.concatenate([chunk['points3D'] for chunk in chunks] + [np.zeros((0, 3))])
+		points3D_counts = np.concatenate([chunk['points3D_counts'] for chunk in chunks] + [np.zeros(0, dtype=np.int64)])
+	else:
+		for column in index['columns']:
+			columns[column] = np.load(folder + column + '.npy', mmap_mode=mmap_mode)[:n_frames]
+		points3D_counts = np.load(folder + 'points3D_counts.npy', mmap_mode=mmap_mode)[:n_frames]
+		points3D 		= np.load(folder + 'points3D.npy', mmap_mode=mmap_mode)
+	points3D_offsets 	= np.concatenate(([0], np.cumsum(points3D_counts, dtype=np.int64)))
+	points3D 			= points3D[:points3D_offsets[-1]]
+	return {'n_frames': n_frames, 'columns': columns, 'points3D': points3D, 'points3D_offsets': points3D_offsets}
+
+'''
+ @brief Columnar recorder of per-frame scalars (process data and timings) and variable-length 3D point clouds.
+ 	Frames are buffered in memory, and appended to the files in chunks of chunk_size frames:
+ 		- Uncompressed (default): one appendable npy file per column (<column>.npy), and the point clouds as points3D.npy (Nx3) with the number of points of each frame in points3D_counts.npy.
+ 			The files may be memory mapped for post-flight analysis (see LoadColumnarSession).
+ 		- Compressed: each chunk is written as a compressed npz file (chunk_<i>.npz), which must be loaded to memory.
+ 	columns.json holds the number of flushed frames and the column names, and is replaced after each chunk, so the files may be read during flight.
+ 	Columns that appear later in the session are back-filled with NaN.
+
+ @param folder (Output folder of the columnar files)
+ @param chunk_size (Number of frames per chunk (default=64))
+ @param compress (True for compressed npz chunks (default=False))
+'''
+class ColumnRecorder():
+	def __init__(self, folder, chunk_size=64, compress=False):
+		'''CONSTRUCTOR'''
+		self.__folder 			= folder
+		self.__chunk_size 		= max(1, chunk_size)
+		self.__compress 		= compress
+		self.__columns 			= []
+		self.__n_frames 		= 0
+		self.__n_chunks 		= 0
+		self.__last_time 		= None
+		self.ResetColumnBuffer()
+		CheckDir(self.__folder)
+
+	def ResetColumnBuffer(self):
+		'''
+		 @brief Reset the buffered frames
+		'''
+		self.__buffer 			= []
+		self.__points3D_buffer 	= []
+
+	def RecordColumns(self, process_data, points3D=[]):
+		'''
+		 @brief Record a frame.
+		 	Numeric process data values are recorded (None is recorded as NaN), with 'timestamp' (unix time) and 'frame_time' (seconds since the previous frame).
+
+		 @param process_data (dictionary, {'tag': value})
+		 @param points3D (list of 3D points (3x1), as returned by the stereopsis (default=[]))
+		'''
+		timestamp 	= time.time()
+		row 		= {'timestamp': timestamp}
+		if self.__last_time != None:
+			row['frame_time'] = timestamp - self.__last_time
+		self.__last_time = timestamp
+		for key in process_data:
+			value = process_data[key]
+			if isinstance(value, (numbers.Number, np.number)):
+				row[key] = float(value)
+			elif value is None:
+				row[key] = np.nan
+		if len(points3D) > 0:
+			self.__points3D_buffer.append(np.asarray(np.hstack(points3D), dtype=np.float64).T)
+		else:
+			self.__points3D_buffer.append(np.zeros((0, 3)))
+		self.__buffer.append(row)
+		if len(self.__buffer) >= self.__chunk_size:
+			self.FlushColumns()
+
+	def FlushColumns(self):
+		'''
+		 @brief Append the buffered frames to the files.
+		'''
+		n_buffered = len(self.__buffer)
+		if n_buffered == 0:
+			return
+		new_columns = sorted(set(key for row in self.__buffer for key in row) - set(self.__columns))
+		chunk 		= {}
+		for column in self.__columns + new_columns:
+			chunk[column] = np.array([row.get(column, np.nan) for row in self.__buffer], dtype=np.float64)
+		chunk['points3D'] 			= np.concatenate(self.__points3D_buffer)
+		chunk['points3D_counts'] 	= np.array([len(points) for points in self.__points3D_buffer], dtype=np.int64)
+		if self.__compress:
+			np.savez_compressed(self.__folder + 'chunk_{0:06d}.npz'.format(self.__n_chunks), **chunk)
+		else:
+			for column in new_columns:
+				if self.__n_frames > 0:
+					AppendToNpy(self.__folder + column + '.npy', np.full(self.__n_frames, np.nan)) # Back-fill
+			for column in chunk:
+				AppendToNpy(self.__folder + column + '.npy', chunk[column])
+		self.__columns 	+= new_columns
+		self.__n_frames += n_buffered
+		self.__n_chunks += 1
+		self.ResetColumnBuffer()
+		self.WriteColumnIndex()
+
+	def WriteColumnIndex(self):
+		'''
+		 @brief Replace the columns.json index file
+		'''
+		index = {'n_frames': self.__n_frames, 'n_chunks': self.__n_chunks, 'columns': self.__columns, 'compress': self.__compress, 'chunk_size': self.__chunk_size}
+		with open(self.__folder + 'columns.json.tmp', 'w') as f:
+			json.dump(index, f, indent=4, sort_keys=True)
+		os.rename(self.__folder + 'columns.json.tmp', self.__folder + 'columns.json')
+
+	def GetNumberOfRecordedFrames(self):
+		'''
+		 @brief Get number of recorded frames (flushed and buffered)
+
+		 @return n_frames
+		'''
+		return self.__n_frames + len(self.__buffer)
+
+	def CloseColumnRecorder(self):
+		'''
+		 @brief Flush remaining frames
+		'''
+		self.FlushColumns()
\ No newline at end of file
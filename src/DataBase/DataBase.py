@@ -9,10 +9,12 @@ import numpy as np
 from datetime import datetime
 
 from src.bin.tools import GetTimestamp
-from MySQL.MySQL import MySQL
+from SQLBase.SQLBase import CreateSQLBackend
 from GPS.GPS import GPS
 from LogTool.LogTool import LogTool
 from FrameRecorder.FrameRecorder import FrameRecorder
+from DataBaseWriter.DataBaseWriter import DataBaseWriter
+from ColumnRecorder.ColumnRecorder import ColumnRecorder
 
 '''
  @brief DataBase class for storing data.
@@ -20,8 +22,14 @@ from FrameRecorder.FrameRecorder import FrameRecorder
  @param subclass DroneMaster or DroneSlave class (self)
  @param settings_inst (DATABASE settings)
  @param default_output_folder (default output folder (default=''))
+ 	Rows are stored by the sql backend given by 'db_backend' in the settings (MySQL or SQLite), available by GetSQLBackend().
+ 	Rows are written by a background writer in batches if 'background_db_writer' is set in the settings (see DataBaseWriter).
+ 	Frames are written by a pool of frame writer threads if 'frame_writer_threads' is set in the settings (see FrameRecorder).
+ 	Frames are only recorded around trigger events (TriggerFrameRecording()) if 'pre_trigger_seconds' is set in the settings (see FrameRecorder).
+ 	The log is written by a background log writer (with a json lines log next to Log.txt) if 'async_log' is set in the settings (see LogTool).
+ 	Process data and 3D points are also recorded to columnar files in the output folder if 'store_columnar_data' is set in the settings (see ColumnRecorder).
 '''
-class DataBase(MySQL, GPS, LogTool, FrameRecorder):
+class DataBase(GPS, LogTool, FrameRecorder):
 	def __init__(self, subclass, settings_inst, default_output_folder=''):
 		'''CONSTRUCTOR'''
 		self.__output_folder 	= default_output_folder
@@ -29,10 +37,26 @@ class DataBase(MySQL, GPS, LogTool, FrameRecorder):
 		self.__primary_key 		= ('timestamp', 'TIMESTAMP(6)')
 		self.__database 		= settings_inst.GetSettings('database')
 		self.__table_name 		= settings_inst.GetSettings('table_name')
-		MySQL.__init__(self, settings_inst.GetSettings('username'), settings_inst.GetSettings('password'), database=self.__database)
-		LogTool.__init__(self, subclass, printToScreen=settings_inst.GetSettings('print_progress'))
+		self.__settings_inst 	= settings_inst
+		self.__dataBaseWriter 	= None
+		self.__columnRecorder 	= None
+		self.__sql_backend 		= CreateSQLBackend(settings_inst)
+		LogTool.__init__(self, subclass, printToScreen=settings_inst.GetSettings('print_progress'), 
+			async_log=settings_inst.GetSettings('async_log'), 
+			flush_interval=settings_inst.GetSettings('log_flush_interval'), 
+			max_queue_size=settings_inst.GetSettings('log_queue_size'), 
+			screen_interval=settings_inst.GetSettings('log_screen_interval'))
 		GPS.__init__(self)
-		FrameRecorder.__init__(self, settings_inst.GetSettings('store_frames_video_fps'), settings_inst.GetSettings('store_frames_as_video'), settings_inst.GetSettings('store_frames_as_images'))
+		FrameRecorder.__init__(self, settings_inst.GetSettings('store_frames_video_fps'), settings_inst.GetSettings('store_frames_as_video'), settings_inst.GetSettings('store_frames_as_images'), 
+			store_frames_in_archive=settings_inst.GetSettings('store_frames_in_archive'), 
+			archive_chunk_size=int(settings_inst.GetSettings('frame_archive_chunk_size')*1024*1024), 
+			archive_compression=settings_inst.GetSettings('frame_archive_compression'), 
+			n_writer_threads=settings_inst.GetSettings('frame_writer_threads'), 
+			writer_queue_size=settings_inst.GetSettings('frame_writer_queue_size'), 
+			writer_block_on_full=settings_inst.GetSettings('frame_writer_block_on_full'), 
+			pre_trigger_seconds=settings_inst.GetSettings('pre_trigger_seconds'), 
+			post_trigger_seconds=settings_inst.GetSettings('post_trigger_seconds'), 
+			pre_trigger_max_bytes=int(settings_inst.GetSettings('pre_trigger_max_mb')*1024*1024))
 
 	def GetDatabaseName(self):
 		'''
@@ -51,6 +75,9 @@ class DataBase(MySQL, GPS, LogTool, FrameRecorder):
 		self.__output_folder = output_folder
 		self.SetLogFilename(self.__output_folder + 'Log.txt')
 		self.InitFrameRecorder(self.__output_folder)
+		if self.__settings_inst.GetSettings('store_columnar_data'):
+			self.CloseColumnRecorder()
+			self.__columnRecorder = ColumnRecorder(self.__output_folder + 'columns/', chunk_size=self.__settings_inst.GetSettings('columnar_chunk_size'), compress=self.__settings_inst.GetSettings('columnar_compress'))
 
 	def GetDatabaseOutputFolder(self):
 		'''
@@ -91,13 +118,13 @@ class DataBase(MySQL, GPS, LogTool, FrameRecorder):
 		columns = {self.__primary_key[0]: self.__primary_key[1]}
 		for data_dict in dict_list:
 			for key in data_dict:
-				columns[key] = self.FindSQLValueType(data_dict[key])
-		if not(self.CheckSQLTableExist(self.__table_name)):
-			self.CreateSQLTable(self.__table_name, columns, self.__primary_key[0])
+				columns[key] = self.__sql_backend.FindSQLValueType(data_dict[key])
+		if not(self.__sql_backend.CheckSQLTableExist(self.__table_name)):
+			self.__sql_backend.CreateSQLTable(self.__table_name, columns, self.__primary_key[0])
 		else:
 			for key in columns:
-				if not(self.CheckSQLColumnExist(self.__table_name, key)):
-					self.AddColumnToSQLTable(self.__table_name, (key, columns[key]))
+				if not(self.__sql_backend.CheckSQLColumnExist(self.__table_name, key)):
+					self.__sql_backend.AddColumnToSQLTable(self.__table_name, (key, columns[key]))
 		self.__table_created = True
 
 	def InsertToDatabase(self, dict_list):
@@ -106,7 +133,7 @@ class DataBase(MySQL, GPS, LogTool, FrameRecorder):
 
 		 @param dict_list (list of data dictionaries to store in database)
 		'''
-		if not(self.__table_created):
+		if not(self.__table_created) and not(self.__settings_inst.GetSettings('background_db_writer')):
 			self.CreateNewTable(dict_list)
 		unix_time 	= GetTimestamp(fractional=True)
 		data 		= {self.__primary_key[0]: unix_time}
@@ -114,40 +141,85 @@ class DataBase(MySQL, GPS, LogTool, FrameRecorder):
 			for key in data_dict:
 				if not(np.isnan(data_dict[key])) and not(data_dict[key] == None):
 					data[key] = data_dict[key]
+		if self.__settings_inst.GetSettings('background_db_writer'):
+			self.GetDataBaseWriter().PutRow(data)
+			return
+		self.__sql_backend.AddMissingSQLColumns(self.__table_name, data) # Checked against the cached schema
 		try:
-			self.InsertDataIntoSQLTable(self.__table_name, data)
-		except: # Check if columns are missing, and try a second time
-			for key in data:
-				if not(self.CheckSQLColumnExist(self.__table_name, key)):
-					self.AddColumnToSQLTable(self.__table_name, (key, self.FindSQLValueType(data[key])))
-			self.InsertDataIntoSQLTable(self.__table_name, data)
+			self.__sql_backend.InsertDataIntoSQLTable(self.__table_name, data)
+		except: # The table may be changed by another connection - reload the schema and try a second time
+			self.__sql_backend.ClearSQLSchemaCache(self.__table_name)
+			self.__sql_backend.AddMissingSQLColumns(self.__table_name, data)
+			self.__sql_backend.InsertDataIntoSQLTable(self.__table_name, data)
 
-	def RecordData(self, record_frames=True, insert_to_database=True, print_progress=False, points3D=[]):
+	def GetSQLBackend(self):
+		'''
+		 @brief Get the sql backend (MySQL or SQLite instance) of the database.
+
+		 @return sql_backend
+		'''
+		return self.__sql_backend
+
+	def GetDataBaseWriter(self):
+		'''
+		 @brief Get the background database writer of the current table.
+		 	The writer is started on the first insert, as the table name is set when the session starts.
+
+		 @return dataBaseWriter
+		'''
+		if self.__dataBaseWriter == None:
+			sql_backend = CreateSQLBackend(self.__settings_inst) # Own sql connection for the writer thread
+			self.__dataBaseWriter = DataBaseWriter(sql_backend, self.__table_name, self.__primary_key, 
+				max_queue_size=self.__settings_inst.GetSettings('db_writer_queue_size'), 
+				batch_size=self.__settings_inst.GetSettings('db_writer_batch_size'), 
+				flush_interval=self.__settings_inst.GetSettings('db_writer_flush_interval'), 
+				block_on_full=self.__settings_inst.GetSettings('db_writer_block_on_full'))
+			self.__dataBaseWriter.StartDataBaseWriter()
+		return self.__dataBaseWriter
+
+	def RecordData(self, record_frames=True, insert_to_database=True, print_progress=False, points3D=[], print_points3D=True, record_columns=False):
 		'''
 		 @brief Record data and frames to database. The frames are also recorded as video and images.
 		
 		 @param record_frames (True/False for recording frames (default=True))
 		 @param insert_to_database (True/False for inserting data to database (default=True))
 		 @param print_progress (Default=False)
-		 @param points3D (for printing 3D points (default=[]))
+		 @param points3D (3D points of the frame (default=[]))
+		 @param print_points3D (True/False for printing the 3D points with the progress (default=True))
+		 @param record_columns (True/False for recording process data and 3D points to the columnar files, if 'store_columnar_data' is set (default=False))
 		'''
 		if print_progress:
-			self.PrintProgress(points3D=points3D)
+			self.PrintProgress(points3D=points3D if print_points3D else [])
 		if record_frames:
 			self.RecordProcessFrames()
 		self.ResetProcessFrames() # Reset process frames to lighten memory
 		if insert_to_database:
 			dict_list = [self.GetGPSPosition(), self.GetProcessData()]
 			self.InsertToDatabase(dict_list)
+		if record_columns and self.__columnRecorder != None:
+			self.__columnRecorder.RecordColumns(self.GetProcessData(), points3D)
 		self.ResetProcessData()
 
+	def CloseColumnRecorder(self):
+		'''
+		 @brief Flush and close the columnar recorder.
+		'''
+		if self.__columnRecorder != None:
+			self.__columnRecorder.CloseColumnRecorder()
+			self.__columnRecorder = None
+
 	def CloseDataBase(self):
 		'''
 		 @brief Close DataBase
+		 	Remaining rows of the background writer are written before closing.
 		'''
-		MySQL.__del__(self)
+		if self.__dataBaseWriter != None:
+			self.__dataBaseWriter.CloseDataBaseWriter()
+			self.__dataBaseWriter = None
+		self.CloseColumnRecorder()
+		self.__sql_backend.CloseSQL()
 		LogTool.__del__(self)
-		FrameRecorder.__del__(self)
+		FrameRecorder.__del__(self) # Queued frames are written before the recordings are closed
 
 	def __del__(self):
 		'''DESTRUCTOR'''
@@ -0,0 +1,192 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import threading, timeit, warnings, Queue
+from src.bin.tools import PutBoundedQueue
+
+'''
+ @brief Background writer of database rows.
+ 	Rows are put in a bounded queue by the frame loop, and written by a writer thread in batches (executemany in one transaction),
+ 	flushed when batch_size rows are collected or flush_interval seconds after the first row of the batch.
+ 	The frame loop waits on a full queue, or the row is dropped if block_on_full is False (see PutBoundedQueue).
+ 	The writer thread owns its sql connection (mySQL), which must not be used by other threads.
+
+ @param mySQL (sql backend instance (MySQL or SQLite) used by the writer thread only)
+ @param table_name
+ @param primary_key (Primary key as (key, sql_type))
+ @param max_queue_size (Maximum number of queued rows (default=256))
+ @param batch_size (Maximum number of rows in a batch (default=32))
+ @param flush_interval (Maximum time in seconds a row waits for its batch to fill (default=1.0))
+ @param block_on_full (True for waiting on a full queue, False for dropping the row (default=True))
+'''
+class DataBaseWriter():
+	def __init__(self, mySQL, table_name, primary_key, max_queue_size=256, batch_size=32, flush_interval=1.0, block_on_full=True):
+		'''CONSTRUCTOR'''
+		self.__mySQL 			= mySQL
+		self.__table_name 		= table_name
+		self.__primary_key 		= primary_key
+		self.__batch_size 		= max(1, batch_size)
+		self.__flush_interval 	= flush_interval
+		self.__block_on_full 	= block_on_full
+		self.__queue 			= Queue.Queue(max(1, max_queue_size))
+		self.__table_created 	= False
+		self.__thread 			= None
+		self.__stop 			= False
+		self.__status_lock 		= threading.Lock()
+		self.__status 			= {'queued': 0, 'written': 0, 'batches': 0, 'failed': 0, 'dropped': 0, 'blocked': 0, 'max_queue_depth': 0}
+
+	def StartDataBaseWriter(self):
+		'''
+		 @brief Start the writer thread.
+		'''
+		self.__stop 			= False
+		self.__thread 			= threading.Thread(target=self.RunDataBaseWriter)
+		self.__thread.daemon 	= True
+		self.__thread.start()
+
+	def PutRow(self, data):
+		'''
+		 @brief Queue a row to be written to the database.
+		 	Reports backpressure if the queue is full.
+
+		 @param data (Dictionary of column keys as dict keys with values, data = {'col_key': data})
+
+		 @return True/False (False if the row was dropped)
+		'''
+		return PutBoundedQueue(self.__queue, data, self.__block_on_full, self.__status, self.__status_lock, 'Database writer', 'rows')
+
+	def RunDataBaseWriter(self):
+		'''
+		 @brief Collect rows into batches and write them.
+		 	Executed in the writer thread. Remaining rows are written before the thread stops.
+		'''
+		while True:
+			try:
+				rows = [self.__queue.get(timeout=0.1)]
+			except Queue.Empty:
+				if self.__stop:
+					break
+				continue
+			flush_time = timeit.default_timer() + self.__flush_interval
+			while len(rows) < self.__batch_size:
+				remaining = flush_time - timeit.default_timer()
+				try:
+					if remaining <= 0 or self.__stop:
+						rows.append(self.__queue.get_nowait())
+					else:
+						rows.append(self.__queue.get(timeout=remaining))
+				except Queue.Empty:
+					break
+			try:
+				self.WriteBatch(rows)
+			finally:
+				for row in rows:
+					self.__queue.task_done()
+
+	def WriteBatch(self, rows):
+		'''
+		 @brief Write a batch of rows to the database.
+		 	Rows are grouped by their columns, and each group is inserted by a single executemany.
+		 	Missing columns are added before inserting (detected by the cached schema of mySQL), and the insert is retried once with a reloaded schema.
+		 	Rows that still fail are counted and reported, and do not stop the writer.
+
+		 @param rows (list of data dictionaries)
+		'''
+		if not(self.__table_created):
+			try:
+				self.CreateTable(rows)
+			except Exception, err:
+				self.ReportFailedRows(len(rows), err)
+				return
+		groups = {}
+		for row in rows:
+			column_keys = tuple(sorted(row.keys()))
+			if not(column_keys in groups):
+				groups[column_keys] = []
+			groups[column_keys].append(row)
+		for column_keys, group_rows in groups.items():
+			try:
+				self.AddMissingColumns(group_rows[:1]) # Rows of a group have equal columns, checked against the cached schema
+				try:
+					self.__mySQL.InsertManyIntoSQLTable(self.__table_name, column_keys, group_rows)
+				except Exception: # The table may be changed by another connection - reload the schema and try a second time
+					self.__mySQL.ClearSQLSchemaCache(self.__table_name)
+					self.AddMissingColumns(group_rows[:1])
+					self.__mySQL.InsertManyIntoSQLTable(self.__table_name, column_keys, group_rows)
+				with self.__status_lock:
+					self.__status['written'] += len(group_rows)
+					self.__status['batches'] += 1
+			except Exception, err:
+				self.ReportFailedRows(len(group_rows), err)
+
+	def ReportFailedRows(self, n_rows, err):
+		'''
+		 @brief Count and warn about rows that failed to be written.
+
+		 @param n_rows
+		 @param err (Raised exception)
+		'''
+		with self.__status_lock:
+			self.__status['failed'] += n_rows
+		warnings.simplefilter('always')
+		warnings.warn('Database writer failed writing {0} rows: {1}'.format(n_rows, err), Warning)
+		warnings.simplefilter('default')
+
+	def CreateTable(self, rows):
+		'''
+		 @brief Create the table with columns of the given rows (or add missing columns if the table exists).
+
+		 @param rows (list of data dictionaries)
+		'''
+		if not(self.__mySQL.CheckSQLTableExist(self.__table_name)):
+			columns = {self.__primary_key[0]: self.__primary_key[1]}
+			for row in rows:
+				for key in row:
+					if not(key in columns):
+						columns[key] = self.__mySQL.FindSQLValueType(row[key])
+			self.__mySQL.CreateSQLTable(self.__table_name, columns, self.__primary_key[0])
+		else:
+			self.AddMissingColumns(rows)
+		self.__table_created = True
+
+	def AddMissingColumns(self, rows):
+		'''
+		 @brief Add columns of the rows that are missing in the table.
+
+		 @param rows (list of data dictionaries)
+		'''
+		for row in rows:
+			self.__mySQL.AddMissingSQLColumns(self.__table_name, row)
+
+	def FlushDataBaseWriter(self):
+		'''
+		 @brief Wait until all queued rows are written.
+		'''
+		if self.__thread != None and self.__thread.is_alive():
+			self.__queue.join()
+
+	def GetDataBaseWriterStatus(self):
+		'''
+		 @brief Get status of the writer.
+
+		 @return status (dictionary: 'queued', 'written', 'batches', 'failed', 'dropped' and 'blocked' rows, 'queue_depth' and 'max_queue_depth')
+		'''
+		with self.__status_lock:
+			status = dict(self.__status)
+		status['queue_depth'] = self.__queue.qsize()
+		return status
+
+	def CloseDataBaseWriter(self):
+		'''
+		 @brief Write remaining rows, stop the writer thread and close its sql connection.
+		'''
+		if self.__thread != None:
+			self.__stop = True
+			self.__thread.join()
+			self.__thread = None
+			status = self.GetDataBaseWriterStatus()
+			print 'Database writer: {0} rows written in {1} batches, {2} failed, {3} dropped, {4} blocked (max queue depth {5})'.format(status['written'], status['batches'], status['failed'], status['dropped'], status['blocked'], status['max_queue_depth'])
+		self.__mySQL.CloseSQL()
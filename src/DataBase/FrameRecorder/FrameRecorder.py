@@ -4,9 +4,12 @@
  Project: Master's Thesis - Autonomous Inspection Of Wind Blades
  Repository: Master's Thesis - CV (Computer Vision)
 '''
+import time
 import numpy as np
 from src.bin.tools import CheckDir
 from src.DroneVision.DroneVision_src.hardware.RecordFrames import RecordFrames
+from FrameWriterPool import FrameWriterPool
+from FrameRingBuffer import FrameRingBuffer
 
 '''
  @brief FrameRecorder class for recording frames.
@@ -14,14 +17,42 @@ from src.DroneVision.DroneVision_src.hardware.RecordFrames import RecordFrames
  @param default_fps (frames per second default value (default=1.0))
  @param store_frames_as_video (store all recorded frames as video (default=True))
  @param store_frames_as_images (store all recorded frames as images in separate subfolder (default=True))
+ @param store_frames_in_archive (store the recorded frames in a chunked frame archive instead of one image per frame, if store_frames_as_images is True (default=False))
+ @param archive_chunk_size (size of each archive chunk file in bytes (default=256 MB))
+ @param archive_compression (zlib compression level (1-9) of archived frames, 0 for raw frames (default=0))
+ @param n_writer_threads (Number of frame writer threads, 0 for writing frames in the calling thread (default=0))
+ 	Frames are written by a persistent FrameWriterPool when n_writer_threads > 0.
+ @param writer_queue_size (Maximum number of queued frames for each writer thread (default=16))
+ @param writer_block_on_full (True for waiting on a full writer queue, False for dropping the frame (default=True))
+ @param copy_frames (True for copying frames before they are queued, if the caller modifies the frames after recording them (default=False))
+ @param pre_trigger_seconds (Seconds of frames held in the pre-trigger ring buffer, 0 for recording all frames (default=0))
+ 	If pre_trigger_seconds > 0, frames are only held in a FrameRingBuffer, and written when TriggerFrameRecording() is called (f.ex on a detection event),
+ 	together with the frames of the following post_trigger_seconds seconds.
+ @param post_trigger_seconds (Seconds of frames recorded after each trigger (default=5.0))
+ @param pre_trigger_max_bytes (Maximum memory used by the pre-trigger ring buffer in bytes (default=256 MB))
 '''
 class FrameRecorder():
-	def __init__(self, default_fps=1.0, store_frames_as_video=True, store_frames_as_images=True):
+	def __init__(self, default_fps=1.0, store_frames_as_video=True, store_frames_as_images=True, store_frames_in_archive=False, archive_chunk_size=256*1024*1024, archive_compression=0, n_writer_threads=0, writer_queue_size=16, writer_block_on_full=True, copy_frames=False, pre_trigger_seconds=0.0, post_trigger_seconds=5.0, pre_trigger_max_bytes=256*1024*1024):
 		'''CONSTRUCTOR'''
 		self.__frame_recorders_dict 		= {}
 		self.__fps 							= default_fps
 		self.__store_frames_as_video		= store_frames_as_video
 		self.__store_frames_as_images 		= store_frames_as_images
+		self.__store_frames_in_archive 		= store_frames_in_archive
+		self.__archive_chunk_size 			= archive_chunk_size
+		self.__archive_compression 			= archive_compression
+		self.__n_writer_threads 			= n_writer_threads
+		self.__writer_queue_size 			= writer_queue_size
+		self.__writer_block_on_full 		= writer_block_on_full
+		self.__copy_frames 					= copy_frames
+		self.__frameWriterPool 				= None
+		self.__pre_trigger_seconds 			= pre_trigger_seconds
+		self.__post_trigger_seconds 		= post_trigger_seconds
+		self.__pre_trigger_max_bytes 		= pre_trigger_max_bytes
+		self.__frameRingBuffer 				= None
+		self.__record_until 				= None
+		self.__n_trigger_events 			= 0
+		self.ResetFrameRingBuffer()
 		self.ResetProcessFrames()
 
 	def ResetProcessFrames(self):
@@ -61,28 +92,119 @@ class FrameRecorder():
 	def RecordProcessFrames(self):
 		'''
 		 @brief Record process frames
+		 	Frames are held in the pre-trigger ring buffer, unless the recording is triggered.
 		'''
 		CheckDir(self.__output_folder)
+		buffer_frames = self.__frameRingBuffer != None and not(self.CheckFrameRecordingTriggered())
 		for key in self.__process_frames:
-			if not(key in self.__frame_recorders_dict):
-				self.__frame_recorders_dict[key] = self.CreateFrameRecorder(self.__fps, self.__output_folder, key, self.__store_frames_as_video, self.__store_frames_as_images)
-			self.RecordFrame(self.__frame_recorders_dict[key], self.__process_frames[key])
-			
-	def RecordFrame(self, frame_recorder, frame, use_threading=False):
+			if buffer_frames:
+				if isinstance(self.__process_frames[key], np.ndarray):
+					self.__frameRingBuffer.PutFrame(key, self.__process_frames[key].copy() if self.__copy_frames else self.__process_frames[key])
+			else:
+				self.RecordFrame(self.GetFrameRecorder(key), self.__process_frames[key], use_threading=(self.__n_writer_threads > 0))
+
+	def GetFrameRecorder(self, key):
+		'''
+		 @brief Get the frame recorder of a frame set (created if it does not exist)
+
+		 @param key (Frame set tag)
+
+		 @return recordFrames (class instance of RecordFrames)
+		'''
+		if not(key in self.__frame_recorders_dict):
+			self.__frame_recorders_dict[key] = self.CreateFrameRecorder(self.__fps, self.__output_folder, key, self.__store_frames_as_video, self.__store_frames_as_images, self.__store_frames_in_archive, self.__archive_chunk_size, self.__archive_compression)
+		return self.__frame_recorders_dict[key]
+
+	def RecordFrame(self, frame_recorder, frame, use_threading=False, timestamp=None, block_on_full=None):
 		'''
 		 @brief Record frame
 
 		 @param frame_recorder
 		 @param frame
-		 @param use_threading (True/False (default=False))
+		 @param use_threading (True/False for handing the frame to the frame writer pool (default=False))
+		 @param timestamp (Capture time of the frame (unix time), None for the current time (default=None))
+		 @param block_on_full (True/False for waiting on a full frame writer queue, None for the writer_block_on_full policy (default=None))
 		'''
 		if isinstance(frame, np.ndarray):
 			if use_threading:
-				frame_recorder.WriteFrameThread(frame)
+				if self.__copy_frames:
+					frame = frame.copy()
+				self.GetFrameWriterPool().PutFrame(frame_recorder, frame, timestamp, block_on_full)
 			else:
-				frame_recorder.WriteFrame(frame)
+				frame_recorder.WriteFrame(frame, timestamp)
 
-	def CreateFrameRecorder(self, fps, output_folder, video_name, store_frames_as_video=True, store_frames_as_images=True):
+	def ResetFrameRingBuffer(self):
+		'''
+		 @brief Reset the pre-trigger ring buffer (buffered frames are discarded)
+		'''
+		if self.__pre_trigger_seconds > 0:
+			self.__frameRingBuffer = FrameRingBuffer(self.__pre_trigger_seconds, self.__pre_trigger_max_bytes)
+
+	def DisableFrameRingBuffer(self):
+		'''
+		 @brief Disable the pre-trigger ring buffer, so all frames are recorded (f.ex if no trigger events are available)
+		'''
+		self.__pre_trigger_seconds 	= 0.0
+		self.__frameRingBuffer 		= None
+
+	def GetFrameRingBufferStatus(self):
+		'''
+		 @brief Get status of the pre-trigger ring buffer (see FrameRingBuffer.GetFrameRingBufferStatus), with the number of 'trigger_events'.
+
+		 @return status (None if frames are not buffered)
+		'''
+		if self.__frameRingBuffer == None:
+			return None
+		status 						= self.__frameRingBuffer.GetFrameRingBufferStatus()
+		status['trigger_events'] 	= self.__n_trigger_events
+		return status
+
+	def CheckFrameRecordingTriggered(self):
+		'''
+		 @brief Check if frames are recorded after a trigger (within post_trigger_seconds of the last trigger)
+
+		 @return True/False
+		'''
+		return self.__record_until != None and time.time() <= self.__record_until
+
+	def TriggerFrameRecording(self, event=''):
+		'''
+		 @brief Trigger frame recording around an event.
+		 	The frames of the pre-trigger ring buffer are written (waiting for room in the frame writer queues, so none are dropped),
+		 	and the following frames are recorded for post_trigger_seconds.
+		 	The event is logged in <output folder>recordings/trigger_events.txt.
+		 	Does nothing if frames are not buffered (pre_trigger_seconds = 0), as all frames are recorded.
+
+		 @param event (Event description, f.ex 'boundary_error' (default=''))
+
+		 @return n_pre_trigger_frames (Number of written pre-trigger frames)
+		'''
+		if self.__frameRingBuffer == None:
+			return 0
+		timestamp 				= time.time()
+		self.__record_until 	= timestamp + self.__post_trigger_seconds
+		self.__n_trigger_events += 1
+		frames 					= self.__frameRingBuffer.PopFrames()
+		for frame_timestamp, key, frame in frames:
+			self.RecordFrame(self.GetFrameRecorder(key), frame, use_threading=(self.__n_writer_threads > 0), timestamp=frame_timestamp, block_on_full=True)
+		CheckDir(self.__output_folder)
+		with open(self.__output_folder + 'trigger_events.txt', 'a') as f:
+			f.write('{0:.6f}\t{1}\t{2}\n'.format(timestamp, event, len(frames)))
+		return len(frames)
+
+	def GetFrameWriterPool(self):
+		'''
+		 @brief Get the frame writer pool.
+		 	The writer threads are started on the first threaded recording.
+
+		 @return frameWriterPool
+		'''
+		if self.__frameWriterPool == None:
+			self.__frameWriterPool = FrameWriterPool(max(1, self.__n_writer_threads), self.__writer_queue_size, self.__writer_block_on_full)
+			self.__frameWriterPool.StartFrameWriterPool()
+		return self.__frameWriterPool
+
+	def CreateFrameRecorder(self, fps, output_folder, video_name, store_frames_as_video=True, store_frames_as_images=True, store_frames_in_archive=False, archive_chunk_size=256*1024*1024, archive_compression=0):
 		'''
 		 @brief Create new frame recorder
 
@@ -90,16 +212,29 @@ class FrameRecorder():
 		 @param video_name (video filename)
 		 @param store_frames_as_video (store all recorded frames as video (default=True))
 		 @param store_frames_as_images (store all recorded frames as images in separate subfolder (default=True))
+		 @param store_frames_in_archive (store the frames in a chunked frame archive instead of one image per frame (default=False))
+		 @param archive_chunk_size (size of each archive chunk file in bytes (default=256 MB))
+		 @param archive_compression (zlib compression level of archived frames, 0 for raw frames (default=0))
 
 		 @return recordFrames (class instance of RecordFrames)
 		'''
-		recordFrames = RecordFrames(fps, output_folder, video_name, store_frames_as_video, store_frames_as_images)
+		recordFrames = RecordFrames(fps, output_folder, video_name, store_frames_as_video, store_frames_as_images, store_frames_in_archive, archive_chunk_size, archive_compression)
 		return recordFrames
 
 	def CloseRecordings(self):
 		'''
 		 @brief Safely close all recordings
-		'''
+		 	Frames queued for the frame writer pool are written before the recordings are closed.
+		 	Frames of the pre-trigger ring buffer are discarded, and the memory use of the buffer is reported.
+		'''
+		if self.__frameRingBuffer != None:
+			status = self.GetFrameRingBufferStatus()
+			if status['buffered'] > 0:
+				print 'Pre-trigger buffer: {0} trigger events, {1} frames buffered, {2} discarded ({3} by the memory limit), peak memory {4:.1f} MB of {5:.1f} MB'.format(status['trigger_events'], status['buffered'], status['discarded'] + status['frames'], status['memory_limited'], status['peak_bytes']/1048576.0, status['max_bytes']/1048576.0)
+			self.ResetFrameRingBuffer()
+		if self.__frameWriterPool != None:
+			self.__frameWriterPool.CloseFrameWriterPool()
+			self.__frameWriterPool = None
 		for key in self.__frame_recorders_dict:
 			self.__frame_recorders_dict[key].CloseRecording()
 
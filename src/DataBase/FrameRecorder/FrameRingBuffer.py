@@ -0,0 +1,89 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import time
+from collections import deque
+from src.bin.tools import WarnRateLimited
+
+'''
+ @brief Bounded in-memory ring buffer of the last recorded frames (pre-trigger buffer).
+ 	Holds the frames of the last max_seconds seconds, but never more than max_bytes bytes of frame data.
+ 	The oldest frames are discarded when either limit is exceeded.
+ 	Frames are buffered by reference (no copy), so they must not be modified after they are put in the buffer.
+
+ @param max_seconds (Maximum age in seconds of buffered frames, relative to the newest frame (default=5.0))
+ @param max_bytes (Maximum number of bytes of buffered frames (default=256 MB))
+'''
+class FrameRingBuffer():
+	def __init__(self, max_seconds=5.0, max_bytes=256*1024*1024):
+		'''CONSTRUCTOR'''
+		self.__max_seconds 	= max_seconds
+		self.__max_bytes 	= max_bytes
+		self.__buffer 		= deque()
+		self.__n_bytes 		= 0
+		self.__status 		= {'buffered': 0, 'discarded': 0, 'memory_limited': 0, 'peak_bytes': 0}
+
+	def PutFrame(self, tag, frame, timestamp=None):
+		'''
+		 @brief Put frame in the ring buffer, and discard the oldest frames exceeding the limits.
+
+		 @param tag (Frame set tag)
+		 @param frame
+		 @param timestamp (Unix time, None for the current time (default=None))
+		'''
+		if timestamp == None:
+			timestamp = time.time()
+		self.__buffer.append((timestamp, tag, frame))
+		self.__n_bytes 					+= frame.nbytes
+		self.__status['buffered'] 		+= 1
+		self.__status['peak_bytes'] 	= max(self.__status['peak_bytes'], self.__n_bytes)
+		while len(self.__buffer) > 0 and timestamp - self.__buffer[0][0] > self.__max_seconds:
+			self.DiscardOldestFrame()
+		while len(self.__buffer) > 0 and self.__n_bytes > self.__max_bytes:
+			self.DiscardOldestFrame()
+			self.__status['memory_limited'] += 1
+			WarnRateLimited('Pre-trigger buffer is limited by memory ({0:.1f} MB) - it holds {1:.2f} of {2:.2f} seconds.'.format(self.__max_bytes/1048576.0, self.GetBufferedSeconds(), self.__max_seconds), self.__status['memory_limited'])
+
+	def DiscardOldestFrame(self):
+		'''
+		 @brief Discard the oldest buffered frame
+		'''
+		self.__n_bytes 				-= self.__buffer.popleft()[2].nbytes
+		self.__status['discarded'] 	+= 1
+
+	def PopFrames(self):
+		'''
+		 @brief Get all buffered frames (oldest first), and empty the buffer.
+
+		 @return frames (list of (timestamp, tag, frame))
+		'''
+		frames 			= list(self.__buffer)
+		self.__buffer 	= deque()
+		self.__n_bytes 	= 0
+		return frames
+
+	def GetBufferedSeconds(self):
+		'''
+		 @brief Get time span of the buffered frames
+
+		 @return seconds
+		'''
+		if len(self.__buffer) == 0:
+			return 0.0
+		return self.__buffer[-1][0] - self.__buffer[0][0]
+
+	def GetFrameRingBufferStatus(self):
+		'''
+		 @brief Get status of the ring buffer.
+
+		 @return status (dictionary: 'frames' and 'bytes' currently buffered, 'seconds' buffered, 'max_bytes', 'peak_bytes', and number of 'buffered', 'discarded' and 'memory_limited' (discarded by the memory limit) frames)
+		'''
+		status 				= dict(self.__status)
+		status['frames'] 	= len(self.__buffer)
+		status['bytes'] 	= self.__n_bytes
+		status['seconds'] 	= self.GetBufferedSeconds()
+		status['max_bytes'] = self.__max_bytes
+		return status
\ No newline at end of file
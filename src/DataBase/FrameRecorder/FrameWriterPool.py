@@ -0,0 +1,141 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import threading, warnings, Queue
+from src.bin.tools import PutBoundedQueue
+
+'''
+ @brief Persistent pool of frame writer threads.
+ 	Frames are handed to the pool by the frame loop, and written (image encoding and video writing) by the writer threads.
+ 	Each frame recorder (RecordFrames instance) is assigned to one writer thread (round-robin), so its frames are written in order,
+ 	while frames of different recorders are written in parallel.
+ 	Each writer thread has a bounded queue, so at most n_workers*max_queue_size frames are held in memory.
+ 	The frame loop waits on a full queue, or the frame is dropped if block_on_full is False (see PutBoundedQueue).
+ 	Frames are queued by reference (no copy), so they must not be modified after they are put in the pool.
+
+ @param n_workers (Number of writer threads (default=2))
+ @param max_queue_size (Maximum number of queued frames for each writer thread (default=16))
+ @param block_on_full (True for waiting on a full queue, False for dropping the frame (default=True))
+'''
+class FrameWriterPool():
+	def __init__(self, n_workers=2, max_queue_size=16, block_on_full=True):
+		'''CONSTRUCTOR'''
+		self.__n_workers 		= max(1, n_workers)
+		self.__max_queue_size 	= max(1, max_queue_size)
+		self.__block_on_full 	= block_on_full
+		self.__queues 			= []
+		self.__threads 			= []
+		self.__worker_indices 	= {}
+		self.__status_lock 		= threading.Lock()
+		self.__status 			= {'queued': 0, 'written': 0, 'failed': 0, 'dropped': 0, 'blocked': 0, 'max_queue_depth': 0}
+
+	def StartFrameWriterPool(self):
+		'''
+		 @brief Start the writer threads.
+		'''
+		self.__queues 	= []
+		self.__threads 	= []
+		for i in range(self.__n_workers):
+			queue 			= Queue.Queue(self.__max_queue_size)
+			thread 			= threading.Thread(target=self.RunFrameWriter, args=(queue,))
+			thread.daemon 	= True
+			thread.start()
+			self.__queues.append(queue)
+			self.__threads.append(thread)
+
+	def GetFrameWriterPoolStarted(self):
+		'''
+		 @brief Get True/False for started writer threads.
+
+		 @return True/False
+		'''
+		return len(self.__threads) > 0
+
+	def GetWriterQueue(self, frame_recorder):
+		'''
+		 @brief Get the queue of the writer thread assigned to the frame recorder.
+
+		 @param frame_recorder
+
+		 @return queue
+		'''
+		key = id(frame_recorder)
+		if not(key in self.__worker_indices):
+			self.__worker_indices[key] = len(self.__worker_indices) % self.__n_workers
+		return self.__queues[self.__worker_indices[key]]
+
+	def PutFrame(self, frame_recorder, frame, timestamp=None, block_on_full=None):
+		'''
+		 @brief Queue a frame to be written by the frame recorder.
+		 	Reports backpressure if the queue is full.
+
+		 @param frame_recorder (RecordFrames instance)
+		 @param frame
+		 @param timestamp (Capture time of the frame (unix time), None for the time of writing (default=None))
+		 @param block_on_full (True/False for waiting on a full queue, None for the policy of the pool (default=None))
+
+		 @return True/False (False if the frame was dropped)
+		'''
+		if block_on_full == None:
+			block_on_full = self.__block_on_full
+		return PutBoundedQueue(self.GetWriterQueue(frame_recorder), (frame_recorder, frame, timestamp), block_on_full, self.__status, self.__status_lock, 'Frame writer', 'frames')
+
+	def RunFrameWriter(self, queue):
+		'''
+		 @brief Write queued frames until the stop item (None) is received.
+		 	Executed in a writer thread.
+
+		 @param queue
+		'''
+		while True:
+			item = queue.get()
+			try:
+				if item == None:
+					break
+				frame_recorder, frame, timestamp = item
+				try:
+					frame_recorder.WriteFrame(frame, timestamp)
+					with self.__status_lock:
+						self.__status['written'] += 1
+				except Exception, err:
+					with self.__status_lock:
+						self.__status['failed'] += 1
+					warnings.simplefilter('always')
+					warnings.warn('Frame writer failed writing frame: {0}'.format(err), Warning)
+					warnings.simplefilter('default')
+			finally:
+				queue.task_done()
+
+	def FlushFrameWriterPool(self):
+		'''
+		 @brief Wait until all queued frames are written.
+		'''
+		for queue in self.__queues:
+			queue.join()
+
+	def GetFrameWriterPoolStatus(self):
+		'''
+		 @brief Get status of the writer pool.
+
+		 @return status (dictionary: 'queued', 'written', 'failed', 'dropped' and 'blocked' frames, 'queue_depth' (all queues) and 'max_queue_depth')
+		'''
+		with self.__status_lock:
+			status = dict(self.__status)
+		status['queue_depth'] = sum([queue.qsize() for queue in self.__queues])
+		return status
+
+	def CloseFrameWriterPool(self):
+		'''
+		 @brief Write remaining frames and stop the writer threads.
+		'''
+		if self.GetFrameWriterPoolStarted():
+			for queue in self.__queues:
+				queue.put(None) # Stop item, queued after the remaining frames
+			for thread in self.__threads:
+				thread.join()
+			self.__threads = []
+			status = self.GetFrameWriterPoolStatus()
+			print 'Frame writer: {0} frames written, {1} failed, {2} dropped, {3} blocked (max queue depth {4})'.format(status['written'], status['failed'], status['dropped'], status['blocked'], status['max_queue_depth'])
\ No newline at end of file
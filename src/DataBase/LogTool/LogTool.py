@@ -4,9 +4,10 @@
  Project: Master's Thesis - Autonomous Inspection Of Wind Blades
  Repository: Master's Thesis - CV (Computer Vision
 '''
-import timeit
+import timeit, time, os, tempfile, shutil
 from getpass import getpass
 from src.DroneVision.DroneVision_src.hardware.imageTools import MatplotShow
+from LogWriter import LogWriter, FormatProgressRecord, FormatDataLines
 
 '''
  @brief LogTool class for logging and printing information.
@@ -14,13 +15,26 @@ from src.DroneVision.DroneVision_src.hardware.imageTools import MatplotShow
  @param subclass DroneMaster or DroneSlave class (self)
  @param filename Log filename (default='')
  @param printToScreen True/False (default=False)
+ @param async_log (True/False for writing the log by a background LogWriter (default=False))
+ 	In async mode log lines and progress are queued as records, and written by the writer thread in batches,
+ 	both to the text log and as json lines (one record per line with frame number and timestamps) to a .jsonl file next to it.
+ 	PrintProgress is then reduced to queuing a record, and progress is printed to the screen at most once every screen_interval seconds.
+ @param flush_interval (Time in seconds between flushing of the log files in async mode (default=0.5))
+ @param max_queue_size (Maximum number of queued log records in async mode (default=10000))
+ @param screen_interval (Minimum time in seconds between progress printed to the screen in async mode (default=1.0))
 '''
 class LogTool():
-	def __init__(self, subclass, filename='', printToScreen=False):
+	def __init__(self, subclass, filename='', printToScreen=False, async_log=False, flush_interval=0.5, max_queue_size=10000, screen_interval=1.0):
 		'''CONSTRUCTUR'''
-		self.__subclass		 = subclass
-		self.__filename 	 = filename
-		self.__printToScreen = printToScreen
+		self.__subclass		 	= subclass
+		self.__filename 	 	= filename
+		self.__printToScreen 	= printToScreen
+		self.__async_log 		= async_log
+		self.__flush_interval 	= flush_interval
+		self.__max_queue_size 	= max_queue_size
+		self.__screen_interval 	= screen_interval
+		self.__logWriter 		= None
+		self.__frame_i 			= None
 		self.ResetProcessData()
 
 	def ResetProcessData(self):
@@ -56,8 +70,14 @@ class LogTool():
 	def OpenLog(self):
 		'''
 		 @brief Open log
+		 	In async mode the log writer is started, with the json log next to the text log (<log name>.jsonl).
 		'''
-		self._f = open(self.__filename, 'w')
+		self.CloseLog()
+		if self.__async_log:
+			self.__logWriter = LogWriter(self.__filename, os.path.splitext(self.__filename)[0] + '.jsonl', self.__flush_interval, self.__max_queue_size, self.__printToScreen, self.__screen_interval)
+			self.__logWriter.StartLogWriter()
+		else:
+			self._f = open(self.__filename, 'w')
 
 	def Print(self, logText):
 		'''
@@ -66,15 +86,40 @@ class LogTool():
 
 		 @param Log text
 		'''
-		self._f.write(logText + '\n')
+		if self.__logWriter != None:
+			self.__logWriter.PutLogRecord({'type': 'text', 'text': logText, 'timestamp': time.time(), 'frame_i': self.__frame_i})
+		else:
+			self._f.write(logText + '\n')
 		if self.__printToScreen:
 			print logText
 
+	def GetLogWriterStatus(self):
+		'''
+		 @brief Get status of the log writer (see LogWriter.GetLogWriterStatus)
+
+		 @return status (None if the log is not written asynchronously)
+		'''
+		if self.__logWriter == None:
+			return None
+		return self.__logWriter.GetLogWriterStatus()
+
+	def FlushLog(self):
+		'''
+		 @brief Wait until all queued log records are written (async mode).
+		'''
+		if self.__logWriter != None:
+			self.__logWriter.FlushLogWriter()
+
 	def CloseLog(self):
 		'''
 		 @brief Close log
+		 	Queued log records are written before the log is closed.
 		'''
-		self._f.close()
+		if self.__logWriter != None:
+			self.__logWriter.CloseLogWriter()
+			self.__logWriter = None
+		elif hasattr(self, '_f'):
+			self._f.close()
 
 	def PrintData(self, process_data, points3D=[]):
 		'''
@@ -85,14 +130,8 @@ class LogTool():
 		'''
 		if not(isinstance(process_data, dict)):
 			process_data = self.GetProcessData() # Use local process data
-		if len(process_data) > 0:
-			self.Print('# Process data:')
-			for key in process_data:
-				self.Print('# \t - '+key+': \t {0}'.format(process_data[key]))
-		if len(points3D) > 0:
-			self.Print('# Stereopsis results:')
-			for point3D in points3D:
-				self.Print('# \t - Point3D: x = {0} \t y = {1} \t z = {2}'.format(point3D[0,0], point3D[1,0], point3D[2,0]))
+		for line in FormatDataLines(process_data, points3D):
+			self.Print(line)
 
 	#################################### PRINT FUNCTIONS #################################################
 
@@ -127,8 +166,10 @@ class LogTool():
 		 @param master (True/False)
 		 @param wait_for_user (True/False)
 		'''
+		self.__source_type 		= self.__subclass.GetSettings('BASIC', 'source_type') # Settings are looked up once, and not for each frame
+		self.__camera_n_frames 	= self.__subclass.GetSettings('CAMERA', 'n_frames')
 		self.Print('#----------------- DRONEVISION STARTING -----------------#')
-		self.Print('# Hardware source: \t\t ' + self.__subclass.GetSettings('BASIC', 'source_type'))
+		self.Print('# Hardware source: \t\t ' + self.__source_type)
 		self.PrintStorageInfo()
 		if master and wait_for_user:
 			self.Print('# Hit enter to begin..')
@@ -141,28 +182,28 @@ class LogTool():
 	def PrintProgress(self, process_data=None, points3D=[]):
 		'''
 		 @brief Print process information during execution.
+		 	In async mode the progress is only queued as a record, which is formatted and written by the log writer.
 
 		 @param process_data (dictionary, {'tag': data}, None if nothing to print (default=None))
 		 @param points3D (for printing 3D points (default=[]))
 		'''
-		elapsed = timeit.default_timer() - self.__start_time
+		timestamp 	= timeit.default_timer()
 		frame_i  	= self.__subclass.objCameraLink.GetFrameNumber()
-		n_frames 	= self.__subclass.objCameraLink.GetTotalFrames()
-		self.Print('#----------------- DRONEVISION PROGRESS -----------------#')	
-		self.Print('# Execution time: \t\t {0:.2f} sec'.format(elapsed))
-		if self.__subclass.GetSettings('BASIC', 'source_type') == 'CAMERA' and self.__subclass.GetSettings('CAMERA', 'n_frames') <= 0:
-			self.Print('# Processed frames: \t\t {0}'.format(int(frame_i)))
+		if self.__source_type == 'CAMERA' and self.__camera_n_frames <= 0:
+			n_frames = None
+		elif self.__camera_n_frames > 0:
+			n_frames = self.__camera_n_frames
 		else:
-			if self.__subclass.GetSettings('CAMERA', 'n_frames') > 0:
-				n_frames = self.__subclass.GetSettings('CAMERA', 'n_frames')
-			self.Print('# Progress (frame_i/n_frames): \t {0}/{1} - {2:.2f}%'.format(int(frame_i), int(n_frames), (frame_i/n_frames)*100))
-			self.Print('# Total frames: \t\t {0}'.format(int(n_frames)))
-		if frame_i > 0:
-			frame_delay = timeit.default_timer() - self.__frame_proc_time
-			self.Print('# Frame processing delay: \t {0:.2f} sec'.format(frame_delay))
-			self.Print('# Average delay per frame: \t {0:.2f} sec'.format(elapsed/frame_i))
-		self.PrintData(process_data, points3D)
-		self.Print('#--------------------------------------------------------#')
+			n_frames = self.__subclass.objCameraLink.GetTotalFrames()
+		if not(isinstance(process_data, dict)):
+			process_data = self.GetProcessData() # Use local process data
+		self.__frame_i 	= frame_i
+		record 			= {'type': 'progress', 'timestamp': time.time(), 'frame_i': frame_i, 'n_frames': n_frames, 'elapsed': timestamp - self.__start_time, 'frame_delay': timestamp - self.__frame_proc_time, 'process_data': dict(process_data), 'points3D': list(points3D)}
+		if self.__logWriter != None:
+			self.__logWriter.PutLogRecord(record)
+		else:
+			for line in FormatProgressRecord(record):
+				self.Print(line)
 		self.__frame_proc_time = timeit.default_timer()
 
 	def PrintFinished(self):
@@ -194,3 +235,67 @@ class LogTool():
 	def __del__(self):
 		'''DESTRUCTOR'''
 		self.CloseLog()
+
+'''
+ @brief Stand-in for the DroneMaster/DroneSlave subclass of the LogTool, used by the log benchmark.
+
+ @param output_folder
+ @param n_frames (Total number of frames)
+'''
+class LogBenchmarkSource():
+	def __init__(self, output_folder, n_frames):
+		'''CONSTRUCTOR'''
+		self.__output_folder 	= output_folder
+		self.__n_frames 		= n_frames
+		self.__frame_i 			= 0
+		self.objCameraLink 		= self
+
+	def SetFrameNumber(self, frame_i):
+		self.__frame_i = frame_i
+
+	def GetFrameNumber(self):
+		return self.__frame_i
+
+	def GetTotalFrames(self):
+		return self.__n_frames
+
+	def GetSettings(self, settings_key, setting):
+		return {'source_type': 'VIDEO', 'n_frames': -1, 'store_process_data': False}[setting]
+
+	def GetDatabaseOutputFolder(self):
+		return self.__output_folder
+
+def RunLogBenchmark(n_records=2000, n_points3D=20):
+	'''
+	 @brief Benchmark the cost per frame of LogTool.PrintProgress, when the log is written synchronously and by the background LogWriter.
+	 	Each progress has a typical set of process data and n_points3D 3D points. Nothing is printed to the screen.
+
+	 @param n_records (Number of progress records (default=2000))
+	 @param n_points3D (Number of 3D points in each progress (default=20))
+
+	 @return results (dictionary: {'sync'/'async': {'per_call': sec, 'total': sec (including closing of the log)}})
+	'''
+	import numpy as np
+	folder 			= tempfile.mkdtemp() + '/'
+	process_data 	= {'X_average': 1.234567, 'Y_average': -0.123456, 'Z_average': 5.678901, 'rho': 123.45, 'theta': 0.7854, 'boundary_error': False, 'tip_or_root_detected': False}
+	points3D 		= [np.random.rand(3, 1) for i in range(n_points3D)]
+	results 		= {}
+	try:
+		for mode in ['sync', 'async']:
+			source 	= LogBenchmarkSource(folder, n_records)
+			logTool = LogTool(source, async_log=(mode == 'async'))
+			logTool.SetLogFilename(folder + 'Log_{0}.txt'.format(mode))
+			logTool.PrintStarting(wait_for_user=False)
+			timer = timeit.default_timer()
+			for i in range(n_records):
+				source.SetFrameNumber(i+1)
+				logTool.PrintProgress(process_data, points3D)
+			elapsed = timeit.default_timer() - timer
+			logTool.CloseLog()
+			results[mode] = {'per_call': elapsed/n_records, 'total': timeit.default_timer() - timer}
+	finally:
+		shutil.rmtree(folder)
+	print 'LogTool.PrintProgress ({0} records, {1} 3D points each):'.format(n_records, n_points3D)
+	for mode in ['sync', 'async']:
+		print '\t{0}: {1:.2f} us per call, {2:.3f} sec total (including closing of the log)'.format(mode, results[mode]['per_call']*1e6, results[mode]['total'])
+	return results
\ No newline at end of file
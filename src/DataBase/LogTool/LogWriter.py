@@ -0,0 +1,223 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import threading, warnings, json, timeit, numbers, Queue
+import numpy as np
+from src.bin.tools import PutBoundedQueue
+
+def FormatProgressRecord(record):
+	'''
+	 @brief Format a progress record as log text lines.
+
+	 @param record (progress record, see LogTool.PrintProgress)
+
+	 @return lines (list of strings)
+	'''
+	lines = ['#----------------- DRONEVISION PROGRESS -----------------#']
+	lines.append('# Execution time: \t\t {0:.2f} sec'.format(record['elapsed']))
+	if record['n_frames'] == None:
+		lines.append('# Processed frames: \t\t {0}'.format(int(record['frame_i'])))
+	else:
+		lines.append('# Progress (frame_i/n_frames): \t {0}/{1} - {2:.2f}%'.format(int(record['frame_i']), int(record['n_frames']), (record['frame_i']/record['n_frames'])*100))
+		lines.append('# Total frames: \t\t {0}'.format(int(record['n_frames'])))
+	if record['frame_i'] > 0:
+		lines.append('# Frame processing delay: \t {0:.2f} sec'.format(record['frame_delay']))
+		lines.append('# Average delay per frame: \t {0:.2f} sec'.format(record['elapsed']/record['frame_i']))
+	lines += FormatDataLines(record['process_data'], record['points3D'])
+	lines.append('#--------------------------------------------------------#')
+	return lines
+
+def FormatDataLines(process_data, points3D=[]):
+	'''
+	 @brief Format process data and 3D points as log text lines.
+
+	 @param process_data (dictionary, {'tag': data})
+	 @param points3D (list of 3D points (3x1) (default=[]))
+
+	 @return lines (list of strings)
+	'''
+	lines = []
+	if len(process_data) > 0:
+		lines.append('# Process data:')
+		for key in process_data:
+			lines.append('# \t - '+key+': \t {0}'.format(process_data[key]))
+	if len(points3D) > 0:
+		lines.append('# Stereopsis results:')
+		for point3D in points3D:
+			lines.append('# \t - Point3D: x = {0} \t y = {1} \t z = {2}'.format(point3D[0,0], point3D[1,0], point3D[2,0]))
+	return lines
+
+def ToJSONValue(value):
+	'''
+	 @brief Convert value to a json serializable value (numpy values to python values, 3D points to [x, y, z] lists).
+
+	 @param value
+
+	 @return json_value
+	'''
+	if isinstance(value, dict):
+		return dict((str(key), ToJSONValue(value[key])) for key in value)
+	if isinstance(value, (list, tuple)):
+		return [ToJSONValue(element) for element in value]
+	if isinstance(value, np.ndarray):
+		return value.ravel().tolist()
+	if isinstance(value, (bool, np.bool_)):
+		return bool(value)
+	if isinstance(value, (numbers.Integral, np.integer)):
+		return int(value)
+	if isinstance(value, (numbers.Number, np.number)):
+		return float(value)
+	if value is None or isinstance(value, basestring):
+		return value
+	return str(value)
+
+'''
+ @brief Background writer of log records.
+ 	Records are put in a bounded queue by the frame loop, and formatted and written by a writer thread in batches,
+ 	flushed to the files every flush_interval seconds. Each record is written as text lines to the log file,
+ 	and as a structured record (one json object per line, with the record type, frame number and timestamps) to the json log file.
+ 	Progress records are printed to the screen at most once every screen_interval seconds (the latest progress is printed).
+ 	Records are dropped while the queue is full (see PutBoundedQueue).
+
+ @param filename (Text log filename)
+ @param json_filename (Json lines log filename, None for no json log (default=None))
+ @param flush_interval (Time in seconds between flushing of the files (default=0.5))
+ @param max_queue_size (Maximum number of queued records (default=10000))
+ @param print_to_screen (True/False for printing progress records to the screen (default=False))
+ @param screen_interval (Minimum time in seconds between progress printed to the screen (default=1.0))
+'''
+class LogWriter():
+	def __init__(self, filename, json_filename=None, flush_interval=0.5, max_queue_size=10000, print_to_screen=False, screen_interval=1.0):
+		'''CONSTRUCTOR'''
+		self.__filename 		= filename
+		self.__json_filename 	= json_filename
+		self.__flush_interval 	= flush_interval
+		self.__print_to_screen 	= print_to_screen
+		self.__screen_interval 	= screen_interval
+		self.__queue 			= Queue.Queue(max(1, max_queue_size))
+		self.__thread 			= None
+		self.__stop_event 		= threading.Event()
+		self.__status_lock 		= threading.Lock()
+		self.__status 			= {'queued': 0, 'written': 0, 'dropped': 0, 'blocked': 0, 'batches': 0, 'printed': 0, 'max_queue_depth': 0}
+
+	def StartLogWriter(self):
+		'''
+		 @brief Open the log files and start the writer thread.
+		'''
+		self.__f 				= open(self.__filename, 'w')
+		self.__json_f 			= open(self.__json_filename, 'w') if self.__json_filename != None else None
+		self.__last_screen_time = None
+		self.__stop_event.clear()
+		self.__thread 			= threading.Thread(target=self.RunLogWriter)
+		self.__thread.daemon 	= True
+		self.__thread.start()
+
+	def PutLogRecord(self, record):
+		'''
+		 @brief Queue a record to be written.
+
+		 @param record (dictionary with 'type' ('text' or 'progress') and 'timestamp', see LogTool)
+
+		 @return True/False (False if the record was dropped)
+		'''
+		return PutBoundedQueue(self.__queue, record, False, self.__status, self.__status_lock, 'Log writer', 'records')
+
+	def RunLogWriter(self):
+		'''
+		 @brief Collect records into batches, and write them, until the stop item (None) is received.
+		 	Executed in the writer thread.
+		'''
+		stop = False
+		while not(stop):
+			records = [self.__queue.get()]
+			while records[-1] != None:
+				try:
+					records.append(self.__queue.get_nowait())
+				except Queue.Empty:
+					break
+			if records[-1] == None:
+				stop = True
+				records.pop()
+				self.__queue.task_done()
+			try:
+				if len(records) > 0:
+					self.WriteLogRecords(records)
+			except Exception, err:
+				warnings.simplefilter('always')
+				warnings.warn('Log writer failed writing {0} records: {1}'.format(len(records), err), Warning)
+				warnings.simplefilter('default')
+			finally:
+				for record in records:
+					self.__queue.task_done()
+			if not(stop) and self.__flush_interval > 0:
+				self.__stop_event.wait(self.__flush_interval) # Let records collect into the next batch (cut short on closing)
+
+	def WriteLogRecords(self, records):
+		'''
+		 @brief Write a batch of records to the log files (and print the latest progress to the screen).
+
+		 @param records (list of records)
+		'''
+		lines 			= []
+		json_lines 		= []
+		last_progress 	= None
+		for record in records:
+			if record['type'] == 'progress':
+				record_lines 	= FormatProgressRecord(record)
+				last_progress 	= record_lines
+			else:
+				record_lines 	= [record['text']]
+			lines += record_lines
+			if self.__json_f != None:
+				json_lines.append(json.dumps(ToJSONValue(record), sort_keys=True))
+		self.__f.write('\n'.join(lines) + '\n')
+		self.__f.flush()
+		if self.__json_f != None:
+			self.__json_f.write('\n'.join(json_lines) + '\n')
+			self.__json_f.flush()
+		if self.__print_to_screen and last_progress != None:
+			if self.__last_screen_time == None or timeit.default_timer() - self.__last_screen_time >= self.__screen_interval:
+				self.__last_screen_time = timeit.default_timer()
+				print '\n'.join(last_progress)
+				with self.__status_lock:
+					self.__status['printed'] += 1
+		with self.__status_lock:
+			self.__status['written'] += len(records)
+			self.__status['batches'] += 1
+
+	def FlushLogWriter(self):
+		'''
+		 @brief Wait until all queued records are written.
+		'''
+		if self.__thread != None and self.__thread.is_alive():
+			self.__queue.join()
+
+	def GetLogWriterStatus(self):
+		'''
+		 @brief Get status of the writer.
+
+		 @return status (dictionary: 'queued', 'written', 'dropped' and 'printed' records, 'batches', 'queue_depth' and 'max_queue_depth')
+		'''
+		with self.__status_lock:
+			status = dict(self.__status)
+		status['queue_depth'] = self.__queue.qsize()
+		return status
+
+	def CloseLogWriter(self):
+		'''
+		 @brief Write remaining records, stop the writer thread and close the log files.
+		'''
+		if self.__thread != None:
+			self.__queue.put(None) # Stop item, queued after the remaining records
+			self.__stop_event.set()
+			self.__thread.join()
+			self.__thread = None
+			self.__f.close()
+			if self.__json_f != None:
+				self.__json_f.close()
+			status = self.GetLogWriterStatus()
+			if status['dropped'] > 0:
+				print 'Log writer: {0} records written in {1} batches, {2} dropped (max queue depth {3})'.format(status['written'], status['batches'], status['dropped'], status['max_queue_depth'])
\ No newline at end of file
@@ -5,9 +5,10 @@
  Repository: Master"s Thesis - CV (Computer Vision)
 '''
 import MySQLdb as mdb
-import numpy as np
 import sys
 
+from src.DataBase.SQLBase.SQLBase import SQLBase
+
 '''
  @brief MySQL class.
  	Install mysql-server:
@@ -22,114 +23,29 @@ import sys
  	manual login to mysql: mysql -u root -p
  		Where root is username, and password where set when mysql was installed
 
+ 	Table, column and value handling is given by SQLBase.
+
  @param username
  @param password
  @param database (None for not created yet, (default=None))
  @param host (default="localhost")
 '''
-class MySQL():
+class MySQL(SQLBase):
 	def __init__(self, username, password, database=None, host="localhost"):
 		'''CONSTRUCTOR'''
 		self.__sql_db_connected = False
+		SQLBase.__init__(self)
 		self.SetSQLConfig(username, password, database=database, host=host)
 
-	def NumpyArrayToSQLBlob(self, np_array):
-		'''
-		 @brief Convert numpy array to sql blob data.
-		 	Note: mysql is not built to handle large datas,
-		 	so it is recommended to store large arrays as file and save filepath to mysql.
-
-		 @param np_array
-
-		 @return np_array_dump
-		'''
-		return np.ndarray.dumps(np_array)
-
-	def SQLBlobToNumpyArray(self, np_array_str):
-		'''
-		 @brief Convert sql numpy blob to numpy array
-		 	Note: mysql is not built to handle large datas,
-		 	so it is recommended to store large arrays as file and save filepath to mysql.
-
-		 @param np_array_str
-
-		 @return np_array
-		'''
-		return np.loads(bytes(np_array_str))
-
-	def FindSQLValueType(self, value):
-		'''
-		 @brief Find correct type for value 
-
-		 @param value
-
-		 @return db_type (as string to database)
-		'''
-		if isinstance(value, np.ndarray):
-			db_type = 'BLOB'
-		elif isinstance(value, float):
-			db_type = 'FLOAT'
-		elif isinstance(value, int):
-			db_type = 'INT'
-		elif isinstance(value, str):
-			if len(value) == 1:
-				db_type = 'CHAR(255)'
-			elif len(value) > 255:
-				db_type = 'TEXT'
-			else:
-				db_type = 'VARCHAR('+str(len(value)+50)+')'
-		elif np.isnan(value):
-			db_type = 'FLOAT'
-		elif value == None:
-			db_type = 'FLOAT'
-		else:
-			raise Exception('Unknown python to sql value type: {0}'.format(value))
-		return db_type
-
-	def ConvertSQLValueToPython(self, value, db_type):
-		'''
-		 @brief Convert sql value to python value 
-
-		 @param value
-		 @param db_type
-
-		 @return python_value
-		'''
-		if 'BLOB' in db_type.upper():
-			python_value = self.SQLBlobToNumpyArray(value)
-		else:
-			python_value = value
-		return python_value
-
-	def ConvertPythonToSQLValue(self, value):
-		'''
-		 @brief Convert sql value to python value 
-
-		 @param value
-
-		 @return sql_value
+	def GetSQLParameter(self, key):
 		'''
-		db_type = self.FindSQLValueType(value)
-		if 'BLOB' in db_type.upper():
-			sql_value = self.NumpyArrayToSQLBlob(value)
-		else:
-			sql_value = value
-		return sql_value
+		 @brief Get named parameter placeholder of the backend.
 
-	def SelectDataFromSQLTable(self, table_name, column_key="*", n_rows=0, row_number=0):
-		'''
-		 @brief Select data from sql table.
+		 @param key
 
-		 @param table_name
-		 @param column_key (default="*", meaning whole table is fetched)
-		 @param n_rows (Number of rows to fetch, starting at row_number - n_rows, If n_rows is 0, then all rows are selected)
-		 @param row_number (Last row number to select. Last row will be row N = row_number - n_rows, if row_number is 0, then all rows up to n_rows are selected)
+		 @return sql_parameter
 		'''
-		if n_rows <= 0:
-			sql_command = "SELECT " + column_key + " FROM " + table_name
-		else:
-			sql_command = "SELECT " + column_key + " FROM " + table_name + " LIMIT " + str(row_number) + "," + str(n_rows)
-		self.ExecuteSQLCommand(sql_command)
+		return "%("+key+")s"
 
 	def FetchSelectedSQLData(self, n_elements=0):
 		'''
@@ -155,50 +71,6 @@ class MySQL():
 			raise Exception('Not connected to database')
 		return sql_rows
 
-	def InsertDataIntoSQLTable(self, table_name, data):
-		'''
-		 @brief Insert value to column in sql table.
-
-		 @param table_name
-		 @param data (Dictionary of column keys as dict keys with values, data = {'col_key': data})
-		'''
-		sql_command = "INSERT INTO " + table_name + " ("
-		i = 0
-		for key in data:
-			sql_command += key
-			if i < len(data)-1:
-				sql_command += ", "
-			i += 1
-		sql_command += ") VALUES ("
-		i = 0
-		for key in data:
-			sql_command += "%("+key+")s"
-			if i < len(data)-1:
-				sql_command += ", "
-			i += 1
-		sql_command += ")"
-		self.ExecuteSQLCommand(sql_command, data)
-
-	def AddColumnToSQLTable(self, table_name, column_value):
-		'''
-		 @brief Add column to existing table 
-
-		 @param table_name
-		 @param column_value (Defined as ("value_key", "value_type"))
-		'''
-		sql_command = "ALTER TABLE " + table_name + " ADD " + column_value[0] + " " + column_value[1]
-		self.ExecuteSQLCommand(sql_command)
-
-	def DropColumnFromSQLTable(self, table_name, column_key):
-		'''
-		 @brief Drop column from existing table 
-
-		 @param table_name
-		 @param column_key (Defined as column_key = "column_key")
-		'''
-		sql_command = "ALTER TABLE " + table_name + " DROP " + column_key
-		self.ExecuteSQLCommand(sql_command)
-
 	def RenameColumnFromSQLTable(self, table_name, column_key, new_column_value):
 		'''
 		 @brief Rename column in existing table 
@@ -209,15 +81,7 @@ class MySQL():
 		'''
 		sql_command = "ALTER TABLE " + table_name + " CHANGE " + column_key + " " + new_column_value[0] + " " + new_column_value[1]
 		self.ExecuteSQLCommand(sql_command)
-
-	def DropSQLTable(self, table_name):
-		'''
-		 @brief Drop table (delete entire table)
-
-		 @param table_name
-		'''
-		sql_command = "DROP TABLE " + table_name
-		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
 
 	def RenameSQLTable(self, table_name, new_table_name):
 		'''
@@ -228,21 +92,8 @@ class MySQL():
 		'''
 		sql_command = "RENAME TABLE " + table_name + " TO " + new_table_name
 		self.ExecuteSQLCommand(sql_command)
-
-	def CreateSQLTable(self, table_name, columns, primary_key):
-		'''
-		 @brief Create new table
-
-		 @param table_name
-		 @param columns (Dictionary of column keys and value types, columns = {'col_key': 'value_type'}
-		 @param primary_key (key in columns that is the primary key)
-		'''
-		sql_command = "CREATE TABLE IF NOT EXISTS " + table_name + " (" + primary_key + " " + columns[primary_key]
-		for key in columns:
-			if not(key == primary_key):
-				sql_command += "," + key + " " + columns[key]
-		sql_command += ", PRIMARY KEY("+ primary_key + "))"
-		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
+		self.ClearSQLSchemaCache(new_table_name)
 
 	def SelectSQLDatabase(self, database_name):
 		'''
@@ -252,6 +103,7 @@ class MySQL():
 		'''
 		sql_command = "USE " + database_name
 		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache()
 
 	def CreateSQLDatabase(self, database_name):
 		'''
@@ -270,59 +122,7 @@ class MySQL():
 		'''
 		sql_command = "DROP DATABASE " + database_name
 		self.ExecuteSQLCommand(sql_command)
-
-	def FindKeyWord(self, sql_rows, key_word):
-		'''
-		 @brief Find key word in returned sql data 
-
-		 @return True/False
-		'''
-		if isinstance(sql_rows, tuple):
-			for sql_row in sql_rows:
-				if self.FindKeyWord(sql_row, key_word):
-					return True
-		else:
-			if isinstance(sql_rows, str):
-				if key_word.upper() == sql_rows.upper():
-					return True
-		return False
-
-	def CheckSQLDatabaseExist(self, database_name):
-		'''
-		 @brief Check if database exist
-
-		 @param database_name
-
-		 @return True/False
-		'''
-		sql_rows 	= self.GetSQLDatabases()
-		exist 		= self.FindKeyWord(sql_rows, database_name)
-		return exist
-
-	def CheckSQLTableExist(self, table_name):
-		'''
-		 @brief Check if table exist
-
-		 @param table_name
-
-		 @return True/False
-		'''
-		sql_rows 	= self.GetSQLTables()
-		exist 		= self.FindKeyWord(sql_rows, table_name)
-		return exist
-
-	def CheckSQLColumnExist(self, table_name, column_key):
-		'''
-		 @brief Check if column exist
-
-		 @param table_name
-		 @param column_key
-
-		 @return True/False
-		'''
-		sql_rows 	= self.GetSQLColumns(table_name)
-		exist 		= self.FindKeyWord(sql_rows, column_key)
-		return exist
+		self.ClearSQLSchemaCache()
 
 	def GetSQLDatabases(self):
 		'''
@@ -359,21 +159,6 @@ class MySQL():
 		sql_rows = self.FetchSelectedSQLData()
 		return sql_rows
 
-	def ConvertSQLRowsToList(self, sql_rows, sql_list=[]):
-		'''
-		 @brief Convert sql rows to list
-
-		 @param sql_rows
-
-		 @return sql_list
-		'''
-		if isinstance(sql_rows, tuple):
-			for sql_row in sql_rows:
-				sql_list = self.ConvertSQLRowsToTuple(sql_row, sql_list)
-		else:
-			sql_list.append(sql_rows)
-		return sql_list
-
 	def ExecuteSQLCommand(self, sql_command, values=None):
 		'''
 		 @brief Execute sql_command to sql database
@@ -393,23 +178,22 @@ class MySQL():
 		except mdb.Error, err:
 			raise Exception("Error executing sql command to SQL database - \n\n"+sql_command+"\n\n - %d: %s" % (err.args[0],err.args[1]))
 
-	def PrintSelectedSQLData(self):
-		'''
-		 @brief Print selected sql data 
-		'''
-		self.PrintFetchedSQLData(self.FetchSelectedSQLData())
-
-	def PrintFetchedSQLData(self, sql_rows):
+	def ExecuteManySQLCommand(self, sql_command, values_list):
 		'''
-		 @brief Print fetched sql data
+		 @brief Execute sql_command for each set of values by executemany, committed as one transaction.
+		 	The transaction is rolled back if any of the values fails.
 
-		 @param sql_rows (as returned from FetchSelectedSQLData())
+		 @param sql_command (sql string sql_command)
+		 @param values_list (list of insert values (tuples or dictionaries))
 		'''
-		if isinstance(sql_rows, tuple):
-			for sql_row in sql_rows:
-				self.PrintFetchedSQLData(sql_row)
-		else:
-			print sql_rows
+		if not(self.GetSQLConnected()):
+			self.OpenSQL()
+		try:
+			self.__sql_cursor.executemany(sql_command, values_list)
+			self.__sql_con.commit()
+		except mdb.Error, err:
+			self.__sql_con.rollback()
+			raise Exception("Error executing sql command to SQL database - \n\n"+sql_command+"\n\n - %d: %s" % (err.args[0],err.args[1]))
 
 	def GetSQLConnected(self):
 		'''
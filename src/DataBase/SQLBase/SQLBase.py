@@ -0,0 +1,435 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import numpy as np
+import timeit
+from datetime import datetime, timedelta
+from SQLBlob import EncodeNumpyBlob, DecodeNumpyBlob
+
+'''
+ @brief Base class of the sql storage backends (MySQL and SQLite).
+ 	Holds the backend independent table, column and value handling, built on these functions given by the backend:
+ 		ExecuteSQLCommand, ExecuteManySQLCommand, FetchSelectedSQLData, GetSQLParameter,
+ 		GetSQLDatabases, GetSQLTables, GetSQLColumns, RenameColumnFromSQLTable, RenameSQLTable,
+ 		SelectSQLDatabase, CreateSQLDatabase, DropSQLDatabase, GetSQLConnected, OpenSQL and CloseSQL.
+
+ 	The schema of each used table (columns and types) is cached, and updated by the table and column functions of the backend,
+ 	so missing columns are detected locally. INSERT statements are cached by table and column set.
+ 	Call ClearSQLSchemaCache() if the tables are changed by another connection.
+'''
+class SQLBase():
+	def __init__(self):
+		'''CONSTRUCTOR'''
+		self.__schema_cache 			= {}
+		self.__insert_cache 			= {}
+		self.__blob_compression_level 	= 0
+
+	def SetSQLBlobCompression(self, compression_level):
+		'''
+		 @brief Set zlib compression level of numpy blobs.
+
+		 @param compression_level (1-9, 0 for no compression)
+		'''
+		self.__blob_compression_level = compression_level
+
+	def NumpyArrayToSQLBlob(self, np_array):
+		'''
+		 @brief Convert numpy array to sql blob data (dtype/shape header + raw bytes, see SQLBlob).
+		 	Note: mysql is not built to handle large datas,
+		 	so it is recommended to store large arrays as file and save filepath to mysql.
+
+		 @param np_array
+
+		 @return np_array_dump
+		'''
+		return EncodeNumpyBlob(np_array, compression_level=self.__blob_compression_level)
+
+	def SQLBlobToNumpyArray(self, np_array_str):
+		'''
+		 @brief Convert sql numpy blob to numpy array
+		 	Uncompressed blobs are decoded without copying, so the array is read-only. Pickled blobs of earlier sessions are still decoded.
+		 	Note: mysql is not built to handle large datas,
+		 	so it is recommended to store large arrays as file and save filepath to mysql.
+
+		 @param np_array_str
+
+		 @return np_array
+		'''
+		return DecodeNumpyBlob(np_array_str)
+
+	def FindSQLValueType(self, value):
+		'''
+		 @brief Find correct type for value 
+
+		 @param value
+
+		 @return db_type (as string to database)
+		'''
+		if isinstance(value, np.ndarray):
+			db_type = 'BLOB'
+		elif isinstance(value, float):
+			db_type = 'FLOAT'
+		elif isinstance(value, int):
+			db_type = 'INT'
+		elif isinstance(value, str):
+			if len(value) == 1:
+				db_type = 'CHAR(255)'
+			elif len(value) > 255:
+				db_type = 'TEXT'
+			else:
+				db_type = 'VARCHAR('+str(len(value)+50)+')'
+		elif np.isnan(value):
+			db_type = 'FLOAT'
+		elif value == None:
+			db_type = 'FLOAT'
+		else:
+			raise Exception('Unknown python to sql value type: {0}'.format(value))
+		return db_type
+
+	def ConvertSQLValueToPython(self, value, db_type):
+		'''
+		 @brief Convert sql value to python value 
+
+		 @param value
+		 @param db_type
+
+		 @return python_value
+		'''
+		if 'BLOB' in db_type.upper():
+			python_value = self.SQLBlobToNumpyArray(value)
+		else:
+			python_value = value
+		return python_value
+
+	def ConvertPythonToSQLValue(self, value):
+		'''
+		 @brief Convert sql value to python value 
+
+		 @param value
+
+		 @return sql_value
+		'''
+		db_type = self.FindSQLValueType(value)
+		if 'BLOB' in db_type.upper():
+			sql_value = self.NumpyArrayToSQLBlob(value)
+		else:
+			sql_value = value
+		return sql_value
+
+	def SelectDataFromSQLTable(self, table_name, column_key="*", n_rows=0, row_number=0):
+		'''
+		 @brief Select data from sql table.
+
+		 @param table_name
+		 @param column_key (default="*", meaning whole table is fetched)
+		 @param n_rows (Number of rows to fetch, starting at row_number - n_rows, If n_rows is 0, then all rows are selected)
+		 @param row_number (Last row number to select. Last row will be row N = row_number - n_rows, if row_number is 0, then all rows up to n_rows are selected)
+		'''
+		if n_rows <= 0:
+			sql_command = "SELECT " + column_key + " FROM " + table_name
+		else:
+			sql_command = "SELECT " + column_key + " FROM " + table_name + " LIMIT " + str(row_number) + "," + str(n_rows)
+		self.ExecuteSQLCommand(sql_command)
+
+	def InsertDataIntoSQLTable(self, table_name, data):
+		'''
+		 @brief Insert value to column in sql table.
+
+		 @param table_name
+		 @param data (Dictionary of column keys as dict keys with values, data = {'col_key': data})
+		'''
+		self.ExecuteSQLCommand(self.GetInsertSQLCommand(table_name, data.keys()), data)
+
+	def InsertManyIntoSQLTable(self, table_name, column_keys, rows):
+		'''
+		 @brief Insert multiple rows to sql table by a single executemany in one transaction.
+
+		 @param table_name
+		 @param column_keys (list of column keys, equal for all rows)
+		 @param rows (list of data dictionaries with the column keys as dict keys, data = {'col_key': data})
+		'''
+		self.ExecuteManySQLCommand(self.GetInsertSQLCommand(table_name, column_keys), rows)
+
+	def GetInsertSQLCommand(self, table_name, column_keys):
+		'''
+		 @brief Get INSERT statement with named parameters for the column keys (cached by table and column set).
+
+		 @param table_name
+		 @param column_keys
+
+		 @return sql_command
+		'''
+		cache_key = (table_name, frozenset(column_keys))
+		if not(cache_key in self.__insert_cache):
+			column_keys = sorted(column_keys)
+			self.__insert_cache[cache_key] = "INSERT INTO " + table_name + " (" + ", ".join(column_keys) + ") VALUES (" + ", ".join([self.GetSQLParameter(key) for key in column_keys]) + ")"
+		return self.__insert_cache[cache_key]
+
+	def GetSQLSchema(self, table_name):
+		'''
+		 @brief Get schema of table (cached - the server is only queried on the first call for each table).
+
+		 @param table_name
+
+		 @return schema (Dictionary of column keys (upper case) and value types, or None if the table does not exist)
+		'''
+		if not(table_name in self.__schema_cache):
+			if not(self.CheckSQLTableExist(table_name)):
+				return None
+			schema = {}
+			for sql_row in self.GetSQLColumns(table_name):
+				schema[sql_row[0].upper()] = sql_row[1]
+			self.__schema_cache[table_name] = schema
+		return self.__schema_cache[table_name]
+
+	def ClearSQLSchemaCache(self, table_name=None):
+		'''
+		 @brief Clear cached schema and INSERT statements.
+
+		 @param table_name (None for clearing all tables (default=None))
+		'''
+		if table_name == None:
+			self.__schema_cache = {}
+			self.__insert_cache = {}
+		else:
+			self.__schema_cache.pop(table_name, None)
+			for cache_key in self.__insert_cache.keys():
+				if cache_key[0] == table_name:
+					del self.__insert_cache[cache_key]
+
+	def AddMissingSQLColumns(self, table_name, data):
+		'''
+		 @brief Add columns of the data that are missing in the table.
+		 	Missing columns are detected by the cached schema, without server round trips.
+
+		 @param table_name
+		 @param data (Dictionary of column keys as dict keys with values, data = {'col_key': data})
+		'''
+		schema = self.GetSQLSchema(table_name)
+		for key in data:
+			if not(key.upper() in schema):
+				self.AddColumnToSQLTable(table_name, (key, self.FindSQLValueType(data[key])))
+
+	def AddColumnToSQLTable(self, table_name, column_value):
+		'''
+		 @brief Add column to existing table 
+
+		 @param table_name
+		 @param column_value (Defined as ("value_key", "value_type"))
+		'''
+		sql_command = "ALTER TABLE " + table_name + " ADD " + column_value[0] + " " + column_value[1]
+		self.ExecuteSQLCommand(sql_command)
+		if table_name in self.__schema_cache:
+			self.__schema_cache[table_name][column_value[0].upper()] = column_value[1]
+
+	def DropColumnFromSQLTable(self, table_name, column_key):
+		'''
+		 @brief Drop column from existing table 
+
+		 @param table_name
+		 @param column_key (Defined as column_key = "column_key")
+		'''
+		sql_command = "ALTER TABLE " + table_name + " DROP " + column_key
+		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
+
+	def DropSQLTable(self, table_name):
+		'''
+		 @brief Drop table (delete entire table)
+
+		 @param table_name
+		'''
+		sql_command = "DROP TABLE " + table_name
+		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
+
+	def CreateSQLTable(self, table_name, columns, primary_key):
+		'''
+		 @brief Create new table
+
+		 @param table_name
+		 @param columns (Dictionary of column keys and value types, columns = {'col_key': 'value_type'}
+		 @param primary_key (key in columns that is the primary key)
+		'''
+		sql_command = "CREATE TABLE IF NOT EXISTS " + table_name + " (" + primary_key + " " + columns[primary_key]
+		for key in columns:
+			if not(key == primary_key):
+				sql_command += "," + key + " " + columns[key]
+		sql_command += ", PRIMARY KEY("+ primary_key + "))"
+		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name) # CREATE TABLE IF NOT EXISTS - the existing table may differ from the given columns
+
+	def FindKeyWord(self, sql_rows, key_word):
+		'''
+		 @brief Find key word in returned sql data 
+
+		 @return True/False
+		'''
+		if isinstance(sql_rows, tuple):
+			for sql_row in sql_rows:
+				if self.FindKeyWord(sql_row, key_word):
+					return True
+		else:
+			if isinstance(sql_rows, str):
+				if key_word.upper() == sql_rows.upper():
+					return True
+		return False
+
+	def CheckSQLDatabaseExist(self, database_name):
+		'''
+		 @brief Check if database exist
+
+		 @param database_name
+
+		 @return True/False
+		'''
+		sql_rows 	= self.GetSQLDatabases()
+		exist 		= self.FindKeyWord(sql_rows, database_name)
+		return exist
+
+	def CheckSQLTableExist(self, table_name):
+		'''
+		 @brief Check if table exist
+
+		 @param table_name
+
+		 @return True/False
+		'''
+		if table_name in self.__schema_cache:
+			return True
+		sql_rows 	= self.GetSQLTables()
+		exist 		= self.FindKeyWord(sql_rows, table_name)
+		return exist
+
+	def CheckSQLColumnExist(self, table_name, column_key):
+		'''
+		 @brief Check if column exist
+
+		 @param table_name
+		 @param column_key
+
+		 @return True/False
+		'''
+		schema = self.GetSQLSchema(table_name)
+		return schema != None and column_key.upper() in schema
+
+	def ConvertSQLRowsToList(self, sql_rows, sql_list=[]):
+		'''
+		 @brief Convert sql rows to list
+
+		 @param sql_rows
+
+		 @return sql_list
+		'''
+		if isinstance(sql_rows, tuple):
+			for sql_row in sql_rows:
+				sql_list = self.ConvertSQLRowsToTuple(sql_row, sql_list)
+		else:
+			sql_list.append(sql_rows)
+		return sql_list
+
+	def PrintSelectedSQLData(self):
+		'''
+		 @brief Print selected sql data 
+		'''
+		self.PrintFetchedSQLData(self.FetchSelectedSQLData())
+
+	def PrintFetchedSQLData(self, sql_rows):
+		'''
+		 @brief Print fetched sql data
+
+		 @param sql_rows (as returned from FetchSelectedSQLData())
+		'''
+		if isinstance(sql_rows, tuple):
+			for sql_row in sql_rows:
+				self.PrintFetchedSQLData(sql_row)
+		else:
+			print sql_rows
+
+def CreateSQLBackend(settings_inst, backend=None):
+	'''
+	 @brief Create the sql backend given by the DATABASE settings.
+	 	The backend is imported on request, so the SQLite backend runs without MySQL-python installed.
+
+	 @param settings_inst (DATABASE settings)
+	 @param backend ('mysql' or 'sqlite', None for the 'db_backend' setting (default=None))
+
+	 @return sql_backend (MySQL or SQLite instance)
+	'''
+	if backend == None:
+		backend = settings_inst.GetSettings('db_backend')
+	if backend == 'sqlite':
+		from src.DataBase.SQLite.SQLite import SQLite
+		sql_backend = SQLite(settings_inst.GetSettings('database'), folder=settings_inst.GetSettings('sqlite_folder'))
+	elif backend == 'mysql':
+		from src.DataBase.MySQL.MySQL import MySQL
+		sql_backend = MySQL(settings_inst.GetSettings('username'), settings_inst.GetSettings('password'), database=settings_inst.GetSettings('database'))
+	else:
+		raise ValueError('Unknown database backend: {0}'.format(backend))
+	sql_backend.SetSQLBlobCompression(settings_inst.GetSettings('db_blob_compression'))
+	return sql_backend
+
+def RunDataBaseBenchmark(settings_inst, backends=None, n_rows=2000, batch_sizes=None):
+	'''
+	 @brief Benchmark the write throughput of the sql backends, with rows as inserted by a session (timestamp, GPS position and process data).
+	 	For each batch size, n_rows are inserted to a new table, which is dropped afterwards.
+	 	Batch size 1 inserts and commits each row (InsertDataIntoSQLTable), larger batch sizes insert each batch in one transaction (InsertManyIntoSQLTable), as the DataBaseWriter.
+	 	Backends that fail to connect (f.ex no running mysql server) are reported and skipped.
+
+	 @param settings_inst (DATABASE settings)
+	 @param backends (List of backends (default=None - 'sqlite' and 'mysql'))
+	 @param n_rows (Number of rows to insert for each batch size (default=2000))
+	 @param batch_sizes (List of batch sizes (default=None - 1 and 'db_writer_batch_size'))
+
+	 @return results (dictionary: {backend: {batch_size: rows/sec}})
+	'''
+	if backends == None:
+		backends = ['sqlite', 'mysql']
+	if batch_sizes == None:
+		batch_sizes = [1, settings_inst.GetSettings('db_writer_batch_size')]
+	primary_key = ('timestamp', 'TIMESTAMP(6)')
+	results 	= {}
+	for backend in backends:
+		try:
+			sql_backend = CreateSQLBackend(settings_inst, backend=backend)
+			sql_backend.GetSQLTables() # Connect
+		except Exception, err:
+			print 'Database benchmark: skipping {0} backend - {1}'.format(backend, err)
+			continue
+		results[backend] = {}
+		for batch_size in batch_sizes:
+			table_name 	= 'Benchmark_{0}_{1}'.format(batch_size, datetime.utcnow().strftime('%Y_%m_%d__%H_%M_%S_%f'))
+			start_time 	= datetime.utcnow()
+			rows 		= []
+			for i in range(n_rows):
+				rows.append({primary_key[0]: (start_time + timedelta(microseconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f'), 'longitude': 0.0, 'langitude': 0.0, 'latitude': 0.0, 'distance': 4424.99 + i, 'rho': 12.055, 'theta': 22.44})
+			columns = {primary_key[0]: primary_key[1]}
+			for key in rows[0]:
+				if key != primary_key[0]:
+					columns[key] = sql_backend.FindSQLValueType(rows[0][key])
+			sql_backend.CreateSQLTable(table_name, columns, primary_key[0])
+			try:
+				column_keys = rows[0].keys()
+				timer 		= timeit.default_timer()
+				if batch_size <= 1:
+					for row in rows:
+						sql_backend.InsertDataIntoSQLTable(table_name, row)
+				else:
+					for i in range(0, n_rows, batch_size):
+						sql_backend.InsertManyIntoSQLTable(table_name, column_keys, rows[i:i+batch_size])
+				elapsed = timeit.default_timer() - timer
+			finally:
+				sql_backend.DropSQLTable(table_name)
+			results[backend][batch_size] = n_rows/max(elapsed, 1e-9)
+		sql_backend.CloseSQL()
+	print 'Database write throughput ({0} rows):'.format(n_rows)
+	for backend in backends:
+		if not(backend in results):
+			continue
+		print '\t{0}:'.format(backend)
+		for batch_size in batch_sizes:
+			print '\t\tbatch size {0}: {1:.1f} rows/sec'.format(batch_size, results[backend][batch_size])
+	return results
\ No newline at end of file
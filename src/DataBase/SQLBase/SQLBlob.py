@@ -0,0 +1,113 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import struct, zlib, timeit
+import numpy as np
+
+'''
+ Binary numpy blob layout (little endian):
+ 	magic ('NPB1', 4 bytes), compression (uint8, 0 = none, 1 = zlib), dtype string length (uint8), ndim (uint8),
+ 	dtype string (f.ex '<f8'), shape (ndim x uint64), padding to a multiple of 16 bytes, raw C-ordered array data.
+'''
+BLOB_MAGIC 				= 'NPB1'
+BLOB_COMPRESSION_NONE 	= 0
+BLOB_COMPRESSION_ZLIB 	= 1
+BLOB_ALIGNMENT 			= 16
+
+def EncodeNumpyBlob(np_array, compression_level=0):
+	'''
+	 @brief Encode numpy array to binary blob (dtype/shape header + raw bytes).
+	 	Arrays of python objects can not be stored as raw bytes, and are pickled as before.
+
+	 @param np_array
+	 @param compression_level (zlib compression level 1-9, 0 for no compression (default=0))
+
+	 @return blob (string)
+	'''
+	if np_array.dtype.hasobject:
+		return np.ndarray.dumps(np_array)
+	dtype_str 	= np_array.dtype.str
+	data 		= np_array.tostring() # C-ordered bytes of any memory layout
+	compression = BLOB_COMPRESSION_NONE
+	if compression_level > 0:
+		data 		= zlib.compress(data, compression_level)
+		compression = BLOB_COMPRESSION_ZLIB
+	header 	= BLOB_MAGIC + struct.pack('<BBB', compression, len(dtype_str), np_array.ndim) + dtype_str + struct.pack('<{0}Q'.format(np_array.ndim), *np_array.shape)
+	header 	+= '\x00'*(-len(header) % BLOB_ALIGNMENT)
+	return header + data
+
+def DecodeNumpyBlob(blob):
+	'''
+	 @brief Decode binary blob to numpy array.
+	 	Uncompressed blobs are decoded without copying (np.frombuffer), so the returned array is read-only.
+	 	Blobs stored as pickled arrays (np.ndarray.dumps) by earlier versions are still decoded.
+
+	 @param blob (string or buffer)
+
+	 @return np_array
+	'''
+	if blob[:len(BLOB_MAGIC)] != BLOB_MAGIC:
+		return np.loads(bytes(blob)) # Pickled blob
+	offset 								= len(BLOB_MAGIC)
+	compression, dtype_len, ndim 		= struct.unpack('<BBB', blob[offset:offset+3])
+	offset 								+= 3
+	dtype 								= np.dtype(blob[offset:offset+dtype_len])
+	offset 								+= dtype_len
+	shape 								= struct.unpack('<{0}Q'.format(ndim), blob[offset:offset+8*ndim])
+	offset 								+= 8*ndim
+	offset 								+= -offset % BLOB_ALIGNMENT
+	if compression == BLOB_COMPRESSION_ZLIB:
+		data = zlib.decompress(blob[offset:])
+		return np.frombuffer(data, dtype=dtype).reshape(shape)
+	elif compression != BLOB_COMPRESSION_NONE:
+		raise ValueError('Unknown numpy blob compression: {0}'.format(compression))
+	return np.frombuffer(blob, dtype=dtype, offset=offset).reshape(shape)
+
+def RunBlobBenchmark(n_keypoints=2000, n_points3D=100000, repeats=10):
+	'''
+	 @brief Benchmark encoding and decoding of numpy blobs (pickle, binary and zlib compressed binary)
+	 	for a keypoint array (n_keypoints x 7 float32: x, y, size, angle, response, octave, class_id) and a 3D point cloud (3 x n_points3D float64).
+
+	 @param n_keypoints (default=2000)
+	 @param n_points3D (default=100000)
+	 @param repeats (Number of timed encodings/decodings - the best time is used (default=10))
+
+	 @return results (dictionary: {array_name: {encoding: {'encode': sec, 'decode': sec, 'bytes': blob size}}})
+	'''
+	arrays = {
+		'keypoints': np.random.rand(n_keypoints, 7).astype(np.float32)*1000.0,
+		'points3D': np.random.rand(3, n_points3D)*10.0
+	}
+	encodings = [
+		('pickle', lambda np_array: np.ndarray.dumps(np_array)),
+		('binary', lambda np_array: EncodeNumpyBlob(np_array)),
+		('binary_zlib', lambda np_array: EncodeNumpyBlob(np_array, compression_level=1))
+	]
+	results = {}
+	for array_name in arrays:
+		results[array_name] = {}
+		for encoding, encode in encodings:
+			encode_time = None
+			decode_time = None
+			for i in range(repeats):
+				timer 		= timeit.default_timer()
+				blob 		= encode(arrays[array_name])
+				elapsed 	= timeit.default_timer() - timer
+				encode_time = elapsed if encode_time == None else min(encode_time, elapsed)
+				timer 		= timeit.default_timer()
+				np_array 	= DecodeNumpyBlob(blob)
+				elapsed 	= timeit.default_timer() - timer
+				decode_time = elapsed if decode_time == None else min(decode_time, elapsed)
+			if not(np.array_equal(np_array, arrays[array_name])):
+				raise Exception('Decoded {0} array differs from the encoded array ({1})'.format(array_name, encoding))
+			results[array_name][encoding] = {'encode': encode_time, 'decode': decode_time, 'bytes': len(blob)}
+	print 'Numpy blob encoding (best of {0}):'.format(repeats)
+	for array_name in sorted(results.keys()):
+		print '\t{0} {1}:'.format(array_name, arrays[array_name].shape)
+		for encoding, encode in encodings:
+			result = results[array_name][encoding]
+			print '\t\t{0}: encode = {1:.6f} sec, decode = {2:.6f} sec, {3} bytes'.format(encoding, result['encode'], result['decode'], result['bytes'])
+	return results
\ No newline at end of file
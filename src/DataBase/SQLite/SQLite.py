@@ -0,0 +1,259 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import sqlite3, os, glob
+
+from src.DataBase.SQLBase.SQLBase import SQLBase
+
+'''
+ @brief SQLite class - embedded sql backend, with the same interface as the MySQL class.
+ 	No server is needed, so it is suited for field runs, test units and benchmarks.
+ 	Each database is a file (<folder><database>.db), opened in WAL mode (write-ahead log) with synchronous=NORMAL,
+ 	so readers never block the writer, and a commit does not wait for the disk (the last transactions may be lost on power loss, but the database is never corrupted).
+ 	Insert rows in batches with InsertManyIntoSQLTable() (one transaction per batch), as done by the DataBaseWriter.
+ 	Table, column and value handling is given by SQLBase.
+
+ @param database (None for a temporary in-memory database (default=None))
+ @param folder (Folder of the database files (default=''))
+'''
+class SQLite(SQLBase):
+	def __init__(self, database=None, folder=''):
+		'''CONSTRUCTOR'''
+		self.__sql_db_connected = False
+		SQLBase.__init__(self)
+		self.SetSQLConfig(database=database, folder=folder)
+
+	def NumpyArrayToSQLBlob(self, np_array):
+		'''
+		 @brief Convert numpy array to sql blob data.
+		 	The dump is wrapped in a buffer, so sqlite3 stores it as a BLOB.
+
+		 @param np_array
+
+		 @return np_array_dump
+		'''
+		return buffer(SQLBase.NumpyArrayToSQLBlob(self, np_array))
+
+	def GetSQLParameter(self, key):
+		'''
+		 @brief Get named parameter placeholder of the backend.
+
+		 @param key
+
+		 @return sql_parameter
+		'''
+		return ":"+key
+
+	def FetchSelectedSQLData(self, n_elements=0):
+		'''
+		 @brief Fetch selected data from sql table.
+
+		 @param n_elements (Number of elements to fetch at this instance, 0= fetch all at once (default=0))
+
+		 @return sql_rows (sql_rows = touple of touples, empty touple is returned when no more rows are available)
+		'''
+		if n_elements < 0:
+			raise ValueError('Invalid negative value for fetching sql data')
+		if self.GetSQLConnected():
+			if n_elements == 0:
+				sql_rows = tuple(self.__sql_cursor.fetchall())
+			elif n_elements == 1:
+				sql_rows = self.__sql_cursor.fetchone()
+			else:
+				sql_rows = tuple(self.__sql_cursor.fetchmany(n_elements))
+		else:
+			raise Exception('Not connected to database')
+		return sql_rows
+
+	def RenameColumnFromSQLTable(self, table_name, column_key, new_column_value):
+		'''
+		 @brief Rename column in sql table
+		 	The column type is kept (SQLite can not change column types).
+
+		 @param table_name
+		 @param column_key
+		 @param new_column_value (column_value = (key, type))
+		'''
+		sql_command = "ALTER TABLE " + table_name + " RENAME COLUMN " + column_key + " TO " + new_column_value[0]
+		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
+
+	def RenameSQLTable(self, table_name, new_table_name):
+		'''
+		 @brief Rename sql table
+
+		 @param table_name
+		 @param new_table_name
+		'''
+		sql_command = "ALTER TABLE " + table_name + " RENAME TO " + new_table_name
+		self.ExecuteSQLCommand(sql_command)
+		self.ClearSQLSchemaCache(table_name)
+		self.ClearSQLSchemaCache(new_table_name)
+
+	def GetSQLDatabaseFilename(self, database_name):
+		'''
+		 @brief Get filename of database
+
+		 @param database_name
+
+		 @return filename
+		'''
+		return self.__config["folder"] + database_name + '.db'
+
+	def SelectSQLDatabase(self, database_name):
+		'''
+		 @brief Select database to use (the database file is created if it does not exist)
+
+		 @param database_name
+		'''
+		self.CloseSQL()
+		self.__config["database"] = database_name
+		self.OpenSQL()
+		self.ClearSQLSchemaCache()
+
+	def CreateSQLDatabase(self, database_name):
+		'''
+		 @brief Create new database (if it does not exist)
+
+		 @param database_name
+		'''
+		if not(self.CheckSQLDatabaseExist(database_name)):
+			sqlite3.connect(self.GetSQLDatabaseFilename(database_name)).close()
+
+	def DropSQLDatabase(self, database_name):
+		'''
+		 @brief Drop database (delete entire database)
+
+		 @param database_name
+		'''
+		if database_name == self.__config["database"]:
+			self.CloseSQL()
+		for filename in [self.GetSQLDatabaseFilename(database_name) + suffix for suffix in ['', '-wal', '-shm']]:
+			if os.path.isfile(filename):
+				os.remove(filename)
+		self.ClearSQLSchemaCache()
+
+	def GetSQLDatabases(self):
+		'''
+		 @brief Get all sql databases (database files in the folder)
+
+		 @return sql_rows
+		'''
+		return tuple((os.path.splitext(os.path.basename(filename))[0],) for filename in sorted(glob.glob(self.__config["folder"] + '*.db')))
+
+	def GetSQLTables(self):
+		'''
+		 @brief Get all sql tables
+
+		 @return sql_rows
+		'''
+		sql_command = "SELECT name FROM sqlite_master WHERE type='table'"
+		self.ExecuteSQLCommand(sql_command)
+		sql_rows = self.FetchSelectedSQLData()
+		return sql_rows
+
+	def GetSQLColumns(self, table_name):
+		'''
+		 @brief Get all sql columns from table
+		 	Returned as the MySQL columns - (Field, Type, Null, Key, Default, Extra) for each column.
+
+		 @param table_name
+
+		 @return sql_rows
+		'''
+		sql_command = "PRAGMA table_info(" + table_name + ")"
+		self.ExecuteSQLCommand(sql_command)
+		sql_rows = tuple((sql_row[1], sql_row[2], 'NO' if sql_row[3] else 'YES', 'PRI' if sql_row[5] else '', sql_row[4], '') for sql_row in self.FetchSelectedSQLData())
+		return sql_rows
+
+	def ExecuteSQLCommand(self, sql_command, values=None):
+		'''
+		 @brief Execute sql_command to sql database
+
+		 @param sql_command (sql string sql_command)
+		 @param values (tuples of insert values. None if no values to insert (default=None))
+		'''
+		if not(self.GetSQLConnected()):
+			self.OpenSQL()
+		try:
+			if isinstance(values, tuple) or isinstance(values, list) or isinstance(values, dict):
+				self.__sql_cursor.execute(sql_command, values)
+			else:
+				self.__sql_cursor.execute(sql_command)
+			self.__sql_con.commit()
+		except sqlite3.Error, err:
+			raise Exception("Error executing sql command to SQL database - \n\n"+sql_command+"\n\n - %s" % err)
+
+	def ExecuteManySQLCommand(self, sql_command, values_list):
+		'''
+		 @brief Execute sql_command for each set of values by executemany, committed as one transaction.
+		 	The transaction is rolled back if any of the values fails.
+
+		 @param sql_command (sql string sql_command)
+		 @param values_list (list of insert values (tuples or dictionaries))
+		'''
+		if not(self.GetSQLConnected()):
+			self.OpenSQL()
+		try:
+			self.__sql_cursor.executemany(sql_command, values_list)
+			self.__sql_con.commit()
+		except sqlite3.Error, err:
+			self.__sql_con.rollback()
+			raise Exception("Error executing sql command to SQL database - \n\n"+sql_command+"\n\n - %s" % err)
+
+	def GetSQLConnected(self):
+		'''
+		 @brief Get True/False for connected (ready to use) sql database.
+
+		 @return True/False
+		'''
+		return self.__sql_db_connected
+
+	def SetSQLConfig(self, database=None, folder=''):
+		'''
+		 @brief Set config parameters for the sql database
+
+		 @param database (None for a temporary in-memory database (default=None))
+		 @param folder (Folder of the database files (default=''))
+		'''
+		self.__config = {
+		  "database": database,
+		  "folder": folder
+		}
+
+	def OpenSQL(self):
+		'''
+		 @brief Connect and initialize SQL database
+		 	The connection may be closed by another thread than the one using it (f.ex when the DataBaseWriter is closed), but must only be used by one thread at a time.
+		'''
+		if self.__config["database"] == None:
+			filename = ':memory:'
+		else:
+			if len(self.__config["folder"]) > 0 and not(os.path.isdir(self.__config["folder"])):
+				os.makedirs(self.__config["folder"])
+			filename = self.GetSQLDatabaseFilename(self.__config["database"])
+		try:
+			self.__sql_con 					= sqlite3.connect(filename, check_same_thread=False)
+			self.__sql_con.text_factory 	= str
+			self.__sql_cursor 				= self.__sql_con.cursor()
+			self.__sql_cursor.execute("PRAGMA journal_mode=WAL")
+			self.__sql_cursor.execute("PRAGMA synchronous=NORMAL")
+			self.__sql_db_connected 		= True
+		except sqlite3.Error, err:
+			raise Exception("Error connecting to SQL database - %s" % err)
+
+	def CloseSQL(self):
+		'''
+		 @brief Disconnect sql database
+		'''
+		if self.__sql_db_connected:
+			self.__sql_cursor.close()
+			self.__sql_con.close()
+		self.__sql_db_connected = False
+
+	def __del__(self):
+		'''DESTRUCTOR'''
+		self.CloseSQL()
\ No newline at end of file
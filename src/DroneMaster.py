@@ -22,7 +22,9 @@ from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import
 '''
 from DataBase.DataBase import DataBase
 from MasterSlave.Master import Master
+from MasterSlave.TriggerBroadcast import GetTriggerClock
 from DroneVision.DroneVision import DroneVision
+from DroneVision.DroneVision_src.CVWorker.CVWorker import CVWorker
 
 '''
  User input
@@ -60,10 +62,13 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 		self.__descriptors_r 							= None
 		self.__req_success 								= False
 		self.__req_error 								= False
+		self.__slave_frame_seq 							= None
+		self.__capture_time 							= None
 		self.__force_stereo_vision_calibration			= False
 		self.__force_blob_calibration 					= False
 		self.__calibrate_stereopsis_session 			= calibrate_stereopsis_session
 		self.__calibrate_blob_scale_detector_session 	= calibrate_blob_scale_detector_session
+		self.__cvWorker 								= None
 
 	def InitializeMaster(self):
 		'''
@@ -81,6 +86,9 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 		self.RequestCVCalibration(self.__calibrate_stereopsis_session, self.__calibrate_blob_scale_detector_session)
 		self.CheckRunMasterCalibration(self.__calibrate_stereopsis_session, self.__calibrate_blob_scale_detector_session)
 		self.CalibratePointDetection(force_calibration=self.__force_stereo_vision_calibration, force_blob_calibration=self.__force_blob_calibration)
+		if self.GetSettings('CV', 'use_cv_worker_process'):
+			self.__cvWorker = CVWorker(self) # Forked after calibration, so the worker inherits the calibrated state.
+			self.__cvWorker.StartCVWorker()
 		self.WaitSlaveReady()
 		self.SetDatabaseTableName(self.__timestamp, master=True, wait_for_user=not(self.GetSettings('USER_INPUT', 'automatic_mode')))
 		self.SendFlagToSlave(True) # Send flag to slave commanding it to continue
@@ -109,6 +117,7 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 			points_error, boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, frame_un_l, delta_frame_l, hough_frame, matches_frame = self.ProcessCV(draw_heading=draw_heading, draw_hough_lines=draw_hough_lines, draw_detected_points=draw_detected_points, draw_matches=draw_matches)
 			if isinstance(points_error, PtGreyError): # Dominant error - continue with next frame
 				continue
+			self.CheckTriggerFrameRecording(boundary_error)
 			if stereo_error == None and points_error == None:
 				points3D_m 		= self.Points3DToMatrix(points3D)
 				average_point3D = np.mean(points3D_m, axis=1)
@@ -143,9 +152,9 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 					if draw_detected_points:
 						self.SetProcessFrame('points', delta_frame_l)
 
-			if not(print_3D_points) or stereo_error != None or points_error != None:
+			if stereo_error != None or points_error != None:
 				points3D = []
-			self.RecordData(record_frames=store_frames, insert_to_database=store_to_db, print_progress=True, points3D=points3D)
+			self.RecordData(record_frames=store_frames, insert_to_database=store_to_db, print_progress=True, points3D=points3D, print_points3D=print_3D_points, record_columns=True)
 			#----------------------------------------#
 
 			#-------- SHOW RESULTS REALTIME ---------#
@@ -177,6 +186,20 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 		self.SendFinishRequest()
 		self.CloseMaster()
 
+	def CheckTriggerFrameRecording(self, boundary_error):
+		'''
+		 @brief Trigger recording of the frames held in the pre-trigger buffer on events:
+		 	boundary detection error, tip or root detection, or the trigger recording key from the user.
+
+		 @param boundary_error (DroneVisionError or None)
+		'''
+		if isinstance(boundary_error, DroneVisionError):
+			self.TriggerFrameRecording('boundary_error')
+		if self.GetTipOrRootDetected():
+			self.TriggerFrameRecording('tip_or_root_detected')
+		if self.CheckRecordingTriggeredByUser():
+			self.TriggerFrameRecording('user')
+
 	def SendFinishRequest(self):
 		'''
 		 @brief Send finish request from master to slave
@@ -304,6 +327,8 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 
 		 @return points_error, boundary_error, heading_error, stereo_error, cv_results (Returns: points_error, heading_error, stereo_error (None, if no error and points_error as dominant error), cv_results = tuple containing elements of desired results.)
 		'''
+		if self.__cvWorker != None:
+			return self.ProcessCVWorker(draw_heading=draw_heading, draw_hough_lines=draw_hough_lines, draw_detected_points=draw_detected_points, draw_matches=draw_matches)
 		points_error, frame_un_l, delta_frame_l, keypoints_l, descriptors_l, und_shape_r, keypoints_r, descriptors_r = self.GetProcessedFrames(draw_detected_points=draw_detected_points)
 		if points_error != None:
 			return points_error, None, None, None, None, None, None, None, None, None, None # Return failed frames.
@@ -311,17 +336,56 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 		stereo_error, points3D, matches_frame = self.ProcessStereopsis(GetShape(frame_un_l), und_shape_r, keypoints_l, descriptors_l, keypoints_r, descriptors_r, draw_matches=draw_matches)
 		return None, boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, frame_un_l, delta_frame_l, hough_frame, matches_frame
 
-	def GetProcessedFrames(self, draw_detected_points=False):
+	def ProcessCVWorker(self, draw_heading=False, draw_hough_lines=False, draw_detected_points=False, draw_matches=False):
 		'''
-		 @brief Get processed left and right frame simultaneously.
-		 	Returns error if an error occurs (error=None if not).
+		 @brief Process computer vision steps in the CV worker process.
+		 	The slave point list is requested while the worker processes the left frames.
 
+		 @param draw_heading (default=False)
+		 @param draw_hough_lines (default=False) - draw_hough_lines overwrites draw_detected_points
 		 @param draw_detected_points (default=False)
+		 @param draw_matches (default=False)
 
-		 @return error, frame_un_l, delta_frame_l, keypoints_l, descriptors_l, frame_un_r_shape, keypoints_r, descriptors_r
+		 @return Same as ProcessCV()
 		'''
-		self.RequestFrameProcessingOnSlave() # Trig slave to capture new frames triggered by the master.
+		points_error, original_frame_l, original_sl_frame_l = self.GetRawFramesAndRecord()
+		if points_error != None:
+			return points_error, None, None, None, None, None, None, None, None, None, None # Return failed frames.
+		t = RunThread(self.RequestPointlistThread)
+		self.__cvWorker.ProcessFrames(original_frame_l, original_sl_frame_l, draw_heading=draw_heading, draw_hough_lines=draw_hough_lines, draw_detected_points=draw_detected_points, draw_matches=draw_matches)
+		del original_frame_l
+		del original_sl_frame_l
 		try:
+			points_error = self.__cvWorker.GetPointsError()
+			if points_error != None:
+				raise points_error
+			t.join() # Wait for slave point list request to finish
+			if not(self.__req_success):
+				self.__cvWorker.AbortStereopsis()
+				if self.__req_error:
+					self.RequestRestartPtGrey()
+				raise DroneVisionError('could_not_get_point_list_from_slave')
+			self.CheckCaptureSkew()
+		except DroneVisionError, err:
+			self.__break_req = True # Break slave point list request if it's still running.
+			warnings.simplefilter('always')
+			warnings.warn(str(err), Warning)
+			warnings.simplefilter('default')
+			t.join() # Wait for slave point list request to terminate
+			return err, None, None, None, None, None, None, None, None, None, None
+		self.__cvWorker.ProcessStereopsis(self.__frame_un_r_shape, self.__keypoints_r, self.__descriptors_r)
+		return self.__cvWorker.GetResults()
+
+	def GetRawFramesAndRecord(self):
+		'''
+		 @brief Trigger the slave, get new raw left frames and record them (if frames are stored).
+		 	Returns error if an error occurs (error=None if not).
+
+		 @return error, original_frame_l, original_sl_frame_l
+		'''
+		self.__slave_frame_seq = self.RequestFrameProcessingOnSlave(push_point_list=self.GetSettings('TCP', 'push_point_list'), broadcast_trigger=self.GetSettings('TCP', 'udp_trigger')) # Trig slave to capture new frames triggered by the master.
+		try:
+			self.__capture_time = GetTriggerClock()
 			original_frame_l, original_sl_frame_l = self.GetRawFrames() # Get new frames from slave, which triggers new frames to be captured on slave
 			if self.GetSettings('DATABASE', 'store_frames_as_video') or self.GetSettings('DATABASE', 'store_frames_as_images'): # Store frames here to relieve memory. The frames are deleted as soon as possible.
 				self.SetProcessFrame('original_left', original_frame_l)
@@ -333,6 +397,20 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 			warnings.simplefilter('default')
 			self.RestartCamera()
 			self.RequestRestartPtGrey()
+			return err, None, None
+		return None, original_frame_l, original_sl_frame_l
+
+	def GetProcessedFrames(self, draw_detected_points=False):
+		'''
+		 @brief Get processed left and right frame simultaneously.
+		 	Returns error if an error occurs (error=None if not).
+
+		 @param draw_detected_points (default=False)
+
+		 @return error, frame_un_l, delta_frame_l, keypoints_l, descriptors_l, frame_un_r_shape, keypoints_r, descriptors_r
+		'''
+		err, original_frame_l, original_sl_frame_l = self.GetRawFramesAndRecord()
+		if err != None:
 			return err, None, None, None, None, None, None, None
 		t = RunThread(self.RequestPointlistThread)
 		try:
@@ -344,6 +422,7 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 				if self.__req_error:
 					self.RequestRestartPtGrey()
 				raise DroneVisionError('could_not_get_point_list_from_slave')
+			self.CheckCaptureSkew()
 		except DroneVisionError, err:
 			self.__break_req = True # Break slave point list request if it's still running.
 			warnings.simplefilter('always')
@@ -353,14 +432,42 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 			return err, None, None, None, None, None, None, None
 		return None, frame_un_l, delta_frame_l, keypoints_l, descriptors_l, self.__frame_un_r_shape, self.__keypoints_r, self.__descriptors_r
 
+	def CheckCaptureSkew(self):
+		'''
+		 @brief Check the capture time difference between the left (master) and right (slave) frames.
+		 	The stereo pair is flagged as skewed if the difference exceeds 'max_capture_delta'.
+		 	Only checked with 'udp_trigger', as the slave clock is not synchronized to the master otherwise.
+		 	The capture time difference and flag are stored with the process data.
+
+		 @return capture_delta (None if not checked, or the slave did not give its capture time)
+		'''
+		if not(self.GetSettings('TCP', 'udp_trigger')):
+			return None
+		slave_capture_time = self.GetSlaveCaptureTime()
+		if slave_capture_time == None or self.__capture_time == None:
+			return None
+		capture_delta 	= slave_capture_time - self.__capture_time
+		skewed 			= abs(capture_delta) > self.GetSettings('TCP', 'max_capture_delta')
+		self.SetProcessData('capture_delta', capture_delta)
+		self.SetProcessData('capture_skewed', int(skewed))
+		if skewed:
+			warnings.simplefilter('always')
+			warnings.warn('Skewed stereo pair - capture time difference between left and right frames: {0:.4f} sec'.format(capture_delta), Warning)
+			warnings.simplefilter('default')
+		return capture_delta
+
 	def RequestPointlistThread(self):
 		'''
 		 @brief Request point list from slave.
+		 	The point list is received from the queue of pushed point lists if the slave pushes it, otherwise the slave is polled.
 		 	Execute in thread.
 		'''
 		self.__break_req   	= False
 		self.__req_success 	= False
 		self.__req_error 	= False
+		if self.GetSettings('TCP', 'push_point_list'):
+			self.__frame_un_r_shape, self.__keypoints_r, self.__descriptors_r, self.__req_success, self.__req_error = self.ReceivePushedPointList(self.__slave_frame_seq, self.GetSettings('TCP', 'frame_req_timeout'))
+			return
 		timeout = timeit.default_timer()
 		while (not(self.__req_success) and not(self.__req_error) and (timeit.default_timer() - timeout) < self.GetSettings('TCP', 'frame_req_timeout')) and not(self.__break_req):
 			self.__frame_un_r_shape, self.__keypoints_r, self.__descriptors_r, self.__req_success, self.__req_error = self.RequestPointList() #Slave is positioned to the right (right frame)
@@ -409,6 +516,10 @@ class DroneMaster(Master, DroneVision, Settings, DataBase, UserInput):
 		'''
 		 @brief Close master safely
 		'''
+		if self.__cvWorker != None:
+			self.__cvWorker.StopCVWorker()
+			self.__cvWorker = None
+		self.SaveTransportMetrics(self.GetDatabaseOutputFolder())
 		Master.__del__(self)
 		DataBase.__del__(self)
 
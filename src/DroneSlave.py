@@ -20,6 +20,7 @@ from src.DroneVision.DroneVision_src.hardware.imageTools import RealTimePlot, Wr
 '''
 from DataBase.DataBase import DataBase
 from MasterSlave.Slave import Slave
+from MasterSlave.TriggerBroadcast import GetTriggerClock
 from DroneVision.DroneVision import DroneVision
 
 '''
@@ -45,6 +46,7 @@ class DroneSlave(Slave, DroneVision, Settings, DataBase):
 		Slave.__init__(self, self.GetSettings('TCP'), self)
 		DroneVision.__init__(self, False, self.GetSettings(), self.__realTimePlot)
 		DataBase.__init__(self, self, self.GetSettings('DATABASE'))
+		self.DisableFrameRingBuffer() # Trigger events are detected by the master - the slave records all frames
 		self.__master_timeout 						= self.GetSettings('BASIC', 'master_timeout')
 		self.__new_frame_ready 						= False
 		self.__store_db 							= False
@@ -54,6 +56,10 @@ class DroneSlave(Slave, DroneVision, Settings, DataBase):
 		self.__slave_calibrated 		 			= False
 		self.__error_flag 							= False
 		self.__process_new_frame_flag 				= False
+		self.__frame_processed_cond 				= threading.Condition()
+		self.__trigger_seq 							= 0
+		self.__processed_seq 						= 0
+		self.__capture_time 						= None
 		self.__master_flag 							= None
 		self.__force_stereo_vision_calibration		= False
 		self.__force_blob_calibration 				= False
@@ -275,21 +281,70 @@ class DroneSlave(Slave, DroneVision, Settings, DataBase):
 		'''
 		return self.__master_flag
 
-	def SetProcessNewFrameFlag(self):
+	def SetProcessNewFrameFlag(self, seq=None):
 		'''
 		 @brief Set process new frame flah
+
+		 @param seq (Frame sequence number given by the master (default=None - next sequence number))
 		'''
+		with self.__frame_processed_cond:
+			if seq == None:
+				seq = self.__trigger_seq + 1
+			self.__trigger_seq = seq
 		self.__process_new_frame_flag = True
 
+	def WaitNewFrameProcessed(self, timeout, seq=None):
+		'''
+		 @brief Wait for the new frame to be processed (after SetProcessNewFrameFlag()).
+
+		 @param timeout (Timeout in seconds)
+		 @param seq (Frame sequence number to wait for (default=None - last triggered frame))
+			The frame may be triggered after this call (UDP trigger).
+
+		 @return True/False (False if the frame was not processed within the timeout)
+		'''
+		start_time = timeit.default_timer()
+		with self.__frame_processed_cond:
+			if seq == None:
+				seq = self.__trigger_seq
+			while self.__processed_seq < seq:
+				remaining = timeout - (timeit.default_timer() - start_time)
+				if remaining <= 0:
+					return False
+				self.__frame_processed_cond.wait(remaining)
+		return True
+
+	def GetCaptureTime(self):
+		'''
+		 @brief Get capture time of the last captured frame (see GetTriggerClock()).
+
+		 @return capture_time (None if no frame is captured)
+		'''
+		return self.__capture_time
+
 	def ProcessNewFrame(self):
 		'''
 		 @brief Prepare new frame to be requested by master.
 
 		 @return frame 
 		'''
+		with self.__frame_processed_cond:
+			seq = self.__trigger_seq
+		try:
+			self.PrepareNewFrame()
+		finally:
+			with self.__frame_processed_cond: # Signal a waiting point list push
+				self.__processed_seq = max(self.__processed_seq, seq)
+				self.__frame_processed_cond.notify_all()
+
+	def PrepareNewFrame(self):
+		'''
+		 @brief Capture and process new frame, and prepare it to be requested by master.
+		'''
 		self.__error_flag = False
 		if not(self.CheckDroneVisionFinished()):
 			try:
+				self.__capture_time = GetTriggerClock()
 				original_frame, original_sl_frame = self.GetRawFrames()
 				if self.GetSettings('DATABASE', 'store_frames_as_video') or self.GetSettings('DATABASE', 'store_frames_as_images'): # Store frames here to relieve memory. The frames are deleted as soon as possible.
 					self.SetProcessFrame('original_right', original_frame)
@@ -418,6 +473,7 @@ class DroneSlave(Slave, DroneVision, Settings, DataBase):
 		'''
 		 @brief Close slave safely
 		'''
+		self.SaveTransportMetrics(self.GetDatabaseOutputFolder())
 		Slave.__del__(self)
 		DataBase.__del__(self)
 
@@ -22,10 +22,12 @@ from src.bin.tools import CheckDir
 from DroneVision_src.hardware.ImageLink import ImageLink
 from DroneVision_src.hardware.CameraLink import CameraLink
 from DroneVision_src.hardware.VideoLink import VideoLink
+from DroneVision_src.hardware.ReplayLink import ReplayLink
 from DroneVision_src.hardware.imageTools import ImShow
 
 # Camera calibration
 from DroneVision_src.imgProcessing.featureDetection.PointDetection.PointDetection import PointDetection
+from DroneVision_src.imgProcessing.featureDetection.PointTracker.PointTracker import PointTracker
 
 # Heading calculation
 from DroneVision_src.imgProcessing.Heading.Heading import Heading
@@ -49,10 +51,12 @@ class DroneVision(PointDetection, Heading, Settings):
 		self.__droneVision_ready 		= False
 		self.__crop_frames 				= False
 		self.__delta_fan_angle_divisor 	= 1.0
+		self.__tip_or_root_detected 	= False
 		if (self.GetSettings('LASER', 'fan_angle') < self.GetSettings('CAMERA', 'fan_angle')) and self.GetSettings('CV', 'crop_frames'):
 			self.__crop_frames 				= True
 			self.__delta_fan_angle_divisor 	= self.GetSettings('LASER', 'fan_angle') / self.GetSettings('CAMERA', 'fan_angle')
 		self.CheckManualTriggeringAndAutoMode()
+		self.__pointTracker 			= PointTracker(self.GetSettings('CV', 'point_tracking_keyframe_interval'), self.GetSettings('CV', 'point_tracking_min_confidence'))
 		PointDetection.__init__(self, self.__me_master, self.GetSettings(), plot_figure=plot_figure)
 		Heading.__init__(self, self.GetSettings('CV', 'rho_step_distance'), self.GetSettings('CV', 'rho_min_diag_perc'))
 
@@ -94,6 +98,7 @@ class DroneVision(PointDetection, Heading, Settings):
 	def CreateCameraLink(self):
 		'''
 		 @brief Create camera link (or video/image link)
+		 	Video and image links are replayed by a ReplayLink, with the range, stride and rate given by the REPLAY settings.
 		'''
 		#---- CREATE IMAGE/VIDEO/CAMERA LINK ----#
 		if self.GetSettings('BASIC', 'source_type') == 'CAMERA':
@@ -106,7 +111,7 @@ class DroneVision(PointDetection, Heading, Settings):
 			else: # This is slave
 				filename = self.GetSettings('VIDEO', 'right_video')
 				sl_filename = self.GetSettings('VIDEO', 'right_sl_video')
-			self.objCameraLink = VideoLink(input_folder + filename, input_folder + sl_filename)
+			self.objCameraLink = VideoLink(input_folder + filename, input_folder + sl_filename, prefetch_size=self.GetSettings('VIDEO', 'video_prefetch_size'))
 		elif self.GetSettings('BASIC', 'source_type') == 'IMAGE':
 			input_folder = self.GetSettings('IMAGE', 'input_folder')
 			if self.__me_master: # This is master
@@ -118,6 +123,10 @@ class DroneVision(PointDetection, Heading, Settings):
 			self.objCameraLink = ImageLink(input_folder, filename, sl_filename)
 		else:
 			raise Exception('Invalid setting: ' + self.GetSettings('BASIC', 'source_type'))
+		if self.GetSettings('BASIC', 'source_type') != 'CAMERA':
+			self.objCameraLink = ReplayLink(self.objCameraLink, self.GetSettings('REPLAY', 'replay_start_frame'), self.GetSettings('REPLAY', 'replay_end_frame'), self.GetSettings('REPLAY', 'replay_stride'), self.GetSettings('REPLAY', 'replay_rate'))
+			if self.GetSettings('REPLAY', 'replay_start_seconds') > 0:
+				self.objCameraLink.SetReplayRange(self.objCameraLink.FindReplayFrame(self.GetSettings('REPLAY', 'replay_start_seconds')), self.GetSettings('REPLAY', 'replay_end_frame'))
 
 	def CheckManualTriggeringAndAutoMode(self):
 		'''
@@ -173,17 +182,30 @@ class DroneVision(PointDetection, Heading, Settings):
 		 	delta_frame = frame with highlighted points above threshold
 		 	keypoints = all point positions (2D numpy array = each row is a point position [x, y])
 		 	descriptors = all point descriptors)
+		 	Points are tracked from the previous frame between keyframes if point tracking is turned on (CV point_tracking_keyframe_interval > 1), with a stable id in each keypoint class_id.
 		'''
 		if not(isinstance(original_frame, np.ndarray)) or not(isinstance(original_sl_frame, np.ndarray)):
 			original_frame, original_sl_frame = self.GetRawFrames()
 
+		point_tracker = None
+		if self.__pointTracker.GetTrackingEnabled():
+			point_tracker = self.__pointTracker
+
 		##########################################
 		#----------- PROCESS FRAME --------------#
 		compute_descriptors = not(self.GetUsingBlockMatching())
-		delta_frame, keypoints, descriptors, frame_un, sl_frame_un = self.GetPointList(original_frame, original_sl_frame, compute_descriptors=compute_descriptors, draw=draw_detected_points, crop_frames=self.__crop_frames, crop_frame_divisor=self.__delta_fan_angle_divisor)
+		delta_frame, keypoints, descriptors, frame_un, sl_frame_un = self.GetPointList(original_frame, original_sl_frame, compute_descriptors=compute_descriptors, draw=draw_detected_points, crop_frames=self.__crop_frames, crop_frame_divisor=self.__delta_fan_angle_divisor, point_tracker=point_tracker)
 		##########################################
 		return (original_frame, original_sl_frame, frame_un, delta_frame, keypoints, descriptors)
 
+	def GetPointTracker(self):
+		'''
+		 @brief Get the point tracker used by GetProcessedFrame()
+
+		 @return pointTracker
+		'''
+		return self.__pointTracker
+
 	def ProcessHeading(self, frame_un, delta_frame, keypoints, draw_heading=False, draw_hough_lines=False, print_hough_positions=False):
 		'''
 		 @brief Compute heading.
@@ -198,6 +220,7 @@ class DroneVision(PointDetection, Heading, Settings):
 		 	edgel_map = (undistorted edgel_map, colored with drawings if draw_heading==True)
 		 	hough_frame = (undistorted hough lines map colored with drawings if draw_hough_lines==True))
 		'''
+		self.__tip_or_root_detected = False
 		try: # Try to find boundary hough lines
 			hough_frame, edgel_map, boundary_hough_lines = self.GetBoundaryHoughLines(frame_un, delta_frame, keypoints, draw=(draw_hough_lines or draw_heading), print_hough_positions=print_hough_positions)
 		except DroneVisionError, err:
@@ -208,6 +231,7 @@ class DroneVision(PointDetection, Heading, Settings):
 		try: # Try to find heading
 			heading, tip_or_root_heading, tip_or_root_detected, edgel_map = self.ComputeHeading(edgel_map, boundary_hough_lines, draw_possible_edge_headings=draw_heading, draw_headings=draw_heading)
 			if tip_or_root_detected:
+				self.__tip_or_root_detected = True
 				heading = self.ProcessDetectionOfTipOrRoot(tip_or_root_heading)
 			return None, None, heading[0], heading[1], edgel_map, hough_frame
 		except DroneVisionError, err:
@@ -216,6 +240,22 @@ class DroneVision(PointDetection, Heading, Settings):
 			warnings.simplefilter('default')
 			return None, err, None, None, edgel_map, hough_frame
 
+	def GetTipOrRootDetected(self):
+		'''
+		 @brief Get True/False for tip or root detected by the last ProcessHeading()
+
+		 @return True/False
+		'''
+		return self.__tip_or_root_detected
+
+	def SetTipOrRootDetected(self, tip_or_root_detected):
+		'''
+		 @brief Set tip or root detected (f.ex as detected by the CV worker process)
+
+		 @param tip_or_root_detected (True/False)
+		'''
+		self.__tip_or_root_detected = tip_or_root_detected
+
 	def ProcessDetectionOfTipOrRoot(self, tip_or_root_heading):
 		'''
 		 @brief Compute necessary action when tip or root is detected.
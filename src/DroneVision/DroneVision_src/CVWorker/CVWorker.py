@@ -0,0 +1,206 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import traceback
+from multiprocessing import Process, Pipe
+from Settings.Exceptions import DroneVisionError
+from src.bin.SharedFrameBuffer import SharedFrameBuffer
+from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
+from src.MasterSlave.MsgParserRecv.keypointsConverter import keypoints_to_list, list_to_keypoints
+
+'''
+ @brief Persistent worker process running the computer vision of the master (point detection, heading and stereopsis).
+ 	The worker process is forked from the calibrated DroneVision instance, so it inherits the calibration state once.
+ 	Raw frames are passed to the worker through a shared frame buffer, and only compact results (errors, heading, 3D points)
+ 	are returned by a pipe, together with the drawn frames that are asked for (through a second shared frame buffer).
+ 	Networking and recording in the master process are thus never blocked by the computer vision.
+
+ 	Sequence for each frame set:
+ 		1. ProcessFrames() - start processing left frames (point detection and heading).
+ 		2. GetPointsError() - wait for the point detection to finish.
+ 		3. ProcessStereopsis() with the right point list (or AbortStereopsis() if it could not be received).
+ 		4. GetResults()
+
+ @param droneVision (Calibrated DroneVision instance)
+'''
+class CVWorker():
+	def __init__(self, droneVision):
+		'''CONSTRUCTOR'''
+		self.__droneVision 		= droneVision
+		self.__frame_buffer 	= SharedFrameBuffer() # Owned by the master
+		self.__result_buffer 	= SharedFrameBuffer() # Owned by the worker
+		self.__conn 			= None
+		self.__process 			= None
+
+	def StartCVWorker(self):
+		'''
+		 @brief Start the worker process.
+		'''
+		self.__conn, worker_conn 	= Pipe()
+		self.__process 				= Process(target=self.RunCVWorker, args=(worker_conn,))
+		self.__process.daemon 		= True
+		self.__process.start()
+		worker_conn.close()
+
+	def GetCVWorkerAlive(self):
+		'''
+		 @brief Check if the worker process is running.
+
+		 @return True/False
+		'''
+		return self.__process != None and self.__process.is_alive()
+
+	def ProcessFrames(self, original_frame, original_sl_frame, draw_heading=False, draw_hough_lines=False, draw_detected_points=False, draw_matches=False):
+		'''
+		 @brief Send raw left frames to the worker, and start point detection and heading computation.
+
+		 @param original_frame
+		 @param original_sl_frame
+		 @param draw_heading (default=False)
+		 @param draw_hough_lines (default=False)
+		 @param draw_detected_points (default=False)
+		 @param draw_matches (default=False)
+		'''
+		fname, headers 	= self.__frame_buffer.WriteFrames([original_frame, original_sl_frame])
+		draw_flags 		= (draw_heading, draw_hough_lines, draw_detected_points, draw_matches)
+		self.__conn.send(('frames', fname, headers, draw_flags))
+
+	def GetPointsError(self):
+		'''
+		 @brief Wait for the point detection of the left frames.
+
+		 @return points_error (None if no error)
+		'''
+		msg = self.ReceiveFromCVWorker('points')
+		return msg[1]
+
+	def ProcessStereopsis(self, frame_un_r_shape, keypoints_r, descriptors_r):
+		'''
+		 @brief Send the right point list to the worker, and start computing 3D points.
+
+		 @param frame_un_r_shape
+		 @param keypoints_r
+		 @param descriptors_r
+		'''
+		self.__conn.send(('points_r', frame_un_r_shape, keypoints_to_list(keypoints_r), descriptors_r))
+
+	def AbortStereopsis(self):
+		'''
+		 @brief Abort the current frame set (if the right point list could not be received).
+		'''
+		self.__conn.send(('abort',))
+
+	def GetResults(self):
+		'''
+		 @brief Wait for the results of the current frame set.
+
+		 @return points_error, boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, frame_un_l, delta_frame_l, hough_frame, matches_frame
+		 	(Same as DroneMaster.ProcessCV(). Frames that are not drawn are returned as None)
+		'''
+		msg = self.ReceiveFromCVWorker('results')
+		boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, tip_or_root_detected, fname, headers = msg[1:]
+		self.__droneVision.SetTipOrRootDetected(tip_or_root_detected) # Detected in the worker process
+		frame_un_l, delta_frame_l, hough_frame, matches_frame = self.__result_buffer.ReadFrames(fname, headers, copy=True)
+		return None, boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, frame_un_l, delta_frame_l, hough_frame, matches_frame
+
+	def ReceiveFromCVWorker(self, expected_msg):
+		'''
+		 @brief Receive message from the worker.
+		 	Raises Exception if the worker failed.
+
+		 @param expected_msg (Expected message type)
+
+		 @return msg
+		'''
+		try:
+			msg = self.__conn.recv()
+		except EOFError:
+			raise Exception('CV worker process terminated unexpectedly.')
+		if msg[0] == 'failed':
+			raise Exception('CV worker process failed:\n' + msg[1])
+		if msg[0] != expected_msg:
+			raise Exception('Unexpected message from CV worker process: {0} (expected {1})'.format(msg[0], expected_msg))
+		return msg
+
+	def RunCVWorker(self, conn):
+		'''
+		 @brief Worker process main loop.
+		 	Executed in the worker process.
+
+		 @param conn (Worker end of the pipe)
+		'''
+		self.__droneVision.ResetDetectionPool() # Threads of the inherited detection pool do not exist in this process.
+		frame_buffer 	= SharedFrameBuffer()
+		result_buffer 	= SharedFrameBuffer()
+		while True:
+			try:
+				msg = conn.recv()
+				if msg[0] == 'stop':
+					break
+				if msg[0] != 'frames':
+					continue
+				fname, headers, draw_flags 					= msg[1:]
+				draw_heading, draw_hough_lines, draw_detected_points, draw_matches = draw_flags
+				original_frame, original_sl_frame 			= frame_buffer.ReadFrames(fname, headers)
+				points_error, frame_un_l, delta_frame_l, keypoints_l, descriptors_l = self.ProcessPoints(original_frame, original_sl_frame, draw_detected_points=draw_detected_points)
+				del original_frame
+				del original_sl_frame
+				conn.send(('points', points_error))
+				if points_error != None:
+					continue
+				boundary_error, heading_error, heading_distance, heading_angle, frame_un_l, hough_frame = self.__droneVision.ProcessHeading(frame_un_l, delta_frame_l, keypoints_l, draw_heading=draw_heading, draw_hough_lines=draw_hough_lines)
+
+				msg = conn.recv()
+				if msg[0] == 'stop':
+					break
+				if msg[0] != 'points_r': # Aborted
+					continue
+				frame_un_r_shape, keypoint_list_r, descriptors_r = msg[1:]
+				stereo_error, points3D, matches_frame = self.__droneVision.ProcessStereopsis(GetShape(frame_un_l), frame_un_r_shape, keypoints_l, descriptors_l, list_to_keypoints(keypoint_list_r), descriptors_r, draw_matches=draw_matches)
+
+				drawn_frames = [frame_un_l if draw_heading else None, delta_frame_l if draw_detected_points else None, hough_frame if draw_hough_lines else None, matches_frame if draw_matches else None]
+				fname, headers = result_buffer.WriteFrames(drawn_frames)
+				conn.send(('results', boundary_error, heading_error, stereo_error, heading_distance, heading_angle, points3D, self.__droneVision.GetTipOrRootDetected(), fname, headers))
+			except (EOFError, IOError):
+				break
+			except Exception:
+				conn.send(('failed', traceback.format_exc()))
+		result_buffer.Close()
+		conn.close()
+
+	def ProcessPoints(self, original_frame, original_sl_frame, draw_detected_points=False):
+		'''
+		 @brief Detect points in the left frames.
+		 	Executed in the worker process.
+
+		 @param original_frame
+		 @param original_sl_frame
+		 @param draw_detected_points (default=False)
+
+		 @return points_error, frame_un, delta_frame, keypoints, descriptors (points_error = None if no error)
+		'''
+		try:
+			original_frame, original_sl_frame, frame_un, delta_frame, keypoints, descriptors = self.__droneVision.GetProcessedFrame(original_frame=original_frame, original_sl_frame=original_sl_frame, draw_detected_points=draw_detected_points)
+		except DroneVisionError, err:
+			return err, None, None, None, None
+		return None, frame_un, delta_frame, keypoints, descriptors
+
+	def StopCVWorker(self):
+		'''
+		 @brief Stop the worker process and release the shared frame buffers.
+		'''
+		if self.__process != None:
+			try:
+				self.__conn.send(('stop',))
+			except IOError:
+				pass
+			self.__process.join(5.0)
+			if self.__process.is_alive():
+				self.__process.terminate()
+			self.__conn.close()
+			self.__process = None
+		self.__frame_buffer.Close()
+		self.__result_buffer.Close()
\ No newline at end of file
@@ -0,0 +1,267 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import os, json, time, zlib
+import numpy as np
+from src.bin.tools import CheckDir
+
+'''
+ Frame archive layout (folder):
+ 	archive.json 		- version, chunk size and tags.
+ 	chunk_<i>.bin 		- append-only chunk files of raw (or zlib compressed) C-ordered frame data, each frame aligned to ARCHIVE_ALIGNMENT bytes.
+ 	index.bin 			- one ARCHIVE_INDEX_DTYPE record per frame, appended after the frame data is written.
+'''
+ARCHIVE_VERSION 		= 1
+ARCHIVE_ALIGNMENT 		= 64
+ARCHIVE_INDEX_DTYPE 	= np.dtype([('frame_i', '<u8'), ('timestamp', '<f8'), ('tag', '<u2'), ('compression', 'u1'), ('channels', 'u1'), ('chunk', '<u4'), ('offset', '<u8'), ('nbytes', '<u8'), ('height', '<u4'), ('width', '<u4'), ('dtype', 'S4')])
+
+def CheckFrameArchive(folder):
+	'''
+	 @brief Check if the folder holds a frame archive
+
+	 @param folder
+
+	 @return True/False
+	'''
+	return os.path.isfile(os.path.join(folder, 'archive.json'))
+
+'''
+ @brief Writer of a chunked frame archive.
+ 	Frames are appended sequentially to large chunk files, which are preallocated to chunk_size bytes (and truncated to the used size when closed),
+ 	so hours of recordings give a few large files instead of one image file per frame, and frames are stored without image encoding.
+ 	The index is appended after the frame data, so the archive may be read while it is written.
+
+ @param folder (Archive folder)
+ @param chunk_size (Size of each chunk file in bytes (default=256 MB))
+ @param compression_level (zlib compression level (1-9) of the frames, 0 for raw frames (default=0))
+'''
+class FrameArchiveWriter():
+	def __init__(self, folder, chunk_size=256*1024*1024, compression_level=0):
+		'''CONSTRUCTOR'''
+		self.__folder 				= folder
+		self.__chunk_size 			= chunk_size
+		self.__compression_level 	= compression_level
+		self.__tags 				= []
+		self.__frame_i 				= 0
+		self.__chunk_i 				= -1
+		self.__chunk_file 			= None
+		self.__chunk_offset 		= 0
+		self.OpenArchive()
+
+	def OpenArchive(self):
+		'''
+		 @brief Create the archive folder, the index file and the first chunk.
+		'''
+		CheckDir(self.__folder)
+		self.__index_file = open(self.__folder + 'index.bin', 'wb')
+		self.NewArchiveChunk()
+		self.WriteArchiveHeader()
+
+	def WriteArchiveHeader(self):
+		'''
+		 @brief Replace the archive.json header file
+		'''
+		header = {'version': ARCHIVE_VERSION, 'chunk_size': self.__chunk_size, 'tags': self.__tags}
+		with open(self.__folder + 'archive.json.tmp', 'w') as f:
+			json.dump(header, f, indent=4, sort_keys=True)
+		os.rename(self.__folder + 'archive.json.tmp', self.__folder + 'archive.json')
+
+	def NewArchiveChunk(self):
+		'''
+		 @brief Close the current chunk and start a new preallocated chunk file.
+		'''
+		self.CloseArchiveChunk()
+		self.__chunk_i 		+= 1
+		self.__chunk_offset = 0
+		self.__chunk_file 	= open(self.__folder + 'chunk_{0:06d}.bin'.format(self.__chunk_i), 'w+b')
+		self.__chunk_file.truncate(self.__chunk_size) # Preallocate
+
+	def CloseArchiveChunk(self):
+		'''
+		 @brief Truncate the current chunk file to the used size and close it.
+		'''
+		if self.__chunk_file != None:
+			self.__chunk_file.truncate(self.__chunk_offset)
+			self.__chunk_file.close()
+			self.__chunk_file = None
+
+	def GetArchiveTag(self, tag):
+		'''
+		 @brief Get tag number of the tag (new tags are added to the header)
+
+		 @param tag
+
+		 @return tag_i
+		'''
+		if not(tag in self.__tags):
+			self.__tags.append(tag)
+			self.WriteArchiveHeader()
+		return self.__tags.index(tag)
+
+	def WriteArchiveFrame(self, frame, tag='', timestamp=None):
+		'''
+		 @brief Append frame to the archive
+
+		 @param frame (2D or 3D numpy array)
+		 @param tag (Frame tag (default=''))
+		 @param timestamp (Unix time, None for the current time (default=None))
+		'''
+		if timestamp == None:
+			timestamp = time.time()
+		data = frame.tostring() # C-ordered bytes of any memory layout
+		if self.__compression_level > 0:
+			data = zlib.compress(data, self.__compression_level)
+		if self.__chunk_offset > 0 and self.__chunk_offset + len(data) > self.__chunk_size:
+			self.NewArchiveChunk()
+		self.__chunk_file.seek(self.__chunk_offset)
+		self.__chunk_file.write(data)
+		self.__chunk_file.flush()
+
+		record 					= np.zeros(1, dtype=ARCHIVE_INDEX_DTYPE)
+		record['frame_i'] 		= self.__frame_i
+		record['timestamp'] 	= timestamp
+		record['tag'] 			= self.GetArchiveTag(tag)
+		record['compression'] 	= 1 if self.__compression_level > 0 else 0
+		record['channels'] 		= frame.shape[2] if frame.ndim > 2 else 0
+		record['chunk'] 		= self.__chunk_i
+		record['offset'] 		= self.__chunk_offset
+		record['nbytes'] 		= len(data)
+		record['height'] 		= frame.shape[0]
+		record['width'] 		= frame.shape[1]
+		record['dtype'] 		= frame.dtype.str
+		self.__index_file.write(record.tostring())
+		self.__index_file.flush()
+
+		self.__chunk_offset += len(data) + (-len(data) % ARCHIVE_ALIGNMENT)
+		self.__frame_i 		+= 1
+
+	def GetNumberOfArchiveFrames(self):
+		'''
+		 @brief Get number of archived frames
+
+		 @return n_frames
+		'''
+		return self.__frame_i
+
+	def CloseArchive(self):
+		'''
+		 @brief Close the archive
+		'''
+		if self.__chunk_file != None:
+			self.CloseArchiveChunk()
+			self.__index_file.close()
+			self.WriteArchiveHeader()
+
+	def __del__(self):
+		'''DESTRUCTOR'''
+		self.CloseArchive()
+
+'''
+ @brief Reader of a chunked frame archive.
+ 	Chunk files are memory mapped, so uncompressed frames are read without copying (read-only arrays), and any frame is read directly by its index.
+
+ @param folder (Archive folder)
+'''
+class FrameArchiveReader():
+	def __init__(self, folder):
+		'''CONSTRUCTOR'''
+		self.__folder 	= folder
+		self.__chunks 	= {}
+		self.LoadArchiveIndex()
+
+	def LoadArchiveIndex(self):
+		'''
+		 @brief Load (or reload) the archive header and index.
+		 	A partially written index record of an archive being written is ignored.
+		'''
+		if not(CheckFrameArchive(self.__folder)):
+			raise Exception('Frame archive does not exist: {0}'.format(self.__folder))
+		with open(self.__folder + 'archive.json', 'r') as f:
+			self.__header = json.load(f)
+		with open(self.__folder + 'index.bin', 'rb') as f:
+			index_data = f.read()
+		n_frames 		= len(index_data)/ARCHIVE_INDEX_DTYPE.itemsize
+		self.__index 	= np.frombuffer(index_data, dtype=ARCHIVE_INDEX_DTYPE, count=n_frames)
+		self.__chunks 	= {} # Chunks may have grown or been truncated
+
+	def GetArchiveIndex(self):
+		'''
+		 @brief Get the archive index (ARCHIVE_INDEX_DTYPE array, one record per frame)
+
+		 @return index
+		'''
+		return self.__index
+
+	def GetArchiveTags(self):
+		'''
+		 @brief Get archive tags (the tag of a frame is tags[index['tag']])
+
+		 @return tags
+		'''
+		return list(self.__header['tags'])
+
+	def GetNumberOfArchiveFrames(self):
+		'''
+		 @brief Get number of archived frames
+
+		 @return n_frames
+		'''
+		return len(self.__index)
+
+	def FindArchiveFrames(self, tag):
+		'''
+		 @brief Find frames of a tag
+
+		 @param tag
+
+		 @return frame_indices (array of frame indices)
+		'''
+		if not(tag in self.__header['tags']):
+			return np.zeros(0, dtype=np.int64)
+		return np.flatnonzero(self.__index['tag'] == self.__header['tags'].index(tag))
+
+	def GetArchiveChunk(self, chunk_i):
+		'''
+		 @brief Get memory map of a chunk file
+
+		 @param chunk_i
+
+		 @return chunk (uint8 memory map)
+		'''
+		if not(chunk_i in self.__chunks):
+			self.__chunks[chunk_i] = np.memmap(self.__folder + 'chunk_{0:06d}.bin'.format(chunk_i), dtype=np.uint8, mode='r')
+		return self.__chunks[chunk_i]
+
+	def ReadArchiveFrame(self, frame_i):
+		'''
+		 @brief Read frame from the archive.
+		 	Uncompressed frames are read-only views of the memory mapped chunk.
+
+		 @param frame_i (Frame index)
+
+		 @return frame, timestamp, tag
+		'''
+		if frame_i >= len(self.__index):
+			self.LoadArchiveIndex() # The archive may be written while reading
+		record 	= self.__index[frame_i]
+		chunk 	= self.GetArchiveChunk(int(record['chunk']))
+		if int(record['offset'] + record['nbytes']) > len(chunk):
+			del self.__chunks[int(record['chunk'])] # Chunk has been truncated since it was mapped
+			chunk = self.GetArchiveChunk(int(record['chunk']))
+		data 	= chunk[int(record['offset']):int(record['offset'] + record['nbytes'])]
+		if record['compression'] == 1:
+			data = np.frombuffer(zlib.decompress(data.tostring()), dtype=np.uint8)
+		shape = (int(record['height']), int(record['width']))
+		if record['channels'] > 0:
+			shape += (int(record['channels']),)
+		frame = np.asarray(data).view(np.dtype(record['dtype'])).reshape(shape)
+		return frame, float(record['timestamp']), self.__header['tags'][record['tag']]
+
+	def CloseArchiveReader(self):
+		'''
+		 @brief Release the memory mapped chunks
+		'''
+		self.__chunks = {}
\ No newline at end of file
@@ -6,7 +6,9 @@
 '''
 import os, glob
 from imageTools import GetImage
-from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
+from FrameArchive import FrameArchiveReader, CheckFrameArchive
+from SessionIndex import LoadSessionIndex, CreateSessionIndex, SortFrameFilenames
+from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape, CheckColor
 
 '''
  @brief Set up image linke.
@@ -14,10 +16,14 @@ from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import
  @param folder (folder where the files are located)
  @param image_filenames (Single or multiple (list) images without structured light)
  @param sl_image_filenames (Single or multiple (list) images with structured light)
+ 	Frame archives (recorded with store_frames_in_archive) are replayed if both image directories are frame archive folders.
+ 	Images of a directory are replayed in order of the frame number in their filenames, and may be accessed randomly by SeekFrame().
 '''
 class ImageLink():
 	def __init__(self, folder, image_filenames, sl_image_filenames):
 		'''CONSTRUCTOR'''
+		self.__frameArchives 	= None
+		self.__sessionIndex 	= None
 		self.CheckFilenames(folder, image_filenames, sl_image_filenames)
 		self.OpenImage()
 
@@ -48,8 +54,17 @@ class ImageLink():
 				folder = ''
 				if not(os.path.isdir(image_filenames) and os.path.isdir(sl_image_filenames)):
 					raise Exception('Both sl filenams and normal filenams must be a directory')
-				self.__image_filenames 		= glob.glob(image_filenames+'/*.*')
-				self.__sl_image_filenames 	= glob.glob(sl_image_filenames+'/*.*')
+				if CheckFrameArchive(image_filenames) and CheckFrameArchive(sl_image_filenames):
+					self.__frameArchives 		= (FrameArchiveReader(os.path.join(image_filenames, '')), FrameArchiveReader(os.path.join(sl_image_filenames, '')))
+					n_frames 					= min(self.__frameArchives[0].GetNumberOfArchiveFrames(), self.__frameArchives[1].GetNumberOfArchiveFrames())
+					self.__image_filenames 		= range(n_frames) # Archive frame indices
+					self.__sl_image_filenames 	= range(n_frames)
+					self.__sessionIndex 		= CreateSessionIndex(n_frames, timestamps=self.__frameArchives[0].GetArchiveIndex()['timestamp'])
+					self.__folder 				= folder
+					return
+				self.__image_filenames 		= SortFrameFilenames(glob.glob(image_filenames+'/*.*'))
+				self.__sl_image_filenames 	= SortFrameFilenames(glob.glob(sl_image_filenames+'/*.*'))
+				self.__sessionIndex 		= LoadSessionIndex(image_filenames)
 			else:
 				self.__image_filenames 		= [image_filenames]
 				self.__sl_image_filenames 	= [sl_image_filenames]
@@ -67,9 +82,29 @@ class ImageLink():
 		'''
 		self.__frame_i 	= 0
 		self.__n_frames = len(self.__image_filenames)
+		if self.__sessionIndex == None or self.__sessionIndex.GetNumberOfFrames() != self.__n_frames:
+			self.__sessionIndex = CreateSessionIndex(self.__n_frames)
 		self.GetFrame() # Get frames for property possibilities
 		self.__frame_i 	= 0 #reset
 
+	def GetSessionIndex(self):
+		'''
+		 @brief Get the session index of the images
+
+		 @return sessionIndex (SessionIndex)
+		'''
+		return self.__sessionIndex
+
+	def SeekFrame(self, frame_i):
+		'''
+		 @brief Seek to a frame, so it is the next frame pulled by GetFrame().
+
+		 @param frame_i
+		'''
+		if frame_i < 0 or frame_i > self.__n_frames:
+			raise ValueError('Cannot seek to frame {0} of {1} frames'.format(frame_i, self.__n_frames))
+		self.__frame_i = frame_i
+
 	def GetTotalFrames(self):
 		'''
 		 @brief Get total frames in video
@@ -95,8 +130,12 @@ class ImageLink():
 
 		 @return frame, sl_frame
 		'''
-		self.__frame 	= GetImage(self.__folder + self.__image_filenames[self.__frame_i], gray=False)
-		self.__sl_frame = GetImage(self.__folder + self.__sl_image_filenames[self.__frame_i], gray=False)
+		if self.__frameArchives != None:
+			self.__frame 	= self.GetArchiveFrame(self.__frameArchives[0], self.__image_filenames[self.__frame_i])
+			self.__sl_frame = self.GetArchiveFrame(self.__frameArchives[1], self.__sl_image_filenames[self.__frame_i])
+		else:
+			self.__frame 	= GetImage(self.__folder + self.__image_filenames[self.__frame_i], gray=False)
+			self.__sl_frame = GetImage(self.__folder + self.__sl_image_filenames[self.__frame_i], gray=False)
 
 		if not(GetShape(self.__frame)[0] == GetShape(self.__sl_frame)[0]) or not(GetShape(self.__frame)[1] == GetShape(self.__sl_frame)[1]):
 			raise Exception('Normal image and sl image dimensions are not consistent.')
@@ -104,6 +143,20 @@ class ImageLink():
 		self.__frame_i += 1
 		return self.__frame, self.__sl_frame
 
+	def GetArchiveFrame(self, frameArchive, frame_i):
+		'''
+		 @brief Read frame from a frame archive, as a color frame (consistent with GetImage(gray=False)).
+
+		 @param frameArchive (FrameArchiveReader)
+		 @param frame_i
+
+		 @return frame
+		'''
+		frame = CheckColor(frameArchive.ReadArchiveFrame(frame_i)[0])
+		if not(frame.flags.writeable): # Memory mapped archive frame
+			frame = frame.copy()
+		return frame
+
 	def GetFrameNumber(self):
 		'''
 		 @brief Get current frame number
@@ -120,9 +173,11 @@ class ImageLink():
 
 	def StopImage(self):
 		'''
-		 @brief Stop image (do nothing actually..)
+		 @brief Stop image (release frame archives)
 		'''
-		pass
+		if self.__frameArchives != None:
+			for frameArchive in self.__frameArchives:
+				frameArchive.CloseArchiveReader()
 
 	def RestartCamera(self):
 		'''
@@ -4,11 +4,13 @@
  Project: Master's Thesis - Autonomous Inspection Of Wind Blades
  Repository: Master's Thesis - CV (Computer Vision)
 '''
-import cv2, threading
+import cv2, threading, time
 import numpy as np
 
 from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape, CheckColor
 from imageTools import WriteImage
+from FrameArchive import FrameArchiveWriter
+from SessionIndex import SessionIndexWriter
 from src.bin.tools import CheckDir, RunThread
 
 '''
@@ -18,9 +20,13 @@ from src.bin.tools import CheckDir, RunThread
  @param video_output_filename Filename for the output video
  @param store_frames_as_video Store frames as a video (True/False (default=True))
  @param store_frames_as_images Store each frame as an image in a subfolder 'frames' (True/False (default=True))
+ @param store_frames_in_archive Store the frames in a chunked frame archive (subfolder 'archive') instead of one image per frame, if store_frames_as_images is True (True/False (default=False))
+ @param archive_chunk_size Size of each archive chunk file in bytes (default=256 MB)
+ @param archive_compression zlib compression level (1-9) of archived frames, 0 for raw frames (default=0)
+ 	A session index (<video_output_filename>_index.bin) with the timestamp of each frame is written next to the video and image frames, for random access replay.
 '''
 class RecordFrames():
-	def __init__(self, fps, folder, video_output_filename, store_frames_as_video=True, store_frames_as_images=True):
+	def __init__(self, fps, folder, video_output_filename, store_frames_as_video=True, store_frames_as_images=True, store_frames_in_archive=False, archive_chunk_size=256*1024*1024, archive_compression=0):
 		'''CONSTRUCTOR'''
 		self.__folder 					= folder
 		self.__video_output_filename 	= video_output_filename
@@ -28,7 +34,11 @@ class RecordFrames():
 		self.__frame_i 					= 0
 		self.__store_frames_as_video 	= store_frames_as_video
 		self.__store_frames_as_images 	= store_frames_as_images
+		self.__store_frames_in_archive 	= store_frames_in_archive
+		self.__archive_chunk_size 		= archive_chunk_size
+		self.__archive_compression 		= archive_compression
 		self.__write_lock 				= threading.Lock()
+		self.__sessionIndex 			= None
 
 	def GetNumberOfRecordedFrames(self):
 		'''
@@ -53,8 +63,10 @@ class RecordFrames():
 		 	Creates a folder for the video, called by the same video filename,
 		 	and creates a subfolder for storing each frame.
 		'''
-		# Create frames folder
-		if self.__store_frames_as_images:
+		# Create frames folder (or frame archive)
+		if self.__store_frames_as_images and self.__store_frames_in_archive:
+			self.__frameArchive = FrameArchiveWriter(self.__folder + self.__video_output_filename+'_archive/', chunk_size=self.__archive_chunk_size, compression_level=self.__archive_compression)
+		elif self.__store_frames_as_images:
 			self.__frames_folder = self.__folder + self.__video_output_filename+'_frames/'
 			CheckDir(self.__frames_folder)
 
@@ -62,6 +74,10 @@ class RecordFrames():
 			# Define the codec and create VideoWriter object
 			fourcc = cv2.VideoWriter_fourcc(*'MJPG')
 			self.video_out = cv2.VideoWriter(filename=self.__folder + self.__video_output_filename+'.avi', fourcc=fourcc, fps=self.__fps, frameSize=(self.__width, self.__height), isColor=True)
+
+		# Create session index (MJPG video frames and image frames are all keyframes)
+		if self.__store_frames_as_video or (self.__store_frames_as_images and not(self.__store_frames_in_archive)):
+			self.__sessionIndex = SessionIndexWriter(self.__folder + self.__video_output_filename+'.avi')
 		
 		self.__frame_i = 0
 
@@ -71,32 +87,42 @@ class RecordFrames():
 		'''
 		RunThread(self.WriteFrame, args=(frame,), lock=self.__write_lock, wait_lock=True)
 
-	def WriteFrame(self, frame):
+	def WriteFrame(self, frame, timestamp=None):
 		'''
 		 @brief Write new frame to output video
 
 		 @param frame Frame to write
+		 @param timestamp Capture time of the frame (unix time) stored in the frame archive and session index, None for the current time (default=None)
 		'''
 		with self.__write_lock:
 			if self.__frame_i == 0:
 				self.InitRecording(frame)
+			if timestamp == None:
+				timestamp = time.time()
 			if not(frame.dtype == np.uint8 or frame.dtype == np.uint16):
 				frame = frame.astype(np.uint16)
 			if self.__store_frames_as_video:
 				self.video_out.write(CheckColor(frame))
-			if self.__store_frames_as_images:
+			if self.__store_frames_as_images and self.__store_frames_in_archive:
+				self.__frameArchive.WriteArchiveFrame(frame, tag=self.__video_output_filename, timestamp=timestamp)
+			elif self.__store_frames_as_images:
 				WriteImage(frame, self.__frames_folder + self.__video_output_filename + '_' + str(self.__frame_i))
+			if self.__sessionIndex != None:
+				self.__sessionIndex.AppendSessionIndex(self.__frame_i, timestamp)
 			self.__frame_i += 1
 
 	def CloseRecording(self):
 		'''
 		 @Stop video recording
 		'''
-		if self.__frame_i > 0:
-			if self.__write_lock.locked():
-				pass
-			if self.__store_frames_as_video:
-				self.video_out.release()
+		with self.__write_lock: # Wait for a frame being written
+			if self.__frame_i > 0:
+				if self.__store_frames_as_video:
+					self.video_out.release()
+				if self.__store_frames_as_images and self.__store_frames_in_archive:
+					self.__frameArchive.CloseArchive()
+				if self.__sessionIndex != None:
+					self.__sessionIndex.CloseSessionIndex()
 
 	def __del__(self):
 		'''DESTRUCTOR'''
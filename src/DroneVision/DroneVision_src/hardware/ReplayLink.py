@@ -0,0 +1,217 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import time
+
+'''
+ @brief Replay engine of a recorded session (VideoLink or ImageLink), used in place of the camera link.
+ 	Replays the frames start_frame to end_frame (exclusive) with the given stride, using the session index of the recording
+ 	for random access (SeekFrame(), SeekTime()), so a segment is replayed without decoding the frames before it.
+ 	Frames are paced by their recorded timestamps if rate > 0 (1.0 = real time, 2.0 = double speed),
+ 	or replayed as fast as possible if rate = 0. A replay slower than the rate is not caught up by skipping frames.
+ 	GetFrameNumber() and GetTotalFrames() count the frames of the range (from start_frame, by stride), so the replay finishes at the end of the range.
+
+ @param link (VideoLink or ImageLink)
+ @param start_frame (First replayed frame (default=0))
+ @param end_frame (Replay until this frame (exclusive), None for the end of the recording (default=None))
+ @param stride (Replay every stride frame (default=1))
+ @param rate (Replay rate relative to real time, 0 for as fast as possible (default=0.0))
+'''
+class ReplayLink():
+	def __init__(self, link, start_frame=0, end_frame=None, stride=1, rate=0.0):
+		'''CONSTRUCTOR'''
+		self.__link 			= link
+		self.__stride 			= max(1, int(stride))
+		self.__rate 			= rate
+		self.__frame_timestamp 	= None
+		self.__replay_frame_i 	= None
+		self.SetReplayRange(start_frame, end_frame)
+
+	def CheckManualTriggering(self):
+		'''
+		 @brief Check if manual triggering is turned ON
+
+		 @return True/False
+		'''
+		return False
+
+	def StartCamera(self):
+		'''
+		 @brief Method for syncronizing with the CameraLink class.
+		 	Restarts the replay from the start of the range.
+		'''
+		self.__link.StartCamera()
+		self.SeekFrame(self.__start_frame)
+
+	def GetLink(self):
+		'''
+		 @brief Get the replayed link
+
+		 @return link (VideoLink or ImageLink)
+		'''
+		return self.__link
+
+	def GetSessionIndex(self):
+		'''
+		 @brief Get the session index of the replayed recording
+
+		 @return sessionIndex (SessionIndex)
+		'''
+		return self.__link.GetSessionIndex()
+
+	def SetReplayRange(self, start_frame=0, end_frame=None):
+		'''
+		 @brief Set the range of replayed frames, and seek to the start of it.
+
+		 @param start_frame (default=0)
+		 @param end_frame (exclusive, None for the end of the recording (default=None))
+		'''
+		n_frames = self.GetSessionIndex().GetNumberOfFrames()
+		if end_frame == None or end_frame < 0 or end_frame > n_frames:
+			end_frame = n_frames
+		self.__start_frame 	= min(max(0, int(start_frame)), end_frame)
+		self.__end_frame 	= end_frame
+		self.SeekFrame(self.__start_frame)
+
+	def GetReplayRange(self):
+		'''
+		 @brief Get the range of replayed frames
+
+		 @return start_frame, end_frame (exclusive)
+		'''
+		return self.__start_frame, self.__end_frame
+
+	def SetReplayStride(self, stride):
+		'''
+		 @brief Set replay stride (replay every stride frame)
+
+		 @param stride
+		'''
+		self.__stride = max(1, int(stride))
+		self.ResetReplayPacing()
+
+	def SetReplayRate(self, rate):
+		'''
+		 @brief Set replay rate
+
+		 @param rate (Rate relative to real time, 0 for as fast as possible)
+		'''
+		self.__rate = rate
+		self.ResetReplayPacing()
+
+	def ResetReplayPacing(self):
+		'''
+		 @brief Reset pacing, so the next frame is replayed immediately and the following frames are paced from it.
+		'''
+		self.__pace_start = None
+
+	def SeekFrame(self, frame_i):
+		'''
+		 @brief Seek to a frame of the recording, so it is the next replayed frame.
+
+		 @param frame_i (Frame number of the recording)
+		'''
+		self.__next_frame_i = min(max(0, int(frame_i)), self.__end_frame)
+		self.ResetReplayPacing()
+
+	def FindReplayFrame(self, seconds):
+		'''
+		 @brief Find the first frame captured at or after the given time into the recording.
+
+		 @param seconds (Time since the first frame of the recording)
+
+		 @return frame_i (Frame number of the recording)
+		'''
+		sessionIndex = self.GetSessionIndex()
+		if sessionIndex.GetNumberOfFrames() == 0:
+			return 0
+		return sessionIndex.FindFrameNumber(sessionIndex.GetFrameTimestamp(0) + seconds)
+
+	def SeekTime(self, seconds):
+		'''
+		 @brief Seek to the first frame captured at or after the given time into the recording.
+
+		 @param seconds (Time since the first frame of the recording)
+		'''
+		self.SeekFrame(self.FindReplayFrame(seconds))
+
+	def GetTotalFrames(self):
+		'''
+		 @brief Get number of frames in the replay (range and stride)
+
+		 @return n_frames
+		'''
+		return len(xrange(self.__start_frame, self.__end_frame, self.__stride))
+
+	def GetFrameProperties(self):
+		'''
+		 @brief Get frame properties such as fps, width, length
+
+		 @return fps, width, height
+		'''
+		return self.__link.GetFrameProperties()
+
+	def GetFrame(self, get_normal_frame_only=False):
+		'''
+		 @brief Pull the next replayed frame and structured light frame, paced by the replay rate.
+
+		 @param get_normal_frame_only (Only implemented to fit with the CameraLink)
+
+		 @return frame, sl_frame
+		'''
+		frame_i = self.__next_frame_i
+		if frame_i >= self.__end_frame:
+			raise TypeError('Cannot pull new frame')
+		if self.__link.GetFrameNumber() != frame_i:
+			self.__link.SeekFrame(frame_i)
+		frame, sl_frame = self.__link.GetFrame(get_normal_frame_only=get_normal_frame_only)
+		timestamp = self.GetSessionIndex().GetFrameTimestamp(frame_i)
+		if self.__rate > 0:
+			if self.__pace_start == None:
+				self.__pace_start = (time.time(), timestamp)
+			delay = self.__pace_start[0] + (timestamp - self.__pace_start[1])/self.__rate - time.time()
+			if delay > 0:
+				time.sleep(delay)
+		self.__frame_timestamp 	= timestamp
+		self.__replay_frame_i 	= frame_i
+		self.__next_frame_i 	= frame_i + self.__stride
+		return frame, sl_frame
+
+	def GetFrameNumber(self):
+		'''
+		 @brief Get number of frames of the range before the next replayed frame (replayed, or skipped by a seek)
+
+		 @return frame_i
+		'''
+		return len(xrange(self.__start_frame, self.__next_frame_i, self.__stride))
+
+	def GetReplayFrameNumber(self):
+		'''
+		 @brief Get frame number (in the recording) of the last replayed frame
+
+		 @return frame_i (None if no frames are replayed)
+		'''
+		return self.__replay_frame_i
+
+	def GetFrameTimestamp(self):
+		'''
+		 @brief Get recorded timestamp of the last replayed frame
+
+		 @return timestamp (None if no frames are replayed)
+		'''
+		return self.__frame_timestamp
+
+	def StopCamera(self):
+		'''
+		 @brief Method for syncronizing with the CameraLink class.
+		'''
+		self.__link.StopCamera()
+
+	def RestartCamera(self):
+		'''
+		 @brief Simulating restart
+		'''
+		self.__link.RestartCamera()
\ No newline at end of file
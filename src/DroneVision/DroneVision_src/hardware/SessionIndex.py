@@ -0,0 +1,192 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import os, re
+import numpy as np
+
+'''
+ Session index layout (<recording name>_index.bin, next to <recording name>.avi and <recording name>_frames/):
+ 	one SESSION_INDEX_DTYPE record per recorded frame, appended while recording.
+ 	keyframe is 1 for frames which may be decoded directly after a seek (all frames of MJPG videos and image folders).
+'''
+SESSION_INDEX_DTYPE = np.dtype([('frame_i', '<u8'), ('timestamp', '<f8'), ('keyframe', 'u1')])
+
+def GetSessionIndexFilename(recording):
+	'''
+	 @brief Get the session index filename of a recorded video file or image folder.
+	 	'<name>.avi' and '<name>_frames/' both give '<name>_index.bin'.
+
+	 @param recording (Video filename or image folder)
+
+	 @return index_filename
+	'''
+	name = os.path.splitext(recording.rstrip('/'))[0]
+	if name.endswith('_frames'):
+		name = name[:-len('_frames')]
+	return name + '_index.bin'
+
+def GetFrameNumberFromFilename(filename):
+	'''
+	 @brief Get the frame number of a recorded image filename ('<name>_<frame_i>.<ext>').
+
+	 @param filename
+
+	 @return frame_i (None if the filename does not end with a frame number)
+	'''
+	match = re.search(r'([0-9]+)$', os.path.splitext(os.path.basename(filename))[0])
+	if match == None:
+		return None
+	return int(match.group(1))
+
+def SortFrameFilenames(filenames):
+	'''
+	 @brief Sort recorded image filenames by frame number (filenames without a frame number are sorted by name, after the numbered filenames).
+
+	 @param filenames
+
+	 @return sorted filenames
+	'''
+	def SortKey(filename):
+		frame_i = GetFrameNumberFromFilename(filename)
+		return (frame_i == None, frame_i, filename)
+	return sorted(filenames, key=SortKey)
+
+def LoadSessionIndex(recording):
+	'''
+	 @brief Load the session index of a recorded video file or image folder.
+
+	 @param recording (Video filename or image folder)
+
+	 @return sessionIndex (None if the recording has no session index)
+	'''
+	index_filename = GetSessionIndexFilename(recording)
+	if not(os.path.isfile(index_filename)):
+		return None
+	return SessionIndex(np.fromfile(index_filename, dtype=SESSION_INDEX_DTYPE))
+
+def CreateSessionIndex(n_frames, fps=1.0, keyframes=True, timestamps=None):
+	'''
+	 @brief Create a session index of frames with a constant frame rate (for recordings without a stored session index).
+
+	 @param n_frames
+	 @param fps (frames per second (default=1.0))
+	 @param keyframes (True if all frames are keyframes, False if only the first frame is a keyframe (default=True))
+	 @param timestamps (timestamps of the frames, None for timestamps given by the frame rate (default=None))
+
+	 @return sessionIndex
+	'''
+	index 				= np.zeros(int(n_frames), dtype=SESSION_INDEX_DTYPE)
+	index['frame_i'] 	= np.arange(int(n_frames))
+	if timestamps is None:
+		index['timestamp'] = index['frame_i']/float(fps if fps > 0 else 1.0)
+	else:
+		index['timestamp'] = timestamps[:int(n_frames)]
+	index['keyframe'] 	= 1 if keyframes else 0
+	if n_frames > 0:
+		index['keyframe'][0] = 1
+	return SessionIndex(index)
+
+'''
+ @brief Session index, mapping frame numbers to timestamps and keyframes of a recording.
+
+ @param index (numpy array of SESSION_INDEX_DTYPE records, ordered by frame number)
+'''
+class SessionIndex():
+	def __init__(self, index):
+		'''CONSTRUCTOR'''
+		self.__index 		= index
+		self.__keyframes 	= np.flatnonzero(index['keyframe'])
+
+	def GetSessionIndex(self):
+		'''
+		 @brief Get the index records
+
+		 @return index (numpy array of SESSION_INDEX_DTYPE records)
+		'''
+		return self.__index
+
+	def GetNumberOfFrames(self):
+		'''
+		 @brief Get number of indexed frames
+
+		 @return n_frames
+		'''
+		return len(self.__index)
+
+	def GetTimestamps(self):
+		'''
+		 @brief Get timestamps of all frames
+
+		 @return timestamps (numpy array)
+		'''
+		return self.__index['timestamp']
+
+	def GetFrameTimestamp(self, frame_i):
+		'''
+		 @brief Get timestamp of a frame
+
+		 @param frame_i
+
+		 @return timestamp
+		'''
+		return self.__index['timestamp'][frame_i]
+
+	def FindFrameNumber(self, timestamp):
+		'''
+		 @brief Find the first frame captured at or after the timestamp.
+
+		 @param timestamp
+
+		 @return frame_i (number of frames if all frames are captured before the timestamp)
+		'''
+		return int(np.searchsorted(self.__index['timestamp'], timestamp, side='left'))
+
+	def GetKeyframe(self, frame_i):
+		'''
+		 @brief Get the last keyframe at or before the frame (where decoding must start to read the frame after a seek).
+
+		 @param frame_i
+
+		 @return keyframe_i
+		'''
+		i = np.searchsorted(self.__keyframes, frame_i, side='right') - 1
+		if i < 0:
+			return 0
+		return int(self.__keyframes[i])
+
+'''
+ @brief Writer of a session index, appending a record for each recorded frame.
+ 	Records are appended (and flushed) while recording, so the index may be read while the session is recorded.
+
+ @param recording (Video filename or image folder of the recording)
+'''
+class SessionIndexWriter():
+	def __init__(self, recording):
+		'''CONSTRUCTOR'''
+		self.__f = open(GetSessionIndexFilename(recording), 'wb')
+
+	def AppendSessionIndex(self, frame_i, timestamp, keyframe=True):
+		'''
+		 @brief Append a frame to the session index
+
+		 @param frame_i
+		 @param timestamp
+		 @param keyframe (True/False (default=True))
+		'''
+		record = np.array([(frame_i, timestamp, keyframe)], dtype=SESSION_INDEX_DTYPE)
+		self.__f.write(record.tobytes())
+		self.__f.flush()
+
+	def CloseSessionIndex(self):
+		'''
+		 @brief Close the session index
+		'''
+		if not(self.__f.closed):
+			self.__f.close()
+
+	def __del__(self):
+		'''DESTRUCTOR'''
+		self.CloseSessionIndex()
\ No newline at end of file
@@ -5,22 +5,33 @@
  Repository: Master's Thesis - CV (Computer Vision
 '''
 
-import cv2, os
+import cv2, os, threading, timeit, Queue
+from SessionIndex import LoadSessionIndex, CreateSessionIndex
 
 '''
  @brief Class for reading of a video file.
+ 	The session index of the video (recorded by RecordFrames, or created from the frame rate on opening) gives random access to the frames by SeekFrame().
+ 	If prefetch_size > 0, the normal and sl videos are decoded concurrently by two read-ahead threads, each into a bounded queue of prefetch_size frames,
+ 	and GetFrame() pulls the next (frame, sl_frame) pair from the queues, so decoding overlaps the processing of the previous frames.
+ 	The effective frame rate, and the share of it spent waiting for decoding, is reported when the video is stopped (GetVideoReadStatus()).
 
  @param video_filename
  @param sl_video_filename
+ @param prefetch_size (Number of frames decoded ahead, 0 for decoding in GetFrame() (default=0))
 '''
 class VideoLink():
-	def __init__(self, video_filename, sl_video_filename):
+	def __init__(self, video_filename, sl_video_filename, prefetch_size=0):
 		'''CONSTRUCTOR'''
 		self.__video_filename 		= video_filename
 		self.__sl_video_filename 	= sl_video_filename
+		self.__prefetch_size 		= prefetch_size
 		self.__frame_i 				= 0
 		self.__n_frames 			= 0
 		self.__vid_open				= False
+		self.__readAheadThreads 	= []
+		self.__readAheadQueues 		= []
+		self.__stop_read_ahead 		= threading.Event()
+		self.ResetVideoReadStatus()
 
 		self.OpenVideo()
 
@@ -44,6 +55,8 @@ class VideoLink():
 		'''
 		if not(os.path.isfile(self.__video_filename)) or not(os.path.isfile(self.__sl_video_filename)):
 			raise Exception('Video file does not exist')
+		self.StopReadAhead()
+		self.ResetVideoReadStatus()
 		self.__vidcap 		= cv2.VideoCapture()
 		self.__sl_vidcap 	= cv2.VideoCapture()
 		self.__vidcap.open(self.__video_filename)
@@ -59,8 +72,105 @@ class VideoLink():
 		if not(self.__vidcap.get(cv2.CAP_PROP_FRAME_WIDTH) == self.__sl_vidcap.get(cv2.CAP_PROP_FRAME_WIDTH)) or not(self.__vidcap.get(cv2.CAP_PROP_FRAME_HEIGHT) == self.__sl_vidcap.get(cv2.CAP_PROP_FRAME_HEIGHT)):
 			raise Exception('Dimensions for the normal video and the sl video is not consistent.')
 		
-		self.__n_frames 	= self.__vidcap.get(cv2.CAP_PROP_FRAME_COUNT)
-		self.__vid_open		= True
+		self.__n_frames 		= self.__vidcap.get(cv2.CAP_PROP_FRAME_COUNT)
+		self.__vid_open			= True
+		self.__capture_frame_i 	= [0, 0] # Decoded frames of the normal and sl video
+		self.OpenSessionIndex()
+		self.StartReadAhead()
+
+	def StartReadAhead(self):
+		'''
+		 @brief Start the read-ahead threads (if prefetch_size > 0), decoding from the current frame.
+		'''
+		if self.__prefetch_size > 0 and self.__vid_open and len(self.__readAheadThreads) == 0:
+			self.__stop_read_ahead.clear()
+			self.__readAheadQueues 	= [Queue.Queue(self.__prefetch_size), Queue.Queue(self.__prefetch_size)]
+			self.__readAheadThreads = [threading.Thread(target=self.RunReadAhead, args=(i,)) for i in range(2)]
+			for thread in self.__readAheadThreads:
+				thread.daemon = True
+				thread.start()
+
+	def RunReadAhead(self, capture_i):
+		'''
+		 @brief Decode frames of one video into its read-ahead queue, until the end of the video (queued as None) or the read-ahead is stopped.
+		 	Executed in a read-ahead thread.
+
+		 @param capture_i (0 = normal video, 1 = sl video)
+		'''
+		vidcap 	= [self.__vidcap, self.__sl_vidcap][capture_i]
+		queue 	= self.__readAheadQueues[capture_i]
+		while not(self.__stop_read_ahead.is_set()):
+			success, frame = vidcap.read()
+			if success:
+				self.__capture_frame_i[capture_i] += 1
+			else:
+				frame = None
+			while not(self.__stop_read_ahead.is_set()):
+				try:
+					queue.put(frame, timeout=0.1)
+					break
+				except Queue.Full:
+					continue
+			if frame is None:
+				break
+
+	def StopReadAhead(self):
+		'''
+		 @brief Stop the read-ahead threads, and discard the prefetched frames.
+		'''
+		if len(self.__readAheadThreads) > 0:
+			self.__stop_read_ahead.set()
+			for thread in self.__readAheadThreads:
+				thread.join()
+			self.__readAheadThreads = []
+			self.__readAheadQueues 	= []
+
+	def OpenSessionIndex(self):
+		'''
+		 @brief Load the session index of the video, or create it from the frame rate if the video has no (consistent) session index.
+		 	Only frames of intra-frame videos (MJPG) are all keyframes in a created index, otherwise the video is decoded from the first frame after a seek.
+		'''
+		self.__sessionIndex = LoadSessionIndex(self.__video_filename)
+		if self.__sessionIndex == None or self.__sessionIndex.GetNumberOfFrames() != int(self.__n_frames):
+			fourcc 				= int(self.__vidcap.get(cv2.CAP_PROP_FOURCC))
+			codec 				= ''.join([chr((fourcc >> 8*i) & 0xFF) for i in range(4)])
+			self.__sessionIndex = CreateSessionIndex(self.__n_frames, self.__vidcap.get(cv2.CAP_PROP_FPS), keyframes=(codec.upper() == 'MJPG'))
+
+	def GetSessionIndex(self):
+		'''
+		 @brief Get the session index of the video
+
+		 @return sessionIndex (SessionIndex)
+		'''
+		return self.__sessionIndex
+
+	def SeekFrame(self, frame_i):
+		'''
+		 @brief Seek to a frame, so it is the next frame pulled by GetFrame().
+		 	Short forward seeks skip frames (prefetched frames, or frames grabbed without decoding), otherwise the videos are set to the last keyframe before the frame.
+
+		 @param frame_i
+		'''
+		if frame_i < 0 or frame_i > self.__n_frames:
+			raise ValueError('Cannot seek to frame {0} of {1} frames'.format(frame_i, int(self.__n_frames)))
+		if frame_i == self.__frame_i:
+			return
+		if len(self.__readAheadThreads) > 0 and self.__frame_i < frame_i <= self.__frame_i + self.__prefetch_size:
+			while self.__frame_i < frame_i:
+				self.GetFrame()
+			return
+		self.StopReadAhead()
+		keyframe_i = self.__sessionIndex.GetKeyframe(frame_i)
+		for capture_i, vidcap in enumerate([self.__vidcap, self.__sl_vidcap]):
+			if not(keyframe_i <= self.__capture_frame_i[capture_i] <= frame_i):
+				vidcap.set(cv2.CAP_PROP_POS_FRAMES, keyframe_i)
+				self.__capture_frame_i[capture_i] = keyframe_i
+			while self.__capture_frame_i[capture_i] < frame_i:
+				if not(vidcap.grab()):
+					raise TypeError('Cannot seek to frame {0}'.format(frame_i))
+				self.__capture_frame_i[capture_i] += 1
+		self.__frame_i = frame_i
+		self.StartReadAhead()
 
 	def GetTotalFrames(self):
 		'''
@@ -89,15 +199,37 @@ class VideoLink():
 
 		 @return frame, sl_frame
 		'''
-		success, frame = self.__vidcap.read()
-		if success == False:
-			raise TypeError('Cannot pull new frame')
-
-		sl_frame = self.GetSLFrame()
+		timer = timeit.default_timer()
+		if len(self.__readAheadThreads) > 0:
+			frame, sl_frame = self.GetReadAheadFrames()
+		else:
+			success, frame = self.__vidcap.read()
+			if success == False:
+				raise TypeError('Cannot pull new frame')
+			self.__capture_frame_i[0] += 1
+			sl_frame = self.GetSLFrame()
+		self.UpdateVideoReadStatus(timer)
 
 		self.__frame_i += 1
 		return frame, sl_frame
 
+	def GetReadAheadFrames(self):
+		'''
+		 @brief Pull the next frame and sl frame from the read-ahead queues (waiting for them to be decoded).
+
+		 @return frame, sl_frame
+		'''
+		frame 		= self.__readAheadQueues[0].get()
+		sl_frame 	= self.__readAheadQueues[1].get()
+		for queue, queued_frame in zip(self.__readAheadQueues, [frame, sl_frame]):
+			if queued_frame is None:
+				queue.put(None) # End of video for the following calls too
+		if frame is None:
+			raise TypeError('Cannot pull new frame')
+		if sl_frame is None:
+			raise TypeError('Cannot pull new sl frame')
+		return frame, sl_frame
+
 	def GetSLFrame(self):
 		'''
 		 @brief Pull new structured light (SL) frame from the stored video
@@ -107,8 +239,41 @@ class VideoLink():
 		success, frame = self.__sl_vidcap.read()
 		if success == False:
 			raise TypeError('Cannot pull new sl frame')
+		self.__capture_frame_i[1] += 1
 		return frame
 
+	def ResetVideoReadStatus(self):
+		'''
+		 @brief Reset the frame rate status
+		'''
+		self.__read_status = {'frames': 0, 'wait': 0.0, 'first_frame_time': None, 'last_frame_time': None}
+
+	def UpdateVideoReadStatus(self, timer):
+		'''
+		 @brief Update the frame rate status with a pulled frame
+
+		 @param timer (Time GetFrame() was called (timeit.default_timer()))
+		'''
+		now = timeit.default_timer()
+		if self.__read_status['first_frame_time'] == None:
+			self.__read_status['first_frame_time'] = timer
+		self.__read_status['last_frame_time'] 	= now
+		self.__read_status['frames'] 			+= 1
+		self.__read_status['wait'] 				+= now - timer
+
+	def GetVideoReadStatus(self):
+		'''
+		 @brief Get the frame rate status of the pulled frames
+
+		 @return status (dictionary: 'frames' pulled, 'elapsed' time from the first to the last pulled frame, effective 'fps', 'wait' time in GetFrame() (decoding or waiting for the read-ahead), and 'prefetch_size')
+		'''
+		status 				= {'frames': self.__read_status['frames'], 'wait': self.__read_status['wait'], 'elapsed': 0.0, 'fps': 0.0, 'prefetch_size': self.__prefetch_size}
+		if status['frames'] > 0:
+			status['elapsed'] = self.__read_status['last_frame_time'] - self.__read_status['first_frame_time']
+			if status['elapsed'] > 0:
+				status['fps'] = status['frames']/status['elapsed']
+		return status
+
 	def GetFrameNumber(self):
 		'''
 		 @brief Get current frame number
@@ -126,9 +291,15 @@ class VideoLink():
 	def StopVideo(self):
 		'''
 		 @brief Stop and release video instance.
+		 	The effective frame rate of the pulled frames is reported.
 		'''
 		if self.__vid_open:
+			self.StopReadAhead()
+			status = self.GetVideoReadStatus()
+			if status['frames'] > 0:
+				print 'Video replay: {0} frames at {1:.2f} fps effective, {2:.1f}% of the time waiting for decoding (read-ahead {3} frames)'.format(status['frames'], status['fps'], 100.0*status['wait']/status['elapsed'] if status['elapsed'] > 0 else 0.0, status['prefetch_size'])
 			self.__vidcap.release()
+			self.__sl_vidcap.release()
 			self.__vid_open = False
 
 	def RestartCamera(self):
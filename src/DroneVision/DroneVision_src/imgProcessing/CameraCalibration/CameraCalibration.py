@@ -6,12 +6,61 @@
 '''
 import cv2
 import numpy as np
-import glob, os
+import glob, os, hashlib
+from multiprocessing import Pool
 from src.bin.SaveParameters import SaveParameters
 from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import CheckGrayScale, GetShape
 from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage, RealTimePlot
 from src.DroneVision.DroneVision_src.hardware.PyQtImage import PyQtImage
 
+def _FindChessboardCornersWorker(args):
+	'''
+	 @brief Find and refine the chessboard corners of a calibration image.
+	 	Module level function, so that it may be used by a process pool.
+	 	If search_divisor > 1, then the chessboard is searched for in a downscaled copy of the image first, 
+	 	and the corners are mapped up and refined with cornerSubPix in full resolution. 
+	 	The full resolution image is searched if the chessboard is not found in the downscaled copy.
+
+	 @param args (fname, pattern_size, criteria, search_divisor, use_sb)
+
+	 @return gray_shape, corners (corners = None if the chessboard was not found)
+	'''
+	fname, pattern_size, criteria, search_divisor, use_sb = args
+	gray 		= CheckGrayScale(GetImage(fname, gray=False))
+	gray_shape 	= GetShape(gray)
+	use_sb 		= use_sb and hasattr(cv2, 'findChessboardCornersSB')
+	if search_divisor > 1:
+		small_gray 		= cv2.resize(gray, (gray_shape[1]//search_divisor, gray_shape[0]//search_divisor), interpolation=cv2.INTER_AREA)
+		ret, corners 	= FindChessboard(small_gray, pattern_size, use_sb)
+		if ret:
+			scale_x = gray_shape[1]/float(small_gray.shape[1])
+			scale_y = gray_shape[0]/float(small_gray.shape[0])
+			corners = corners.astype(np.float32)
+			corners[:,:,0] = (corners[:,:,0] + 0.5)*scale_x - 0.5
+			corners[:,:,1] = (corners[:,:,1] + 0.5)*scale_y - 0.5
+			return gray_shape, cv2.cornerSubPix(gray, corners, (11,11), (-1,-1), criteria)
+	ret, corners = FindChessboard(gray, pattern_size, use_sb)
+	if not(ret):
+		return gray_shape, None
+	return gray_shape, cv2.cornerSubPix(gray, corners, (11,11), (-1,-1), criteria)
+
+def FindChessboard(gray, pattern_size, use_sb=False):
+	'''
+	 @brief Find chessboard corners with findChessboardCorners, or the sector based findChessboardCornersSB.
+
+	 @param gray
+	 @param pattern_size (rows, columns)
+	 @param use_sb (True for using findChessboardCornersSB - must be available in the installed opencv version (default=False))
+
+	 @return ret, corners
+	'''
+	if use_sb:
+		ret, corners = cv2.findChessboardCornersSB(gray, pattern_size, flags=cv2.CALIB_CB_NORMALIZE_IMAGE)
+	else:
+		flags 		 = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK
+		ret, corners = cv2.findChessboardCorners(gray, pattern_size, flags=flags)
+	return ret, corners
+
 '''
  @brief Camera calibration class. Follow steps on the opencv page:
  	http://docs.opencv.org/3.1.0/dc/dbb/tutorial_py_calibration.html
@@ -31,6 +80,10 @@ from src.DroneVision.DroneVision_src.hardware.PyQtImage import PyQtImage
  	 - calib_chess_rows Number of rows of the chessboard (innen chessboard)
  	 - calib_chess_columns Number of columns of the chessboard (innen chessboard)
  	 - save_calib_param_to_json Save calibration parameters to json readable file (False will save parameters to python pickle file)
+ 	 - calib_workers Number of worker processes for the chessboard corner detection.
+ 	 - calib_corner_cache Cache detected chessboard corners on disk.
+ 	 - calib_search_divisor Divisor of the downscaled copy used to search for the chessboard (<= 1 for full resolution search).
+ 	 - calib_use_sb Use findChessboardCornersSB if available.
  @param calib_folder Folder with calibration images. 
  @param calib_save_fname Filename of saved calibration parameters
  @param reset (True/False)
@@ -49,6 +102,12 @@ class CameraCalibration():
 		self.__print_process 			= settings_inst.GetSettings('calib_print_process')
 		self.__calib_chess_rows 		= settings_inst.GetSettings('calib_chess_rows')
 		self.__calib_chess_columns 		= settings_inst.GetSettings('calib_chess_columns')
+		self.__calib_workers 			= settings_inst.GetSettings('calib_workers')
+		self.__use_corner_cache 		= settings_inst.GetSettings('calib_corner_cache')
+		self.__corner_cache_folder 		= settings_inst.GetSettings('calib_save_folder') + 'corner_cache/'
+		self.__search_divisor 			= settings_inst.GetSettings('calib_search_divisor')
+		self.__use_sb 					= settings_inst.GetSettings('calib_use_sb')
+		self.__criteria 				= (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001) # termination criteria
 		self.__distortion_calibrated 	= False
 		self.__calib_reset 				= reset
 		self.__plot_figure 				= plot_figure
@@ -183,16 +242,23 @@ class CameraCalibration():
 		'''
 		 @brief Set initial calibration parameters.
 		'''
-		# termination criteria
-		self.__criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-		
 		# prepare object points, like (0,0,0), (1,0,0), (2,0,0) ....,(6,5,0)
-		self.__objp 		= np.zeros((self.__calib_chess_columns*self.__calib_chess_rows,3), np.float32)
-		self.__objp[:,:2] 	= np.mgrid[0:self.__calib_chess_rows,0:self.__calib_chess_columns].T.reshape(-1,2)
+		self.__objp = self.GetChessboardObjectPoints()
 
 		# Arrays to store object points and image points from all the images.
 		self.__calib_params['objpoints'] = [] # 3d point in real world space
 		self.__calib_params['imgpoints'] = [] # 2d points in image plane.
+		self.__calib_params['imgpoints_fnames'] = [] # Filenames of the images belonging to the image points.
+
+	def GetChessboardObjectPoints(self):
+		'''
+		 @brief Get object points of the chessboard corners, like (0,0,0), (1,0,0), (2,0,0) ....,(6,5,0)
+
+		 @return objp
+		'''
+		objp 		= np.zeros((self.__calib_chess_columns*self.__calib_chess_rows,3), np.float32)
+		objp[:,:2] 	= np.mgrid[0:self.__calib_chess_rows,0:self.__calib_chess_columns].T.reshape(-1,2)
+		return objp
 
 	def SetDistortionCalibImages(self):
 		'''
@@ -204,6 +270,16 @@ class CameraCalibration():
 		if len(self.__calib_img_fnames) == 0:
 			raise Exception('No calibration images present in calibration folder: {0}, of type: {1}'.format(self.__calib_folder, self.__image_type))
 
+	def CheckDistortionCalibImages(self):
+		'''
+		 @brief Check if distortion calibration images are present in the calibration folder
+
+		 @return True/False
+		'''
+		if not(os.path.isdir('./'+self.__calib_folder)):
+			return False
+		return len(glob.glob(self.__calib_folder+'*.'+self.__image_type)) > 0
+
 	def GetDistorionCalibImages(self):
 		'''
 		 @brief Get all distortion calibration image filenames
@@ -221,38 +297,34 @@ class CameraCalibration():
 			realTimePlot = self.GetNewRealTimePlot()
 
 		ret_calib 	= False
-		for i in range(len(self.__calib_img_fnames)):
-			fname 		= self.__calib_img_fnames[i]
-			img 		= GetImage(fname, gray=False)
-			gray 		= CheckGrayScale(img)
-			gray_shape 	= GetShape(gray)
+		detections 	= self.DetectChessboardCorners(self.__calib_img_fnames)
+		for i in range(len(detections)):
+			fname, gray_shape, corners = detections[i]
 			if i > 0:
 				if not(self.CheckIntrinsicScale(gray_shape)):
 					raise ValueError('Calibration image dimensions do not match!')
 			else:
 				self.SetScale(gray_shape)
 
-			# Find the chess board corners
-			flags = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE | cv2.CALIB_CB_FAST_CHECK
-			ret, corners = cv2.findChessboardCorners(gray, (self.__calib_chess_rows,self.__calib_chess_columns), flags=flags)
-
 			# If found, add object points, image points (after refining them)
-			print_msg = '{0}/{1} images processed'.format(i+1, len(self.__calib_img_fnames))
+			ret 		= not(isinstance(corners, type(None)))
+			print_msg 	= '{0}/{1} images processed'.format(i+1, len(self.__calib_img_fnames))
 			if ret:
 				self.PrintCalibrationProcess(print_msg+' - {0} was successfull'.format(fname))
 				ret_calib = True
 				self.__calib_params['objpoints'].append(self.__objp)
-
-				corners = cv2.cornerSubPix(gray, corners, (11,11), (-1,-1), self.__criteria)
 				self.__calib_params['imgpoints'].append(corners)
+				self.__calib_params['imgpoints_fnames'].append(fname)
 
 				if self.__show_chessboard_img:
+					img = GetImage(fname, gray=False)
 					cv2.drawChessboardCorners(img, (self.__calib_chess_rows,self.__calib_chess_columns), corners, ret)
 					realTimePlot(reset=True)
 					realTimePlot([(fname[len(self.__calib_folder):], img)], 'calibration_frames')
 			else:
 				self.PrintCalibrationProcess(print_msg+' - {0} was not successfull'.format(fname))
 				if self.__show_chessboard_img:
+					gray = CheckGrayScale(GetImage(fname, gray=False))
 					realTimePlot(reset=True)
 					realTimePlot([('Failed: '+fname[len(self.__calib_folder):], gray)], 'calibration_frames')
 
@@ -260,6 +332,104 @@ class CameraCalibration():
 			err_msg = 'None of the chessboard calibration frames could be used for calibration. Folder = {0}'.format(self.__calib_folder)
 			raise Exception(err_msg)
 
+	def DetectChessboardCorners(self, fnames):
+		'''
+		 @brief Detect chessboard corners in calibration images.
+		 	Corners are loaded from the corner cache if available, and the remaining images are processed on a process pool (if calib_workers > 1).
+		 	New detections (also failed ones) are stored in the corner cache.
+
+		 @param fnames (list of image filenames)
+
+		 @return detections (list of (fname, gray_shape, corners) in the same order as fnames, corners = None if the chessboard was not found)
+		'''
+		pattern_size 	= (self.__calib_chess_rows, self.__calib_chess_columns)
+		detections 		= [None]*len(fnames)
+		cache_fnames 	= [None]*len(fnames)
+		missing 		= []
+		for i in range(len(fnames)):
+			if self.__use_corner_cache:
+				cache_fnames[i] = self.GetCornerCacheFname(fnames[i])
+				detections[i] 	= self.LoadCachedCorners(cache_fnames[i])
+			if isinstance(detections[i], type(None)):
+				missing.append(i)
+
+		if len(missing) > 0:
+			args = [(fnames[i], pattern_size, self.__criteria, self.__search_divisor, self.__use_sb) for i in missing]
+			if self.__calib_workers > 1 and len(missing) > 1:
+				pool = Pool(processes=min(self.__calib_workers, len(missing)))
+				try:
+					results = pool.map(_FindChessboardCornersWorker, args)
+				finally:
+					pool.close()
+					pool.join()
+			else:
+				results = map(_FindChessboardCornersWorker, args)
+			for i, (gray_shape, corners) in zip(missing, results):
+				detections[i] = (gray_shape, corners)
+				if self.__use_corner_cache:
+					self.SaveCachedCorners(cache_fnames[i], gray_shape, corners)
+
+		return [(fnames[i],) + tuple(detections[i]) for i in range(len(fnames))]
+
+	def GetCornerCacheEnabled(self):
+		'''
+		 @brief Check if detected chessboard corners are cached on disk.
+
+		 @return True/False
+		'''
+		return self.__use_corner_cache
+
+	def GetCornerCacheFname(self, fname):
+		'''
+		 @brief Get the corner cache filename of a calibration image.
+		 	The cache is keyed by the image content hash, the chessboard pattern size and the search mode, 
+		 	so renamed images are still cached and changed images are detected again.
+
+		 @param fname (image filename)
+
+		 @return cache_fname
+		'''
+		with open(fname, 'rb') as f:
+			content_hash = hashlib.sha1(f.read()).hexdigest()
+		search_mode = 'sb' if self.__use_sb and hasattr(cv2, 'findChessboardCornersSB') else 'cb'
+		if self.__search_divisor > 1:
+			search_mode += '_div{0}'.format(self.__search_divisor)
+		return self.__corner_cache_folder + '{0}_{1}x{2}_{3}.npz'.format(content_hash, self.__calib_chess_rows, self.__calib_chess_columns, search_mode)
+
+	def LoadCachedCorners(self, cache_fname):
+		'''
+		 @brief Load cached chessboard corners.
+
+		 @param cache_fname
+
+		 @return (gray_shape, corners) or None if the image is not cached (corners = None if the chessboard was not found)
+		'''
+		if not(os.path.isfile(cache_fname)):
+			return None
+		try:
+			cache = np.load(cache_fname)
+			gray_shape 	= tuple(int(x) for x in cache['shape'])
+			corners 	= cache['corners'] if bool(cache['found']) else None
+		except (IOError, ValueError, KeyError):
+			return None
+		return gray_shape, corners
+
+	def SaveCachedCorners(self, cache_fname, gray_shape, corners):
+		'''
+		 @brief Save chessboard corners to the corner cache.
+
+		 @param cache_fname
+		 @param gray_shape
+		 @param corners (None if the chessboard was not found)
+		'''
+		if not(os.path.isdir('./'+self.__corner_cache_folder)):
+			os.makedirs('./'+self.__corner_cache_folder)
+		found = not(isinstance(corners, type(None)))
+		if not(found):
+			corners = np.zeros((0,1,2), dtype=np.float32)
+		with open(cache_fname, 'wb') as f:
+			np.savez(f, shape=np.array(gray_shape), corners=corners, found=found)
+
 	def PrintCalibrationProcess(self, msg):
 		'''
 		 @brief Print process message if told to.
@@ -286,6 +456,33 @@ class CameraCalibration():
 			retval, self.__calib_params['intrinsic_mtx'], self.__calib_params['distortion_coeffs'], rvecs, tvecs = cv2.calibrateCamera(self.__calib_params['objpoints'], self.__calib_params['imgpoints'], (frame_size[1], frame_size[0]), None, None)
 		if not(retval):
 			raise Exception('Camera calibration failed!')
+		self.ComputeReprojectionErrors(rvecs, tvecs)
+
+	def ComputeReprojectionErrors(self, rvecs, tvecs):
+		'''
+		 @brief Compute the RMS reprojection error in pixels of each calibration image, and print it if told to.
+
+		 @param rvecs (rotation vectors from calibrateCamera)
+		 @param tvecs (translation vectors from calibrateCamera)
+		'''
+		self.__calib_params['reprojection_errors'] = []
+		for i in range(len(self.__calib_params['objpoints'])):
+			imgpoints, jacobian = cv2.projectPoints(self.__calib_params['objpoints'][i], rvecs[i], tvecs[i], self.__calib_params['intrinsic_mtx'], self.__calib_params['distortion_coeffs'])
+			error = cv2.norm(self.__calib_params['imgpoints'][i], imgpoints, cv2.NORM_L2)/np.sqrt(len(imgpoints))
+			self.__calib_params['reprojection_errors'].append(error)
+			if 'imgpoints_fnames' in self.__calib_params:
+				self.PrintCalibrationProcess('Reprojection error of {0}: {1} px'.format(self.__calib_params['imgpoints_fnames'][i], error))
+		if len(self.__calib_params['reprojection_errors']) > 0:
+			self.PrintCalibrationProcess('Mean reprojection error: {0} px'.format(np.mean(self.__calib_params['reprojection_errors'])))
+
+	def GetReprojectionErrors(self):
+		'''
+		 @brief Get the RMS reprojection error of each calibration image (in the same order as the image points)
+
+		 @return reprojection_errors (list of errors in pixels)
+		'''
+		self.AssertCameraCalibrated()
+		return list(self.__calib_params.get('reprojection_errors', []))
 
 	def RectifyCamera(self, frame_size=None, rectify_scale=0.0, force_recalibration_of_intrinsic_mtx=False):
 		'''
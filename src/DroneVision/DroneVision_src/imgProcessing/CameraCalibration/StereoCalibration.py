@@ -4,7 +4,7 @@
  Project: Master's Thesis - Autonomous Inspection Of Wind Blades
  Repository: Master's Thesis - CV (Computer Vision
 '''
-import cv2
+import cv2, os
 import numpy as np
 from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
 from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage, RealTimePlot
@@ -52,7 +52,7 @@ class StereoCalibration():
 		new_calibration = False
 		if not(self.LoadStereoParameters()) or self.__stereo_calib_reset or force_calibration:
 			new_calibration = True
-			self.StereoCalibrate()
+			self.StereoCalibrate(pair_calib_images=True)
 			self.StereoRectify()
 			self.SaveStereoParameters()
 		self.InitUndistortRectifyMapStereo()
@@ -202,17 +202,17 @@ class StereoCalibration():
 		if not(left_imageSize[0] == right_imageSize[0]) or not(left_imageSize[1] == right_imageSize[1]):
 			raise ValueError('Left and right image dimensions do not match!' )
 
-	def StereoCalibrate(self):
+	def StereoCalibrate(self, pair_calib_images=False):
 		'''
 		 @brief Calibrates the stereo camera first, and then computes rectification transforms for each head of a calibrated stereo camera.
 		 	Computes rotation matrix (R), translation vector (T), essential matrix (E) and fundamental matrix (F)
+
+		 @param pair_calib_images (True for pairing the left and right calibration images (new calibration), see GetStereoImagePoints() (default=False))
 		'''
 		self.AssertSameStereoSize()
 		cameraMatrix1, distCoeffs1 = self.__leftCameraCalibration.GetIntrinsicParameters()
 		cameraMatrix2, distCoeffs2 = self.__rightCameraCalibration.GetIntrinsicParameters()
-		objectPoints = self.__leftCameraCalibration.GetObjectPoints()
-		imagePoints1 = self.__leftCameraCalibration.GetImagePoints()
-		imagePoints2 = self.__rightCameraCalibration.GetImagePoints()
+		objectPoints, imagePoints1, imagePoints2 = self.GetStereoImagePoints(pair_calib_images)
 		imageSize 	 = self.__leftCameraCalibration.GetImageSize()
 		stereocalib_criteria 	= (cv2.TERM_CRITERIA_MAX_ITER + cv2.TERM_CRITERIA_EPS, 100, 1e-5)
 		#stereocalib_flags 		= cv2.CALIB_FIX_ASPECT_RATIO | cv2.CALIB_ZERO_TANGENT_DIST | cv2.CALIB_SAME_FOCAL_LENGTH | cv2.CALIB_RATIONAL_MODEL | cv2.CALIB_FIX_K3 | cv2.CALIB_FIX_K4 | cv2.CALIB_FIX_K5
@@ -240,6 +240,38 @@ class StereoCalibration():
 		self.__calib_params['E'] 					= E
 		self.__calib_params['F'] 					= F
 
+	def GetStereoImagePoints(self, pair_calib_images=False):
+		'''
+		 @brief Get object points and image points for the stereo calibration.
+		 	If pair_calib_images is True and the corner cache is enabled, then the left and right calibration images are paired by filename, 
+		 	and only pairs where the chessboard was found in both images are used. 
+		 	The corners are shared with the camera calibrations through the cache, so they are not detected again.
+		 	Otherwise (or if the calibration images are missing, or no pairs could be used), the saved image points of each camera calibration are used directly.
+
+		 @param pair_calib_images (True for pairing the calibration images (default=False))
+
+		 @return objectPoints, imagePoints1, imagePoints2
+		'''
+		if pair_calib_images and self.__leftCameraCalibration.GetCornerCacheEnabled() and self.__rightCameraCalibration.GetCornerCacheEnabled() and \
+			self.__leftCameraCalibration.CheckDistortionCalibImages() and self.__rightCameraCalibration.CheckDistortionCalibImages():
+			right_fnames 	= dict((os.path.basename(fname), fname) for fname in self.__rightCameraCalibration.GetDistorionCalibImages())
+			left_fnames 	= [fname for fname in self.__leftCameraCalibration.GetDistorionCalibImages() if os.path.basename(fname) in right_fnames]
+			if len(left_fnames) > 0:
+				left_detections 	= self.__leftCameraCalibration.DetectChessboardCorners(left_fnames)
+				right_detections 	= self.__rightCameraCalibration.DetectChessboardCorners([right_fnames[os.path.basename(fname)] for fname in left_fnames])
+				objp 				= self.__leftCameraCalibration.GetChessboardObjectPoints()
+				objectPoints 		= []
+				imagePoints1 		= []
+				imagePoints2 		= []
+				for (left_fname, left_shape, left_corners), (right_fname, right_shape, right_corners) in zip(left_detections, right_detections):
+					if not(isinstance(left_corners, type(None))) and not(isinstance(right_corners, type(None))):
+						objectPoints.append(objp)
+						imagePoints1.append(left_corners)
+						imagePoints2.append(right_corners)
+				if len(objectPoints) > 0:
+					return objectPoints, imagePoints1, imagePoints2
+		return self.__leftCameraCalibration.GetObjectPoints(), self.__leftCameraCalibration.GetImagePoints(), self.__rightCameraCalibration.GetImagePoints()
+
 	def StereoRectify(self, frame_size=None, rectify_scale=0.0):
 		'''
 		 @brief Rectify the stereopsis system.
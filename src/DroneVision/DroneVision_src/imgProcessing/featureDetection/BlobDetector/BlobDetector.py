@@ -6,6 +6,7 @@
 '''
 import cv2, math, operator
 import numpy as np
+from multiprocessing.pool import ThreadPool
 
 from Settings.Exceptions import DroneVisionError
 from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import PyrDown, GetShape, CropFrame, CheckColor, CheckGrayScale, FilterByColor
@@ -46,15 +47,20 @@ from src.DroneVision.DroneVision_src.imgProcessing.CameraCalibration.StereoVisio
 		 						1 = ORB detector
 		 						2 = SIFT detector
 		 						3 = SURF detector)
+ @param n_detection_tiles (Number of overlapping horizontal tiles the green mask is split into for detecting blobs in parallel threads. Set <= 1 to detect blobs on the whole frame in the calling thread (default=1))
+ @param coarse_detection_divisor (Coarse-to-fine detection: blobs are located on the green mask downsampled by this divisor, and each blob centroid is refined on the green mask at the processing resolution using image moments. Set <= 1 for single scale detection (default=1))
  @param plot_figure (optional plot figure (default=None))
 '''
 class BlobDetector(StereoVision):
-	def __init__(self, me_master, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=0, plot_figure=None):
+	def __init__(self, me_master, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=0, n_detection_tiles=1, coarse_detection_divisor=1, plot_figure=None):
 		'''CONSTRUCTOR'''
 		StereoVision.__init__(self, me_master, calib_settings_inst, reset, plot_figure=plot_figure)
 		self.__default_downsampling_divisor = default_downsampling_divisor
 		self.__desired_frame_shape 		= desired_frame_shape
 		self.__detector_type 			= detector_type
+		self.__n_detection_tiles 		= n_detection_tiles
+		self.__detection_pool 			= None # Created on first tiled detection
+		self.__coarse_detection_divisor = coarse_detection_divisor
 
 		# Setup SimpleBlobDetector parameters.
 		self.__blob_params = cv2.SimpleBlobDetector_Params()
@@ -94,6 +100,7 @@ class BlobDetector(StereoVision):
 		 
 		# Create a detector with the parameters
 		self.__keypoint_detector 								= self.ComputeFeatureDetector(self.__blob_params, self.__detector_type)
+		self.__coarse_keypoint_detector 						= self.ComputeFeatureDetector(self.GetScaledBlobParams(self.__coarse_detection_divisor), self.__detector_type)
 		self.__descriptor_detector, self.__descriptor_available = self.ComputeFeatureDescriptor()
 
 		# Create scale detector 
@@ -146,7 +153,7 @@ class BlobDetector(StereoVision):
 		 @return keypoint_detector
 		'''
 		if detector_type == 0:
-			keypoint_detector = cv2.SimpleBlobDetector_create(self.__blob_params)
+			keypoint_detector = cv2.SimpleBlobDetector_create(params)
 		elif detector_type == 1:
 			keypoint_detector = cv2.ORB_create()
 		elif detector_type == 2:
@@ -157,6 +164,26 @@ class BlobDetector(StereoVision):
 			raise ValueError('Invalid detector type flag: {0}. Options are 0, 1, 2, 3 for simple blob detector, ORB, SIFT or SURF (in that order).')
 		return keypoint_detector
 
+	def GetScaledBlobParams(self, divisor):
+		'''
+		 @brief Get a copy of the blob parameters scaled to a downsampled frame.
+		 	Distances are scaled by 1/divisor and areas by 1/divisor^2.
+
+		 @param divisor (downsampling divisor)
+
+		 @return scaled_blob_params
+		'''
+		divisor 		= float(max(1, divisor))
+		scaled_params 	= cv2.SimpleBlobDetector_Params()
+		for attribute in ['minThreshold', 'maxThreshold', 'thresholdStep', 'minRepeatability', 'filterByColor', 'blobColor', \
+				'filterByArea', 'filterByCircularity', 'minCircularity', 'maxCircularity', 'filterByConvexity', 'minConvexity', 'maxConvexity', \
+				'filterByInertia', 'minInertiaRatio', 'maxInertiaRatio']:
+			setattr(scaled_params, attribute, getattr(self.__blob_params, attribute))
+		scaled_params.minDistBetweenBlobs 	= self.__blob_params.minDistBetweenBlobs/divisor
+		scaled_params.minArea 				= self.__blob_params.minArea/divisor**2
+		scaled_params.maxArea 				= self.__blob_params.maxArea/divisor**2
+		return scaled_params
+
 	def ComputeFeatureDescriptor(self):
 		'''
 		 @brief Compute descriptor detector
@@ -196,7 +223,8 @@ class BlobDetector(StereoVision):
 		self.__blob_params.maxArea = mean_point_size*3.5
 
 		# Recreate a keypoint detector with the new parameters
-		self.__keypoint_detector = self.ComputeFeatureDetector(self.__blob_params, self.__detector_type)
+		self.__keypoint_detector 		= self.ComputeFeatureDetector(self.__blob_params, self.__detector_type)
+		self.__coarse_keypoint_detector = self.ComputeFeatureDetector(self.GetScaledBlobParams(self.__coarse_detection_divisor), self.__detector_type)
 		self.__minDistBetweenBlobs_calibrated = True
 
 	def DetectBlobs(self, frame, compute_descriptors=False, ignore_no_blobs_error=False):
@@ -215,16 +243,204 @@ class BlobDetector(StereoVision):
 		 		blob.size  #size )
 		'''
 		# Detect blobs. Frame consist only of highlighted points (blobs), so mask is equal to the frame (mask shows all points of interest which is all non-zero values).
-		keypoints = self.__keypoint_detector.detect(frame, mask=frame)
+		if self.__coarse_detection_divisor > 1:
+			keypoints = self.DetectBlobsCoarseToFine(frame, self.__coarse_detection_divisor)
+		elif self.__n_detection_tiles > 1:
+			keypoints = self.DetectBlobsTiled(frame, self.__n_detection_tiles)
+		else:
+			keypoints = self.__keypoint_detector.detect(frame, mask=frame)
+		keypoints, descriptors = self.ComputeDescriptors(frame, keypoints, compute_descriptors=compute_descriptors)
+		if len(keypoints) == 0 and not(ignore_no_blobs_error):
+			raise DroneVisionError('no_blobs_error_msg')
+		return keypoints, descriptors
+
+	def ComputeDescriptors(self, frame, keypoints, compute_descriptors=False):
+		'''
+		 @brief Compute descriptors of given keypoints.
+
+		 @param frame
+		 @param keypoints
+		 @param compute_descriptors (False returns zero descriptors (default=False))
+
+		 @return keypoints, descriptors
+		'''
 		if compute_descriptors:
 			self.AssertFeatureDesctriptorAvailable()
 			keypoints, descriptors = self.__descriptor_detector.compute(frame, keypoints=keypoints)
 		else:
 			descriptors = np.zeros(len(keypoints))
-		if len(keypoints) == 0 and not(ignore_no_blobs_error):
-			raise DroneVisionError('no_blobs_error_msg')
 		return keypoints, descriptors
 
+	def GetCoarseDetectionDivisor(self):
+		'''
+		 @brief Get the divisor of the coarse detection level (coarse-to-fine detection)
+
+		 @return coarse_detection_divisor
+		'''
+		return self.__coarse_detection_divisor
+
+	def SetCoarseDetectionDivisor(self, coarse_detection_divisor):
+		'''
+		 @brief Set the divisor of the coarse detection level (coarse-to-fine detection)
+
+		 @param coarse_detection_divisor (Set <= 1 for single scale detection)
+		'''
+		self.__coarse_detection_divisor = coarse_detection_divisor
+		self.__coarse_keypoint_detector = self.ComputeFeatureDetector(self.GetScaledBlobParams(self.__coarse_detection_divisor), self.__detector_type)
+
+	def DetectBlobsCoarseToFine(self, frame, divisor):
+		'''
+		 @brief Detect blobs coarse-to-fine.
+		 	The blobs are located on the frame downsampled by the divisor, 
+		 	and each centroid is refined on the frame itself using image moments of a small window around the upscaled position.
+
+		 @param frame (green mask at the processing resolution)
+		 @param divisor (coarse level divisor)
+
+		 @return keypoints (keypoints in frame coordinates)
+		'''
+		coarse_frame 				= PyrDown(frame, divisor)
+		coarse_frame[coarse_frame > 0] = 255
+		coarse_keypoints 			= self.__coarse_keypoint_detector.detect(coarse_frame, mask=coarse_frame)
+		height, width 				= GetShape(frame)
+		coarse_height, coarse_width = GetShape(coarse_frame)
+		return self.RefineKeypoints(frame, coarse_keypoints, width/float(coarse_width), height/float(coarse_height))
+
+	def RefineKeypoints(self, frame, keypoints, scale_x, scale_y):
+		'''
+		 @brief Refine keypoints detected on a downsampled frame to sub-pixel centroids on the given frame.
+		 	The centroid is computed from the image moments of a window around the upscaled keypoint.
+		 	The window is limited to half the distance between blobs, so that neighbouring blobs do not pull the centroid.
+
+		 @param frame (green mask at the target resolution)
+		 @param keypoints (keypoints from the downsampled frame)
+		 @param scale_x (scale in x direction from the downsampled frame to the frame)
+		 @param scale_y (scale in y direction from the downsampled frame to the frame)
+
+		 @return refined_keypoints
+		'''
+		height, width 	= GetShape(frame)
+		max_radius 		= None
+		if self.GetBlobDistanceCalibrated():
+			max_radius = max(1, int(self.GetMinDistanceBetweenBlobs()//2))
+		refined_keypoints = []
+		for kp in keypoints:
+			x 		= kp.pt[0]*scale_x
+			y 		= kp.pt[1]*scale_y
+			radius 	= int(math.ceil(kp.size*max(scale_x, scale_y)/2.0)) + 1
+			if max_radius != None:
+				radius = min(radius, max_radius)
+			x_start = max(0, int(round(x)) - radius)
+			y_start = max(0, int(round(y)) - radius)
+			window 	= frame[y_start:int(round(y)) + radius + 1, x_start:int(round(x)) + radius + 1]
+			moments = cv2.moments(window)
+			size 	= kp.size*(scale_x + scale_y)/2.0
+			if moments['m00'] > 0:
+				x 		= x_start + moments['m10']/moments['m00']
+				y 		= y_start + moments['m01']/moments['m00']
+				size 	= 2.0*math.sqrt((moments['m00']/255.0)/math.pi) # Diameter of a circle with the blob area (the green mask is binary)
+			if x < 0 or x > width - 1 or y < 0 or y > height - 1:
+				continue
+			refined_keypoints.append(cv2.KeyPoint(x=x, y=y, _size=size, _angle=kp.angle, _response=kp.response, _octave=kp.octave, _class_id=kp.class_id))
+		return refined_keypoints
+
+	def GetDetectionTiles(self):
+		'''
+		 @brief Get number of tiles used for parallel blob detection
+
+		 @return n_detection_tiles
+		'''
+		return self.__n_detection_tiles
+
+	def SetDetectionTiles(self, n_detection_tiles):
+		'''
+		 @brief Set number of tiles used for parallel blob detection.
+		 	The thread pool is recreated on the next tiled detection if the number of tiles changed.
+
+		 @param n_detection_tiles (Set <= 1 to turn off tiled detection)
+		'''
+		if n_detection_tiles != self.__n_detection_tiles and not(isinstance(self.__detection_pool, type(None))):
+			self.__detection_pool.close()
+			self.__detection_pool = None
+		self.__n_detection_tiles = n_detection_tiles
+
+	def ResetDetectionPool(self):
+		'''
+		 @brief Drop the thread pool for tiled detection without closing it.
+		 	Used in forked processes, where the threads of the inherited pool do not exist. 
+		 	A new pool is created on the next tiled detection.
+		'''
+		self.__detection_pool = None
+
+	def GetTileOverlap(self):
+		'''
+		 @brief Get the overlap in pixels between neighbouring detection tiles.
+		 	A blob cut by a tile border must be complete in at least one of the tiles, so the overlap is set to cover the blob distance.
+
+		 @return tile_overlap (int)
+		'''
+		if self.GetBlobDistanceCalibrated():
+			tile_overlap = int(math.ceil(self.GetMinDistanceBetweenBlobs()))
+		else:
+			tile_overlap = 16
+		return tile_overlap
+
+	def ComputeDetectionTiles(self, height, n_tiles, tile_overlap):
+		'''
+		 @brief Compute horizontal detection tiles of the frame.
+		 	Each tile owns the rows from own_start to own_end, and is extended by the overlap on both sides for detection.
+
+		 @param height (frame height)
+		 @param n_tiles (number of tiles)
+		 @param tile_overlap (overlap in pixels)
+
+		 @return tiles (list of (tile_start, tile_end, own_start, own_end))
+		'''
+		n_tiles 	= max(1, min(n_tiles, height//max(1, 2*tile_overlap)))
+		tile_height = int(math.ceil(height/float(n_tiles)))
+		tiles 		= []
+		for i in range(n_tiles):
+			own_start 	= i*tile_height
+			own_end 	= min(height, own_start + tile_height)
+			if own_start >= own_end:
+				break
+			tiles.append((max(0, own_start - tile_overlap), min(height, own_end + tile_overlap), own_start, own_end))
+		return tiles
+
+	def DetectBlobsTiled(self, frame, n_tiles):
+		'''
+		 @brief Detect blobs in overlapping horizontal tiles of the frame on a thread pool.
+		 	OpenCV releases the GIL during detection, so the tiles are processed concurrently.
+		 	Keypoints detected twice in the overlap zones are merged by position, by only keeping the keypoints which are centered within the rows owned by the tile.
+
+		 @param frame
+		 @param n_tiles (number of tiles)
+
+		 @return keypoints (list of keypoints in frame coordinates)
+		'''
+		tiles = self.ComputeDetectionTiles(GetShape(frame)[0], n_tiles, self.GetTileOverlap())
+		if len(tiles) < 2:
+			return self.__keypoint_detector.detect(frame, mask=frame)
+
+		if isinstance(self.__detection_pool, type(None)):
+			self.__detection_pool = ThreadPool(processes=self.__n_detection_tiles)
+
+		def detect_tile(tile):
+			tile_start, tile_end, own_start, own_end = tile
+			tile_frame 		= frame[tile_start:tile_end] # Row slices are contiguous views - no copy.
+			tile_keypoints 	= []
+			for keypoint in self.__keypoint_detector.detect(tile_frame, mask=tile_frame):
+				y = keypoint.pt[1] + tile_start
+				if own_start <= y < own_end:
+					keypoint.pt = (keypoint.pt[0], y)
+					tile_keypoints.append(keypoint)
+			return tile_keypoints
+
+		keypoints = []
+		for tile_keypoints in self.__detection_pool.map(detect_tile, tiles):
+			keypoints += tile_keypoints
+		return keypoints
+
 	def GetDefaultPyrDownDivisor(self):
 		'''
 		 @brief Get default donwsample divisor
@@ -241,7 +457,7 @@ class BlobDetector(StereoVision):
 		'''
 		return self.__desired_frame_shape
 
-	def GetPointList(self, cl_frame, cl_sl_frame, undistort=True, concatenate_points=False, compute_descriptors=False, draw=False, crop_frames=False, crop_frame_divisor=0.5, ignore_no_blobs_error=False):
+	def GetPointList(self, cl_frame, cl_sl_frame, undistort=True, concatenate_points=False, compute_descriptors=False, draw=False, crop_frames=False, crop_frame_divisor=0.5, ignore_no_blobs_error=False, point_tracker=None):
 		'''
 		 @brief Steps for computing point list from a normal frame and structured light frame.
 		 		Undistorts (at request) and scales down the frames. 
@@ -255,6 +471,7 @@ class BlobDetector(StereoVision):
 		 @param crop_frames (True/False for cropping the frames to match the fan angle of the laser (default=False))
 		 @param crop_frame_divisor (0 < Float <= 1  - divisor for cropping frames. F.ex 0.5 will crop the frame to half the size around the frame center.)
 		 @param ignore_no_blobs_error (True/False)
+		 @param point_tracker (PointTracker instance for tracking points from the previous frame instead of running full detection, None for full detection (default=None))
 		 
 		 @return green_mask, keypoints, descriptors, frame, sl_frame 
 		 		(Returns: 
@@ -284,7 +501,7 @@ class BlobDetector(StereoVision):
 			sl_frame 	= CropFrame(sl_frame, crop_frame_divisor)
 			green_mask 	= CropFrame(green_mask, crop_frame_divisor)
 
-		green_mask, keypoints, descriptors = self.DetectFeatures(green_mask, concatenate_points=concatenate_points, compute_descriptors=compute_descriptors, draw=draw, ignore_no_blobs_error=ignore_no_blobs_error)
+		green_mask, keypoints, descriptors = self.DetectFeatures(green_mask, concatenate_points=concatenate_points, compute_descriptors=compute_descriptors, draw=draw, ignore_no_blobs_error=ignore_no_blobs_error, point_tracker=point_tracker)
 		return green_mask, keypoints, descriptors, frame, sl_frame
 
 	def ComputeGreenMask(self, cl_frame, cl_sl_frame, hvs_cl_threshold=30):
@@ -351,23 +568,36 @@ class BlobDetector(StereoVision):
 
 		return delta_frame, g_frame, g_sl_frame
 
-	def DetectFeatures(self, green_mask, concatenate_points=False, compute_descriptors=False, draw=False, ignore_no_blobs_error=False):
+	def DetectFeatures(self, green_mask, concatenate_points=False, compute_descriptors=False, draw=False, ignore_no_blobs_error=False, point_tracker=None):
 		'''
 		 @brief Detect feature points
+		 	If a point tracker is given, then the points from the previous frame are tracked to this frame, and full detection is only run on keyframes or when the tracking confidence drops.
 
 		 @param green_mask
 		 @param concatenate_points (True for concatenating close points which are within a close distance (default=False))
 		 @param compute_descriptors (default=False)
 		 @param draw Draw detected points on frame
 		 @param ignore_no_blobs_error (True/False)
+		 @param point_tracker (PointTracker instance, None for full detection (default=None))
 
 		 @return green_mask, keypoints, descriptors (Returns green_mask = frame with highlighted structured light points. 
 										keypoints = all point positions above threshold (list of keypoints).
 										descriptors = point descriptors)
 		'''
+		tracked_keypoints = None
+		if not(isinstance(point_tracker, type(None))) and not(point_tracker.CheckKeyframe(GetShape(green_mask))):
+			tracked_keypoints, tracking_ok = point_tracker.TrackKeypoints(green_mask)
+			if tracking_ok:
+				keypoints, descriptors = self.ComputeDescriptors(green_mask, tracked_keypoints, compute_descriptors=compute_descriptors)
+				if draw:
+					green_mask = self.DrawKeypoints(green_mask, keypoints)
+				return green_mask, keypoints, descriptors
+
 		keypoints, descriptors	= self.DetectBlobs(green_mask, compute_descriptors=compute_descriptors, ignore_no_blobs_error=ignore_no_blobs_error)
 		if concatenate_points:
 			keypoints, descriptors = self.ConcatenateClosePoints(keypoints, descriptors)
+		if not(isinstance(point_tracker, type(None))) and point_tracker.GetTrackingEnabled():
+			point_tracker.SetKeyframe(green_mask, keypoints, tracked_keypoints=tracked_keypoints)
 
 		if draw:
 			green_mask = self.DrawKeypoints(green_mask, keypoints)
@@ -6,12 +6,38 @@
 '''
 import cv2, math, glob, os, warnings
 import numpy as np
+from multiprocessing import Pool
+from scipy.spatial import cKDTree
 from Settings.Exceptions import DroneVisionError
 from src.bin.SaveParameters import SaveParameters
 from src.DroneVision.DroneVision_src.hardware.imageTools import GetImage
 from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape, CheckColor, PyrDown
 from ..BlobDetector.BlobDetector import BlobDetector
 
+_scale_calib_detector = None # Blob scale detector of a scale calibration worker process
+
+def _InitScaleCalibrationWorker(blob_scale_detector):
+	'''
+	 @brief Initialize a scale calibration worker process with the calibration state of the blob scale detector.
+	 	The worker processes are forked, so the calibrated detector is inherited once per worker instead of being sent with every image pair.
+
+	 @param blob_scale_detector
+	'''
+	global _scale_calib_detector
+	blob_scale_detector.ResetDetectionPool()
+	_scale_calib_detector = blob_scale_detector
+
+def _ComputeScaleCalibrationPair(calib_img_fnames):
+	'''
+	 @brief Compute the standard scale distance of a scale calibration image pair in a worker process.
+
+	 @param calib_img_fnames (sl_fname, fname)
+
+	 @return sl_fname, fname, standard_scale_distance, mean_point_size, err (err = None if no error occurred)
+	'''
+	sl_fname, fname = calib_img_fnames
+	return _scale_calib_detector.ComputeScaleCalibrationPair(sl_fname, fname)
+
 '''
  @brief Class for computing standard distance between blobs based on scaling between structural light points.
  	A scale calibration sequence is initiated if it has not been previously done, or stereo_reset is set to True.
@@ -33,16 +59,19 @@ from ..BlobDetector.BlobDetector import BlobDetector
 		 						1 = ORB detector
 		 						2 = SIFT detector
 		 						3 = SURF detector)
+ @param n_detection_tiles (Number of tiles for parallel blob detection, set <= 1 for no tiling (default=1))
+ @param coarse_detection_divisor (Divisor of the coarse level for coarse-to-fine blob detection, set <= 1 for single scale detection (default=1))
  @param plot_figure (optional plot figure (default=None))
 '''
 class BlobScaleDetector(BlobDetector):
-	def __init__(self, me_master, blob_scale_settings_inst, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset,  detector_type=0, plot_figure=None):
+	def __init__(self, me_master, blob_scale_settings_inst, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset,  detector_type=0, n_detection_tiles=1, coarse_detection_divisor=1, plot_figure=None):
 		'''CONSTRUCTOR'''
-		BlobDetector.__init__(self, me_master, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset,  detector_type=detector_type, plot_figure=plot_figure)
+		BlobDetector.__init__(self, me_master, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset,  detector_type=detector_type, n_detection_tiles=n_detection_tiles, coarse_detection_divisor=coarse_detection_divisor, plot_figure=plot_figure)
 		self.__saveParameters 				= SaveParameters(blob_scale_settings_inst.GetSettings('scale_calib_save_folder'), blob_scale_settings_inst.GetSettings('scale_calib_save_fname'), True)
 		self.__calib_folder					= blob_scale_settings_inst.GetSettings('scale_calib_folder')
 		self.__image_type 					= blob_scale_settings_inst.GetSettings('scale_img_type')
 		self.__filtrate_points 				= blob_scale_settings_inst.GetSettings('scale_filtrate')
+		self.__calib_workers 				= blob_scale_settings_inst.GetSettings('scale_calib_workers')
 		self.__calib_reset 					= reset
 		self.__scale_params 				= {}
 
@@ -66,36 +95,26 @@ class BlobScaleDetector(BlobDetector):
 	def CalibrateStandardScaling(self, printInfo=False):
 		'''
 		 @brief Run standard scale calibration.
+		 	The image pairs are processed in parallel on a process pool if the number of calibration workers is > 1.
 
 		 @param printInfo (Print info during calibration (default=False))
 		'''
 		self.SetScalingImages()
 		
+		n_pairs 				 = len(self.__calib_img_fnames)
 		standard_scale_distances = []
 		mean_point_sizes 		 = []
-		for sl_fname, fname in self.__calib_img_fnames:
-			frame 													= GetImage(fname, gray=False)
-			sl_frame 												= GetImage(sl_fname, gray=False)
+		if self.__calib_workers > 1 and n_pairs > 1:
+			pool 	= Pool(processes=min(self.__calib_workers, n_pairs), initializer=_InitScaleCalibrationWorker, initargs=(self,))
 			try:
-				delta_frame, keypoints, descriptors, frame, sl_frame = self.GetPointList(frame, sl_frame, concatenate_points=True, compute_descriptors=False)
-			except DroneVisionError, err:
-				warnings.simplefilter('always')
-				warnings.warn(str(err) + ' - file: {0}, SL file: {1}'.format(fname, sl_fname), Warning)
-				warnings.simplefilter('default')
-				continue
-			width, height 											= GetShape(sl_frame)
-			blockSize 												= int(math.sqrt(math.pow(width, 2.0) + math.pow(height, 2.0))//2)
-			scaling_point_frame, mean_point_size 					= self.PointScaleMatch(delta_frame, keypoints, blockSize)
-			standard_scale_distance 								= self.ComputeStandardScaleDistance(scaling_point_frame)
-			if np.isnan(standard_scale_distance):
-				err = 'No scaling points detected - file: {0}, SL file: {1}'.format(fname, sl_fname)
-				warnings.simplefilter('always')
-				warnings.warn(str(err), Warning)
-				warnings.simplefilter('default')
-				continue
-
-			standard_scale_distances.append(standard_scale_distance)
-			mean_point_sizes.append(mean_point_size)
+				results = pool.imap_unordered(_ComputeScaleCalibrationPair, self.__calib_img_fnames)
+				self.ReduceScaleCalibrationResults(results, n_pairs, standard_scale_distances, mean_point_sizes, printInfo)
+			finally:
+				pool.close()
+				pool.join()
+		else:
+			results = (self.ComputeScaleCalibrationPair(sl_fname, fname) for sl_fname, fname in self.__calib_img_fnames)
+			self.ReduceScaleCalibrationResults(results, n_pairs, standard_scale_distances, mean_point_sizes, printInfo)
 		
 		if len(standard_scale_distances) == 0:
 			raise ValueError('Could not compute any scaling points - please provide adequate frame samples!')
@@ -104,6 +123,51 @@ class BlobScaleDetector(BlobDetector):
 		if printInfo:
 			print 'Standard blob scale calibration parameter: ', self.__scale_params['standard_scale_distance']
 
+	def ComputeScaleCalibrationPair(self, sl_fname, fname):
+		'''
+		 @brief Compute the standard scale distance and mean point size of a scale calibration image pair.
+
+		 @param sl_fname (Filename of the frame with points)
+		 @param fname (Filename of the frame without points)
+
+		 @return sl_fname, fname, standard_scale_distance, mean_point_size, err (err = None if no error occurred, otherwise an error message and the scale distance/point size are nan)
+		'''
+		frame 		= GetImage(fname, gray=False)
+		sl_frame 	= GetImage(sl_fname, gray=False)
+		try:
+			delta_frame, keypoints, descriptors, frame, sl_frame = self.GetPointList(frame, sl_frame, concatenate_points=True, compute_descriptors=False)
+		except DroneVisionError, err:
+			return sl_fname, fname, np.nan, np.nan, str(err)
+		width, height 							= GetShape(sl_frame)
+		blockSize 								= int(math.sqrt(math.pow(width, 2.0) + math.pow(height, 2.0))//2)
+		scaling_point_frame, mean_point_size 	= self.PointScaleMatch(delta_frame, keypoints, blockSize)
+		standard_scale_distance 				= self.ComputeStandardScaleDistance(scaling_point_frame)
+		if np.isnan(standard_scale_distance):
+			return sl_fname, fname, np.nan, np.nan, 'No scaling points detected'
+		return sl_fname, fname, standard_scale_distance, mean_point_size, None
+
+	def ReduceScaleCalibrationResults(self, results, n_pairs, standard_scale_distances, mean_point_sizes, printInfo=False):
+		'''
+		 @brief Reduce scale calibration results into the lists of standard scale distances and mean point sizes.
+		 	Warns about image pairs that failed, and prints the calibration progress if told to.
+
+		 @param results (iterable of results from ComputeScaleCalibrationPair)
+		 @param n_pairs (Total number of image pairs)
+		 @param standard_scale_distances (list which is appended with valid standard scale distances)
+		 @param mean_point_sizes (list which is appended with valid mean point sizes)
+		 @param printInfo (Print progress (default=False))
+		'''
+		for i, (sl_fname, fname, standard_scale_distance, mean_point_size, err) in enumerate(results):
+			if printInfo:
+				print 'Scale calibration progress: {0}/{1}'.format(i+1, n_pairs)
+			if err != None:
+				warnings.simplefilter('always')
+				warnings.warn(err + ' - file: {0}, SL file: {1}'.format(fname, sl_fname), Warning)
+				warnings.simplefilter('default')
+				continue
+			standard_scale_distances.append(standard_scale_distance)
+			mean_point_sizes.append(mean_point_size)
+
 	def SetScalingImages(self):
 		'''
 		 @brief Get all scaling calibration image filenames
@@ -136,19 +200,11 @@ class BlobScaleDetector(BlobDetector):
 
 		 @return scaling_point_frame (filtrated)
 		'''
-		distance_pos_list = np.argwhere(scaling_point_frame > 0)
-		if len(distance_pos_list) > 0:
-			distances = np.zeros(len(distance_pos_list))
-			for i in range(len(distance_pos_list)):
-				x = distance_pos_list[i,0]
-				y = distance_pos_list[i,1]
-				distances[i] = scaling_point_frame[x,y]
-			remove_ind = np.argwhere(np.abs(distances - np.mean(distances)) > np.std(distances)).T[0]
-			for i in range(len(remove_ind)):
-				x = distance_pos_list[remove_ind[i], 0]
-				y = distance_pos_list[remove_ind[i], 1]
-				scaling_point_frame[x,y] = 0
-
+		distance_pos 	= np.flatnonzero(scaling_point_frame > 0)
+		if len(distance_pos) > 0:
+			distances 	= scaling_point_frame.flat[distance_pos]
+			remove 		= np.abs(distances - np.mean(distances)) > np.std(distances)
+			scaling_point_frame.flat[distance_pos[remove]] = 0
 		return scaling_point_frame
 
 	def ComputeStandardScaleDistance(self, scaling_point_frame):
@@ -186,19 +242,46 @@ class BlobScaleDetector(BlobDetector):
 
 		 @return average_scale_distance (np.nan if no scaling points where detected)
 		'''
-		distance_points 		= np.argwhere(scaling_point_frame > 0)
+		distances 				= scaling_point_frame[scaling_point_frame > 0]
 		average_scale_distance 	= np.nan
-		if len(distance_points) > 0:
-			distances 		= np.zeros(len(distance_points))
-			for i in range(len(distance_points)):
-				distances[i] = scaling_point_frame[distance_points[i,0], distance_points[i,1]]
-			valid_dist 		= np.argwhere(np.abs(distances-np.mean(distances)) <= np.std(distances)).T[0]
-			std_distances 	= np.zeros(len(valid_dist))
-			for i in range(len(valid_dist)):
-				std_distances[i] = distances[valid_dist[i]]
-			average_scale_distance = np.mean(std_distances)
+		if len(distances) > 0:
+			std_distances 			= distances[np.abs(distances - np.mean(distances)) <= np.std(distances)]
+			average_scale_distance 	= np.mean(std_distances)
 		return average_scale_distance
 
+	def ComputeScalingDistances(self, keypoints, blockSize):
+		'''
+		 @brief Compute the distance from each point to its closest neighbour point within a block around the point.
+		 	Points are positioned by their rounded pixel positions (the last point is kept if several points share a pixel).
+		 	The closest neighbours are found with a KD-tree query of the two nearest points (the point itself and its neighbour). 
+		 	If the nearest neighbour is outside of the block, then the closest point among the points within the block is used instead.
+
+		 @param keypoints
+		 @param blockSize (Side length of the square search block centered on each point)
+
+		 @return positions, distances (Returns: positions = rounded point positions as an array of [row, column], distances = distance to the closest neighbour within the block (-1 if no neighbour within the block))
+		'''
+		points 				= np.array([kp.pt for kp in keypoints], dtype=np.float64).reshape(-1, 2)
+		positions 			= np.round(points[:,::-1]).astype(int)
+		position_keys 		= positions[:,0]*(np.max(positions[:,1]) + 1 if len(positions) > 0 else 1) + positions[:,1]
+		last_index 			= np.sort(len(position_keys) - 1 - np.unique(position_keys[::-1], return_index=True)[1])
+		points 				= points[last_index]
+		positions 			= positions[last_index]
+		distances 			= np.ones(len(points))*-1
+		if len(points) < 2:
+			return positions, distances
+
+		blockSize_radi 		= blockSize//2
+		tree 				= cKDTree(points)
+		nearest_distances, nearest_indices = tree.query(points, k=2)
+		in_block 			= np.max(np.abs(positions[nearest_indices[:,1]] - positions), axis=1) <= blockSize_radi
+		distances[in_block] = nearest_distances[in_block,1]
+		for i in np.flatnonzero(~in_block):
+			block_indices = [j for j in tree.query_ball_point(points[i], blockSize_radi + 1, p=np.inf) if j != i and np.max(np.abs(positions[j] - positions[i])) <= blockSize_radi]
+			if len(block_indices) > 0:
+				distances[i] = np.min(np.sqrt(np.sum(np.square(points[block_indices] - points[i]), axis=1)))
+		return positions, distances
+
 	def PointScaleMatch(self, frame, keypoints, blockSize, filtrate_scaling_points=None):
 		'''
 		 @brief Compute scaling map between points.
@@ -215,56 +298,11 @@ class BlobScaleDetector(BlobDetector):
 			filtrate_scaling_points = self.__filtrate_points
 
 		height, width			= GetShape(frame)
-		points_frame 			= np.zeros((height, width), dtype=np.uint16)
 		scaling_point_frame 	= np.zeros((height, width))
-		float_points_list 		= [None]*(width*height)
-		mean_point_size = 0.0
-		for point in keypoints:
-			x = int(round(point.pt[1]))
-			y = int(round(point.pt[0]))
-			float_points_list[x*width + y] = point
-			mean_point_size += point.size
-			points_frame[x, y] = point.size
-		mean_point_size /= len(keypoints)
-		blockSize_radi = blockSize//2
-		points_pos = np.argwhere(points_frame > 0)
-		for i in range(len(points_pos)):
-			x 			 = points_pos[i, 0]
-			y 			 = points_pos[i, 1]
-			point 		 = float_points_list[x*width + y]
-			if point == None:
-				raise Exception('None point: {0}'.format(point))
-			x_offset_neg = 0
-			x_offset_pos = 0
-			y_offset_neg = 0
-			y_offset_pos = 0
-			if x - blockSize_radi < 0:
-				x_offset_neg = x - blockSize_radi
-			elif x + blockSize_radi >= height:
-				x_offset_pos = x + blockSize_radi - (height - 1)
-			if y - blockSize_radi < 0:
-				y_offset_neg = y - blockSize_radi
-			elif y + blockSize_radi >= width:
-				y_offset_pos = y + blockSize_radi - (width - 1)
-			x_block_start		= x - blockSize_radi - x_offset_neg
-			y_block_start		= y - blockSize_radi - y_offset_neg
-			block 				= points_frame[x_block_start: (x+1) + blockSize_radi - x_offset_pos, y_block_start: (y+1) + blockSize_radi - y_offset_pos]
-			x_block_center 		= len(block)//2
-			y_block_center 		= len(block[x_block_center])//2
-			block[x_block_center, y_block_center] = 0
-			block_disparities 	= np.argwhere(block > 0)
-			shortest_distance 	= -1
-			for j in range(len(block_disparities)):
-				x_block 	= x_block_start + block_disparities[j, 0]
-				y_block 	= y_block_start + block_disparities[j, 1]
-				block_point = float_points_list[x_block*width + y_block]
-				if block_point == None:
-					raise Exception('None block point: {0}'.format(block_point))
-				distance 	= math.sqrt(math.pow(point.pt[0] - block_point.pt[0], 2) + math.pow(point.pt[1] - block_point.pt[1], 2))
-				if distance < shortest_distance or shortest_distance < 0:
-					shortest_distance 	= distance
-			if shortest_distance >= 0:
-				scaling_point_frame[x,y] = shortest_distance
+		mean_point_size 		= np.mean([point.size for point in keypoints])
+		positions, distances 	= self.ComputeScalingDistances(keypoints, blockSize)
+		valid 					= distances >= 0
+		scaling_point_frame[positions[valid,0], positions[valid,1]] = distances[valid]
 
 		if filtrate_scaling_points:
 			scaling_point_frame = self.FiltrateScalingPoints(scaling_point_frame)
@@ -28,6 +28,8 @@ class PointDetection(FeatureStereopsis):
 			settings_inst.GetSettings('CV', 'desired_frame_shape'), \
 			settings_inst.GetSettings('BASIC', 'reset_calibration'), \
 			settings_inst.GetSettings('CV', 'detector_type'), \
+			n_detection_tiles=settings_inst.GetSettings('CV', 'blob_detection_tiles'), \
+			coarse_detection_divisor=settings_inst.GetSettings('CV', 'coarse_detection_divisor'), \
 			plot_figure=plot_figure)
 
 	def CalibratePointDetection(self, printInfo=False, force_calibration=False, force_blob_calibration=False):
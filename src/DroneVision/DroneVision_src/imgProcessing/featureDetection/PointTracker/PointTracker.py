@@ -0,0 +1,162 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision
+'''
+import cv2
+import numpy as np
+from scipy.spatial import cKDTree
+from src.DroneVision.DroneVision_src.imgProcessing.frameTools.frameTools import GetShape
+
+'''
+ @brief Track structured light points between consecutive frames using sparse optical flow (pyramidal Lucas-Kanade) on the green mask.
+ 	Full blob detection is only necessary on keyframes, which are given every keyframe_interval frame, or when the tracking confidence drops below min_confidence.
+ 	Each tracked point keeps a stable id stored in the keypoint class_id, which is carried across keyframes by matching detected points to the tracked points.
+
+ @param keyframe_interval (Run full detection every keyframe_interval frame. Set <= 1 to turn tracking off (full detection on every frame))
+ @param min_confidence (0 < Float <= 1 - minimum fraction of points successfully tracked from the previous frame. Full detection is run if the confidence drops below this value (default=0.8))
+ @param win_size (Search window size for the optical flow (default=15))
+ @param max_level (Maximum pyramid level for the optical flow (default=2))
+ @param max_fb_error (Maximum forward-backward error in pixels for accepting a tracked point (default=1.0))
+'''
+class PointTracker():
+	def __init__(self, keyframe_interval, min_confidence=0.8, win_size=15, max_level=2, max_fb_error=1.0):
+		'''CONSTRUCTOR'''
+		self.__keyframe_interval 	= keyframe_interval
+		self.__min_confidence 		= min_confidence
+		self.__max_fb_error 		= max_fb_error
+		self.__lk_params 			= dict(winSize=(win_size, win_size), maxLevel=max_level, criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+		self.__next_id 				= 0
+		self.ResetTracker()
+
+	def ResetTracker(self):
+		'''
+		 @brief Reset tracker, so that full detection is run on the next frame.
+		'''
+		self.__prev_mask 				= None
+		self.__prev_keypoints 			= []
+		self.__frames_since_keyframe 	= 0
+		self.__confidence 				= 0.0
+
+	def GetTrackingEnabled(self):
+		'''
+		 @brief Get tracking enabled
+
+		 @return True/False
+		'''
+		return self.__keyframe_interval > 1
+
+	def GetMinConfidence(self):
+		'''
+		 @brief Get minimum tracking confidence
+
+		 @return min_confidence
+		'''
+		return self.__min_confidence
+
+	def GetConfidence(self):
+		'''
+		 @brief Get tracking confidence of the last tracked frame (fraction of points successfully tracked).
+
+		 @return confidence
+		'''
+		return self.__confidence
+
+	def CheckKeyframe(self, frame_shape):
+		'''
+		 @brief Check if the next frame must be a keyframe (full detection).
+
+		 @param frame_shape (shape of the incoming green mask as (height, width))
+
+		 @return True/False
+		'''
+		if not(self.GetTrackingEnabled()) or isinstance(self.__prev_mask, type(None)) or len(self.__prev_keypoints) == 0:
+			return True
+		if GetShape(self.__prev_mask) != frame_shape:
+			return True
+		return self.__frames_since_keyframe + 1 >= self.__keyframe_interval
+
+	def PropagateKeypoints(self, green_mask):
+		'''
+		 @brief Propagate the previous keypoints to the new green mask using forward-backward checked optical flow.
+		 	Does not change the tracker state.
+
+		 @param green_mask
+
+		 @return keypoints, confidence (Returns: keypoints = successfully tracked keypoints with the same class_id (id) as before, confidence = fraction of points successfully tracked)
+		'''
+		prev_points 	= np.array([kp.pt for kp in self.__prev_keypoints], dtype=np.float32).reshape(-1, 1, 2)
+		points, status, err 		= cv2.calcOpticalFlowPyrLK(self.__prev_mask, green_mask, prev_points, None, **self.__lk_params)
+		back_points, back_status, err 	= cv2.calcOpticalFlowPyrLK(green_mask, self.__prev_mask, points, None, **self.__lk_params)
+		fb_error 		= np.abs(prev_points - back_points).reshape(-1, 2).max(axis=1)
+		points 			= points.reshape(-1, 2)
+
+		height, width 	= GetShape(green_mask)
+		x 				= np.round(points[:,0]).astype(int)
+		y 				= np.round(points[:,1]).astype(int)
+		valid 			= (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.__max_fb_error)
+		valid 			&= (x >= 0) & (x < width) & (y >= 0) & (y < height)
+		valid[valid] 	= green_mask[y[valid], x[valid]] > 0 # A tracked point must end on a highlighted point.
+
+		keypoints = []
+		for i in np.flatnonzero(valid):
+			kp = self.__prev_keypoints[i]
+			keypoints.append(cv2.KeyPoint(x=float(points[i,0]), y=float(points[i,1]), _size=kp.size, _angle=kp.angle, _response=kp.response, _octave=kp.octave, _class_id=kp.class_id))
+		confidence = len(keypoints)/float(len(self.__prev_keypoints))
+		return keypoints, confidence
+
+	def TrackKeypoints(self, green_mask):
+		'''
+		 @brief Track the previous keypoints to the new green mask.
+		 	The tracker state is only updated if the confidence is acceptable, otherwise a keyframe should be set using SetKeyframe().
+
+		 @param green_mask
+
+		 @return keypoints, ok (Returns: keypoints = tracked keypoints, ok = True if the tracking confidence >= min_confidence)
+		'''
+		keypoints, self.__confidence = self.PropagateKeypoints(green_mask)
+		ok = self.__confidence >= self.__min_confidence and len(keypoints) > 0
+		if ok:
+			self.__prev_mask 				= green_mask
+			self.__prev_keypoints 			= keypoints
+			self.__frames_since_keyframe 	+= 1
+		return keypoints, ok
+
+	def SetKeyframe(self, green_mask, keypoints, tracked_keypoints=None):
+		'''
+		 @brief Set new keyframe from fully detected keypoints.
+		 	Detected keypoints are given the id of the closest tracked keypoint (within the keypoint size), and new ids otherwise.
+
+		 @param green_mask
+		 @param keypoints (fully detected keypoints - class_id is set in place)
+		 @param tracked_keypoints (keypoints already tracked to this green mask. If None, then the previous keypoints are propagated if possible (default=None))
+		'''
+		if isinstance(tracked_keypoints, type(None)):
+			tracked_keypoints = []
+			if not(isinstance(self.__prev_mask, type(None))) and len(self.__prev_keypoints) > 0 and GetShape(self.__prev_mask) == GetShape(green_mask):
+				tracked_keypoints, confidence = self.PropagateKeypoints(green_mask)
+
+		matched_ids = set()
+		if len(tracked_keypoints) > 0 and len(keypoints) > 0:
+			tree 				= cKDTree(np.array([kp.pt for kp in tracked_keypoints]))
+			distances, indices 	= tree.query(np.array([kp.pt for kp in keypoints]))
+			for i in np.argsort(distances):
+				tracked_kp = tracked_keypoints[indices[i]]
+				if distances[i] <= max(keypoints[i].size, 1.0) and not(tracked_kp.class_id in matched_ids):
+					keypoints[i].class_id = tracked_kp.class_id
+					matched_ids.add(tracked_kp.class_id)
+				else:
+					keypoints[i].class_id = -1
+		else:
+			for kp in keypoints:
+				kp.class_id = -1
+		for kp in keypoints:
+			if kp.class_id < 0:
+				kp.class_id 	= self.__next_id
+				self.__next_id 	+= 1
+
+		self.__prev_mask 				= green_mask
+		self.__prev_keypoints 			= list(keypoints)
+		self.__frames_since_keyframe 	= 0
+		self.__confidence 				= 1.0
@@ -38,17 +38,20 @@ from Settings.Exceptions import DroneVisionError
 		 						1 = ORB detector
 		 						2 = SIFT detector
 		 						3 = SURF detector)
+ @param n_detection_tiles (Number of tiles for parallel blob detection, set <= 1 for no tiling (default=1))
+ @param coarse_detection_divisor (Divisor of the coarse level for coarse-to-fine blob detection, set <= 1 for single scale detection (default=1))
  @param plot_figure (optional plot figure (default=None))
 '''
 class FeatureStereopsis(BlobScaleDetector):
-	def __init__(self, me_master, feature_stereo_settings_inst, calib_settings_inst, blob_scale_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=0, plot_figure=None):
+	def __init__(self, me_master, feature_stereo_settings_inst, calib_settings_inst, blob_scale_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=0, n_detection_tiles=1, coarse_detection_divisor=1, plot_figure=None):
 		'''CONSTRUCTOR'''
-		BlobScaleDetector.__init__(self, me_master, blob_scale_settings_inst, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=detector_type, plot_figure=plot_figure)
+		BlobScaleDetector.__init__(self, me_master, blob_scale_settings_inst, calib_settings_inst, default_downsampling_divisor, desired_frame_shape, reset, detector_type=detector_type, n_detection_tiles=n_detection_tiles, coarse_detection_divisor=coarse_detection_divisor, plot_figure=plot_figure)
 		self.__use_triangulation			= feature_stereo_settings_inst.GetSettings('use_triangulation')
 		self.__use_cv2_triangulation 		= feature_stereo_settings_inst.GetSettings('use_cv2_triangulation')
 		self.__use_block_matching 			= feature_stereo_settings_inst.GetSettings('use_block_matching')
 		self.__block_matching_param			= feature_stereo_settings_inst.GetSettings('block_matching_parameter')
 		self.__use_brute_force_matching 	= feature_stereo_settings_inst.GetSettings('use_brute_force')
+		self.__previous_id_matches 			= {} # Previous block matches between tracked point ids {left_id: right_id}
 
 	def CalibrateFeatureStereopsis(self, printInfo=False, force_calibration=False, force_blob_calibration=False):
 		'''
@@ -226,6 +229,7 @@ class FeatureStereopsis(BlobScaleDetector):
 	def PointBlockMatch(self, left_frame_shape, right_frame_shape, left_keypoints, right_keypoints, minBlobDistanceScaleParameter=2.5, blockSize=None):
 		'''
 		 @brief Compute disparities between matching points.
+		 	Points with stable ids from point tracking (class_id >= 0) reuse the match of the previous frame if the previous match is still within the search block.
 
 		 @param left_frame_shape (tuple of (height,width))
 		 @param right_frame_shape (tuple of (height,width))
@@ -273,11 +277,30 @@ class FeatureStereopsis(BlobScaleDetector):
 		blockSize_radi_y 		= blockSize//2 		# Sorry but the (x,y) coordinates is according to normal matrix axes (x=row, y=columns), not image coordinates (y=rows, x=columns).
 		blockSize_radi_x 		= blockSize//6
 
+		right_id_index = {}
+		if len(self.__previous_id_matches) > 0:
+			for j in range(length_right_keypoints):
+				if right_keypoints[j].class_id >= 0:
+					right_id_index[right_keypoints[j].class_id] = j
+
 		matches = []
 		left_points_pos = np.argwhere(left_points_frame > 0)
 		for i in range(len(left_points_pos)):
 			x = left_points_pos[i, 0]
 			y = left_points_pos[i, 1]
+			left_point 				= left_keypoints[left_index_points_list[x*left_frame_shape[1] + y]]
+			if left_point.class_id in self.__previous_id_matches:
+				j = right_id_index.get(self.__previous_id_matches[left_point.class_id], -1)
+				if j >= 0:
+					right_point = right_keypoints[j]
+					x_right 	= int(round(right_point.pt[1]))
+					y_right 	= int(round(right_point.pt[0]))
+					if abs(x_right - x) <= blockSize_radi_x and y - blockSize_radi_y <= y_right <= y and np.abs(left_point.size - right_point.size) < blob_size_error_thres:
+						match = cv2.DMatch()
+						match.trainIdx 	= left_index_points_list[x*left_frame_shape[1] + y]
+						match.queryIdx 	= j
+						matches.append(match)
+						continue
 			x_offset_neg = 0
 			x_offset_pos = 0
 			y_offset_neg = 0
@@ -292,7 +315,6 @@ class FeatureStereopsis(BlobScaleDetector):
 			right_block 			= right_points_frame[x_block_start: (x+1) + blockSize_radi_x - x_offset_pos, y_block_start: (y+1)]
 			right_block_disparities = np.argwhere(right_block > 0)
 			shortest_distance 		= -1
-			left_point 				= left_keypoints[left_index_points_list[x*left_frame_shape[1] + y]]
 			for j in range(len(right_block_disparities)):
 				x_right 	= x_block_start + right_block_disparities[j, 0]
 				y_right 	= y_block_start + right_block_disparities[j, 1]
@@ -309,6 +331,13 @@ class FeatureStereopsis(BlobScaleDetector):
 				match.queryIdx 	= right_index_points_list[shortest_x_right*right_frame_shape[1] + shortest_y_right]
 				matches.append(match)
 
+		self.__previous_id_matches = {}
+		for match in matches:
+			left_id 	= left_keypoints[match.trainIdx].class_id
+			right_id 	= right_keypoints[match.queryIdx].class_id
+			if left_id >= 0 and right_id >= 0:
+				self.__previous_id_matches[left_id] = right_id
+
 		return matches
 
 	def DrawMatches(self, frame_l, frame_r, left_keypoints, right_keypoints, matches):
@@ -0,0 +1,424 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+import time, timeit, threading, warnings
+import numpy as np
+from Settings.Settings import Settings
+from Settings.Exceptions import DroneVisionError
+from src.bin.tools import RunThread
+from src.DroneVision.DroneVision import DroneVision
+from Slave import Slave
+from Master import Master
+from TriggerBroadcast import GetTriggerClock
+
+'''
+ @brief Emulation of a network link, by delaying messages with a fixed latency and a bandwidth limit.
+
+ @param latency (One-way latency in seconds (default=0.0))
+ @param bandwidth (Bandwidth in bytes per second, 0 or None for unlimited bandwidth (default=None))
+'''
+class LinkEmulator():
+    def __init__(self, latency=0.0, bandwidth=None):
+        '''CONSTRUCTOR'''
+        self.__latency      = latency
+        self.__bandwidth    = bandwidth
+
+    def GetLinkDelay(self, n_bytes):
+        '''
+         @brief Get delay of a message on the emulated link.
+
+         @param n_bytes (Message size in bytes)
+
+         @return delay (seconds)
+        '''
+        delay = self.__latency
+        if self.__bandwidth:
+            delay += float(n_bytes)/self.__bandwidth
+        return delay
+
+    def Delay(self, n_bytes):
+        '''
+         @brief Delay a message on the emulated link.
+
+         @param n_bytes (Message size in bytes)
+        '''
+        delay = self.GetLinkDelay(n_bytes)
+        if delay > 0:
+            time.sleep(delay)
+
+'''
+ @brief Loopback slave - a stand-in for the slave device, without camera or database.
+    Speaks the same request protocol as DroneSlave, but serves frame sets from a recorded session (right camera frames given by the VIDEO/IMAGE settings, f.ex 'DataSamples/live_test_sample/'),
+    looping over the frame sets for as long as the master requests new frames. The master may thus be benchmarked end to end (f.ex 'python main.py run loopback image') on any device.
+    Point lists are precomputed for all frame sets when the master requests CV calibration (if 'loopback_point_lists' is set in the TCP settings),
+    so serving a new frame is immediate, and the measured throughput is of the master and the transport only.
+    Otherwise the original frames are served with empty point lists.
+    Messages to and from the master are delayed by the 'loopback_latency' and 'loopback_bandwidth' TCP settings (see LinkEmulator).
+
+ @param settings_inst (Preconfigured settings instance, used if settings_inst != None, (default=None))
+ @param frame_sets (List of (original_frame, original_sl_frame), or None to load the frame sets from the VIDEO/IMAGE settings (default=None))
+'''
+class LoopbackSlave(Slave, DroneVision, Settings):
+    def __init__(self, settings_inst=None, frame_sets=None):
+        '''CONSTRUCTOR'''
+        Settings.__init__(self, load_initial_settings=False)
+        if not(isinstance(settings_inst, type(None))):
+            self.ResetSettings(settings_inst.GetRawSettings())
+        else:
+            self.GetInitialSettings()
+        Slave.__init__(self, self.GetSettings('TCP'), self)
+        DroneVision.__init__(self, False, self.GetSettings())
+        self.__linkEmulator         = LinkEmulator(self.GetSettings('TCP', 'loopback_latency'), self.GetSettings('TCP', 'loopback_bandwidth'))
+        self.__frame_sets           = frame_sets
+        self.__point_lists          = None
+        self.__frame_i              = -1
+        self.__frame_processed_cond = threading.Condition()
+        self.__trigger_seq          = 0
+        self.__processed_seq        = 0
+        self.__capture_time         = None
+        self.__new_frame_ready      = False
+        self.__served_frames        = 0
+        self.__first_trigger_time   = None
+        self.__last_trigger_time    = None
+        self.__run_calibrate_cv_flag = False
+        self.__slave_calibrated     = False
+        self.__master_flag          = None
+
+    def InitializeLoopbackSlave(self):
+        '''
+         @brief Load the frame sets (if not given), and connect to master.
+        '''
+        if self.__frame_sets == None:
+            self.__frame_sets = self.LoadFrameSets()
+        if len(self.__frame_sets) == 0:
+            raise Exception('No frame sets to serve from the loopback slave.')
+        self.Connect()
+
+    def LoadFrameSets(self):
+        '''
+         @brief Load all right camera frame sets of the recorded session given by the VIDEO/IMAGE settings.
+            Limited to CAMERA 'n_frames' frame sets (if n_frames > 0).
+
+         @return frame_sets (list of (original_frame, original_sl_frame))
+        '''
+        if self.GetSettings('BASIC', 'source_type') == 'CAMERA':
+            raise Exception("The loopback slave serves recorded sessions only - set source_type to 'VIDEO' or 'IMAGE'.")
+        self.CreateCameraLink()
+        n_frames = self.objCameraLink.GetTotalFrames()
+        if self.GetSettings('CAMERA', 'n_frames') > 0:
+            n_frames = min(n_frames, self.GetSettings('CAMERA', 'n_frames'))
+        frame_sets = []
+        for i in range(n_frames):
+            frame_sets.append(self.GetRawFrames())
+        self.objCameraLink.StopCamera()
+        print 'Loopback slave loaded {0} frame sets'.format(len(frame_sets))
+        return frame_sets
+
+    def RunLoopbackSlave(self):
+        '''
+         @brief Run loopback slave until the master stops it.
+        '''
+        while not(self.GetTerminate()):
+            if self.__run_calibrate_cv_flag:
+                self.__run_calibrate_cv_flag = False
+                self.RunCalibrateCV()
+            time.sleep(0.001)
+        self.PrintServedFrameRate()
+        while self.CheckConnected() and not(self.CheckErrorFlag()): # Wait for master to disconnect slave
+            time.sleep(0.001)
+        self.CloseLoopbackSlave()
+
+    def RunCalibrateCV(self):
+        '''
+         @brief Calibrate point detection from the saved calibration, and precompute point lists of all frame sets.
+        '''
+        if self.GetSettings('TCP', 'loopback_point_lists'):
+            self.CalibratePointDetection()
+            self.__point_lists = self.PrecomputePointLists()
+        self.__slave_calibrated = True
+
+    def PrecomputePointLists(self):
+        '''
+         @brief Precompute point lists of all frame sets.
+
+         @return point_lists (list of (frame_un, delta_frame, keypoints, descriptors), or None for frame sets where the point detection failed)
+        '''
+        start_time  = timeit.default_timer()
+        point_lists = []
+        for original_frame, original_sl_frame in self.__frame_sets:
+            try:
+                frame_content = self.GetProcessedFrame(original_frame=original_frame, original_sl_frame=original_sl_frame)
+                point_lists.append(frame_content[2:])
+            except DroneVisionError, err:
+                warnings.simplefilter('always')
+                warnings.warn(str(err), Warning)
+                warnings.simplefilter('default')
+                point_lists.append(None)
+        print 'Loopback slave precomputed {0} point lists in {1:.2f} sec'.format(len(point_lists), timeit.default_timer() - start_time)
+        return point_lists
+
+    def Recv(self, max_length=None):
+        '''
+         @brief Receive message through the emulated link (see Slave.Recv()).
+            The link delay of a large message is added by RecvLarge().
+
+         @param max_length (default=None)
+
+         @return payload_raw
+        '''
+        payload_raw = Slave.Recv(self, max_length)
+        if max_length == None:
+            self.__linkEmulator.Delay(len(payload_raw))
+        return payload_raw
+
+    def RecvLarge(self, length):
+        '''
+         @brief Receive large message through the emulated link (see Slave.RecvLarge()).
+
+         @param length
+
+         @return payload_raw
+        '''
+        payload_raw = Slave.RecvLarge(self, length)
+        self.__linkEmulator.Delay(length)
+        return payload_raw
+
+    def SendLarge(self, payload_raw, max_len=512):
+        '''
+         @brief Send message through the emulated link (see Slave.SendLarge()).
+
+         @param payload_raw
+         @param max_len (default=512)
+        '''
+        self.__linkEmulator.Delay(len(payload_raw))
+        Slave.SendLarge(self, payload_raw, max_len)
+
+    def SetProcessNewFrameFlag(self, seq=None):
+        '''
+         @brief Serve the next frame set (looping over the frame sets).
+
+         @param seq (Frame sequence number given by the master (default=None - next sequence number))
+        '''
+        with self.__frame_processed_cond:
+            if seq == None:
+                seq = self.__trigger_seq + 1
+            self.__trigger_seq      = seq
+            self.__frame_i          = (self.__frame_i + 1) % len(self.__frame_sets)
+            self.__capture_time     = GetTriggerClock()
+            self.__new_frame_ready  = True
+            self.__served_frames    += 1
+            if self.__first_trigger_time == None:
+                self.__first_trigger_time = self.__capture_time
+            self.__last_trigger_time = self.__capture_time
+            self.__processed_seq    = max(self.__processed_seq, seq)
+            self.__frame_processed_cond.notify_all()
+
+    def WaitNewFrameProcessed(self, timeout, seq=None):
+        '''
+         @brief Wait for the new frame to be served (see DroneSlave.WaitNewFrameProcessed()).
+
+         @param timeout (Timeout in seconds)
+         @param seq (Frame sequence number to wait for (default=None - last triggered frame))
+
+         @return True/False (False if the frame was not served within the timeout)
+        '''
+        start_time = timeit.default_timer()
+        with self.__frame_processed_cond:
+            if seq == None:
+                seq = self.__trigger_seq
+            while self.__processed_seq < seq:
+                remaining = timeout - (timeit.default_timer() - start_time)
+                if remaining <= 0:
+                    return False
+                self.__frame_processed_cond.wait(remaining)
+        return True
+
+    def GetFramePayload(self):
+        '''
+         @brief Get the served frame set with its point list (see DroneSlave.GetFramePayload()).
+
+         @return frame_content, error
+        '''
+        with self.__frame_processed_cond:
+            if not(self.__new_frame_ready):
+                return None, False
+            self.__new_frame_ready  = False
+            frame_i                 = self.__frame_i
+        original_frame, original_sl_frame = self.__frame_sets[frame_i]
+        if self.__point_lists == None:
+            return (original_frame, original_sl_frame, original_frame, original_sl_frame, [], np.zeros(0)), False
+        if self.__point_lists[frame_i] == None:
+            return None, True
+        return (original_frame, original_sl_frame) + tuple(self.__point_lists[frame_i]), False
+
+    def GetCaptureTime(self):
+        '''
+         @brief Get the time the last frame set was served (see GetTriggerClock()).
+
+         @return capture_time (None if no frame is served)
+        '''
+        return self.__capture_time
+
+    def GetServedFrameRate(self):
+        '''
+         @brief Get the rate of new frames requested by the master.
+
+         @return n_frames, frame_rate (frame_rate = None if less than two frames are served)
+        '''
+        with self.__frame_processed_cond:
+            n_frames = self.__served_frames
+            if n_frames < 2 or self.__last_trigger_time == self.__first_trigger_time:
+                return n_frames, None
+            return n_frames, (n_frames - 1)/(self.__last_trigger_time - self.__first_trigger_time)
+
+    def PrintServedFrameRate(self):
+        '''
+         @brief Print the rate of new frames requested by the master.
+        '''
+        n_frames, frame_rate = self.GetServedFrameRate()
+        if frame_rate != None:
+            print 'Loopback slave served {0} frames at {1:.2f} fps'.format(n_frames, frame_rate)
+
+    def SetStoreDBFlag(self):
+        '''
+         @brief Nothing is stored by the loopback slave.
+        '''
+        pass
+
+    def SetTimestamp(self, timestamp):
+        '''
+         @brief Nothing is stored by the loopback slave.
+
+         @param timestamp
+        '''
+        pass
+
+    def CalibrateCV(self, calibrate_stereopsis_session, calibrate_blob_scale_detector_session):
+        '''
+         @brief Calibrate CV (calibration sessions are not supported by the loopback slave).
+
+         @param calibrate_stereopsis_session (see droneMaster)
+         @param calibrate_blob_scale_detector_session (see droneMaster)
+        '''
+        if calibrate_stereopsis_session or calibrate_blob_scale_detector_session:
+            warnings.simplefilter('always')
+            warnings.warn('Calibration sessions are not supported by the loopback slave - using the saved calibration.', Warning)
+            warnings.simplefilter('default')
+        self.__slave_calibrated         = False
+        self.__run_calibrate_cv_flag    = True
+
+    def GetSlaveReady(self):
+        '''
+         @brief Check if the loopback slave is calibrated.
+
+         @return True/False
+        '''
+        return self.__slave_calibrated
+
+    def RestartCamera(self):
+        '''
+         @brief No camera to restart.
+        '''
+        pass
+
+    def SetFlagFromMaster(self, flag):
+        '''
+         @brief Set the master flag.
+
+         @param flag
+        '''
+        self.__master_flag = flag
+
+    def GetOriginalFramePayload(self, filename, sl_filename=None):
+        '''
+         @brief Original frames are not available from the loopback slave.
+
+         @param filename
+         @param sl_filename (default=None)
+
+         @return frame_content, error (None, True)
+        '''
+        return None, True
+
+    def SetNewTradedFrame(self, traded_frame):
+        '''
+         @brief Traded frames are not stored by the loopback slave.
+
+         @param traded_frame
+        '''
+        pass
+
+    def CloseLoopbackSlave(self):
+        '''
+         @brief Close loopback slave safely
+        '''
+        self.SaveTransportMetrics(self.GetSettings('DATABASE', 'output_folder'))
+        Slave.__del__(self)
+
+def RunLoopbackBenchmark(settings_inst, frame_sets=None, n_frames=None, request_frames=False):
+    '''
+     @brief Benchmark the master transport against a loopback slave on this device.
+        Each frame cycle triggers a new frame ('setNewFrame'), and receives the point list as DroneMaster (pushed if 'push_point_list' is set in the TCP settings, otherwise requested by 'getPointList'),
+        or the full frame set ('getFrame') if request_frames=True. The round trip times of the master are printed.
+
+     @param settings_inst (Settings instance)
+     @param frame_sets (List of (original_frame, original_sl_frame), or None to load the frame sets from the VIDEO/IMAGE settings (default=None))
+     @param n_frames (Number of frame cycles (default=None - TCP 'loopback_benchmark_frames'))
+     @param request_frames (True/False for requesting the full frame set instead of the point list in each cycle (default=False))
+
+     @return results (dictionary: {'n_frames', 'n_invalid', 'elapsed', 'fps', 'master_metrics', 'slave_metrics'})
+    '''
+    if n_frames == None:
+        n_frames = settings_inst.GetSettings('TCP', 'loopback_benchmark_frames')
+    push_point_list     = settings_inst.GetSettings('TCP', 'push_point_list')
+    frame_req_timeout   = settings_inst.GetSettings('TCP', 'frame_req_timeout')
+    loopbackSlave       = LoopbackSlave(settings_inst, frame_sets)
+    def RunSlave():
+        loopbackSlave.InitializeLoopbackSlave()
+        loopbackSlave.RunLoopbackSlave()
+    slave_thread = RunThread(RunSlave)
+
+    master = Master(settings_inst.GetSettings('TCP'))
+    master.Connect()
+    master.RequestSetTimestamp(time.strftime('%Y_%m_%d__%H_%M_%S'))
+    master.RequestCVCalibration(False, False)
+    start_time = timeit.default_timer()
+    while not(master.RequestSlaveReady()):
+        if timeit.default_timer() - start_time > settings_inst.GetSettings('TCP', 'tcp_timeout'):
+            raise Exception('Timeout - loopback slave is not ready')
+        time.sleep(0.01)
+    master.SendFlagToSlave(True)
+
+    n_invalid   = 0
+    start_time  = timeit.default_timer()
+    for i in range(n_frames):
+        if request_frames:
+            master.RequestFrameProcessingOnSlave()
+            frame_content, valid, error = master.RequestFrame()
+        elif push_point_list:
+            seq = master.RequestFrameProcessingOnSlave(push_point_list=True)
+            und_shape, keypoints, descriptors, valid, error = master.ReceivePushedPointList(seq, frame_req_timeout)
+        else:
+            master.RequestFrameProcessingOnSlave()
+            und_shape, keypoints, descriptors, valid, error = master.RequestPointList()
+        if not(valid):
+            n_invalid += 1
+    elapsed = timeit.default_timer() - start_time
+
+    master_metrics  = master.GetTransportMetrics()
+    slave_metrics   = master.RequestTransportMetrics()
+    master.RequestStop()
+    master.RequestDisconnect()
+    master.Disconnect()
+    slave_thread.join(settings_inst.GetSettings('TCP', 'tcp_timeout'))
+    fps = n_frames/elapsed if elapsed > 0 else None
+    print 'Loopback benchmark: {0} frames in {1:.3f} sec ({2:.2f} fps), {3} invalid'.format(n_frames, elapsed, fps, n_invalid)
+    for request in sorted((master_metrics or {}).keys()):
+        round_trip = master_metrics[request]['timings'].get('round_trip')
+        if round_trip != None:
+            print '\t{0}: n = {1}, mean = {2:.6f}, p99 = {3:.6f} sec'.format(request, round_trip['count'], round_trip['mean'], round_trip['p99'])
+    return {'n_frames': n_frames, 'n_invalid': n_invalid, 'elapsed': elapsed, 'fps': fps, 'master_metrics': master_metrics, 'slave_metrics': slave_metrics}
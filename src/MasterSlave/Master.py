@@ -5,14 +5,26 @@
  Repository: Master's Thesis - CV (Computer Vision
 '''
 
-import socket, time
+import socket, time, os, select, timeit, Queue
 from Requests import Requests
+from SharedMemoryTransport import SharedFrameRing, GetLocalSocketAddress
+from TriggerBroadcast import TriggerBroadcaster
+from TransportMetrics import TransportMetrics
+from SocketTuning import ConfigureSocket, SendChunks, RecvExactly, AdaptiveChunker
 from MsgParserRecv.MessageParser import MessageParser
 
 '''
  @brief Master class 
 
  @param settings_inst (TCP settings)
+    The master and slave communicate by TCP sockets, or by the shared memory transport if 'transport' is set to 'shm' in the settings.
+    The shared memory transport is for a co-located master and slave (f.ex simulation):
+        Control messages are sent by a local (unix domain) socket, and frame payloads are passed by a ring of shared frame buffers.
+    The slave may push its point list of a triggered frame (see RequestFrameProcessingOnSlave()). 
+        Pushed point lists are queued by their frame sequence number, and no new requests are sent to the slave before all pending pushes are received.
+    Frame capturing may be triggered by a UDP broadcast if 'udp_trigger' is set in the settings (see TriggerBroadcast).
+    Transport metrics (per request type) are recorded if 'transport_metrics' is set in the settings (see TransportMetrics).
+    Socket options (TCP_NODELAY, SO_SNDBUF, SO_RCVBUF) are given by the settings, and the send chunk size may be tuned from measured throughput (see SocketTuning).
 '''
 class Master(MessageParser, Requests):
     def __init__(self, settings_inst):
@@ -25,17 +37,47 @@ class Master(MessageParser, Requests):
         self.__max_send_size        = settings_inst.GetSettings('slave_buffer_size')
         self.__timeout              = settings_inst.GetSettings('tcp_timeout')
         self.__print_payload_info   = settings_inst.GetSettings('print_payload_info')
+        self.__use_shm_transport    = settings_inst.GetSettings('transport') == 'shm'
         self.__connected            = False
+        self.__frame_seq            = 0
+        self.__pending_pushes       = 0
+        self.__pushed_point_lists   = Queue.Queue()
+        self.__slave_capture_time   = None
+        self.__request_start_times  = {}
+        self.__transportMetrics     = None
+        self.__settings_inst        = settings_inst
+        self.__sendChunker          = None
+        if settings_inst.GetSettings('auto_tune_send_size'):
+            self.__sendChunker      = AdaptiveChunker(sorted(set([self.__max_send_size, 16*1024, 64*1024, 256*1024, 1024**2])) + [0])
+        if settings_inst.GetSettings('transport_metrics'):
+            self.__transportMetrics = TransportMetrics('master')
+        self.__triggerBroadcaster   = None
+        if settings_inst.GetSettings('udp_trigger'):
+            self.__triggerBroadcaster = TriggerBroadcaster(settings_inst)
+        self.__sharedFrameRing      = None
+        if self.__use_shm_transport:
+            self.__sharedFrameRing  = SharedFrameRing(settings_inst.GetSettings('shm_ring_slots'))
+            self.SetSharedFrameRing(self.__sharedFrameRing)
 
     def Connect(self):
         '''
          @brief Connect to slave.
         '''
         # Set up the socket connection to the slave
-        self.__connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.__use_shm_transport:
+            address = GetLocalSocketAddress(self.__server_port)
+            if os.path.exists(address): # Remove socket file of a previous session
+                os.remove(address)
+            self.__connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            address = (self.__host, self.__server_port)
+            self.__connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__connection.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Force non-lingering mode of sockets after closing.
+        ConfigureSocket(self.__connection, self.__settings_inst) # Inherited by the accepted connection.
         self.__connection.settimeout(self.__timeout)
-        self.__connection.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Force non-lingering mode of sockets after closing.
-        self.__connection.bind((self.__host, self.__server_port))
+        self.__connection.bind(address)
+        if self.__triggerBroadcaster != None:
+            self.__triggerBroadcaster.StartTriggerBroadcaster() # Before the slave connects, so the slave may synchronize its clock.
 
         # Initiate the connection to the slave
         self.__connection.listen(1)
@@ -51,29 +93,41 @@ class Master(MessageParser, Requests):
             self.__slave_conn.close()
             self.__connection.close()
             self.__connected = False
+            if self.__use_shm_transport and os.path.exists(GetLocalSocketAddress(self.__server_port)):
+                os.remove(GetLocalSocketAddress(self.__server_port))
+        if self.__triggerBroadcaster != None:
+            self.__triggerBroadcaster.CloseTriggerBroadcaster()
 
     def RecvLarge(self, length):
         '''
          @brief Receive large message given by length
 
          @param length Number of bytes to receive.
+            Never reads beyond the message, since the next message may follow immediately (f.ex a pushed point list).
+            The message is received directly into a preallocated buffer (see RecvExactly()).
         '''
-        payload_raw = ''
-        while len(payload_raw) < length:
-            payload_raw += self.Recv()
-        return payload_raw
+        try:
+            return RecvExactly(self.__slave_conn, length)
+        except:
+            self.Disconnect()
+            raise
 
-    def Recv(self):
+    def Recv(self, max_length=None):
         '''
          @brief Receive message
 
+         @param max_length Maximum number of bytes to receive (default=None - buffer size)
+
          @return payload_raw Received message
         '''
+        buffer_size = self.__buffer_size
+        if max_length != None:
+            buffer_size = min(buffer_size, max_length)
         reads = 0
         payload_raw = ''
         while len(payload_raw) == 0 and reads < 5:
             try:
-                payload_raw = self.__slave_conn.recv(self.__buffer_size)
+                payload_raw = self.__slave_conn.recv(buffer_size)
             except:
                 self.Disconnect()
                 raise
@@ -86,53 +140,73 @@ class Master(MessageParser, Requests):
 
          @param payload_raw Message to send
          @param max_len (default=512)
+            The chunk size is tuned from the measured throughput instead, if 'auto_tune_send_size' is set (see AdaptiveChunker).
         '''
-        if len(payload_raw) > max_len:
-            offset = 0
-            while offset < len(payload_raw):
-                if offset + max_len < len(payload_raw):
-                    self.Send(payload_raw[offset:offset+max_len])
-                else:
-                    self.Send(payload_raw[offset:])
-                offset += max_len
+        if self.__sendChunker != None:
+            max_len = self.__sendChunker.GetChunkSize(len(payload_raw))
+            start_time = timeit.default_timer()
+            self.Send(payload_raw, max_len)
+            self.__sendChunker.AddThroughputSample(max_len, len(payload_raw), timeit.default_timer() - start_time)
         else:
-            self.Send(payload_raw)
+            self.Send(payload_raw, max_len)
 
-    def Send(self, payload_raw):
+    def Send(self, payload_raw, max_len=0):
         '''
          @brief Send message 
 
          @param payload_raw Message to send
+         @param max_len (Chunk size - the message is sent completely in chunks of memoryviews (see SendChunks()), 0 = single call (default=0))
         '''
-        length = len(payload_raw)
-        offset  = 0
-        while offset < length:
-            try:
-                offset = self.__slave_conn.send(payload_raw[offset:])
-            except:
-                self.Disconnect()
-                raise
+        try:
+            SendChunks(self.__slave_conn, payload_raw, max_len)
+        except:
+            self.Disconnect()
+            raise
 
-    def RecvResponse(self, request):
+    def RecvPackage(self):
         '''
-         @brief Receive a response from slave
-          Raises Exception if:
-            No response
-            Error response
-            response doesn't match request
+         @brief Receive a package from slave
+          Raises Exception if error response.
 
-         @param request Sent request. 
+         @return response, content
         '''
         payload_raw = self.Recv()
         response, content = self.Parse(payload_raw)
         if response == 'error':
             raise Exception(content)
         elif response == 'response_size':
+            recv_start_time = timeit.default_timer()
             self.SendAck()
             payload_raw = self.RecvLarge(content['length'])
+            recv_end_time = timeit.default_timer()
             response, content = self.Parse(payload_raw)
+            if self.__transportMetrics != None:
+                self.__transportMetrics.AddTiming(response, 'recv', recv_end_time - recv_start_time)
+                self.__transportMetrics.AddTiming(response, 'deserialize', timeit.default_timer() - recv_end_time)
+                self.__transportMetrics.AddPayload(response, 'received', len(payload_raw))
+        return response, content
+
+    def RecvResponse(self, request):
+        '''
+         @brief Receive a response from slave
+            Point lists pushed by the slave are queued.
+          Raises Exception if:
+            No response
+            Error response
+            response doesn't match request
+
+         @param request Sent request. 
+        '''
+        response, content = self.RecvPackage()
+        while response == 'pushPointList' and request != 'pushPointList':
+            self.QueuePushedPointList(content)
+            response, content = self.RecvPackage()
         if not(response == request):
             raise Exception('Response does not match request: Response = ' + response + ', Request = ' + request)
+        if request in self.__request_start_times:
+            start_time = self.__request_start_times.pop(request)
+            if self.__transportMetrics != None:
+                self.__transportMetrics.AddTiming(request, 'round_trip', timeit.default_timer() - start_time)
         return content
 
     def SendAck(self):
@@ -157,12 +231,20 @@ class Master(MessageParser, Requests):
          @param request Request identity
          @param content Request content
         '''
+        self.WaitPendingPushes()
+        start_time = timeit.default_timer()
         payload = {'request': request, 'content': content}
         payload_raw = self.DumpJson(payload)
+        serialized_time = timeit.default_timer()
         if self.__print_payload_info:
             print 'PAYLOAD MASTER -> SLAVE: {0}, {1}'.format(payload['request'], len(payload_raw))
         self.SendLengthFrontMsg(len(payload_raw))
         self.SendLarge(payload_raw, self.__max_send_size)
+        if self.__transportMetrics != None:
+            self.__transportMetrics.AddTiming(request, 'serialize', serialized_time - start_time)
+            self.__transportMetrics.AddTiming(request, 'send', timeit.default_timer() - serialized_time)
+            self.__transportMetrics.AddPayload(request, 'sent', len(payload_raw))
+        self.__request_start_times[request] = start_time
 
     def SendLengthFrontMsg(self, length):
         '''
@@ -176,13 +258,87 @@ class Master(MessageParser, Requests):
         self.SendLarge(payload_raw, self.__max_send_size)
         self.AssertAck()
 
-    def RequestFrameProcessingOnSlave(self):
+    def RequestFrameProcessingOnSlave(self, push_point_list=False, broadcast_trigger=False):
         '''
          @brief Request slave to process new frame
+
+         @param push_point_list (True for requesting the slave to push the point list of the new frame as soon as it is processed (default=False))
+            The pushed point list is received by ReceivePushedPointList().
+         @param broadcast_trigger (True for triggering the slave by the UDP trigger broadcast, if 'udp_trigger' is set (default=False))
+            The TCP request is then only sent if the point list should be pushed.
+
+         @return seq (Frame sequence number)
         '''
+        self.__frame_seq += 1
+        triggered = False
+        if broadcast_trigger and self.__triggerBroadcaster != None:
+            self.__triggerBroadcaster.BroadcastTrigger(self.__frame_seq)
+            triggered = True
+            if not(push_point_list):
+                return self.__frame_seq
         request = 'setNewFrame'
-        self.SendRequest(request, '')
-        content = self.RecvResponse(request)
+        content = ''
+        if push_point_list or triggered:
+            content = {'seq': self.__frame_seq, 'push_point_list': push_point_list, 'triggered': triggered}
+        self.SendRequest(request, content)
+        self.RecvResponse(request)
+        if push_point_list:
+            self.__pending_pushes += 1
+        return self.__frame_seq
+
+    def QueuePushedPointList(self, content):
+        '''
+         @brief Queue point list pushed by the slave
+
+         @param content (Point list content, tagged with the frame sequence number)
+        '''
+        self.__pending_pushes -= 1
+        self.__pushed_point_lists.put(content)
+
+    def RecvPushedPointList(self, timeout):
+        '''
+         @brief Receive next point list pushed by the slave, and queue it.
+
+         @param timeout (Timeout in seconds to wait for the push)
+
+         @return True/False (False if no push was received within the timeout)
+        '''
+        readable, writable, exceptional = select.select([self.__slave_conn], [], [], max(0.0, timeout))
+        if len(readable) == 0:
+            return False
+        self.QueuePushedPointList(self.RecvResponse('pushPointList'))
+        return True
+
+    def WaitPendingPushes(self):
+        '''
+         @brief Wait for all pending pushes from the slave, so that a new request does not interfere with a push.
+            Raises Exception if a push is not received within the tcp timeout.
+        '''
+        while self.__pending_pushes > 0:
+            if not(self.RecvPushedPointList(self.__timeout)):
+                raise Exception('Timeout - pushed point list not received from slave')
+
+    def ReceivePushedPointList(self, seq, timeout):
+        '''
+         @brief Receive point list pushed by the slave for a given frame.
+            Queued point lists of older frames are discarded.
+
+         @param seq (Frame sequence number returned by RequestFrameProcessingOnSlave())
+         @param timeout (Timeout in seconds to wait for the push)
+
+         @return und_shape, keypoints, descriptors, valid, error (Same as RequestPointList(). valid = False if the point list was not received within the timeout)
+        '''
+        start_time = timeit.default_timer()
+        while True:
+            while not(self.__pushed_point_lists.empty()):
+                content = self.__pushed_point_lists.get()
+                if content['seq'] == seq:
+                    self.SetSlaveCaptureTime(content)
+                    und_shape, keypoints, descriptors, valid, error = self.GetContentRequestPointList(content)
+                    return und_shape, keypoints, descriptors, valid, error
+            remaining = timeout - (timeit.default_timer() - start_time)
+            if self.__pending_pushes <= 0 or not(self.RecvPushedPointList(remaining)):
+                return None, None, None, False, False
 
     def RequestFrame(self):
         '''
@@ -218,7 +374,7 @@ class Master(MessageParser, Requests):
         ''' 
         request = 'tradeFrame'
         dtype = str(trade_frame.dtype)
-        trade_frame = trade_frame.tolist()
+        trade_frame = self.PackFrames([trade_frame])[0]
         frame_content = (trade_frame, dtype)
         content = {'filename': filename, 'frame_content': frame_content}
         self.SendRequest(request, content)
@@ -235,9 +391,64 @@ class Master(MessageParser, Requests):
         request                     = 'getPointList'
         self.SendRequest(request, '')
         content                     = self.RecvResponse(request)
+        self.SetSlaveCaptureTime(content)
         und_shape, keypoints, descriptors, valid, error = self.GetContentRequestPointList(content)
         return und_shape, keypoints, descriptors, valid, error
 
+    def SetSlaveCaptureTime(self, content):
+        '''
+         @brief Set capture time of the last point list received from slave.
+
+         @param content (Point list content)
+        '''
+        self.__slave_capture_time = None
+        if 'capture_time' in content:
+            self.__slave_capture_time = content['capture_time']
+
+    def GetSlaveCaptureTime(self):
+        '''
+         @brief Get capture time (in master time) of the frame of the last point list received from slave.
+
+         @return capture_time (None if not given by the slave)
+        '''
+        return self.__slave_capture_time
+
+    def GetTransportMetrics(self, request=None):
+        '''
+         @brief Get transport metrics of the master (see TransportMetrics.GetTransportMetrics()).
+            Timings per request type: 'serialize', 'send' (length message, acknowledge and payload), 'recv', 'deserialize' and 'round_trip' (from serializing the request to receiving the response).
+
+         @param request (Request type, or None for all request types (default=None))
+
+         @return metrics (None if transport metrics are not recorded)
+        '''
+        if self.__transportMetrics == None:
+            return None
+        return self.__transportMetrics.GetTransportMetrics(request)
+
+    def SaveTransportMetrics(self, folder):
+        '''
+         @brief Save transport metrics of the master to 'transport_metrics_master.json' in the given folder, and print them.
+            The metrics are only saved once, as recording is stopped when they are saved (on closing).
+
+         @param folder
+        '''
+        if self.__transportMetrics != None and os.path.isdir(folder):
+            self.__transportMetrics.PrintTransportMetrics()
+            self.__transportMetrics.SaveTransportMetrics(os.path.join(folder, 'transport_metrics_master.json'))
+            self.__transportMetrics = None
+
+    def RequestTransportMetrics(self):
+        '''
+         @brief Request live transport metrics of the slave.
+
+         @return metrics (None if the slave does not record transport metrics)
+        '''
+        request = 'getTransportMetrics'
+        self.SendRequest(request, '')
+        content = self.RecvResponse(request)
+        return content['metrics']
+
     def RequestSetTimestamp(self, timestamp):
         '''
          @brief Request slave to set timestamp
@@ -320,4 +531,6 @@ class Master(MessageParser, Requests):
 
     def __del__(self):
         '''DESTRUCTOR'''
-        self.Disconnect()
\ No newline at end of file
+        self.Disconnect()
+        if self.__sharedFrameRing != None:
+            self.__sharedFrameRing.Close()
\ No newline at end of file
@@ -18,10 +18,12 @@ class MessageParser():
             'getOriginalFrame': self.ParseGeneralPayload,
             'tradeFrame': self.ParseGeneralPayload,
             'getPointList': self.ParseGeneralPayload,
+            'pushPointList': self.ParseGeneralPayload,
             'setTimestamp': self.ParseGeneralPayload,
             'calibrateCV': self.ParseGeneralPayload,
             'slaveReady': self.ParseGeneralPayload,
             'sendFlagToSlave': self.ParseGeneralPayload,
+            'getTransportMetrics': self.ParseGeneralPayload,
             'response_size': self.ParseGeneralPayload,
             'recv_file': self.ParseGeneralPayload,
             'ack': self.ParseGeneralPayload,
@@ -18,6 +18,41 @@ class Requests():
 	def __init__(self, master_or_slave):
 		'''CONSTRUCTOR'''
 		self.__master_or_slave = master_or_slave
+		self.__sharedFrameRing = None
+
+	def SetSharedFrameRing(self, sharedFrameRing):
+		'''
+		 @brief Set shared frame ring for passing frame payloads through shared memory instead of json lists.
+		 	Only for a co-located master and slave (shared memory transport).
+
+		 @param sharedFrameRing (SharedFrameRing instance, or None for json lists)
+		'''
+		self.__sharedFrameRing = sharedFrameRing
+
+	def PackFrames(self, frames):
+		'''
+		 @brief Pack frames for a json payload.
+
+		 @param frames (list of frames)
+
+		 @return packed_frames (list of frames as lists, or as shared memory frame references if the shared frame ring is set)
+		'''
+		if self.__sharedFrameRing != None:
+			return self.__sharedFrameRing.PackFrames(frames)
+		return [frame.tolist() for frame in frames]
+
+	def UnpackFrame(self, packed_frame, dtype):
+		'''
+		 @brief Unpack frame from a json payload.
+
+		 @param packed_frame (frame as list, or shared memory frame reference)
+		 @param dtype
+
+		 @return frame
+		'''
+		if isinstance(packed_frame, dict):
+			return self.__sharedFrameRing.UnpackFrame(packed_frame)
+		return np.array(packed_frame, dtype=dtype)
 
 	def GetContentRequestFrame(self, content, error=False):
 		'''
@@ -38,10 +73,10 @@ class Requests():
 			if valid:
 				original_frame, original_sl_frame, frame_un, dtype, delta_frame, keypoints, descriptors = content['frame_content']
 				dtype 				= np.dtype(dtype)
-				original_frame 		= np.array(original_frame, dtype=dtype)
-				original_sl_frame 	= np.array(original_sl_frame, dtype=dtype)
-				frame_un       		= np.array(frame_un, dtype=dtype)
-				delta_frame   		= np.array(delta_frame, dtype=dtype)
+				original_frame 		= self.UnpackFrame(original_frame, dtype)
+				original_sl_frame 	= self.UnpackFrame(original_sl_frame, dtype)
+				frame_un       		= self.UnpackFrame(frame_un, dtype)
+				delta_frame   		= self.UnpackFrame(delta_frame, dtype)
 				keypoints			= list_to_keypoints(keypoints)
 				descriptors 		= np.array(descriptors)
 				frame_content  		= (original_frame, original_sl_frame, frame_un, delta_frame, keypoints, descriptors)
@@ -52,10 +87,7 @@ class Requests():
 				valid = True
 				original_frame, original_sl_frame, frame_un, delta_frame, keypoints, descriptors = content
 				dtype 				= str(original_frame.dtype)
-				original_frame 		= original_frame.tolist()
-				original_sl_frame 	= original_sl_frame.tolist()
-				frame_un 			= frame_un.tolist()
-				delta_frame 		= delta_frame.tolist()
+				original_frame, original_sl_frame, frame_un, delta_frame = self.PackFrames([original_frame, original_sl_frame, frame_un, delta_frame])
 				keypoints			= keypoints_to_list(keypoints)
 				descriptors 		= descriptors.tolist()
 				frame_content 		= (original_frame, original_sl_frame, frame_un, dtype, delta_frame, keypoints, descriptors)
@@ -82,13 +114,13 @@ class Requests():
 				if content['frame_content'] == 2:
 					original_frame, dtype = content['frame_content']
 					dtype 				= np.dtype(dtype)
-					original_frame 		= np.array(original_frame, dtype=dtype)
+					original_frame 		= self.UnpackFrame(original_frame, dtype)
 					frame_content  		= (original_frame)
 				else:
 					original_frame, original_sl_frame, dtype = content['frame_content']
 					dtype 				= np.dtype(dtype)
-					original_frame 		= np.array(original_frame, dtype=dtype)
-					original_sl_frame 	= np.array(original_sl_frame, dtype=dtype)
+					original_frame 		= self.UnpackFrame(original_frame, dtype)
+					original_sl_frame 	= self.UnpackFrame(original_sl_frame, dtype)
 					frame_content  		= (original_frame, original_sl_frame)
 			return frame_content, valid, error
 		else:
@@ -98,13 +130,12 @@ class Requests():
 				if len(content) == 1:
 					original_frame = content
 					dtype 				= str(original_frame.dtype)
-					original_frame 		= original_frame.tolist()
+					original_frame 		= self.PackFrames([original_frame])[0]
 					frame_content 		= (original_frame, dtype)
 				else:
 					original_frame, original_sl_frame = content
 					dtype 				= str(original_frame.dtype)
-					original_frame 		= original_frame.tolist()
-					original_sl_frame 	= original_sl_frame.tolist()
+					original_frame, original_sl_frame = self.PackFrames([original_frame, original_sl_frame])
 					frame_content 		= (original_frame, original_sl_frame, dtype)
 			content = {'frame_content': frame_content, 'valid': valid, 'error': error}
 			return content
@@ -124,7 +155,7 @@ class Requests():
 			if valid:
 				original_frame, dtype 	= content['frame_content']
 				dtype 					= np.dtype(dtype)
-				original_frame 			= np.array(original_frame, dtype=dtype)
+				original_frame 			= self.UnpackFrame(original_frame, dtype)
 				frame_content  			= (original_frame)
 			return frame_content, valid, error
 		else:
@@ -133,10 +164,10 @@ class Requests():
 				valid = True
 				new_original_frame, dtype 	= recv_content['frame_content']
 				dtype 						= np.dtype(dtype)
-				new_original_frame 			= np.array(new_original_frame, dtype=dtype)
+				new_original_frame 			= self.UnpackFrame(new_original_frame, dtype)
 				original_frame 				= content
 				dtype 						= str(original_frame.dtype)
-				original_frame 				= original_frame.tolist()
+				original_frame 				= self.PackFrames([original_frame])[0]
 				frame_content 				= (original_frame, dtype)
 			content = {'frame_content': frame_content, 'valid': valid, 'error': error}
 			return content, new_original_frame
@@ -0,0 +1,87 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+import os, tempfile
+from src.bin.SharedFrameBuffer import SharedFrameBuffer
+
+def GetLocalSocketAddress(port):
+    '''
+     @brief Get address of the local (unix domain) socket used for control messages by the shared memory transport.
+
+     @param port (TCP port from the settings, used to separate concurrent sessions)
+
+     @return address (socket file path)
+    '''
+    return os.path.join(tempfile.gettempdir(), 'dronevision_{0}.sock'.format(port))
+
+'''
+ @brief Ring of shared frame buffers for passing frame payloads between a co-located master and slave.
+    Frames are written to the next buffer slot in the ring, and only small references to the frames (buffer name and frame header) are sent in the json payload.
+    The receiver attaches to the buffers of the sender by name, and copies the frames out of the buffer.
+    A slot is not overwritten before n_slots new payloads are sent, so a payload stays valid until the receiver has read it.
+
+ @param n_slots (Number of buffer slots in the ring)
+'''
+class SharedFrameRing():
+    def __init__(self, n_slots):
+        '''CONSTRUCTOR'''
+        self.__n_slots          = max(1, n_slots)
+        self.__write_buffers    = [SharedFrameBuffer() for i in range(self.__n_slots)]
+        self.__slot             = 0
+        self.__read_buffers     = {}
+
+    def PackFrames(self, frames):
+        '''
+         @brief Write frames to the next slot in the ring.
+
+         @param frames (list of numpy arrays, or None)
+
+         @return frame_refs (list of json serializable frame references - None for frames given as None)
+        '''
+        write_buffer    = self.__write_buffers[self.__slot]
+        self.__slot     = (self.__slot + 1) % self.__n_slots
+        fname, headers  = write_buffer.WriteFrames(frames)
+        frame_refs      = []
+        for header in headers:
+            if header == None:
+                frame_refs.append(None)
+            else:
+                frame_refs.append({'shm': fname, 'header': header})
+        return frame_refs
+
+    def UnpackFrame(self, frame_ref):
+        '''
+         @brief Read a frame from the ring of the sender.
+
+         @param frame_ref (frame reference given by PackFrames)
+
+         @return frame (copy of the frame)
+        '''
+        fname = frame_ref['shm']
+        if not(fname in self.__read_buffers):
+            if len(self.__read_buffers) >= 2*self.__n_slots: # Forget buffers that have been reallocated by the sender.
+                self.CloseReadBuffers()
+            read_buffer = SharedFrameBuffer()
+            read_buffer.Attach(fname)
+            self.__read_buffers[fname] = read_buffer
+        return self.__read_buffers[fname].ReadFrames(fname, [frame_ref['header']], copy=True)[0]
+
+    def CloseReadBuffers(self):
+        '''
+         @brief Close all buffers attached from the sender.
+        '''
+        for read_buffer in self.__read_buffers.values():
+            read_buffer.Close()
+        self.__read_buffers = {}
+
+    def Close(self):
+        '''
+         @brief Close and remove all buffers owned by this ring, and close attached buffers.
+        '''
+        for write_buffer in self.__write_buffers:
+            write_buffer.Close()
+        self.CloseReadBuffers()
\ No newline at end of file
@@ -8,6 +8,10 @@
 import socket, sys, os, timeit
 from src.bin.tools import RunThread
 from Requests import Requests
+from SharedMemoryTransport import SharedFrameRing, GetLocalSocketAddress
+from TriggerBroadcast import TriggerReceiver
+from TransportMetrics import TransportMetrics
+from SocketTuning import ConfigureSocket, SendChunks, RecvExactly, AdaptiveChunker
 from MsgParserRecv.MessageReceiverSlave import MessageReceiverSlave
 from MsgParserRecv.MessageParser import MessageParser
 
@@ -15,6 +19,10 @@ from MsgParserRecv.MessageParser import MessageParser
  @brief Slave class 
 
  @param settings_inst (TCP settings)
+    Uses the shared memory transport if 'transport' is set to 'shm' in the settings (see Master).
+    Receives UDP triggers if 'udp_trigger' is set in the settings, and reports capture times in master time (see TriggerBroadcast).
+    Transport metrics (per request type) are recorded if 'transport_metrics' is set in the settings (see TransportMetrics).
+    Socket options (TCP_NODELAY, SO_SNDBUF, SO_RCVBUF) are given by the settings, and the send chunk size may be tuned from measured throughput (see SocketTuning).
 '''
 class Slave(MessageParser, Requests):
     def __init__(self, settings_inst, subclass):
@@ -27,29 +35,56 @@ class Slave(MessageParser, Requests):
         self.__max_send_size        = settings_inst.GetSettings('master_buffer_size')
         self.__timeout              = settings_inst.GetSettings('tcp_timeout')
         self.__print_payload_info   = settings_inst.GetSettings('print_payload_info')
+        self.__frame_req_timeout    = settings_inst.GetSettings('frame_req_timeout')
         self.__terminate            = False
         self.__connected            = False
         self.__error_flag           = False
         self.__subclass             = subclass
+        self.__use_shm_transport    = settings_inst.GetSettings('transport') == 'shm'
+        self.__sharedFrameRing      = None
+        if self.__use_shm_transport:
+            self.__sharedFrameRing  = SharedFrameRing(settings_inst.GetSettings('shm_ring_slots'))
+            self.SetSharedFrameRing(self.__sharedFrameRing)
+        self.__request_recv_times   = {}
+        self.__transportMetrics     = None
+        self.__settings_inst        = settings_inst
+        self.__sendChunker          = None
+        if settings_inst.GetSettings('auto_tune_send_size'):
+            self.__sendChunker      = AdaptiveChunker(sorted(set([self.__max_send_size, 16*1024, 64*1024, 256*1024, 1024**2])) + [0])
+        if settings_inst.GetSettings('transport_metrics'):
+            self.__transportMetrics = TransportMetrics('slave')
+        self.__triggerReceiver      = None
+        if settings_inst.GetSettings('udp_trigger'):
+            self.__triggerReceiver  = TriggerReceiver(settings_inst, self.__subclass.SetProcessNewFrameFlag)
 
     def Connect(self):
         '''
          @brief Connect to master and wait for request
         '''
         # Set up the socket connection to the master
-        self.__connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.__use_shm_transport:
+            address = GetLocalSocketAddress(self.__server_port)
+            self.__connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            address = (self.__host, self.__server_port)
+            self.__connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        ConfigureSocket(self.__connection, self.__settings_inst)
 
         # Initiate the connection to the master
         start_time = timeit.default_timer()
         while not(self.__connected):
             try:
-                self.__connection.connect((self.__host, self.__server_port))
+                self.__connection.connect(address)
                 self.__connected = True
             except socket.error, error:
                 elapsed = timeit.default_timer() - start_time
                 if elapsed > self.__timeout:
                     self.__terminate = True
                     raise
+        if self.__triggerReceiver != None:
+            clock_offset, delay = self.__triggerReceiver.SynchronizeClock()
+            print 'Slave clock offset to master: {0:.6f} sec (round trip delay: {1:.6f} sec)'.format(clock_offset, delay)
+            self.__triggerReceiver.StartTriggerReceiver()
         MessageReceiverSlave(self)
         
     def Disconnect(self):
@@ -59,6 +94,10 @@ class Slave(MessageParser, Requests):
         if self.__connected:
             self.__connection.close()
             self.__connected = False
+        if self.__sharedFrameRing != None:
+            self.__sharedFrameRing.Close()
+        if self.__triggerReceiver != None:
+            self.__triggerReceiver.CloseTriggerReceiver()
 
     def CheckConnected(self):
         '''
@@ -85,23 +124,32 @@ class Slave(MessageParser, Requests):
          @brief Receive large message given by length
 
          @param length Number of bytes to receive.
+            Never reads beyond the message, since the next message may follow immediately (f.ex a pushed point list).
+            The message is received directly into a preallocated buffer (see RecvExactly()).
         '''
-        payload_raw = ''
-        while len(payload_raw) < length:
-            payload_raw += self.Recv()
-        return payload_raw
+        try:
+            return RecvExactly(self.__connection, length)
+        except:
+            self.Disconnect()
+            self.__terminate = True
+            raise
 
-    def Recv(self):
+    def Recv(self, max_length=None):
         '''
          @brief Receive message
 
+         @param max_length Maximum number of bytes to receive (default=None - buffer size)
+
          @return payload_raw Received message
         '''
+        buffer_size = self.__buffer_size
+        if max_length != None:
+            buffer_size = min(buffer_size, max_length)
         reads = 0
         payload_raw = ''
         while len(payload_raw) == 0 and reads < 5:
             try:
-                payload_raw = self.__connection.recv(self.__buffer_size)
+                payload_raw = self.__connection.recv(buffer_size)
             except:
                 self.Disconnect()
                 self.__terminate = True
@@ -115,33 +163,29 @@ class Slave(MessageParser, Requests):
 
          @param payload_raw Message to send
          @param max_len (default=512)
+            The chunk size is tuned from the measured throughput instead, if 'auto_tune_send_size' is set (see AdaptiveChunker).
         '''
-        if len(payload_raw) > max_len:
-            offset = 0
-            while offset < len(payload_raw):
-                if offset + max_len < len(payload_raw):
-                    self.Send(payload_raw[offset:offset+max_len])
-                else:
-                    self.Send(payload_raw[offset:])
-                offset += max_len
+        if self.__sendChunker != None:
+            max_len = self.__sendChunker.GetChunkSize(len(payload_raw))
+            start_time = timeit.default_timer()
+            self.Send(payload_raw, max_len)
+            self.__sendChunker.AddThroughputSample(max_len, len(payload_raw), timeit.default_timer() - start_time)
         else:
-            self.Send(payload_raw)
+            self.Send(payload_raw, max_len)
 
-    def Send(self, payload_raw):
+    def Send(self, payload_raw, max_len=0):
         '''
          @brief Send message 
 
          @param payload_raw Message to send
+         @param max_len (Chunk size - the message is sent completely in chunks of memoryviews (see SendChunks()), 0 = single call (default=0))
         '''
-        length = len(payload_raw)
-        offset  = 0
-        while offset < length:
-            try:
-                offset = self.__connection.send(payload_raw[offset:])
-            except:
-                self.Disconnect()
-                self.__terminate = True
-                raise
+        try:
+            SendChunks(self.__connection, payload_raw, max_len)
+        except:
+            self.Disconnect()
+            self.__terminate = True
+            raise
 
     def RecvPackage(self):
         '''
@@ -158,9 +202,16 @@ class Slave(MessageParser, Requests):
         if response == 'error':
             raise Exception(content)
         elif response == 'response_size':
+            recv_start_time = timeit.default_timer()
             self.SendAck()
             payload_raw = self.RecvLarge(content['length'])
+            recv_end_time = timeit.default_timer()
             response, content = self.Parse(payload_raw)
+            self.__request_recv_times[response] = timeit.default_timer()
+            if self.__transportMetrics != None:
+                self.__transportMetrics.AddTiming(response, 'recv', recv_end_time - recv_start_time)
+                self.__transportMetrics.AddTiming(response, 'deserialize', self.__request_recv_times[response] - recv_end_time)
+                self.__transportMetrics.AddPayload(response, 'received', len(payload_raw))
         return response, content
 
     def SendAck(self):
@@ -187,12 +238,20 @@ class Slave(MessageParser, Requests):
          @param request Request identity
          @param content Requested content
         '''
+        start_time = timeit.default_timer()
         payload = {'request': request, 'content': content}
         payload_raw = self.DumpJson(payload)
+        serialized_time = timeit.default_timer()
         if self.__print_payload_info:
             print 'PAYLOAD SLAVE -> MASTER: {0}, {1}'.format(payload['request'], len(payload_raw))
         self.SendLengthFrontMsg(len(payload_raw))
         self.SendLarge(payload_raw, self.__max_send_size)
+        if self.__transportMetrics != None:
+            self.__transportMetrics.AddTiming(request, 'serialize', serialized_time - start_time)
+            self.__transportMetrics.AddTiming(request, 'send', timeit.default_timer() - serialized_time)
+            self.__transportMetrics.AddPayload(request, 'sent', len(payload_raw))
+            if request in self.__request_recv_times:
+                self.__transportMetrics.AddTiming(request, 'service', timeit.default_timer() - self.__request_recv_times.pop(request))
 
     def SendLengthFrontMsg(self, length):
         '''
@@ -218,7 +277,13 @@ class Slave(MessageParser, Requests):
         stop = False
         if request == 'setNewFrame':
             self.SendPayload(request, '')
-            self.__subclass.SetProcessNewFrameFlag()
+            seq, push_point_list, triggered = None, False, False
+            if isinstance(content, dict):
+                seq, push_point_list, triggered = content['seq'], content['push_point_list'], content['triggered']
+            if not(triggered): # Else triggered by the UDP trigger broadcast
+                self.__subclass.SetProcessNewFrameFlag(seq)
+            if push_point_list:
+                self.PushPointList(seq)
         elif request == 'getFrame':
             frame_content, error    = self.__subclass.GetFramePayload()
             content                 = self.GetContentRequestFrame(frame_content, error)
@@ -242,6 +307,9 @@ class Slave(MessageParser, Requests):
         elif request == 'getPointList':
             frame_content, error    = self.__subclass.GetFramePayload()
             content                 = self.GetContentRequestPointList(frame_content, error)
+            capture_time            = self.GetCaptureTime()
+            if capture_time != None:
+                content['capture_time'] = capture_time
             self.SendPayload(request, content)
             if content['valid']:
                 self.__subclass.SetStoreDBFlag() # Store frames to database after sending them to master.
@@ -260,6 +328,8 @@ class Slave(MessageParser, Requests):
             flag = self.GetContentSendFlagToSlave(content)
             self.__subclass.SetFlagFromMaster(flag)
             self.SendPayload(request, '')
+        elif request == 'getTransportMetrics':
+            self.SendPayload(request, {'metrics': self.GetTransportMetrics()})
         elif request == 'stop':
             self.SendPayload(request, '')
             self.ForceTermination()
@@ -279,6 +349,65 @@ class Slave(MessageParser, Requests):
             self.SendPayload(request, '')
         return stop
 
+    def PushPointList(self, seq):
+        '''
+         @brief Push point list of the new frame to master as soon as it is processed.
+            The point list is tagged with the frame sequence number given by the master.
+            The master does not send new requests before the push is received, so a push is always sent - as invalid if the frame was not processed within the frame request timeout.
+
+         @param seq (Frame sequence number)
+        '''
+        frame_content, error = None, False
+        if self.__subclass.WaitNewFrameProcessed(self.__frame_req_timeout, seq):
+            frame_content, error = self.__subclass.GetFramePayload()
+        content                 = self.GetContentRequestPointList(frame_content, error)
+        content['seq']          = seq
+        capture_time            = self.GetCaptureTime()
+        if capture_time != None:
+            content['capture_time'] = capture_time
+        self.SendPayload('pushPointList', content)
+        if content['valid']:
+            self.__subclass.SetStoreDBFlag() # Store frames to database after sending them to master.
+
+    def GetCaptureTime(self):
+        '''
+         @brief Get capture time of the prepared frame in master time.
+            The capture time is only given if the clock is synchronized to the master (UDP trigger).
+
+         @return capture_time (None if no frame is captured, or the clock is not synchronized)
+        '''
+        if self.__triggerReceiver == None or self.__triggerReceiver.GetClockOffset()[1] == None:
+            return None
+        capture_time = self.__subclass.GetCaptureTime()
+        if capture_time != None:
+            capture_time = self.__triggerReceiver.GetMasterTime(capture_time)
+        return capture_time
+
+    def GetTransportMetrics(self, request=None):
+        '''
+         @brief Get transport metrics of the slave (see TransportMetrics.GetTransportMetrics()).
+            Timings per request type: 'recv', 'deserialize', 'serialize', 'send' (length message, acknowledge and payload) and 'service' (from receiving the request to sending the response).
+
+         @param request (Request type, or None for all request types (default=None))
+
+         @return metrics (None if transport metrics are not recorded)
+        '''
+        if self.__transportMetrics == None:
+            return None
+        return self.__transportMetrics.GetTransportMetrics(request)
+
+    def SaveTransportMetrics(self, folder):
+        '''
+         @brief Save transport metrics of the slave to 'transport_metrics_slave.json' in the given folder, and print them.
+            The metrics are only saved once, as recording is stopped when they are saved (on closing).
+
+         @param folder
+        '''
+        if self.__transportMetrics != None and os.path.isdir(folder):
+            self.__transportMetrics.PrintTransportMetrics()
+            self.__transportMetrics.SaveTransportMetrics(os.path.join(folder, 'transport_metrics_slave.json'))
+            self.__transportMetrics = None
+
     def RestartRequest(self):
         '''
          @brief Initiated by a restart request from master
@@ -0,0 +1,196 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+import socket, timeit, threading
+
+def ConfigureSocket(sock, settings_inst):
+    '''
+     @brief Set socket options given by the TCP settings.
+        TCP_NODELAY (Nagle's algorithm) is only set on TCP sockets. SO_SNDBUF/SO_RCVBUF are left to the OS default if set to 0.
+        Set the options on a listening socket before accepting, so the accepted connection inherits them (the receive window is negotiated on connecting).
+
+     @param sock
+     @param settings_inst (TCP settings)
+    '''
+    if sock.family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(settings_inst.GetSettings('tcp_nodelay')))
+    if settings_inst.GetSettings('so_sndbuf') > 0:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, settings_inst.GetSettings('so_sndbuf'))
+    if settings_inst.GetSettings('so_rcvbuf') > 0:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings_inst.GetSettings('so_rcvbuf'))
+
+def SendChunks(sock, payload_raw, chunk_size):
+    '''
+     @brief Send payload completely, in chunks of chunk_size bytes.
+        The chunks are memoryviews of the payload, so nothing is copied before it is handed to the socket.
+
+     @param sock
+     @param payload_raw (string)
+     @param chunk_size (Bytes per sendall call, <= 0 to send the payload by a single call)
+    '''
+    length = len(payload_raw)
+    if chunk_size <= 0 or length <= chunk_size:
+        sock.sendall(payload_raw)
+        return
+    view = memoryview(payload_raw)
+    for offset in xrange(0, length, chunk_size):
+        sock.sendall(view[offset:offset+chunk_size])
+
+def RecvExactly(sock, length):
+    '''
+     @brief Receive exactly length bytes into a preallocated buffer.
+        Raises socket.error if the connection is closed before the message is received.
+
+     @param sock
+     @param length
+
+     @return payload_raw (string)
+    '''
+    payload_raw = bytearray(length)
+    view        = memoryview(payload_raw)
+    offset      = 0
+    while offset < length:
+        n_bytes = sock.recv_into(view[offset:], length - offset)
+        if n_bytes == 0:
+            raise socket.error('Connection closed after {0} of {1} bytes'.format(offset, length))
+        offset += n_bytes
+    return str(payload_raw)
+
+'''
+ @brief Tuning of the send chunk size from measured throughput.
+    Each candidate chunk size is used for 'samples' large payloads (>= min_payload bytes), and the candidate with the highest measured throughput is kept.
+    Small payloads are sent by a single call, and are not measured.
+
+ @param candidates (Candidate chunk sizes in bytes, 0 for sending the payload by a single call)
+ @param min_payload (Minimum payload size in bytes to measure (default=65536))
+ @param samples (Number of payloads to measure for each candidate (default=3))
+'''
+class AdaptiveChunker():
+    def __init__(self, candidates, min_payload=65536, samples=3):
+        '''CONSTRUCTOR'''
+        self.__candidates   = list(candidates)
+        self.__min_payload  = min_payload
+        self.__samples      = samples
+        self.__candidate_i  = 0
+        self.__n_samples    = 0
+        self.__n_bytes      = 0
+        self.__seconds      = 0.0
+        self.__throughputs  = {}
+        self.__chunk_size   = None
+        self.__lock         = threading.Lock()
+
+    def GetChunkSize(self, n_bytes):
+        '''
+         @brief Get chunk size for sending a payload.
+
+         @param n_bytes (Payload size)
+
+         @return chunk_size (0 = single call)
+        '''
+        if n_bytes < self.__min_payload:
+            return 0
+        with self.__lock:
+            if self.__chunk_size != None:
+                return self.__chunk_size
+            return self.__candidates[self.__candidate_i]
+
+    def AddThroughputSample(self, chunk_size, n_bytes, seconds):
+        '''
+         @brief Add measured send time of a payload.
+
+         @param chunk_size (Chunk size given by GetChunkSize())
+         @param n_bytes (Payload size)
+         @param seconds (Send time)
+        '''
+        if n_bytes < self.__min_payload:
+            return
+        with self.__lock:
+            if self.__chunk_size != None or chunk_size != self.__candidates[self.__candidate_i]:
+                return
+            self.__n_samples    += 1
+            self.__n_bytes      += n_bytes
+            self.__seconds      += seconds
+            if self.__n_samples < self.__samples:
+                return
+            self.__throughputs[chunk_size] = self.__n_bytes/max(self.__seconds, 1e-9)
+            self.__n_samples    = 0
+            self.__n_bytes      = 0
+            self.__seconds      = 0.0
+            self.__candidate_i  += 1
+            if self.__candidate_i >= len(self.__candidates):
+                self.__chunk_size = max(self.__throughputs.keys(), key=lambda candidate: self.__throughputs[candidate])
+
+    def GetTunedChunkSize(self):
+        '''
+         @brief Get the tuned chunk size.
+
+         @return chunk_size, throughputs (chunk_size = None if tuning is not finished, throughputs = {chunk_size: bytes/sec} of the measured candidates)
+        '''
+        with self.__lock:
+            return self.__chunk_size, dict(self.__throughputs)
+
+def RunThroughputBenchmark(settings_inst, payload_sizes=None, chunk_sizes=None, repeats=3):
+    '''
+     @brief Benchmark the throughput of the transport over a loopback TCP connection, with socket options given by the TCP settings.
+        Each payload is sent with SendChunks() and received with RecvExactly(), and is timed until a one byte acknowledge is received.
+
+     @param settings_inst (TCP settings)
+     @param payload_sizes (List of payload sizes in bytes (default=None - 1 KB to 50 MB))
+     @param chunk_sizes (List of chunk sizes to compare (default=None - 'master_buffer_size', 64 KB and a single call (0)))
+     @param repeats (Number of transfers of each payload (default=3))
+
+     @return results (dictionary: {chunk_size: {payload_size: best throughput in bytes/sec}})
+    '''
+    if payload_sizes == None:
+        payload_sizes = [1024, 10*1024, 100*1024, 1024**2, 10*1024**2, 50*1024**2]
+    if chunk_sizes == None:
+        chunk_sizes = [settings_inst.GetSettings('master_buffer_size'), 64*1024, 0]
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    ConfigureSocket(server, settings_inst)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    def RunReceiver():
+        conn, address = server.accept()
+        try:
+            for chunk_size in chunk_sizes:
+                for payload_size in payload_sizes:
+                    for i in range(repeats):
+                        RecvExactly(conn, payload_size)
+                        conn.sendall('a')
+        finally:
+            conn.close()
+    receiver = threading.Thread(target=RunReceiver)
+    receiver.daemon = True
+    receiver.start()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    ConfigureSocket(sender, settings_inst)
+    sender.connect(server.getsockname())
+    results = {}
+    try:
+        payloads = dict((payload_size, '\x00'*payload_size) for payload_size in payload_sizes)
+        for chunk_size in chunk_sizes:
+            results[chunk_size] = {}
+            for payload_size in payload_sizes:
+                best = None
+                for i in range(repeats):
+                    start_time = timeit.default_timer()
+                    SendChunks(sender, payloads[payload_size], chunk_size)
+                    RecvExactly(sender, 1)
+                    elapsed = timeit.default_timer() - start_time
+                    if best == None or elapsed < best:
+                        best = elapsed
+                results[chunk_size][payload_size] = payload_size/max(best, 1e-9)
+    finally:
+        sender.close()
+        receiver.join(5.0)
+        server.close()
+    print 'Transport throughput over loopback (tcp_nodelay = {0}, so_sndbuf = {1}, so_rcvbuf = {2}):'.format(settings_inst.GetSettings('tcp_nodelay'), settings_inst.GetSettings('so_sndbuf'), settings_inst.GetSettings('so_rcvbuf'))
+    for chunk_size in chunk_sizes:
+        print '\tchunk size {0}:'.format(chunk_size if chunk_size > 0 else 'single call')
+        for payload_size in payload_sizes:
+            print '\t\t{0} bytes: {1:.1f} MB/s'.format(payload_size, results[chunk_size][payload_size]/1024.0**2)
+    return results
@@ -0,0 +1,174 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+import math, json, threading
+
+'''
+ @brief Histogram of latencies with logarithmic bins (fixed memory, O(1) insertion).
+    Percentiles are accurate to the bin width (bins_per_octave=4 gives < 19% relative error).
+
+ @param min_value (Upper limit of the first bin in seconds (default=1e-6))
+ @param bins_per_octave (default=4)
+ @param n_bins (default=112 - up to about 4.5 min with the default min_value and bins_per_octave)
+'''
+class LatencyHistogram():
+    def __init__(self, min_value=1e-6, bins_per_octave=4, n_bins=112):
+        '''CONSTRUCTOR'''
+        self.__min_value        = min_value
+        self.__bins_per_octave  = bins_per_octave
+        self.__bins             = [0]*n_bins
+        self.__count            = 0
+        self.__sum              = 0.0
+        self.__min              = None
+        self.__max              = None
+
+    def Add(self, value):
+        '''
+         @brief Add value to the histogram
+
+         @param value (seconds)
+        '''
+        if value <= self.__min_value:
+            i = 0
+        else:
+            i = min(int(math.ceil(math.log(value/self.__min_value, 2)*self.__bins_per_octave)), len(self.__bins)-1)
+        self.__bins[i] += 1
+        self.__count   += 1
+        self.__sum     += value
+        if self.__min == None or value < self.__min:
+            self.__min = value
+        if self.__max == None or value > self.__max:
+            self.__max = value
+
+    def GetCount(self):
+        '''
+         @brief Get number of values in the histogram
+
+         @return count
+        '''
+        return self.__count
+
+    def GetPercentile(self, percentile):
+        '''
+         @brief Get percentile of the values in the histogram.
+
+         @param percentile (0-100)
+
+         @return value (Upper limit of the bin containing the percentile, limited to the max value. None if the histogram is empty)
+        '''
+        if self.__count == 0:
+            return None
+        rank        = percentile/100.0*self.__count
+        cumulative  = 0
+        for i in range(len(self.__bins)):
+            cumulative += self.__bins[i]
+            if cumulative >= rank and cumulative > 0:
+                return min(self.__min_value*2**(float(i)/self.__bins_per_octave), self.__max)
+        return self.__max
+
+    def GetSummary(self):
+        '''
+         @brief Get summary of the histogram
+
+         @return summary (dictionary with count, mean, min, max, p50, p90, p99 (seconds))
+        '''
+        mean = None
+        if self.__count > 0:
+            mean = self.__sum/self.__count
+        return {'count': self.__count, 'mean': mean, 'min': self.__min, 'max': self.__max, 'p50': self.GetPercentile(50), 'p90': self.GetPercentile(90), 'p99': self.GetPercentile(99)}
+
+'''
+ @brief In-memory transport metrics per request type.
+    Timings (f.ex 'serialize', 'deserialize', 'send', 'recv', 'round_trip') are kept in latency histograms,
+    and payloads are counted with their total and max size in bytes for each direction ('sent'/'received').
+
+ @param name (Name of the instrumented end, f.ex 'master' or 'slave')
+'''
+class TransportMetrics():
+    def __init__(self, name):
+        '''CONSTRUCTOR'''
+        self.__name     = name
+        self.__timings  = {}
+        self.__payloads = {}
+        self.__lock     = threading.Lock()
+
+    def AddTiming(self, request, metric, seconds):
+        '''
+         @brief Add timing of a request
+
+         @param request (Request type)
+         @param metric (Timing type)
+         @param seconds
+        '''
+        with self.__lock:
+            if not(request in self.__timings):
+                self.__timings[request] = {}
+            if not(metric in self.__timings[request]):
+                self.__timings[request][metric] = LatencyHistogram()
+            self.__timings[request][metric].Add(seconds)
+
+    def AddPayload(self, request, direction, n_bytes):
+        '''
+         @brief Add payload of a request
+
+         @param request (Request type)
+         @param direction ('sent' or 'received')
+         @param n_bytes
+        '''
+        with self.__lock:
+            if not(request in self.__payloads):
+                self.__payloads[request] = {}
+            if not(direction in self.__payloads[request]):
+                self.__payloads[request][direction] = {'count': 0, 'bytes': 0, 'max_bytes': 0}
+            payload = self.__payloads[request][direction]
+            payload['count']        += 1
+            payload['bytes']        += n_bytes
+            payload['max_bytes']    = max(payload['max_bytes'], n_bytes)
+
+    def GetTransportMetrics(self, request=None):
+        '''
+         @brief Get summary of the transport metrics.
+
+         @param request (Request type, or None for all request types (default=None))
+
+         @return metrics (dictionary: {request: {'timings': {metric: histogram summary}, 'payloads': {direction: {'count', 'bytes', 'max_bytes'}}}})
+        '''
+        metrics = {}
+        with self.__lock:
+            for req in set(self.__timings.keys() + self.__payloads.keys()):
+                if request != None and req != request:
+                    continue
+                timings = {}
+                for metric, histogram in self.__timings.get(req, {}).items():
+                    timings[metric] = histogram.GetSummary()
+                payloads = {}
+                for direction, payload in self.__payloads.get(req, {}).items():
+                    payloads[direction] = dict(payload)
+                metrics[req] = {'timings': timings, 'payloads': payloads}
+        return metrics
+
+    def PrintTransportMetrics(self):
+        '''
+         @brief Print summary of the transport metrics.
+        '''
+        metrics = self.GetTransportMetrics()
+        print 'Transport metrics ({0}):'.format(self.__name)
+        for request in sorted(metrics.keys()):
+            print '\t{0}:'.format(request)
+            for direction, payload in sorted(metrics[request]['payloads'].items()):
+                print '\t\t{0}: {1} payloads, {2} bytes (max {3} bytes)'.format(direction, payload['count'], payload['bytes'], payload['max_bytes'])
+            for metric, summary in sorted(metrics[request]['timings'].items()):
+                print '\t\t{0}: n = {1}, mean = {2:.6f}, p50 = {3:.6f}, p90 = {4:.6f}, p99 = {5:.6f}, max = {6:.6f} sec'.format(metric, summary['count'], summary['mean'], summary['p50'], summary['p90'], summary['p99'], summary['max'])
+
+    def SaveTransportMetrics(self, filename):
+        '''
+         @brief Save summary of the transport metrics to json file.
+
+         @param filename
+        '''
+        with open(filename, 'w') as f:
+            json.dump({'name': self.__name, 'metrics': self.GetTransportMetrics()}, f, indent=4, sort_keys=True)
\ No newline at end of file
@@ -0,0 +1,226 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+
+import socket, json, timeit, threading
+
+def GetTriggerClock():
+    '''
+     @brief Clock used for trigger and capture timestamps.
+
+     @return timestamp (seconds)
+    '''
+    return timeit.default_timer()
+
+def ComputeClockOffset(t0, t1, t2, t3):
+    '''
+     @brief Compute clock offset and round trip delay from an NTP-style exchange.
+
+     @param t0 (Local time of sending the request)
+     @param t1 (Remote time of receiving the request)
+     @param t2 (Remote time of sending the reply)
+     @param t3 (Local time of receiving the reply)
+
+     @return offset, delay (Returns: offset = remote time - local time, delay = round trip delay)
+    '''
+    offset  = ((t1 - t0) + (t2 - t3))/2.0
+    delay   = (t3 - t0) - (t2 - t1)
+    return offset, delay
+
+'''
+ @brief Master end of the UDP trigger channel.
+    Triggers (sequence number + master timestamp) are broadcasted to all camera nodes on 'udp_trigger_port'.
+    Clock synchronization requests from the camera nodes are answered on 'udp_trigger_port'+1.
+
+ @param settings_inst (TCP settings)
+'''
+class TriggerBroadcaster():
+    def __init__(self, settings_inst):
+        '''CONSTRUCTOR'''
+        self.__trigger_address  = (settings_inst.GetSettings('udp_trigger_address'), settings_inst.GetSettings('udp_trigger_port'))
+        self.__sync_port        = settings_inst.GetSettings('udp_trigger_port') + 1
+        self.__trigger_socket   = None
+        self.__sync_socket      = None
+        self.__running          = False
+
+    def StartTriggerBroadcaster(self):
+        '''
+         @brief Open the trigger socket, and start answering clock synchronization requests.
+        '''
+        self.__trigger_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__trigger_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.__sync_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__sync_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__sync_socket.bind(('', self.__sync_port))
+        self.__sync_socket.settimeout(0.5)
+        self.__running = True
+        t = threading.Thread(target=self.RunClockSyncServer)
+        t.daemon = True
+        t.start()
+
+    def BroadcastTrigger(self, seq):
+        '''
+         @brief Broadcast trigger to all camera nodes.
+
+         @param seq (Frame sequence number)
+
+         @return timestamp (Master timestamp of the trigger)
+        '''
+        timestamp = GetTriggerClock()
+        self.__trigger_socket.sendto(json.dumps({'seq': seq, 'timestamp': timestamp}), self.__trigger_address)
+        return timestamp
+
+    def RunClockSyncServer(self):
+        '''
+         @brief Answer clock synchronization requests.
+            Execute in thread.
+        '''
+        while self.__running:
+            try:
+                payload_raw, address = self.__sync_socket.recvfrom(512)
+                t1 = GetTriggerClock()
+                request = json.loads(payload_raw)
+                self.__sync_socket.sendto(json.dumps({'t0': request['t0'], 't1': t1, 't2': GetTriggerClock()}), address)
+            except socket.timeout:
+                pass
+            except (socket.error, ValueError, KeyError):
+                if not(self.__running):
+                    break
+
+    def CloseTriggerBroadcaster(self):
+        '''
+         @brief Close the trigger channel.
+        '''
+        self.__running = False
+        if self.__trigger_socket != None:
+            self.__trigger_socket.close()
+            self.__trigger_socket = None
+        if self.__sync_socket != None:
+            self.__sync_socket.close()
+            self.__sync_socket = None
+
+'''
+ @brief Camera node end of the UDP trigger channel.
+    Receives triggers broadcasted by the master, and estimates the clock offset to the master with an NTP-style exchange
+    (the sample with the shortest round trip delay of 'clock_sync_samples' is used).
+
+ @param settings_inst (TCP settings)
+ @param trigger_callback (Function called with the sequence number of each received trigger)
+'''
+class TriggerReceiver():
+    def __init__(self, settings_inst, trigger_callback):
+        '''CONSTRUCTOR'''
+        self.__trigger_port         = settings_inst.GetSettings('udp_trigger_port')
+        self.__sync_address         = (settings_inst.GetSettings('master_ip'), settings_inst.GetSettings('udp_trigger_port') + 1)
+        self.__sync_samples         = settings_inst.GetSettings('clock_sync_samples')
+        self.__trigger_callback     = trigger_callback
+        self.__clock_offset         = 0.0
+        self.__clock_sync_delay     = None
+        self.__trigger_latency      = None
+        self.__trigger_socket       = None
+        self.__running              = False
+
+    def StartTriggerReceiver(self):
+        '''
+         @brief Start receiving triggers from the master.
+        '''
+        self.__trigger_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.__trigger_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__trigger_socket.bind(('', self.__trigger_port))
+        self.__trigger_socket.settimeout(0.5)
+        self.__running = True
+        t = threading.Thread(target=self.RunTriggerReceiver)
+        t.daemon = True
+        t.start()
+
+    def RunTriggerReceiver(self):
+        '''
+         @brief Receive triggers.
+            Execute in thread.
+        '''
+        while self.__running:
+            try:
+                payload_raw, address = self.__trigger_socket.recvfrom(512)
+                local_time  = GetTriggerClock()
+                trigger     = json.loads(payload_raw)
+                self.__trigger_latency = self.GetMasterTime(local_time) - trigger['timestamp']
+                self.__trigger_callback(trigger['seq'])
+            except socket.timeout:
+                pass
+            except (socket.error, ValueError, KeyError):
+                if not(self.__running):
+                    break
+
+    def SynchronizeClock(self, timeout=1.0):
+        '''
+         @brief Estimate the clock offset to the master.
+            Raises Exception if no clock synchronization reply is received from the master.
+
+         @param timeout (Timeout in seconds for each reply (default=1.0))
+
+         @return clock_offset, delay (Returns: clock_offset = master time - local time, delay = round trip delay of the used sample)
+        '''
+        sync_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sync_socket.settimeout(timeout)
+        best_offset = None
+        best_delay  = None
+        try:
+            for i in range(self.__sync_samples):
+                t0 = GetTriggerClock()
+                sync_socket.sendto(json.dumps({'t0': t0}), self.__sync_address)
+                try:
+                    reply = json.loads(sync_socket.recvfrom(512)[0])
+                except socket.timeout:
+                    continue
+                t3 = GetTriggerClock()
+                if reply['t0'] != t0: # Late reply to an earlier request
+                    continue
+                offset, delay = ComputeClockOffset(t0, reply['t1'], reply['t2'], t3)
+                if best_delay == None or delay < best_delay:
+                    best_offset = offset
+                    best_delay  = delay
+        finally:
+            sync_socket.close()
+        if best_offset == None:
+            raise Exception('Clock synchronization failed - no reply from master')
+        self.__clock_offset     = best_offset
+        self.__clock_sync_delay = best_delay
+        return best_offset, best_delay
+
+    def GetMasterTime(self, local_time):
+        '''
+         @brief Convert local timestamp to master time.
+
+         @param local_time
+
+         @return master_time
+        '''
+        return local_time + self.__clock_offset
+
+    def GetClockOffset(self):
+        '''
+         @brief Get estimated clock offset to the master.
+
+         @return clock_offset, delay (master time - local time, round trip delay of the clock synchronization (None if not synchronized))
+        '''
+        return self.__clock_offset, self.__clock_sync_delay
+
+    def GetTriggerLatency(self):
+        '''
+         @brief Get latency of the last received trigger (in master time).
+
+         @return trigger_latency (None if no trigger is received)
+        '''
+        return self.__trigger_latency
+
+    def CloseTriggerReceiver(self):
+        '''
+         @brief Stop receiving triggers.
+        '''
+        self.__running = False
+        if self.__trigger_socket != None:
+            self.__trigger_socket.close()
+            self.__trigger_socket = None
\ No newline at end of file
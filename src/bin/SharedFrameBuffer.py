@@ -0,0 +1,140 @@
+'''
+ Author: Hans Erik Heggem
+ Email: hans.erik.heggem@gmail.com
+ Project: Master's Thesis - Autonomous Inspection Of Wind Blades
+ Repository: Master's Thesis - CV (Computer Vision)
+'''
+import mmap, os, tempfile
+import numpy as np
+
+'''
+ @brief Shared memory buffer for passing frames between processes without serializing them.
+ 	The buffer is a memory mapped file (in /dev/shm if available), so any process may attach to it by its name.
+ 	Each direction of a process pair should have its own buffer, where the writing process owns the buffer.
+ 	The owner reallocates the buffer with a new name if the frames do not fit, and removes the file when closed.
+ 	The buffer name and frame headers are sent to the receiving process by a pipe, and frames are read as views into the buffer.
+'''
+class SharedFrameBuffer():
+	def __init__(self):
+		'''CONSTRUCTOR'''
+		self.__fname 	= None
+		self.__mmap 	= None
+		self.__nbytes 	= 0
+		self.__owner 	= False
+
+	def GetName(self):
+		'''
+		 @brief Get name of the shared buffer
+
+		 @return fname (None if the buffer is not allocated)
+		'''
+		return self.__fname
+
+	def Allocate(self, nbytes):
+		'''
+		 @brief Allocate a new owned buffer if the current buffer is too small.
+
+		 @param nbytes (Minimum buffer size in bytes)
+		'''
+		if self.__owner and nbytes <= self.__nbytes:
+			return
+		self.Close()
+		shm_folder 	= '/dev/shm' if os.path.isdir('/dev/shm') else None
+		fd, fname 	= tempfile.mkstemp(prefix='dronevision_frames_', dir=shm_folder)
+		try:
+			nbytes = max(nbytes, mmap.PAGESIZE)
+			os.ftruncate(fd, nbytes)
+			self.__mmap = mmap.mmap(fd, nbytes)
+		finally:
+			os.close(fd)
+		self.__fname 	= fname
+		self.__nbytes 	= nbytes
+		self.__owner 	= True
+
+	def Attach(self, fname):
+		'''
+		 @brief Attach to a buffer owned by another process.
+
+		 @param fname (Buffer name given by the owner)
+		'''
+		self.Close()
+		fd = os.open(fname, os.O_RDWR)
+		try:
+			self.__nbytes 	= os.fstat(fd).st_size
+			self.__mmap 	= mmap.mmap(fd, self.__nbytes)
+		finally:
+			os.close(fd)
+		self.__fname = fname
+		self.__owner = False
+
+	def WriteFrames(self, frames):
+		'''
+		 @brief Write frames to the buffer (the buffer is (re)allocated if necessary).
+
+		 @param frames (list of numpy arrays, or None)
+
+		 @return fname, headers (Returns: fname = buffer name, headers = list of (offset, shape, dtype) for each frame (None for frames given as None))
+		'''
+		headers = []
+		offset 	= 0
+		for i in range(len(frames)):
+			if not(isinstance(frames[i], np.ndarray)):
+				headers.append(None)
+				continue
+			headers.append((offset, frames[i].shape, frames[i].dtype.str))
+			offset += frames[i].nbytes + (-frames[i].nbytes % 64) # 64 byte aligned frames
+		self.Allocate(offset)
+		for frame, header in zip(frames, headers):
+			if header != None:
+				self.GetFrame(header)[...] = frame
+		return self.__fname, headers
+
+	def ReadFrames(self, fname, headers, copy=False):
+		'''
+		 @brief Read frames from the buffer. Attaches to the buffer if it is not attached.
+		 	Frames are views into the buffer (unless copy=True), which are valid until the owner writes new frames.
+
+		 @param fname (Buffer name given by the owner)
+		 @param headers (Frame headers given by WriteFrames)
+		 @param copy (True for copying frames out of the buffer (default=False))
+
+		 @return frames (list of numpy arrays, or None)
+		'''
+		if fname != self.__fname:
+			self.Attach(fname)
+		frames = []
+		for header in headers:
+			if header == None:
+				frames.append(None)
+			elif copy:
+				frames.append(self.GetFrame(header).copy())
+			else:
+				frames.append(self.GetFrame(header))
+		return frames
+
+	def GetFrame(self, header):
+		'''
+		 @brief Get frame view into the buffer.
+
+		 @param header (offset, shape, dtype)
+
+		 @return frame
+		'''
+		offset, shape, dtype = header
+		return np.frombuffer(self.__mmap, dtype=np.dtype(dtype), count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+	def Close(self):
+		'''
+		 @brief Close the buffer, and remove it if this is the owner.
+		 	Attached processes keep their mapping of a removed buffer until they attach to a new one.
+		'''
+		self.__mmap = None # Not closed explicitly - frame views keep a reference to the mapping, which is released with the last view.
+		if self.__owner and self.__fname != None and os.path.isfile(self.__fname):
+			os.remove(self.__fname)
+		self.__fname 	= None
+		self.__nbytes 	= 0
+		self.__owner 	= False
+
+	def __del__(self):
+		'''DESTRUCTOR'''
+		self.Close()
\ No newline at end of file
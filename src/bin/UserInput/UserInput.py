@@ -20,9 +20,11 @@ class UserInput():
         '''CONSTRUCTOR'''
         self.__terminate            = False
         self.__capture_img          = False
+        self.__trigger_recording    = False
         self.__getch_lock           = threading.Lock()
         self.__getch                = Getch() # Get new user input by calling self.__getch()
-        self.__action_keys          = {  input_settings.GetSettings('key_terminate'): 'terminate'}
+        self.__action_keys          = {  input_settings.GetSettings('key_terminate'): 'terminate',
+                                        input_settings.GetSettings('key_trigger_recording'): 'trigger_recording'}
         self.__manual_user_input    = True
         self.__auto                 = input_settings.GetSettings('automatic_mode')
         self.__no_termination       = input_settings.GetSettings('no_termination')
@@ -82,6 +84,16 @@ class UserInput():
             self.ManualHandleUserInput()
         return self.__terminate
 
+    def CheckRecordingTriggeredByUser(self):
+        '''
+         @brief Check if the user has triggered frame recording since the last check
+
+         @return True/False
+        '''
+        triggered                   = self.__trigger_recording
+        self.__trigger_recording    = False
+        return triggered
+
     def StartAutoHandleUserInput(self):
         '''
          @brief Handle auto user input in thread
@@ -115,6 +127,8 @@ class UserInput():
         ######## HANDLE ACTION KEYS ##########
         if action_key == 'terminate':
             self.ForceTermination()
+        elif action_key == 'trigger_recording':
+            self.__trigger_recording = True
         ######################################
 
     def PrintActionKeys(self):
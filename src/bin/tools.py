@@ -4,7 +4,7 @@
  Project: Master's Thesis - Autonomous Inspection Of Wind Blades
  Repository: Master's Thesis - CV (Computer Vision)
 '''
-import os, threading, timeit, time, warnings
+import os, threading, timeit, time, warnings, Queue
 from datetime import datetime
 
 def RemoveDir(directory):
@@ -97,4 +97,53 @@ def RunThread(func, args=(), daemon=True, lock=None, wait_lock=False, wait_timeo
 				t.start()
 			else:
 				raise Exception('Runtime error - lock not availble')
-	return t
\ No newline at end of file
+	return t
+
+WARNING_INTERVAL = 100 # Repeated warnings are given for the first event, and then every WARNING_INTERVAL events.
+
+def WarnRateLimited(message, count):
+	'''
+	 @brief Warn about a repeated event, rate-limited to the first and then every WARNING_INTERVAL event.
+
+	 @param message
+	 @param count (Number of events so far, including this event)
+
+	 @return True/False (True if warned)
+	'''
+	if count == 1 or count % WARNING_INTERVAL == 0:
+		warnings.simplefilter('always')
+		warnings.warn(message, Warning)
+		warnings.simplefilter('default')
+		return True
+	return False
+
+def PutBoundedQueue(queue, item, block_on_full, status, status_lock, name='Queue', unit='items'):
+	'''
+	 @brief Put item in a bounded queue, with backpressure accounting.
+	 	A full queue is counted as 'blocked' (waits for room) or 'dropped' (item is not queued), with a rate-limited warning.
+	 	'queued' and 'max_queue_depth' are updated for queued items.
+
+	 @param queue (Queue.Queue)
+	 @param item
+	 @param block_on_full (True for waiting on a full queue, False for dropping the item)
+	 @param status (Status dictionary with 'queued', 'dropped', 'blocked' and 'max_queue_depth' counters)
+	 @param status_lock (Lock of the status dictionary)
+	 @param name (Name of the queue owner in the warning (default='Queue'))
+	 @param unit (Name of the items in the warning (default='items'))
+
+	 @return True/False (False if the item was dropped)
+	'''
+	try:
+		queue.put_nowait(item)
+	except Queue.Full:
+		with status_lock:
+			status['blocked' if block_on_full else 'dropped'] += 1
+			n_dropped, n_blocked = status['dropped'], status['blocked']
+		WarnRateLimited('{0} queue is full ({1} {2}) - {3} {2} dropped, {4} {2} blocked so far.'.format(name, queue.maxsize, unit, n_dropped, n_blocked), n_dropped + n_blocked)
+		if not(block_on_full):
+			return False
+		queue.put(item)
+	with status_lock:
+		status['queued'] += 1
+		status['max_queue_depth'] = max(status['max_queue_depth'], queue.qsize())
+	return True
\ No newline at end of file